@@ -46,6 +46,7 @@ function(gen_kobject_list_gperf)
     SCRIPT_ARGS
       --kernel $<TARGET_FILE:${arg_KERNEL_TARGET}>
       --gperf-output ${arg_OUTPUT}
+      --cache-dir ${CMAKE_BINARY_DIR}/kobject_cache
     INCLUDES ${arg_INCLUDES}
     DEPENDS
       ${arg_DEPENDS}
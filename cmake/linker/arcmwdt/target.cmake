@@ -160,6 +160,7 @@ macro(toolchain_ld_relocation)
     -s ${MEM_RELOCATION_SRAM_DATA_LD}
     -b ${MEM_RELOCATION_SRAM_BSS_LD}
     -c ${MEM_RELOCATION_CODE}
+    --cache-dir ${CMAKE_BINARY_DIR}/obj_index_cache
     DEPENDS app kernel ${ZEPHYR_LIBS_PROPERTY}
     )
 
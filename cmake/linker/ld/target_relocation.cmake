@@ -31,6 +31,7 @@ macro(toolchain_ld_relocation)
     -s ${MEM_RELOCATION_SRAM_DATA_LD}
     -b ${MEM_RELOCATION_SRAM_BSS_LD}
     -c ${MEM_RELOCATION_CODE}
+    --cache-dir ${CMAKE_BINARY_DIR}/obj_index_cache
     --default_ram_region ${MEM_REGION_DEFAULT_RAM}
     DEPENDS app kernel ${ZEPHYR_LIBS_PROPERTY} ${DICT_FILE}
     )
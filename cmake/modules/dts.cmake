@@ -56,6 +56,7 @@ find_package(Dtc 1.4.6)
 #      bindings were found
 #    - ${PROJECT_BINARY_DIR}/zephyr.dts exists
 #    - ${PROJECT_BINARY_DIR}/edt.pickle exists
+#    - ${PROJECT_BINARY_DIR}/edt.snapshot exists
 #    - ${KCONFIG_BINARY_DIR}/Kconfig.dts exists
 #    - DTS_INCLUDE_FILES is set to a ;-list of all devicetree files
 #      used in this build, including transitive includes (the build
@@ -92,6 +93,10 @@ find_package(Dtc 1.4.6)
 #   invalid flags are automatically filtered out of the list
 # - DTS_EXTRA_CPPFLAGS: extra command line options to pass to the
 #   C preprocessor when generating the devicetree from DTS_SOURCE
+# - DTS_BINDING_INDEX: path to an index of binding files used to speed
+#   up loading the bindings, see edtlib.BindingIndex. No index is used
+#   by default. Filling the index costs more than loading the bindings
+#   without it, so it pays off when builds share it.
 # - DTS_SOURCE: the devicetree source file to use may be pre-set
 #   with this variable; otherwise, it defaults to
 #   ${BOARD_DIRECTORIES}/<normalized_board_target>.dts
@@ -109,6 +114,9 @@ set(GEN_EDT_SCRIPT              ${DT_SCRIPTS}/gen_edt.py)
 set(GEN_DEFINES_SCRIPT          ${DT_SCRIPTS}/gen_defines.py)
 # The edtlib.EDT object in pickle format.
 set(EDT_PICKLE                  ${PROJECT_BINARY_DIR}/edt.pickle)
+# A lazily loaded, read-only snapshot of the same object, for tools which
+# only query it, like the Kconfig preprocessor functions.
+set(EDT_SNAPSHOT                ${PROJECT_BINARY_DIR}/edt.snapshot)
 # The generated file containing the final DTS, for debugging.
 set(ZEPHYR_DTS                  ${PROJECT_BINARY_DIR}/zephyr.dts)
 # The generated C header needed by <zephyr/devicetree.h>
@@ -116,6 +124,8 @@ set(DEVICETREE_GENERATED_H      ${BINARY_DIR_INCLUDE_GENERATED}/devicetree_gener
 # Generated build system internals.
 set(DTS_POST_CPP                ${PROJECT_BINARY_DIR}/zephyr.dts.pre)
 set(DTS_DEPS                    ${PROJECT_BINARY_DIR}/zephyr.dts.d)
+set(GEN_EDT_STAMP               ${PROJECT_BINARY_DIR}/gen_edt.stamp)
+set(GEN_DEFINES_STAMP           ${PROJECT_BINARY_DIR}/gen_defines.stamp)
 
 # This generates DT information needed by the Kconfig APIs.
 set(GEN_DRIVER_KCONFIG_SCRIPT   ${DT_SCRIPTS}/gen_driver_kconfig_dts.py)
@@ -228,6 +238,10 @@ foreach(dts_root ${DTS_ROOT})
   endif()
 endforeach()
 
+if(DEFINED DTS_BINDING_INDEX)
+  list(APPEND EXTRA_GEN_EDT_ARGS --binding-index ${DTS_BINDING_INDEX})
+endif()
+
 # Cache the location of the root bindings so they can be used by
 # scripts which use the build directory.
 set(CACHED_DTS_ROOT_BINDINGS ${DTS_ROOT_BINDINGS} CACHE INTERNAL
@@ -238,9 +252,9 @@ set(CACHED_DTS_ROOT_BINDINGS ${DTS_ROOT_BINDINGS} CACHE INTERNAL
 # (using the Python devicetree package) in later steps.
 #
 
-# TODO: Cut down on CMake configuration time by avoiding
-# regeneration of devicetree_generated.h on every configure. How
-# challenging is this? Can we cache the dts dependencies?
+# TODO: Cut down on CMake configuration time by avoiding running the
+# preprocessor on every configure. The scripts below already skip their
+# work when their inputs did not change. Can we cache the dts dependencies?
 
 # Run the preprocessor on the DTS input files.
 if(DEFINED CMAKE_DTS_PREPROCESSOR)
@@ -292,14 +306,20 @@ else()
   set(GEN_EDT_WORKSPACE_DIR ${ZEPHYR_BASE}/..)
 endif()
 
+# The outputs of gen_edt.py and gen_defines.py are only replaced when
+# their contents change, so that what depends on them is not rebuilt.
+# The stamps let the scripts skip their work entirely when their inputs
+# did not change since the previous configure.
 string(REPLACE ";" " " EXTRA_DTC_FLAGS_RAW "${EXTRA_DTC_FLAGS}")
 set(CMD_GEN_EDT ${PYTHON_EXECUTABLE} ${GEN_EDT_SCRIPT}
 --dts ${DTS_POST_CPP}
 --dtc-flags '${EXTRA_DTC_FLAGS_RAW}'
 --bindings-dirs ${DTS_ROOT_BINDINGS}
 --workspace-dir ${GEN_EDT_WORKSPACE_DIR}
---dts-out ${ZEPHYR_DTS}.new # for debugging and dtc
---edt-pickle-out ${EDT_PICKLE}.new
+--dts-out ${ZEPHYR_DTS} # for debugging and dtc
+--edt-pickle-out ${EDT_PICKLE}
+--edt-snapshot-out ${EDT_SNAPSHOT}
+--inputs-stamp ${GEN_EDT_STAMP}
 ${EXTRA_GEN_EDT_ARGS}
 )
 
@@ -308,9 +328,6 @@ execute_process(
   WORKING_DIRECTORY ${PROJECT_BINARY_DIR}
   COMMAND_ERROR_IS_FATAL ANY
   )
-zephyr_file_copy(${ZEPHYR_DTS}.new ${ZEPHYR_DTS} ONLY_IF_DIFFERENT)
-zephyr_file_copy(${EDT_PICKLE}.new ${EDT_PICKLE} ONLY_IF_DIFFERENT)
-file(REMOVE ${ZEPHYR_DTS}.new ${EDT_PICKLE}.new)
 message(STATUS "Generated zephyr.dts: ${ZEPHYR_DTS}")
 message(STATUS "Generated pickled edt: ${EDT_PICKLE}")
 
@@ -319,8 +336,9 @@ message(STATUS "Generated pickled edt: ${EDT_PICKLE}")
 #
 
 set(CMD_GEN_DEFINES ${PYTHON_EXECUTABLE} ${GEN_DEFINES_SCRIPT}
---header-out ${DEVICETREE_GENERATED_H}.new
+--header-out ${DEVICETREE_GENERATED_H}
 --edt-pickle ${EDT_PICKLE}
+--inputs-stamp ${GEN_DEFINES_STAMP}
 ${EXTRA_GEN_DEFINES_ARGS}
 )
 
@@ -329,8 +347,6 @@ execute_process(
   WORKING_DIRECTORY ${PROJECT_BINARY_DIR}
   COMMAND_ERROR_IS_FATAL ANY
   )
-zephyr_file_copy(${DEVICETREE_GENERATED_H}.new ${DEVICETREE_GENERATED_H} ONLY_IF_DIFFERENT)
-file(REMOVE ${DEVICETREE_GENERATED_H}.new)
 message(STATUS "Generated devicetree_generated.h: ${DEVICETREE_GENERATED_H}")
 
 #
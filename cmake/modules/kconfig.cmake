@@ -78,6 +78,11 @@ endif()
 
 set(DOTCONFIG                  ${PROJECT_BINARY_DIR}/.config)
 set(PARSED_KCONFIG_SOURCES_TXT ${PROJECT_BINARY_DIR}/kconfig/sources.txt)
+# If set, parsed Kconfig trees are cached here, see the 'cache_dir' argument
+# of kconfiglib.Kconfig. Builds may share the directory, e.g. in the user
+# cache directory, to use the trees of each other. Paths within
+# KCONFIG_BINARY_DIR and APPLICATION_SOURCE_DIR are cached relative to them.
+zephyr_get(KCONFIG_CACHE_DIR)
 
 if(CONF_FILE)
   string(CONFIGURE "${CONF_FILE}" CONF_FILE_EXPANDED)
@@ -156,6 +161,7 @@ set(COMMON_KCONFIG_ENV_SETTINGS
   TOOLCHAIN_HAS_NEWLIB=${_local_TOOLCHAIN_HAS_NEWLIB}
   TOOLCHAIN_HAS_PICOLIBC=${_local_TOOLCHAIN_HAS_PICOLIBC}
   EDT_PICKLE=${EDT_PICKLE}
+  EDT_SNAPSHOT=${EDT_SNAPSHOT}
   # Export all Zephyr modules to Kconfig
   ${ZEPHYR_KCONFIG_MODULES_DIR}
 )
@@ -358,6 +364,14 @@ if(DEFINED FORCED_CONF_FILE)
   list(APPEND input_configs_flags --forced-input-configs)
 endif()
 
+if(KCONFIG_CACHE_DIR)
+  set(kconfig_cache_flags
+    --cache-dir=${KCONFIG_CACHE_DIR}
+    --cache-build-dir=${KCONFIG_BINARY_DIR}
+    --cache-build-dir=${APPLICATION_SOURCE_DIR}
+    )
+endif()
+
 cmake_path(GET AUTOCONF_H PARENT_PATH autoconf_h_path)
 if(NOT EXISTS ${autoconf_h_path})
   file(MAKE_DIRECTORY ${autoconf_h_path})
@@ -370,6 +384,7 @@ execute_process(
   ${PYTHON_EXECUTABLE}
   ${ZEPHYR_BASE}/scripts/kconfig/kconfig.py
   --zephyr-base=${ZEPHYR_BASE}
+  ${kconfig_cache_flags}
   ${input_configs_flags}
   ${KCONFIG_ROOT}
   ${DOTCONFIG}
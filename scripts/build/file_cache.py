@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+#
+# Copyright The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Cache of the results of processing files, shared by build scripts
+
+parse_syscalls.py and obj_index.py both process many files of which only a
+few change between runs. They keep a result per file, starting with the
+modification time and the size of the file, pickle them with the time the run
+started at, and process the files again only if these changed, spreading the
+work over several processes if there is enough of it.
+"""
+
+import os
+import pickle
+import tempfile
+from multiprocessing import Pool
+
+# Files written this shortly before the cached run started may have been
+# written again since without their modification time changing, when the
+# file system timestamps are coarse, so they are processed again
+MTIME_MARGIN_NS = 2 * 1000 * 1000 * 1000
+
+
+def load_cache(path, header):
+    """
+    Return the time the cached run started at and the cached results of the
+    files, or no results if there is no valid cache at path for header
+    """
+    try:
+        with open(path, 'rb') as f:
+            cached_header, start_ns, results = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        return 0, {}
+
+    if cached_header != header:
+        return 0, {}
+    return start_ns, results
+
+
+def save_cache(path, header, start_ns, results):
+    """Cache the results of the files of a run started at start_ns"""
+    cache_dir = os.path.dirname(path)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Write atomically, as several scripts may use the cache at the same time
+    with tempfile.NamedTemporaryFile('wb', dir=cache_dir, delete=False) as f:
+        pickle.dump((header, start_ns, results), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(f.name, path)
+
+
+def is_unchanged(path, result, start_ns):
+    """
+    Return True if the file at path still has the modification time and size
+    its result starts with, and was not modified around start_ns
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    return (st.st_mtime_ns, st.st_size) == tuple(result[:2]) and (
+        st.st_mtime_ns < start_ns - MTIME_MARGIN_NS
+    )
+
+
+def map_files(func, args, jobs, min_per_pool):
+    """
+    Return func(*a) for each tuple a of args, in jobs processes if there are
+    at least min_per_pool of them, as starting the processes costs more than
+    it saves otherwise
+    """
+    if jobs > 1 and len(args) >= min_per_pool:
+        # Several chunks of files per process, as their sizes vary
+        chunksize = max(1, len(args) // (jobs * 4))
+        with Pool(jobs) as pool:
+            return pool.starmap(func, args, chunksize)
+    return [func(*a) for a in args]
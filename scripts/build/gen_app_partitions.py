@@ -27,6 +27,10 @@ This script takes as inputs:
 - key/value pairs mapping static library files to what partitions their globals
   should end up in.
 
+The sections of the object files are read with obj_index.py, in --jobs
+processes, and cached in --cache-dir if given, so that only the object files
+modified since a previous run are read again.
+
 The output is either a linker script fragment or linker-script generator
 fragments containing the definition of the app shared memory section, which
 is further divided, for each partition found, into data and BSS for each
@@ -169,7 +173,6 @@ partition.
 #     )
 
 
-import sys
 import argparse
 import json
 import os
@@ -179,6 +182,8 @@ from elftools.elf.elffile import ELFFile
 from elftools.elf.sections import SymbolTableSection
 import elftools.common.exceptions
 
+from obj_index import ObjectIndex, find_object_files
+
 SZ = 'size'
 SRC = 'sources'
 LIB = 'libraries'
@@ -319,51 +324,48 @@ section_regex = re.compile(r'data_smem_([A-Za-z0-9_]*)_(data|bss)*')
 
 elf_part_size_regex = re.compile(r'z_data_smem_(.*)_part_size')
 
-def find_obj_file_partitions(filename, partitions):
-    with open(filename, 'rb') as f:
-        try:
-            full_lib = ELFFile(f)
-        except elftools.common.exceptions.ELFError as e:
-            exit(f"Error: {filename}: {e}")
-
-        if not full_lib:
-            sys.exit("Error parsing file: " + filename)
+def find_obj_file_partitions(filename, obj_file, partitions):
+    if obj_file.error:
+        exit(f"Error: {filename}: {obj_file.error}")
 
-        sections = [x for x in full_lib.iter_sections()]
-        for section in sections:
-            m = section_regex.match(section.name)
-            if not m:
-                continue
+    for name, size in obj_file.sections:
+        m = section_regex.match(name)
+        if not m:
+            continue
 
-            partition_name = m.groups()[0]
-            if partition_name not in partitions:
-                partitions[partition_name] = {SZ: section.header.sh_size}
+        partition_name = m.groups()[0]
+        if partition_name not in partitions:
+            partitions[partition_name] = {SZ: size}
 
-                if args.verbose:
-                    partitions[partition_name][SRC] = filename
+            if args.verbose:
+                partitions[partition_name][SRC] = filename
 
-            else:
-                partitions[partition_name][SZ] += section.header.sh_size
+        else:
+            partitions[partition_name][SZ] += size
 
 
     return partitions
 
 
+def find_obj_files_partitions(filenames, partitions):
+    # Read all object files at once, so that they are read in parallel
+    index = ObjectIndex(args.cache_dir, args.jobs)
+    for filename, obj_file in zip(filenames, index.read(filenames), strict=True):
+        find_obj_file_partitions(filename, obj_file, partitions)
+
+
 def parse_obj_files(partitions):
     # Iterate over all object files to find partitions
-    for dirpath, _, files in os.walk(args.directory):
-        for filename in files:
-            if re.match(r".*\.obj$", filename):
-                fullname = os.path.join(dirpath, filename)
-                fsize = os.path.getsize(fullname)
-                if fsize != 0:
-                    find_obj_file_partitions(fullname, partitions)
+    filenames = [fullname for fullname in find_object_files(args.directory)
+                 if fullname.endswith(".obj") and os.path.getsize(fullname) != 0]
+    find_obj_files_partitions(filenames, partitions)
 
 
 def parse_compile_command_file(partitions):
     # Iterate over all entries to find object files.
     # Thereafter process each object file to find partitions
     object_pattern = re.compile(r'-o\s+(\S*)')
+    filenames = []
     with open(args.compile_commands_file, 'rb') as f:
         commands = json.load(f)
         for command in commands:
@@ -377,7 +379,8 @@ def parse_compile_command_file(partitions):
                 # the compile_commands.json file may be available, therefore
                 # only include existing files.
                 if os.path.exists(fullname):
-                    find_obj_file_partitions(fullname, partitions)
+                    filenames.append(fullname)
+    find_obj_files_partitions(filenames, partitions)
 
 
 def parse_elf_file(partitions):
@@ -471,6 +474,12 @@ def parse_args():
                         help="Output ld file for pinned sections")
     parser.add_argument("--pinpartitions", action="store", required=False, default="",
                         help="Comma separated names of partitions to be pinned in physical memory")
+    parser.add_argument("--cache-dir", required=False,
+                        help="Directory to cache the sections of the object files in")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Number of processes reading object files, 1 by "
+                             "default. More only pay off when many object "
+                             "files must be read again")
 
     args, _ = parser.parse_known_args()
 
@@ -28,6 +28,10 @@ kernel objects. For device drivers, the API struct pointer populated at build
 time is also examined to disambiguate between various device driver instances
 since they are all 'struct device'.
 
+The information read from the DWARF debug information of each compilation
+unit can be cached with --cache-dir, so that only the units which changed
+are read again by the next runs, e.g. on the next link pass or build.
+
 This script can generate five different output files:
 
     - A gperf script to generate the hash table mapping kernel object memory
@@ -53,13 +57,17 @@ This script can generate five different output files:
 
 import sys
 import argparse
+import hashlib
 import math
 import os
+import pickle
 import struct
 import json
+import tempfile
 from packaging import version
 
 import elftools
+from elftools.dwarf.enums import ENUM_DW_AT, ENUM_DW_FORM, ENUM_DW_TAG
 from elftools.elf.elffile import ELFFile
 from elftools.elf.sections import SymbolTableSection
 
@@ -156,19 +164,21 @@ def error(text):
     sys.exit("%s ERROR: %s" % (scr, text))
 
 def debug_die(die, text):
-    lp_header = die.dwarfinfo.line_program_for_CU(die.cu).header
-    files = lp_header["file_entry"]
-    includes = lp_header["include_directory"]
+    if not args.verbose:
+        return
 
-    fileinfo = files[die.attributes["DW_AT_decl_file"].value - 1]
-    filename = fileinfo.name.decode("utf-8")
-    filedir = includes[fileinfo.dir_index - 1].decode("utf-8")
+    debug(str(die))
+    if die.decl_file is not None:
+        lp_header = die.cu.dwarfinfo.line_program_for_CU(die.cu).header
+        files = lp_header["file_entry"]
+        includes = lp_header["include_directory"]
 
-    path = os.path.join(filedir, filename)
-    lineno = die.attributes["DW_AT_decl_line"].value
+        fileinfo = files[die.decl_file - 1]
+        filename = fileinfo.name.decode("utf-8")
+        filedir = includes[fileinfo.dir_index - 1].decode("utf-8")
 
-    debug(str(die))
-    debug("File '%s', line %d:" % (path, lineno))
+        path = os.path.join(filedir, filename)
+        debug("File '%s', line %d:" % (path, die.decl_line))
     debug("    %s" % text)
 
 # -- ELF processing
@@ -353,49 +363,687 @@ class AggregateType:
         return objs
 
 
-# --- helper functions for getting data from DIEs ---
+# --- DWARF information extraction ---
+#
+# The DIEs needed to find kernel objects are extracted from each CU of
+# .debug_info as plain records, see add_die_record(). They are read by a
+# small DWARF reader, which only decodes the attributes of the DIE tags
+# listed in DIE_ATTRS and steps over the other DIEs. CUs using forms it does
+# not decode are read with pyelftools instead.
+#
+# The records of a CU only depend on its DIEs, its abbreviation table and
+# the strings they reference, so they can be cached and reused for the CUs
+# that did not change between two link passes or two builds, see
+# DwarfRecordReader.
+
+# Version of the records, to be increased when their format changes
+DWARF_RECORDS_VERSION = 1
+
+# Attributes read from the DIEs with these tags
+DIE_ATTRS = {
+    "DW_TAG_structure_type": {"DW_AT_name", "DW_AT_byte_size"},
+    "DW_TAG_member": {"DW_AT_name", "DW_AT_type", "DW_AT_data_member_location"},
+    "DW_TAG_const_type": {"DW_AT_type"},
+    "DW_TAG_array_type": {"DW_AT_type"},
+    "DW_TAG_subrange_type": {"DW_AT_upper_bound", "DW_AT_count"},
+    "DW_TAG_typedef": {"DW_AT_type"},
+    "DW_TAG_variable": {"DW_AT_name", "DW_AT_type", "DW_AT_specification",
+                        "DW_AT_declaration", "DW_AT_location",
+                        "DW_AT_decl_file", "DW_AT_decl_line"},
+}
 
-def die_get_spec(die):
-    if 'DW_AT_specification' not in die.attributes:
+# Forms of a fixed size, "addr" and "offset" being the address and offset
+# sizes of the CU
+FIXED_SIZE_FORMS = {
+    "DW_FORM_addr": "addr",
+    "DW_FORM_flag_present": 0,
+    "DW_FORM_implicit_const": 0,
+    "DW_FORM_data1": 1,
+    "DW_FORM_ref1": 1,
+    "DW_FORM_flag": 1,
+    "DW_FORM_strx1": 1,
+    "DW_FORM_addrx1": 1,
+    "DW_FORM_data2": 2,
+    "DW_FORM_ref2": 2,
+    "DW_FORM_strx2": 2,
+    "DW_FORM_addrx2": 2,
+    "DW_FORM_strx3": 3,
+    "DW_FORM_addrx3": 3,
+    "DW_FORM_data4": 4,
+    "DW_FORM_ref4": 4,
+    "DW_FORM_strx4": 4,
+    "DW_FORM_addrx4": 4,
+    "DW_FORM_ref_sup4": 4,
+    "DW_FORM_data8": 8,
+    "DW_FORM_ref8": 8,
+    "DW_FORM_ref_sig8": 8,
+    "DW_FORM_ref_sup8": 8,
+    "DW_FORM_data16": 16,
+    "DW_FORM_strp": "offset",
+    "DW_FORM_line_strp": "offset",
+    "DW_FORM_sec_offset": "offset",
+    "DW_FORM_strp_sup": "offset",
+    "DW_FORM_GNU_ref_alt": "offset",
+    "DW_FORM_GNU_strp_alt": "offset",
+}
+
+# How the forms of a variable size are stepped over
+VARIABLE_SIZE_FORMS = {
+    "DW_FORM_udata": "leb128",
+    "DW_FORM_sdata": "leb128",
+    "DW_FORM_ref_udata": "leb128",
+    "DW_FORM_strx": "leb128",
+    "DW_FORM_addrx": "leb128",
+    "DW_FORM_loclistx": "leb128",
+    "DW_FORM_rnglistx": "leb128",
+    "DW_FORM_GNU_addr_index": "leb128",
+    "DW_FORM_GNU_str_index": "leb128",
+    "DW_FORM_string": "string",
+    "DW_FORM_block1": "block1",
+    "DW_FORM_block2": "block2",
+    "DW_FORM_block4": "block4",
+    "DW_FORM_block": "block",
+    "DW_FORM_exprloc": "block",
+}
+
+# Forms of the fields masked in the data identifying a CU, see
+# DwarfRecordReader
+MASKED_FORMS = {
+    "DW_FORM_strp": "offset",
+    "DW_FORM_line_strp": "offset",
+    "DW_FORM_sec_offset": "offset",
+    "DW_FORM_addr": "addr",
+}
+
+# Forms of the attribute values decoded as unsigned integers
+INT_FORMS = {
+    "DW_FORM_addr", "DW_FORM_data1", "DW_FORM_data2", "DW_FORM_data4",
+    "DW_FORM_data8", "DW_FORM_ref1", "DW_FORM_ref2", "DW_FORM_ref4",
+    "DW_FORM_ref8", "DW_FORM_ref_addr", "DW_FORM_sec_offset",
+}
+
+
+def enum_names(enum):
+    names = {}
+    for name, value in enum.items():
+        if name.startswith("DW_"):
+            names.setdefault(value, name)
+    return names
+
+
+DW_TAG_NAMES = enum_names(ENUM_DW_TAG)
+DW_AT_NAMES = enum_names(ENUM_DW_AT)
+DW_FORM_NAMES = enum_names(ENUM_DW_FORM)
+DW_FORM_implicit_const = 0x21
+
+
+class DwarfFormError(Exception):
+    """Form not decoded by DwarfRecordReader"""
+
+
+def read_uleb128(data, pos):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def read_sleb128(data, pos):
+    value, end = read_uleb128(data, pos)
+    if data[end - 1] & 0x40:
+        value -= 1 << (7 * (end - pos))
+    return value, end
+
+
+def parse_abbrev_table(data, pos):
+    """Parse the abbreviation table at pos in data. Return the
+    declarations by code, as (tag, has_children, attribute specs)
+    tuples, and the offset of the end of the table"""
+    decls = {}
+    while True:
+        code, pos = read_uleb128(data, pos)
+        if not code:
+            return decls, pos
+        tag, pos = read_uleb128(data, pos)
+        has_children = data[pos] != 0
+        pos += 1
+        specs = []
+        while True:
+            name, pos = read_uleb128(data, pos)
+            form, pos = read_uleb128(data, pos)
+            if not name and not form:
+                break
+            value = None
+            if form == DW_FORM_implicit_const:
+                value, pos = read_sleb128(data, pos)
+            specs.append((DW_AT_NAMES.get(name, name),
+                          DW_FORM_NAMES.get(form, form), value))
+        decls[code] = (DW_TAG_NAMES.get(tag, tag), has_children, specs)
+
+
+def new_cu_records():
+    return {"types": [], "variables": []}
+
+
+def add_die_record(records, tag, offset, attrs, parent):
+    """Add the record of a DIE to the records of its CU and return it.
+
+    attrs maps the names of the attributes of DIE_ATTRS[tag] found in the
+    DIE to (form, value) tuples, and parent is the record of the DIE
+    containing this one, if any. Offsets and type references are relative
+    to the CU.
+
+    The "types" records are lists, in the order of the DIEs:
+
+        ["struct", offset, name, byte size, [(offset, name, type, location)]]
+        ["const", offset, type]
+        ["array", offset, type, [number of elements in each dimension]]
+        ["typedef", offset, type]
+
+    The "variables" records are (offset, name, type, specification,
+    declaration, location, decl_file, decl_line) tuples, location being a
+    (form, value) tuple or None, with a value only for expressions."""
+    name = attrs.get("DW_AT_name")
+    if name:
+        name = name[1].decode("utf-8")
+    type_offset = attrs.get("DW_AT_type")
+    if type_offset:
+        type_offset = type_offset[1]
+
+    if tag == "DW_TAG_structure_type":
+        size = attrs.get("DW_AT_byte_size")
+        record = ["struct", offset, name, size[1] if size else 0, []]
+        records["types"].append(record)
+        return record
+
+    if tag == "DW_TAG_member":
+        location = attrs.get("DW_AT_data_member_location")
+        if parent and parent[0] == "struct" and location:
+            parent[4].append((offset, name, type_offset, location[1]))
         return None
 
-    spec_val = die.attributes["DW_AT_specification"].value
+    if tag == "DW_TAG_const_type":
+        record = ["const", offset, type_offset]
+    elif tag == "DW_TAG_array_type":
+        record = ["array", offset, type_offset, []]
+    elif tag == "DW_TAG_typedef":
+        record = ["typedef", offset, type_offset]
+    elif tag == "DW_TAG_subrange_type":
+        if parent and parent[0] == "array":
+            if "DW_AT_upper_bound" in attrs:
+                form, value = attrs["DW_AT_upper_bound"]
+                if form.startswith("DW_FORM_data"):
+                    parent[3].append(value + 1)
+            # in DWARF 4, e.g. ARC Metaware toolchain, DW_AT_count is used
+            # not DW_AT_upper_bound
+            elif "DW_AT_count" in attrs:
+                form, value = attrs["DW_AT_count"]
+                if form.startswith("DW_FORM_data"):
+                    parent[3].append(value)
+        return None
+    else:
+        spec = attrs.get("DW_AT_specification")
+        if spec:
+            spec = spec[1]
+        # Without a name or a type, the variable is never looked at
+        elif not name or not type_offset:
+            return None
 
-    # offset of the DW_TAG_variable for the extern declaration
-    offset = spec_val + die.cu.cu_offset
+        # Only the locations in an expression are used
+        location = attrs.get("DW_AT_location")
+        if location and not isinstance(location[1], list):
+            location = (location[0], None)
+
+        decl_file = attrs.get("DW_AT_decl_file")
+        decl_line = attrs.get("DW_AT_decl_line")
+        records["variables"].append((
+            offset, name, type_offset, spec, "DW_AT_declaration" in attrs,
+            location, decl_file and decl_file[1],
+            decl_line and decl_line[1]))
+        return None
+
+    records["types"].append(record)
+    return record
+
+
+def section_data(section):
+    if section is None:
+        return b""
+
+    section.stream.seek(0)
+    return section.stream.read(section.size)
+
+
+class DwarfRecordReader:
+    """Reader of the records of the CUs of .debug_info
+
+    The records of a CU are cached with the offsets of the fields that
+    hold an offset in another section, e.g. a string offset, or an address
+    unused by the records, relative to the end of the CU DIE. These fields
+    change when other CUs do, so they are masked in the data hashed to
+    identify the CU, and the strings of the records are checked instead."""
+
+    def __init__(self, dwarfinfo):
+        self.byteorder = "little" if dwarfinfo.config.little_endian else "big"
+        self.info = section_data(dwarfinfo.debug_info_sec)
+        self.abbrev = section_data(dwarfinfo.debug_abbrev_sec)
+        self.str_sections = {
+            "DW_FORM_strp": section_data(dwarfinfo.debug_str_sec),
+            "DW_FORM_line_strp": section_data(
+                getattr(dwarfinfo, "debug_line_str_sec", None)),
+        }
+
+    def read_cu(self, cu, cache):
+        """Return the records of cu, taking them from cache if possible,
+        with the key and the entry to cache them with. The key and entry
+        are None for the CUs read with pyelftools, which are not cached."""
+        try:
+            return self.read_cu_dies(cu, cache)
+        except DwarfFormError:
+            return read_cu_records_pyelftools(cu), None, None
+
+    def read_cu_dies(self, cu, cache):
+        address_size = cu["address_size"]
+        offset_size = 8 if cu.structs.dwarf_format == 64 else 4
+        version = cu["version"]
+        form_sizes = {}
+        for form, size in FIXED_SIZE_FORMS.items():
+            if size == "addr":
+                size = address_size
+            elif size == "offset":
+                size = offset_size
+            form_sizes[form] = size
+        form_sizes["DW_FORM_ref_addr"] = address_size if version == 2 else offset_size
+
+        abbrev_offset = cu["debug_abbrev_offset"]
+        decls, abbrev_end = parse_abbrev_table(self.abbrev, abbrev_offset)
+        plans = {}
+        end = cu.cu_offset + cu.size
+
+        # The attributes of the CU DIE, e.g. its address range or its line
+        # program offset, change when other CUs do and are not needed
+        pos = cu.cu_die_offset
+        code, pos = read_uleb128(self.info, pos)
+        has_children = False
+        if code:
+            plan = plans[code] = self.compile_abbrev(decls[code], form_sizes)
+            for step in plan[2]:
+                pos = self.skip_attr(step[0] if isinstance(step, tuple) else step, pos)
+            has_children = plan[1]
+
+        key = hashlib.sha256(repr((
+            DWARF_RECORDS_VERSION, self.byteorder, version, address_size,
+            offset_size, has_children, end - pos)).encode())
+        key.update(self.abbrev[abbrev_offset:abbrev_end])
+        key = key.digest()
+
+        for entry in cache.get(key, ()):
+            if self.check_entry(entry, pos, end, offset_size, address_size):
+                return entry[4], key, entry
+
+        offset_fields, addr_fields, strings, records = self.read_dies(
+            pos, end, cu.cu_offset, has_children, decls, plans, form_sizes)
+        digest = self.masked_digest(pos, end, offset_fields, addr_fields,
+                                    offset_size, address_size)
+        return records, key, (digest, offset_fields, addr_fields, strings, records)
+
+    def masked_digest(self, start, end, offset_fields, addr_fields,
+                      offset_size, address_size):
+        data = bytearray(self.info[start:end])
+        zeros = bytes(offset_size)
+        for pos in offset_fields:
+            data[pos:pos + offset_size] = zeros
+        zeros = bytes(address_size)
+        for pos in addr_fields:
+            data[pos:pos + address_size] = zeros
+        return hashlib.sha256(data).digest()
+
+    def check_entry(self, entry, start, end, offset_size, address_size):
+        digest, offset_fields, addr_fields, strings, _ = entry
+        if self.masked_digest(start, end, offset_fields, addr_fields,
+                              offset_size, address_size) != digest:
+            return False
+
+        for pos, form, value in strings:
+            pos += start
+            offset = int.from_bytes(self.info[pos:pos + offset_size], self.byteorder)
+            if not self.str_sections[form].startswith(value + b"\0", offset):
+                return False
+        return True
+
+    @staticmethod
+    def compile_abbrev(decl, form_sizes):
+        """Return how the DIEs using the abbreviation declaration decl are
+        read, as a (tag, has_children, steps, attribute steps) tuple.
+
+        steps steps over all the attributes. Its items are either the
+        name of a way to step over a form of a variable size, or a (size,
+        offset fields, address fields) tuple stepping over forms of a fixed
+        size, the fields being relative to the start of the first form.
+
+        attribute steps decode the attributes of DIE_ATTRS, and is None
+        for the other tags. Its items are (name, form, step, implicit value,
+        masked) tuples, name being None for the attributes not decoded and
+        masked being "offset", "addr" or None."""
+        tag, has_children, specs = decl
+        wanted = DIE_ATTRS.get(tag)
+
+        steps = []
+        attr_steps = []
+        for name, form, value in specs:
+            step = form_sizes.get(form)
+            if step is None:
+                step = VARIABLE_SIZE_FORMS.get(form)
+                if step is None:
+                    raise DwarfFormError(form)
+
+            if wanted is not None and name in wanted:
+                # The strings of the records are checked separately, and
+                # the offset of a location list is not recorded
+                masked = None
+                if form in ("DW_FORM_strp", "DW_FORM_line_strp") or \
+                        (form == "DW_FORM_sec_offset" and name == "DW_AT_location"):
+                    masked = "offset"
+            else:
+                name = None
+                masked = MASKED_FORMS.get(form)
+            attr_steps.append((name, form, step, value, masked))
+
+            if isinstance(step, str):
+                steps.append(step)
+                continue
+
+            # Merge the steps over forms of a fixed size
+            if not steps or isinstance(steps[-1], str):
+                steps.append((0, (), ()))
+            size, offset_fields, addr_fields = steps[-1]
+            if masked == "offset":
+                offset_fields += (size,)
+            elif masked == "addr":
+                addr_fields += (size,)
+            steps[-1] = (size + step, offset_fields, addr_fields)
+
+        return tag, has_children, steps, attr_steps if wanted is not None else None
+
+    def skip_attr(self, step, pos):
+        if isinstance(step, int):
+            return pos + step
+
+        info = self.info
+        if step == "leb128":
+            while info[pos] & 0x80:
+                pos += 1
+            return pos + 1
+        if step == "string":
+            return info.index(b"\0", pos) + 1
+        if step == "block1":
+            return pos + 1 + info[pos]
+        if step == "block2":
+            return pos + 2 + int.from_bytes(info[pos:pos + 2], self.byteorder)
+        if step == "block4":
+            return pos + 4 + int.from_bytes(info[pos:pos + 4], self.byteorder)
+        length, pos = read_uleb128(info, pos)
+        return pos + length
+
+    def read_attr(self, form, step, implicit_value, pos):
+        """Decode the value of an attribute as pyelftools does. Return it
+        and the offset of the next attribute."""
+        info = self.info
+        if form in INT_FORMS:
+            value = int.from_bytes(info[pos:pos + step], self.byteorder)
+        elif form in ("DW_FORM_strp", "DW_FORM_line_strp"):
+            offset = int.from_bytes(info[pos:pos + step], self.byteorder)
+            section = self.str_sections[form]
+            value = section[offset:section.index(b"\0", offset)]
+        elif form == "DW_FORM_string":
+            value = info[pos:info.index(b"\0", pos)]
+        elif form in ("DW_FORM_udata", "DW_FORM_ref_udata"):
+            return read_uleb128(info, pos)
+        elif form == "DW_FORM_sdata":
+            return read_sleb128(info, pos)
+        elif form == "DW_FORM_flag":
+            value = info[pos] != 0
+        elif form == "DW_FORM_flag_present":
+            value = True
+        elif form == "DW_FORM_implicit_const":
+            value = implicit_value
+        elif step in ("block1", "block2", "block4", "block"):
+            end = self.skip_attr(step, pos)
+            if step == "block":
+                _, pos = read_uleb128(info, pos)
+            else:
+                pos += int(step[5:])
+            return list(info[pos:end]), end
+        else:
+            raise DwarfFormError(form)
+
+        return value, self.skip_attr(step, pos)
+
+    def read_dies(self, start, end, cu_offset, has_children, decls, plans,
+                  form_sizes):
+        """Read the DIEs from start to end, after the CU DIE. Return the
+        offset fields, address fields and strings of the cache entry of the
+        CU, see check_entry(), and its records."""
+        records = new_cu_records()
+        offset_fields = []
+        addr_fields = []
+        strings = []
+        info = self.info
+
+        # Records of the DIEs containing the current one
+        parents = [None] if has_children else []
+        pos = start
+        while pos < end:
+            offset = pos
+            code, pos = read_uleb128(info, pos)
+            if not code:
+                if parents:
+                    parents.pop()
+                continue
+
+            plan = plans.get(code)
+            if plan is None:
+                plan = plans[code] = self.compile_abbrev(decls[code], form_sizes)
+            tag, has_children, steps, attr_steps = plan
+
+            record = None
+            if attr_steps is None:
+                for step in steps:
+                    if isinstance(step, str):
+                        pos = self.skip_attr(step, pos)
+                        continue
+                    size, step_offset_fields, step_addr_fields = step
+                    for field in step_offset_fields:
+                        offset_fields.append(pos - start + field)
+                    for field in step_addr_fields:
+                        addr_fields.append(pos - start + field)
+                    pos += size
+            else:
+                attrs = {}
+                for name, form, step, implicit_value, masked in attr_steps:
+                    if masked == "offset":
+                        offset_fields.append(pos - start)
+                    elif masked == "addr":
+                        addr_fields.append(pos - start)
+
+                    if name is None:
+                        pos = self.skip_attr(step, pos)
+                        continue
+
+                    if form in self.str_sections:
+                        field = pos - start
+                    value, pos = self.read_attr(form, step, implicit_value, pos)
+                    if form in self.str_sections:
+                        strings.append((field, form, value))
+                    attrs[name] = (form, value)
+                record = add_die_record(records, tag, offset - cu_offset, attrs,
+                                        parents[-1] if parents else None)
+
+            if has_children:
+                parents.append(record)
+
+        return offset_fields, addr_fields, strings, records
+
+
+def read_cu_records_pyelftools(cu):
+    records = new_cu_records()
+
+    parents = []
+    for die in cu.iter_DIEs():
+        if die.is_null():
+            if parents:
+                parents.pop()
+            continue
+
+        record = None
+        wanted = DIE_ATTRS.get(die.tag)
+        if wanted is not None:
+            attrs = {name: (attr.form, attr.value)
+                     for name, attr in die.attributes.items() if name in wanted}
+            record = add_die_record(records, die.tag, die.offset - cu.cu_offset,
+                                    attrs, parents[-1] if parents else None)
+
+        if die.has_children:
+            parents.append(record)
+
+    return records
 
-    return extern_env.get(offset)
+
+def get_dwarf_cache_file(cache_dir, kernel):
+    return os.path.join(cache_dir, os.path.basename(kernel) + ".pickle")
+
+
+def load_dwarf_cache(cache_dir):
+    """Return the entries cached in cache_dir for any kernel ELF file,
+    as lists by key"""
+    cache = {}
+    try:
+        names = sorted(os.listdir(cache_dir))
+    except OSError:
+        return cache
+
+    for name in names:
+        if not name.endswith(".pickle"):
+            continue
+        try:
+            with open(os.path.join(cache_dir, name), "rb") as f:
+                entries = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            continue
+        if not isinstance(entries, dict):
+            continue
+        for key, key_entries in entries.items():
+            cache.setdefault(key, []).extend(key_entries)
+
+    return cache
+
+
+def save_dwarf_cache(cache_file, entries):
+    """Cache the entries in cache_file, replacing the ones cached for the
+    same kernel ELF file"""
+    cache_dir = os.path.dirname(cache_file)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Written to a temporary file first, so that an interrupted build does
+    # not leave a truncated cache
+    with tempfile.NamedTemporaryFile("wb", dir=cache_dir, delete=False) as f:
+        pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(f.name, cache_file)
+
+
+def read_dwarf_records(elf, cache_file=None):
+    """Return (CU, records) tuples for the CUs of the DWARF information
+    of elf, see add_die_record(). If cache_file is set, the records cached
+    in its directory are used for the CUs that did not change, and the
+    records of all the CUs are then cached in it."""
+    di = elf.get_dwarf_info()
+    reader = DwarfRecordReader(di)
+    cache = load_dwarf_cache(os.path.dirname(cache_file)) if cache_file else {}
+
+    cus = []
+    entries = {}
+    cached = 0
+    for cu in di.iter_CUs():
+        records, key, entry = reader.read_cu(cu, cache)
+        if key is not None:
+            if any(entry is e for e in cache.get(key, ())):
+                cached += 1
+            key_entries = entries.setdefault(key, [])
+            if not any(entry[0] == e[0] for e in key_entries):
+                key_entries.append(entry)
+        cus.append((cu, records))
+
+    if cache_file:
+        debug("%d of %d CUs read from the cache" % (cached, len(cus)))
+        save_dwarf_cache(cache_file, entries)
+
+    return cus
+
+
+# --- helper functions for getting data from the records ---
+
+class VariableDie:
+    """DW_TAG_variable DIE, from the records of its CU"""
+
+    def __init__(self, cu, record):
+        offset, name, type_offset, spec, declaration, location, decl_file, \
+            decl_line = record
+        self.cu = cu
+        self.offset = cu_ref(cu, offset)
+        self.name = name
+        self.type_offset = cu_ref(cu, type_offset)
+        self.spec = cu_ref(cu, spec)
+        self.declaration = declaration
+        self.location = location
+        self.decl_file = decl_file
+        self.decl_line = decl_line
+
+    def __repr__(self):
+        return "<variable %s at offset 0x%x>" % (self.name, self.offset)
+
+
+def cu_ref(cu, offset):
+    if offset is None:
+        return None
+
+    return offset + cu.cu_offset
+
+
+def die_get_spec(die):
+    if die.spec is None:
+        return None
+
+    # offset of the DW_TAG_variable for the extern declaration
+    return extern_env.get(die.spec)
 
 
 def die_get_name(die):
-    if 'DW_AT_name' not in die.attributes:
+    if die.name is None:
         die = die_get_spec(die)
         if not die:
             return None
 
-    return die.attributes["DW_AT_name"].value.decode("utf-8")
+    return die.name
 
 
 def die_get_type_offset(die):
-    if 'DW_AT_type' not in die.attributes:
+    if die.type_offset is None:
         die = die_get_spec(die)
         if not die:
             return None
 
-    return die.attributes["DW_AT_type"].value + die.cu.cu_offset
-
-
-def die_get_byte_size(die):
-    if 'DW_AT_byte_size' not in die.attributes:
-        return 0
+    return die.type_offset
 
-    return die.attributes["DW_AT_byte_size"].value
 
-
-def analyze_die_struct(die):
-    name = die_get_name(die) or "<anon>"
-    offset = die.offset
-    size = die_get_byte_size(die)
+def analyze_struct(cu, record):
+    _, offset, name, size, members = record
+    name = name or "<anon>"
+    offset = cu_ref(cu, offset)
 
     # Incomplete type
     if not size:
@@ -411,57 +1059,29 @@ def analyze_die_struct(die):
         at = AggregateType(offset, name, size)
         type_env[offset] = at
 
-        for child in die.iter_children():
-            if child.tag != "DW_TAG_member":
-                continue
-            data_member_location = child.attributes.get("DW_AT_data_member_location")
-            if not data_member_location:
-                continue
-
-            child_type = die_get_type_offset(child)
-            member_offset = data_member_location.value
-            cname = die_get_name(child) or "<anon>"
-            m = AggregateTypeMember(child.offset, cname, child_type,
-                                    member_offset)
+        for member_offset, cname, child_type, data_member_location in members:
+            m = AggregateTypeMember(cu_ref(cu, member_offset),
+                                    cname or "<anon>", cu_ref(cu, child_type),
+                                    data_member_location)
             at.add_member(m)
 
         return
 
 
-def analyze_die_const(die):
-    type_offset = die_get_type_offset(die)
+def analyze_const(cu, record):
+    _, offset, type_offset = record
+    type_offset = cu_ref(cu, type_offset)
     if not type_offset:
         return
 
-    type_env[die.offset] = ConstType(type_offset)
-
-
-def analyze_die_array(die):
-    type_offset = die_get_type_offset(die)
-    elements = []
+    type_env[cu_ref(cu, offset)] = ConstType(type_offset)
 
-    for child in die.iter_children():
-        if child.tag != "DW_TAG_subrange_type":
-            continue
-
-        if "DW_AT_upper_bound" in child.attributes:
-            ub = child.attributes["DW_AT_upper_bound"]
 
-            if not ub.form.startswith("DW_FORM_data"):
-                continue
-
-            elements.append(ub.value + 1)
-        # in DWARF 4, e.g. ARC Metaware toolchain, DW_AT_count is used
-        # not DW_AT_upper_bound
-        elif "DW_AT_count" in child.attributes:
-            ub = child.attributes["DW_AT_count"]
-
-            if not ub.form.startswith("DW_FORM_data"):
-                continue
-
-            elements.append(ub.value)
-        else:
-            continue
+def analyze_array(cu, record):
+    _, offset, type_offset, elements = record
+    offset = cu_ref(cu, offset)
+    type_offset = cu_ref(cu, type_offset)
+    elements = list(elements)
 
     if not elements:
         if type_offset in type_env:
@@ -469,18 +1089,27 @@ def analyze_die_array(die):
             if mt.has_kobject():
                 if isinstance(mt, KobjectType) and mt.name == STACK_TYPE:
                     elements.append(1)
-                    type_env[die.offset] = ArrayType(die.offset, elements, type_offset)
+                    type_env[offset] = ArrayType(offset, elements, type_offset)
     else:
-        type_env[die.offset] = ArrayType(die.offset, elements, type_offset)
+        type_env[offset] = ArrayType(offset, elements, type_offset)
 
 
-def analyze_typedef(die):
-    type_offset = die_get_type_offset(die)
+def analyze_typedef(cu, record):
+    _, offset, type_offset = record
+    type_offset = cu_ref(cu, type_offset)
 
     if type_offset not in type_env:
         return
 
-    type_env[die.offset] = type_env[type_offset]
+    type_env[cu_ref(cu, offset)] = type_env[type_offset]
+
+
+TYPE_ANALYZERS = {
+    "struct": analyze_struct,
+    "const": analyze_const,
+    "array": analyze_array,
+    "typedef": analyze_typedef,
+}
 
 
 def unpack_pointer(elf, data, offset):
@@ -515,7 +1144,7 @@ def device_get_api_addr(elf, addr):
     return addr_deref(elf, addr + offset)
 
 
-def find_kobjects(elf, syms):
+def find_kobjects(elf, syms, cache_file=None):
     global thread_counter
     global sys_mutex_counter
     global futex_counter
@@ -537,26 +1166,16 @@ def find_kobjects(elf, syms):
     user_stack_start = syms["z_user_stacks_start"]
     user_stack_end = syms["z_user_stacks_end"]
 
-    di = elf.get_dwarf_info()
-
     variables = []
 
-    # Step 1: collect all type information.
-    for CU in di.iter_CUs():
-        for die in CU.iter_DIEs():
-            # Unions are disregarded, kernel objects should never be union
-            # members since the memory is not dedicated to that object and
-            # could be something else
-            if die.tag == "DW_TAG_structure_type":
-                analyze_die_struct(die)
-            elif die.tag == "DW_TAG_const_type":
-                analyze_die_const(die)
-            elif die.tag == "DW_TAG_array_type":
-                analyze_die_array(die)
-            elif die.tag == "DW_TAG_typedef":
-                analyze_typedef(die)
-            elif die.tag == "DW_TAG_variable":
-                variables.append(die)
+    # Step 1: collect all type information. Unions are disregarded, kernel
+    # objects should never be union members since the memory is not
+    # dedicated to that object and could be something else
+    for cu, records in read_dwarf_records(elf, cache_file):
+        for record in records["types"]:
+            TYPE_ANALYZERS[record[0]](cu, record)
+        for record in records["variables"]:
+            variables.append(VariableDie(cu, record))
 
     # Step 2: filter type_env to only contain kernel objects, or structs
     # and arrays of kernel objects
@@ -588,24 +1207,24 @@ def find_kobjects(elf, syms):
         if type_offset not in type_env:
             continue
 
-        if "DW_AT_declaration" in die.attributes:
+        if die.declaration:
             # Extern declaration, only used indirectly
             extern_env[die.offset] = die
             continue
 
-        if "DW_AT_location" not in die.attributes:
+        if die.location is None:
             debug_die(die,
                       "No location information for object '%s'; possibly stack allocated"
                       % name)
             continue
 
-        loc = die.attributes["DW_AT_location"]
-        if loc.form not in ("DW_FORM_exprloc", "DW_FORM_block1"):
+        loc_form, loc = die.location
+        if loc_form not in ("DW_FORM_exprloc", "DW_FORM_block1"):
             debug_die(die, "kernel object '%s' unexpected location format" %
                       name)
             continue
 
-        opcode = loc.value[0]
+        opcode = loc[0]
         if opcode != DW_OP_addr:
 
             # Check if frame pointer offset DW_OP_fbreg
@@ -618,18 +1237,18 @@ def find_kobjects(elf, syms):
             continue
 
         if "CONFIG_64BIT" in syms:
-            addr = ((loc.value[1] << 0 ) | (loc.value[2] << 8)  |
-                    (loc.value[3] << 16) | (loc.value[4] << 24) |
-                    (loc.value[5] << 32) | (loc.value[6] << 40) |
-                    (loc.value[7] << 48) | (loc.value[8] << 56))
+            addr = ((loc[1] << 0 ) | (loc[2] << 8)  |
+                    (loc[3] << 16) | (loc[4] << 24) |
+                    (loc[5] << 32) | (loc[6] << 40) |
+                    (loc[7] << 48) | (loc[8] << 56))
         else:
-            addr = ((loc.value[1] << 0 ) | (loc.value[2] << 8)  |
-                    (loc.value[3] << 16) | (loc.value[4] << 24))
+            addr = ((loc[1] << 0 ) | (loc[2] << 8)  |
+                    (loc[3] << 16) | (loc[4] << 24))
 
             # Handle a DW_FORM_exprloc that contains a DW_OP_addr, followed immediately by
             # a DW_OP_plus_uconst.
-            if len(loc.value) >= 7 and loc.value[5] == DW_OP_plus_uconst:
-                addr += (loc.value[6])
+            if len(loc) >= 7 and loc[5] == DW_OP_plus_uconst:
+                addr += (loc[6])
 
         if addr == 0:
             # Never linked; gc-sections deleted it
@@ -1015,6 +1634,12 @@ def parse_args():
         the driver subsystems list. Can be specified multiple times:
         -i file1 -i file2 ...''')
 
+    parser.add_argument("--cache-dir", required=False,
+                        help="Directory to cache the information read from "
+                        "the DWARF debug information of each compilation "
+                        "unit in, to only read the units which changed "
+                        "again in the next runs")
+
     parser.add_argument("-v", "--verbose", action="store_true",
                         help="Print extra debugging information")
     args = parser.parse_args()
@@ -1034,7 +1659,10 @@ def main():
         elf = ELFFile(open(args.kernel, "rb"))
         syms = get_symbols(elf)
         max_threads = syms["CONFIG_MAX_THREAD_BYTES"] * 8
-        objs = find_kobjects(elf, syms)
+        cache_file = None
+        if args.cache_dir:
+            cache_file = get_dwarf_cache_file(args.cache_dir, args.kernel)
+        objs = find_kobjects(elf, syms, cache_file)
         if not objs:
             sys.stderr.write("WARNING: zero kobject found in %s\n"
                              % args.kernel)
@@ -39,10 +39,15 @@ Configuration that needs to be sent to the python script.
 
 Multiple regions can be appended together like SRAM2_DATA_BSS
 this will place data and bss inside SRAM2.
+
+The sections of the object files are read with obj_index.py, and cached in
+--cache-dir if given, so that only the object files modified since a previous
+run are read again.
 """
 
 import argparse
 import glob
+import os
 import re
 import sys
 import warnings
@@ -51,8 +56,7 @@ from enum import Enum
 from pathlib import Path
 from typing import NamedTuple, NewType
 
-from elftools.elf.elffile import ELFFile
-from elftools.elf.sections import SymbolTableSection
+from obj_index import ObjectFile, ObjectIndex, find_object_files, index_by_name
 
 MemoryRegion = NewType('MemoryRegion', str)
 
@@ -228,7 +232,9 @@ def region_is_default_ram(region_name: str) -> bool:
     return region_name == args.default_ram_region
 
 
-def find_sections(filename: str, symbol_filter: str) -> 'dict[SectionKind, list[OutputSection]]':
+def find_sections(
+    filename: str, obj_file: ObjectFile, symbol_filter: str
+) -> 'dict[SectionKind, list[OutputSection]]':
     """
     Locate relocatable sections in the given object file.
 
@@ -237,41 +243,31 @@ def find_sections(filename: str, symbol_filter: str) -> 'dict[SectionKind, list[
     """
     obj_file_path = Path(filename)
 
-    with open(obj_file_path, 'rb') as obj_file_desc:
-        full_lib = ELFFile(obj_file_desc)
-        if not full_lib:
-            sys.exit("Error parsing file: " + filename)
-
-        sections = [x for x in full_lib.iter_sections()]
-        out = defaultdict(list)
-
-        for section in sections:
-            if not re.search(symbol_filter, section.name):
-                # Section is filtered-out
-                continue
-            section_kind = SectionKind.for_section_named(section.name)
-            if section_kind is None:
-                continue
-
-            out[section_kind].append(OutputSection(obj_file_path.name, section.name))
+    if obj_file.error:
+        sys.exit("Error parsing file: " + filename)
 
-            # Common variables will be placed in the .bss section
-            # only after linking in the final executable. This "if" finds
-            # common symbols and warns the user of the problem.
-            # The solution to which is simply assigning a 0 to
-            # bss variable and it will go to the required place.
-            if isinstance(section, SymbolTableSection):
+    out = defaultdict(list)
 
-                def is_common_symbol(s):
-                    return s.entry["st_shndx"] == "SHN_COMMON"
+    for section_name, _ in obj_file.sections:
+        if not re.search(symbol_filter, section_name):
+            # Section is filtered-out
+            continue
+        section_kind = SectionKind.for_section_named(section_name)
+        if section_kind is None:
+            continue
 
-                for symbol in filter(is_common_symbol, section.iter_symbols()):
-                    warnings.warn(
-                        "Common variable found. Move "
-                        + symbol.name
-                        + " to bss by assigning it to 0/NULL",
-                        stacklevel=2,
-                    )
+        out[section_kind].append(OutputSection(obj_file_path.name, section_name))
+
+        # Common variables will be placed in the .bss section
+        # only after linking in the final executable. This "for" finds
+        # common symbols and warns the user of the problem.
+        # The solution to which is simply assigning a 0 to
+        # bss variable and it will go to the required place.
+        for symbol_name in obj_file.common_symbols.get(section_name, []):
+            warnings.warn(
+                "Common variable found. Move " + symbol_name + " to bss by assigning it to 0/NULL",
+                stacklevel=2,
+            )
 
     return out
 
@@ -554,11 +550,15 @@ def parse_args():
         help="Name of default RAM memory region for system",
     )
     parser.add_argument("-v", "--verbose", action="count", default=0, help="Verbose Output")
+    parser.add_argument(
+        "--cache-dir", required=False, help="Directory to cache the sections of object files in"
+    )
     args = parser.parse_args()
 
 
 def gen_all_obj_files(searchpath):
-    return list(Path(searchpath).rglob('*.o')) + list(Path(searchpath).rglob('*.obj'))
+    # Object files by file name
+    return index_by_name(find_object_files(searchpath))
 
 
 # return the absolute path for the object file.
@@ -566,9 +566,9 @@ def get_obj_filename(all_obj_files, filename):
     # get the object file name which is almost always pended with .obj
     obj_filename = filename.split("/")[-1] + ".obj"
 
-    for obj_file in all_obj_files:
-        if obj_file.name == obj_filename and filename.split("/")[-2] in obj_file.parent.name:
-            return str(obj_file)
+    for obj_file in all_obj_files.get(obj_filename, []):
+        if filename.split("/")[-2] in os.path.basename(os.path.dirname(obj_file)):
+            return obj_file
 
 
 # Extracts all possible components for the input string:
@@ -666,17 +666,26 @@ def main():
     # Create/or truncate file contents if it already exists
     # raw = open(linker_file, "w")
 
+    # Read the sections of all obj files at once
+    obj_filenames = {
+        filename: get_obj_filename(all_obj_files, filename)
+        for files in rel_dict.values()
+        for filename, _ in files
+    }
+    index = ObjectIndex(args.cache_dir)
+    index.read([obj_filename for obj_filename in obj_filenames.values() if obj_filename])
+
     # for each memory_type, create text/rodata/data/bss sections for all obj files
     for memory_type, files in rel_dict.items():
         full_list_of_sections: dict[SectionKind, list[OutputSection]] = defaultdict(list)
 
         for filename, symbol_filter in files:
-            obj_filename = get_obj_filename(all_obj_files, filename)
+            obj_filename = obj_filenames[filename]
             # the obj file wasn't found. Probably not compiled.
             if not obj_filename:
                 continue
 
-            file_sections = find_sections(obj_filename, symbol_filter)
+            file_sections = find_sections(obj_filename, index.get(obj_filename), symbol_filter)
             # Merge sections from file into collection of sections for all files
             for category, sections in file_sections.items():
                 full_list_of_sections[category].extend(sections)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+#
+# Copyright The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Index of the sections of the object files of a build directory
+
+gen_app_partitions.py and gen_relocate_app.py both look up object files of
+the build directory and the sections in them. ObjectIndex reads the section
+names and sizes, and the common symbols, of the object files once, in several
+processes, and can cache them in a directory with file_cache.py, so that only
+the object files modified since they were cached are read again by the next
+script or link stage.
+"""
+
+import os
+import struct
+import time
+from collections import defaultdict
+from typing import NamedTuple
+
+import elftools.common.exceptions
+from elftools.elf.elffile import ELFFile
+from elftools.elf.sections import SymbolTableSection
+from file_cache import MTIME_MARGIN_NS, is_unchanged, load_cache, map_files, save_cache
+
+# Version of the cached object files, to be increased when ObjectFile changes
+OBJ_INDEX_VERSION = 1
+
+OBJ_INDEX_CACHE_FILE = 'obj_index.pickle'
+
+# Below this number of object files to read, starting worker processes costs
+# more than it saves
+MIN_FILES_PER_POOL = 64
+
+SHN_COMMON = 0xFFF2
+
+
+class ObjectFile(NamedTuple):
+    mtime_ns: int
+    size: int
+    # (name, size) of each section
+    sections: 'list[tuple[str, int]]'
+    # Names of the common symbols of each symbol table section having some
+    common_symbols: 'dict[str, list[str]]'
+    # Why the file could not be read as an ELF file, if it could not
+    error: 'str | None' = None
+
+
+def find_object_files(directory: str) -> 'list[str]':
+    """Return the paths of the object files under directory, sorted"""
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        paths.extend(
+            os.path.join(root, name) for name in sorted(files) if name.endswith(('.o', '.obj'))
+        )
+    return paths
+
+
+def index_by_name(paths: 'list[str]') -> 'dict[str, list[str]]':
+    """Map the file names of paths to the paths with that name, in order"""
+    by_name = defaultdict(list)
+    for path in paths:
+        by_name[os.path.basename(path)].append(path)
+    return by_name
+
+
+def find_common_symbols(elf: ELFFile, section: SymbolTableSection) -> 'list[str]':
+    """
+    Return the names of the common symbols of a symbol table section, only
+    parsing the section index of each symbol, as there are few of them
+    """
+    # Offset of st_shndx in Elf32_Sym and Elf64_Sym
+    shndx_offset = 14 if elf.elfclass == 32 else 6
+    fmt = '<H' if elf.little_endian else '>H'
+
+    data = section.data()
+    entsize = section['sh_entsize']
+    return [
+        section.get_symbol(i).name
+        for i in range(section.num_symbols())
+        if struct.unpack_from(fmt, data, i * entsize + shndx_offset)[0] == SHN_COMMON
+    ]
+
+
+def read_object_file(path: str) -> ObjectFile:
+    """Read the sections and common symbols of an object file"""
+    st = os.stat(path)
+    if st.st_size == 0:
+        return ObjectFile(st.st_mtime_ns, 0, [], {}, 'empty file')
+
+    with open(path, 'rb') as f:
+        try:
+            elf = ELFFile(f)
+            sections = []
+            common_symbols = {}
+            for section in elf.iter_sections():
+                sections.append((section.name, section['sh_size']))
+                if isinstance(section, SymbolTableSection):
+                    names = find_common_symbols(elf, section)
+                    if names:
+                        common_symbols[section.name] = names
+        except elftools.common.exceptions.ELFError as e:
+            return ObjectFile(st.st_mtime_ns, st.st_size, [], {}, str(e))
+
+    return ObjectFile(st.st_mtime_ns, st.st_size, sections, common_symbols)
+
+
+class ObjectIndex:
+    """
+    Sections of object files, read once by read(), cached in cache_dir if
+    given and read in jobs processes
+    """
+
+    def __init__(self, cache_dir: 'str | None' = None, jobs: int = 1):
+        self.cache_dir = cache_dir
+        self.jobs = jobs
+        self.objects: dict[str, ObjectFile] = {}
+        self._cached_start_ns = 0
+        self._cached: dict[str, ObjectFile] = {}
+
+        if cache_dir:
+            self._load_cache()
+
+    def _cache_file(self):
+        return os.path.join(self.cache_dir, OBJ_INDEX_CACHE_FILE)
+
+    def _load_cache(self):
+        self._cached_start_ns, self._cached = load_cache(self._cache_file(), OBJ_INDEX_VERSION)
+
+    def _save_cache(self, start_ns):
+        # Keep the object files other scripts read, as long as they exist,
+        # unless they may have been written again unnoticed
+        objects = {
+            path: obj
+            for path, obj in self._cached.items()
+            if obj.mtime_ns < self._cached_start_ns - MTIME_MARGIN_NS and os.path.exists(path)
+        }
+        objects.update(self.objects)
+        save_cache(self._cache_file(), OBJ_INDEX_VERSION, start_ns, objects)
+
+    def _is_cached(self, path):
+        obj = self._cached.get(path)
+        return obj is not None and is_unchanged(path, obj, self._cached_start_ns)
+
+    def read(self, paths: 'list[str]') -> 'list[ObjectFile]':
+        """
+        Return the ObjectFile of each path, only reading the object files
+        not read yet, nor cached, or modified since they were cached
+        """
+        start_ns = time.time_ns()
+        paths = [os.path.abspath(path) for path in paths]
+
+        pending = []
+        for path in dict.fromkeys(paths):
+            if path in self.objects:
+                continue
+            if self._is_cached(path):
+                self.objects[path] = self._cached[path]
+            else:
+                pending.append(path)
+
+        read = map_files(
+            read_object_file, [(path,) for path in pending], self.jobs, MIN_FILES_PER_POOL
+        )
+        self.objects.update(zip(pending, read, strict=True))
+
+        if self.cache_dir and pending:
+            self._save_cache(start_ns)
+
+        return [self.objects[path] for path in paths]
+
+    def get(self, path: str) -> ObjectFile:
+        """Return the ObjectFile of path"""
+        return self.read([path])[0]
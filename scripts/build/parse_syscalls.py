@@ -22,15 +22,24 @@ If the output JSON file already exists, its contents are checked against
 what information this script would have outputted; if the result is that the
 file would be unchanged, it is not modified to prevent unnecessary
 incremental builds.
+
+With --cache-dir, the results of the scan of each file are cached, and only
+the files whose modification time or size changed since the previous run
+are read again; they are only scanned again if their content changed too.
+Files which must be scanned are spread over --jobs processes.
 """
 
 import sys
 import re
 import argparse
+import hashlib
 import os
 import json
+import time
 from pathlib import PurePath
 
+from file_cache import is_unchanged, load_cache, map_files, save_cache
+
 regex_flags = re.MULTILINE | re.VERBOSE
 
 syscall_regex = re.compile(r'''
@@ -44,16 +53,97 @@ syscall_regex = re.compile(r'''
 struct_tags = ["__subsystem", "__net_socket"]
 
 tagged_struct_decl_template = r'''
-%s\s+                           # tag, must be first
+(%s)\s+                         # tag, must be first
 struct\s+                       # struct keyword is next
 ([^{]+)                         # name of subsystem
 [{]                             # Open curly bracket
 '''
 
-def tagged_struct_update(target_list, tag, contents):
-    regex = re.compile(tagged_struct_decl_template % tag, regex_flags)
-    items = [mo.groups()[0].strip() for mo in regex.finditer(contents)]
-    target_list.extend(items)
+# A single pattern for all the tags, so that each file is only matched once
+tagged_struct_regex = re.compile(tagged_struct_decl_template % "|".join(struct_tags),
+                                 regex_flags)
+
+# Version of the cached scan results, to be increased when they change
+SCAN_CACHE_VERSION = 1
+
+SCAN_CACHE_FILE = "parse_syscalls.pickle"
+
+# Below this number of files to scan, starting worker processes costs
+# more than it saves
+MIN_FILES_PER_POOL = 256
+
+
+def scan_file(path, cached=None):
+    """
+    Scan a file for system calls and tagged structs and return its cache
+    entry: (mtime, size, digest, syscalls, tagged structs), with the
+    groups of each system call match and the (tag, name) of each struct.
+    The results of the cached entry are reused if the content is unchanged.
+    """
+    st = os.stat(path)
+    with open(path, "rb") as fp:
+        data = fp.read()
+    digest = hashlib.sha256(data).digest()
+
+    if cached is not None and cached[2] == digest:
+        return (st.st_mtime_ns, st.st_size) + cached[2:]
+
+    try:
+        contents = data.decode("utf-8")
+    except Exception:
+        sys.stderr.write("Error decoding %s\n" % path)
+        raise
+    # As read by a file opened in text mode
+    if "\r" in contents:
+        contents = contents.replace("\r\n", "\n").replace("\r", "\n")
+
+    try:
+        syscalls = []
+        if "__syscall" in contents:
+            syscalls = [mo.groups() for mo in syscall_regex.finditer(contents)]
+
+        tagged = []
+        if any(tag in contents for tag in struct_tags):
+            tagged = [(mo.group(1), mo.group(2).strip())
+                      for mo in tagged_struct_regex.finditer(contents)]
+    except Exception:
+        sys.stderr.write("While parsing %s\n" % os.path.basename(path))
+        raise
+
+    return (st.st_mtime_ns, st.st_size, digest, syscalls, tagged)
+
+
+def scan_cache_header():
+    return (SCAN_CACHE_VERSION, syscall_regex.pattern, tagged_struct_regex.pattern)
+
+
+def scan_files(paths, cache_dir, jobs):
+    """
+    Return the cache entries of the files, only scanning the files not
+    in the cache of cache_dir, or modified since, in jobs processes
+    """
+    start_ns = time.time_ns()
+    cache_file = os.path.join(cache_dir, SCAN_CACHE_FILE) if cache_dir else None
+    cached_start_ns, cached = (load_cache(cache_file, scan_cache_header())
+                               if cache_file else (0, {}))
+
+    entries = {}
+    pending = []
+    for path in paths:
+        entry = cached.get(path)
+        if entry is not None and is_unchanged(path, entry, cached_start_ns):
+            entries[path] = entry
+        else:
+            pending.append((path, entry))
+
+    scanned = map_files(scan_file, pending, jobs, MIN_FILES_PER_POOL)
+    for (path, _), entry in zip(pending, scanned, strict=True):
+        entries[path] = entry
+
+    if cache_file and (pending or len(entries) != len(cached)):
+        save_cache(cache_file, scan_cache_header(), start_ns, entries)
+
+    return entries
 
 
 def analyze_headers(include_dir, scan_dir, file_list):
@@ -95,17 +185,19 @@ def analyze_headers(include_dir, scan_dir, file_list):
         for root, dirs, files in os.walk(base_path, topdown=True):
             dirs.sort()
             files.sort()
+            # Normalized once per directory, as the file names are plain
+            prefix = PurePath(os.path.normpath(root)).as_posix()
+            prefix = "" if prefix == "." else prefix.rstrip("/") + "/"
             for fn in files:
 
                 # toolchain/common.h has the definitions of these tags which we
                 # don't want to trip over
-                path = os.path.join(root, fn)
-                if (not (path.endswith(".h") or path.endswith(".c")) or
-                        path.endswith(os.path.join(os.sep, 'toolchain',
-                                                   'common.h'))):
+                if (not (fn.endswith(".h") or fn.endswith(".c")) or
+                        os.path.join(root, fn).endswith(
+                            os.path.join(os.sep, 'toolchain', 'common.h'))):
                     continue
 
-                path = PurePath(os.path.normpath(path)).as_posix()
+                path = prefix + fn
 
                 if path not in syscall_files:
                     if include_dir and base_path in include_dir:
@@ -113,29 +205,19 @@ def analyze_headers(include_dir, scan_dir, file_list):
                     else:
                         syscall_files[path] = {"emit" : False}
 
-    # Parse files to extract syscall functions
+    # Parse files to extract syscall functions, in the order of
+    # syscall_files whether they were scanned now or cached
+    entries = scan_files(list(syscall_files), args.cache_dir, args.jobs)
+
     for one_file in syscall_files:
-        with open(one_file, "r", encoding="utf-8") as fp:
-            try:
-                contents = fp.read()
-            except Exception:
-                sys.stderr.write("Error decoding %s (included in %s)\n" % (one_file, path))
-                raise
+        _, _, _, syscalls, tagged = entries[one_file]
 
         fn = os.path.basename(one_file)
+        to_emit = syscall_files[one_file]["emit"] | args.emit_all_syscalls
 
-        try:
-            to_emit = syscall_files[one_file]["emit"] | args.emit_all_syscalls
-
-            syscall_result = [(mo.groups(), fn, to_emit)
-                              for mo in syscall_regex.finditer(contents)]
-            for tag in struct_tags:
-                tagged_struct_update(tagged_ret[tag], tag, contents)
-        except Exception:
-            sys.stderr.write("While parsing %s\n" % fn)
-            raise
-
-        syscall_ret.extend(syscall_result)
+        syscall_ret.extend((groups, fn, to_emit) for groups in syscalls)
+        for tag, name in tagged:
+            tagged_ret[tag].append(name)
 
     return syscall_ret, tagged_ret
 
@@ -184,6 +266,14 @@ def parse_args():
     parser.add_argument(
         "--emit-all-syscalls", required=False, action="store_true",
         help="Emit all potential syscalls in the tree")
+    parser.add_argument(
+        "--cache-dir", required=False,
+        help="Directory to cache the results of the scan of each file in, "
+             "so that only modified files are scanned again")
+    parser.add_argument(
+        "--jobs", type=int, default=1,
+        help="Number of processes scanning files, 1 by default. More "
+             "only pay off when many files must be scanned again")
 
     args = parser.parse_args()
 
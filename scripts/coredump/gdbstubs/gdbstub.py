@@ -6,6 +6,7 @@
 
 import abc
 import binascii
+import bisect
 import logging
 
 from coredump_parser.elf_parser import ThreadInfoOffset
@@ -32,6 +33,7 @@ class GdbStub(abc.ABC):
             mem_regions.append(r)
 
         self.mem_regions = mem_regions
+        self.build_mem_index()
 
     def get_gdb_packet(self):
         socket = self.socket
@@ -80,48 +82,82 @@ class GdbStub(abc.ABC):
         if socket is None:
             return
 
-        checksum = 0
-        for d in data:
-            checksum += d
+        checksum = sum(data) % 256
 
         pkt = b'$' + data + b'#'
-
-        checksum = checksum % 256
         pkt += format(checksum, "02X").encode()
 
-        logger.debug(f"Sending GDB packet: {pkt}")
+        # Formatted only if enabled, as memory replies can be large
+        logger.debug("Sending GDB packet: %s", pkt)
 
         socket.send(pkt)
 
-    def get_memory(self, start_address, length):
-        def get_mem_region(addr):
-            for r in self.mem_regions:
-                if r['start'] <= addr < r['end']:
-                    return r
+    def build_mem_index(self):
+        # Index the memory regions as a list of non-overlapping
+        # (start, end, data) segments sorted by address, with the data
+        # as memoryview of the region data. Where regions overlap, the
+        # first one in mem_regions is used, so the content from the log
+        # file takes precedence over the one from the ELF file.
+        #
+        # The region is covered by its data: the end address is not
+        # inclusive for regions from the log file, but it is for regions
+        # from the ELF file.
+        segments = list()
 
-            return None
+        for r in self.mem_regions:
+            data = memoryview(r['data'])
+            r_start = r['start']
+            r_end = r_start + len(data)
+
+            # Parts of the region not covered by earlier regions
+            parts = list()
+            addr = r_start
+            for s_start, s_end, _ in sorted(segments, key=lambda seg: seg[0]):
+                if s_end <= addr or s_start >= r_end:
+                    continue
+
+                if s_start > addr:
+                    parts.append((addr, s_start))
+                addr = max(addr, s_end)
+
+            if addr < r_end:
+                parts.append((addr, r_end))
+
+            for p_start, p_end in parts:
+                segments.append((p_start, p_end, data[p_start - r_start:p_end - r_start]))
+
+        segments.sort(key=lambda seg: seg[0])
+
+        self.mem_segments = segments
+        self.mem_segment_starts = [seg[0] for seg in segments]
+
+    def get_memory(self, start_address, length):
+        # Returns the memory content in the given address range, which
+        # may span adjacent regions, or None if any byte of it is not
+        # in the core dump
+        segments = self.mem_segments
+        idx = bisect.bisect_right(self.mem_segment_starts, start_address) - 1
 
-        # FIXME: Need more efficient way of extracting memory content
         remaining = length
         addr = start_address
-        barray = b''
-        r = get_mem_region(addr)
+        chunks = list()
         while remaining > 0:
-            if r is None:
-                barray = None
-                break
+            if idx < 0 or idx >= len(segments):
+                return None
 
-            if addr > r['end']:
-                r = get_mem_region(addr)
-                continue
+            s_start, s_end, data = segments[idx]
+            if not s_start <= addr < s_end:
+                return None
 
-            offset = addr - r['start']
-            barray += r['data'][offset:offset+1]
+            offset = addr - s_start
+            size = min(remaining, s_end - addr)
+            chunks.append(data[offset:offset + size])
 
-            addr += 1
-            remaining -= 1
+            addr += size
+            remaining -= size
+            idx += 1
 
-        return barray
+        return b''.join(chunks)
 
     def handle_signal_query_packet(self):
         # the '?' packet
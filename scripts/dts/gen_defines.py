@@ -15,10 +15,10 @@
 
 import argparse
 from collections import defaultdict
+import functools
 import os
 import pathlib
 import pickle
-import re
 import sys
 from typing import Iterable, NoReturn, Optional
 
@@ -26,27 +26,57 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'python-devicetree',
                                 'src'))
 
 import edtlib_logger
+import incremental
 from devicetree import edtlib
 
 
 def main():
-    global header_file
-    global flash_area_num
-
     args = parse_args()
 
     edtlib_logger.setup_edtlib_logging()
 
+    digest = None
+    if args.inputs_stamp:
+        # The pickled EDT covers the devicetree and the bindings.
+        # relativize() also depends on $ZEPHYR_BASE.
+        digest = incremental.inputs_digest(
+            sys.argv[1:] + [os.getenv("ZEPHYR_BASE", "")],
+            contents=[args.edt_pickle],
+            stats=[__file__, incremental.__file__, edtlib.__file__])
+        if incremental.is_up_to_date(args.inputs_stamp, digest,
+                                     [args.header_out]):
+            # Nothing changed since the previous run
+            return
+        incremental.remove_stamp(args.inputs_stamp)
+
     with open(args.edt_pickle, 'rb') as f:
         edt = pickle.load(f)
 
+    # Only replace the header if it changed, as most of the build depends
+    # on it
+    incremental.update_file(args.header_out,
+                            lambda path: write_header(edt, path))
+
+    if digest is not None:
+        incremental.write_stamp(args.inputs_stamp, digest)
+
+
+def write_header(edt: edtlib.EDT, header_out: str) -> None:
+    # Writes the generated header for 'edt' to 'header_out'
+
+    global header_file
+    global header_lines
+    global flash_area_num
+
     flash_area_num = 0
+    header_lines = []
 
     # Create the generated header.
-    with open(args.header_out, "w", encoding="utf-8") as header_file:
+    with open(header_out, "w", encoding="utf-8") as header_file:
         write_top_comment(edt)
 
         write_utils()
+        flush_header()
 
         sorted_nodes = sorted(edt.nodes, key=lambda node: node.dep_ordinal)
 
@@ -72,14 +102,13 @@ def main():
             out_dt_define(f"{node.z_path_id}_PATH", f'"{escape(node.path)}"')
 
             out_comment("Node's name with unit-address:")
-            out_dt_define(f"{node.z_path_id}_FULL_NAME",
-                          f'"{escape(node.name)}"')
-            out_dt_define(f"{node.z_path_id}_FULL_NAME_UNQUOTED",
-                          f'{escape(node.name)}')
-            out_dt_define(f"{node.z_path_id}_FULL_NAME_TOKEN",
-                          f'{edtlib.str_as_token(escape(node.name))}')
+            name = escape(node.name)
+            name_token = edtlib.str_as_token(name)
+            out_dt_define(f"{node.z_path_id}_FULL_NAME", f'"{name}"')
+            out_dt_define(f"{node.z_path_id}_FULL_NAME_UNQUOTED", name)
+            out_dt_define(f"{node.z_path_id}_FULL_NAME_TOKEN", name_token)
             out_dt_define(f"{node.z_path_id}_FULL_NAME_UPPER_TOKEN",
-                          f'{edtlib.str_as_token(escape(node.name)).upper()}')
+                          name_token.upper())
 
             if node.parent is not None:
                 out_comment(f"Node parent ({node.parent.path}) identifier:")
@@ -104,9 +133,11 @@ def main():
             write_bus(node)
             write_special_props(node)
             write_vanilla_props(node)
+            flush_header()
 
         write_chosen(edt)
         write_global_macros(edt)
+        flush_header()
 
 
 def node_z_path_id(node: edtlib.Node) -> str:
@@ -136,6 +167,11 @@ def parse_args() -> argparse.Namespace:
                         help="path to write header to")
     parser.add_argument("--edt-pickle",
                         help="path to read pickled edtlib.EDT object from")
+    parser.add_argument("--inputs-stamp",
+                        help="path to a file recording a digest of the "
+                             "inputs of the previous run. If the inputs "
+                             "did not change, the header is not generated "
+                             "again.")
 
     return parser.parse_args()
 
@@ -216,10 +252,13 @@ Binding (compatible = {node.matching_compat}):
     out_comment(s)
 
 
+@functools.cache
 def relativize(path) -> Optional[str]:
     # If 'path' is within $ZEPHYR_BASE, returns it relative to $ZEPHYR_BASE,
     # with a "$ZEPHYR_BASE/..." hint at the start of the string. Otherwise,
     # returns 'path' unchanged.
+    #
+    # Many nodes share a binding, so the results are cached.
 
     zbase = os.getenv("ZEPHYR_BASE")
     if zbase is None:
@@ -975,10 +1014,17 @@ def write_global_macros(edt: edtlib.EDT):
                 f"DT_COMPAT_{str2ident(compat)}_BUS_{str2ident(bus)}", 1)
 
 
+IDENT_TABLE = str.maketrans("-,.@/+", "______")
+
+
+@functools.cache
 def str2ident(s: str) -> str:
     # Converts 's' to a form suitable for (part of) an identifier
+    #
+    # The same compatibles, property names and path components are
+    # converted many times, so the results are cached.
 
-    return re.sub('[-,.@/+]', '_', s.lower())
+    return s.lower().translate(IDENT_TABLE)
 
 
 def list2init(l: Iterable[str]) -> str:
@@ -1026,7 +1072,7 @@ def out_define(
     else:
         s = f"#define {macro}{warn} {val}"
 
-    print(s, file=header_file)
+    header_lines.append(s)
 
 
 def out_comment(s: str, blank_before=True) -> None:
@@ -1035,7 +1081,7 @@ def out_comment(s: str, blank_before=True) -> None:
     # before the comment.
 
     if blank_before:
-        print(file=header_file)
+        header_lines.append("")
 
     if "\n" in s:
         # Format multi-line comments like
@@ -1046,18 +1092,29 @@ def out_comment(s: str, blank_before=True) -> None:
         #    *
         #    * empty line before this line
         #    */
-        res = ["/*"]
+        header_lines.append("/*")
         for line in s.splitlines():
             # Avoid an extra space after '*' for empty lines. They turn red in
             # Vim if space error checking is on, which is annoying.
-            res.append(f" * {line}".rstrip())
-        res.append(" */")
-        print("\n".join(res), file=header_file)
+            header_lines.append(f" * {line}".rstrip())
+        header_lines.append(" */")
     else:
         # Format single-line comments like
         #
         #   /* foo bar */
-        print(f"/* {s} */", file=header_file)
+        header_lines.append(f"/* {s} */")
+
+
+def flush_header() -> None:
+    # Writes the lines buffered by out_define() and out_comment() to the
+    # header file, in a single write. This is called once per node, as
+    # printing each line separately is a large part of the run time for
+    # big devicetrees.
+
+    if header_lines:
+        header_lines.append("")
+        header_file.write("\n".join(header_lines))
+        header_lines.clear()
 
 ESCAPE_TABLE = str.maketrans(
     {
@@ -22,14 +22,21 @@
 import argparse
 import os
 import pickle
+import re
 import sys
-from typing import NoReturn
+from typing import TYPE_CHECKING, NoReturn
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'python-devicetree',
                                 'src'))
 
 import edtlib_logger
-from devicetree import edtlib
+import incremental
+
+if TYPE_CHECKING:
+    from devicetree import edtlib
+
+DEVICETREE_DIR = os.path.join(os.path.dirname(__file__), 'python-devicetree',
+                              'src', 'devicetree')
 
 
 def main():
@@ -37,6 +44,23 @@ def main():
 
     edtlib_logger.setup_edtlib_logging()
 
+    outputs = [args.dts_out, args.edt_pickle_out]
+    if args.edt_snapshot_out:
+        outputs.append(args.edt_snapshot_out)
+
+    digest = None
+    if args.inputs_stamp:
+        digest = inputs_digest(args)
+        if digest is not None and \
+           incremental.is_up_to_date(args.inputs_stamp, digest, outputs):
+            # Nothing changed since the previous run
+            return
+        incremental.remove_stamp(args.inputs_stamp)
+
+    # Imported only now, as importing edtlib takes a large part of the time
+    # of runs that reuse the previous outputs
+    from devicetree import edtlib, snapshot
+
     vendor_prefixes = {}
     for prefixes_file in args.vendor_prefixes:
         vendor_prefixes.update(edtlib.load_vendor_prefixes_txt(prefixes_file))
@@ -50,15 +74,24 @@ def main():
                          default_prop_types=True,
                          infer_binding_for_paths=["/zephyr,user", "/cpus"],
                          werror=args.edtlib_Werror,
-                         vendor_prefixes=vendor_prefixes)
+                         vendor_prefixes=vendor_prefixes,
+                         binding_index=args.binding_index)
     except edtlib.EDTError as e:
         sys.exit(f"devicetree error: {e}")
 
     # Save merged DTS source, as a debugging aid
-    with open(args.dts_out, "w", encoding="utf-8") as f:
-        print(edt.dts_source, file=f)
+    incremental.update_file(args.dts_out,
+                            lambda path: write_dts_source(edt, path))
+
+    incremental.update_file(args.edt_pickle_out,
+                            lambda path: write_pickled_edt(edt, path))
+
+    if args.edt_snapshot_out:
+        incremental.update_file(args.edt_snapshot_out,
+                                lambda path: snapshot.write_snapshot(edt, path))
 
-    write_pickled_edt(edt, args.edt_pickle_out)
+    if digest is not None:
+        incremental.write_stamp(args.inputs_stamp, digest)
 
 
 def parse_args() -> argparse.Namespace:
@@ -80,18 +113,74 @@ def parse_args() -> argparse.Namespace:
                              "as a debugging aid)")
     parser.add_argument("--edt-pickle-out",
                         help="path to write pickled edtlib.EDT object to", required=True)
+    parser.add_argument("--edt-snapshot-out",
+                        help="path to write a devicetree.snapshot snapshot of "
+                             "the edtlib.EDT object to, for tools that only "
+                             "query it")
     parser.add_argument("--vendor-prefixes", action='append', default=[],
                         help="vendor-prefixes.txt path; used for validation; "
                              "may be given multiple times")
+    parser.add_argument("--binding-index",
+                        help="path to an edtlib binding index file, which "
+                             "is created if needed and may be shared "
+                             "between builds")
     parser.add_argument("--edtlib-Werror", action="store_true",
                         help="if set, edtlib-specific warnings become errors. "
                              "(this does not apply to warnings shared "
                              "with dtc.)")
+    parser.add_argument("--inputs-stamp",
+                        help="path to a file recording a digest of the "
+                             "inputs of the previous run. If the inputs "
+                             "did not change, the outputs of that run are "
+                             "kept and the EDT is not built again.")
 
     return parser.parse_args()
 
 
-def write_pickled_edt(edt: edtlib.EDT, out_file: str) -> None:
+def inputs_digest(args: argparse.Namespace) -> str | None:
+    # Returns a digest of everything the outputs depend on: the arguments,
+    # the DTS file, the vendor prefixes, the bindings, and the devicetree
+    # package itself. Bindings are identified by their size and
+    # modification time, as reading all of them would take about as long
+    # as building the EDT.
+    #
+    # Returns None if the outputs can't be reused, because the DTS file
+    # /include/s files that would not be covered by the digest.
+
+    with open(args.dts, "rb") as f:
+        if _include_re.search(f.read()):
+            return None
+
+    bindings = sorted(
+        os.path.join(root, filename)
+        for bindings_dir in args.bindings_dirs
+        for root, _, filenames in os.walk(bindings_dir)
+        for filename in filenames
+        if filename.endswith((".yaml", ".yml")))
+    sources = [__file__, incremental.__file__] + sorted(
+        os.path.join(DEVICETREE_DIR, filename)
+        for filename in os.listdir(DEVICETREE_DIR)
+        if filename.endswith(".py"))
+
+    return incremental.inputs_digest(
+        sys.argv[1:],
+        contents=[args.dts, *args.vendor_prefixes],
+        stats=bindings + sources)
+
+
+# Matches /include/ directives, but not paths like "/foo/include/bar.h" in
+# line markers. False positives only make outputs not be reused.
+_include_re = re.compile(rb'(?:^|[\s;{}])/include/', re.MULTILINE)
+
+
+def write_dts_source(edt: 'edtlib.EDT', out_file: str) -> None:
+    # Writes the merged DTS source of the edt object to out_file.
+
+    with open(out_file, "w", encoding="utf-8") as f:
+        print(edt.dts_source, file=f)
+
+
+def write_pickled_edt(edt: 'edtlib.EDT', out_file: str) -> None:
     # Writes the edt object in pickle format to out_file.
 
     with open(out_file, 'wb') as f:
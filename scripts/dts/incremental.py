@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+# Copyright The Zephyr Project Contributors
+# SPDX-License-Identifier: Apache-2.0
+
+# Helpers for the devicetree generator scripts, so that they can skip their
+# work when their inputs did not change since the previous run, and only
+# touch their outputs when the contents change.
+#
+# The previous run is described by a stamp file with a digest of its
+# inputs. The stamp is removed before any output is written and written
+# again once all outputs are complete, so an interrupted run is never
+# mistaken for a complete one.
+#
+# Outputs are first written next to their final path, then compared with
+# the existing file, which is only replaced if the contents differ. This
+# keeps the timestamps of unchanged outputs, so that the build system does
+# not rebuild what depends on them.
+
+import contextlib
+import filecmp
+import hashlib
+import os
+from collections.abc import Callable, Iterable
+
+
+def inputs_digest(
+    args: Iterable[str], contents: Iterable[str] = (), stats: Iterable[str] = ()
+) -> str:
+    # Returns a digest of the command line arguments 'args', the contents of
+    # the files in 'contents' and the path, size and modification time of
+    # the files in 'stats'. The latter is meant for files that are too many
+    # to read on every run, like bindings.
+
+    h = hashlib.sha256()
+    for arg in args:
+        h.update(f"arg {arg}\0".encode())
+    for path in contents:
+        with open(path, "rb") as f:
+            h.update(f"contents {path} ".encode() + hashlib.sha256(f.read()).digest())
+    for path in stats:
+        try:
+            st = os.stat(path)
+            h.update(f"stat {path} {st.st_size} {st.st_mtime_ns}\0".encode())
+        except OSError:
+            h.update(f"stat {path} missing\0".encode())
+    return h.hexdigest()
+
+
+def is_up_to_date(stamp: str, digest: str, outputs: Iterable[str]) -> bool:
+    # True if 'stamp' records 'digest' and all files in 'outputs' exist
+
+    try:
+        with open(stamp, encoding="utf-8") as f:
+            if f.read() != digest:
+                return False
+    except OSError:
+        return False
+    return all(os.path.exists(path) for path in outputs)
+
+
+def remove_stamp(stamp: str) -> None:
+    # Removes 'stamp', before outputs are written
+
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(stamp)
+
+
+def write_stamp(stamp: str, digest: str) -> None:
+    # Records 'digest' in 'stamp', after all outputs were written
+
+    with open(stamp, "w", encoding="utf-8") as f:
+        f.write(digest)
+
+
+def update_file(path: str, write: Callable[[str], None]) -> bool:
+    # Calls 'write' with a temporary path to write the new contents of 'path'
+    # to, then replaces 'path' with it if the contents differ. Returns True
+    # if 'path' was replaced.
+
+    tmp = path + ".tmp"
+    try:
+        write(tmp)
+        if os.path.exists(path) and filecmp.cmp(tmp, path, shallow=False):
+            return False
+        os.replace(tmp, path)
+        return True
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
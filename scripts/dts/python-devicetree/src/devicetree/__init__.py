@@ -1,4 +1,4 @@
 # Copyright (c) 2021 Nordic Semiconductor ASA
 # SPDX-License-Identifier: Apache-2.0
 
-__all__ = ['edtlib', 'dtlib']
+__all__ = ['edtlib', 'dtlib', 'snapshot']
@@ -796,7 +796,8 @@ class DT:
     #
 
     def __init__(self, filename: Optional[str], include_path: Iterable[str] = (),
-                 force: bool = False, base_dir: Optional[str] = None):
+                 force: bool = False, base_dir: Optional[str] = None,
+                 fast_lexer: bool = True):
         """
         Parses a DTS file to create a DT instance. Raises OSError if 'filename'
         can't be opened, and DTError for any parse errors.
@@ -818,6 +819,13 @@ class DT:
           Path to the directory that is to be used as the reference for
           the generated relative paths in comments. When not provided, the
           current working directory is used.
+
+        fast_lexer (default: True):
+          If True, whitespace, comments and the next token are matched
+          together with a single regular expression. If False, the original
+          lexer, which tries the token regular expressions one at a time, is
+          used. Both give the same result, the original lexer is kept for
+          testing.
         """
         # Remember to update __deepcopy__() if you change this.
 
@@ -832,6 +840,7 @@ class DT:
 
         self._force = force
         self._base_dir = base_dir or os.getcwd()
+        self._fast_lexer = fast_lexer
 
         if filename is not None:
             self._parse_file(filename, include_path)
@@ -989,7 +998,7 @@ class DT:
         """
 
         # We need a new DT, obviously. Make a new, empty one.
-        ret = DT(None, (), self._force, self._base_dir)
+        ret = DT(None, (), self._force, self._base_dir, self._fast_lexer)
 
         # Now allocate new Node objects for every node in self, to use
         # in the new DT. Set their parents to None for now and leave
@@ -1108,6 +1117,13 @@ class DT:
         self._remove_unreferenced()
         self._register_labels()
 
+        # The lexer state is only needed while parsing. Dropping it keeps the
+        # file contents out of pickled DT instances, which then only differ
+        # when the tree does.
+        del (self._file_contents, self._tok_i, self._tok_end_i,
+             self._filestack, self._lexer_state, self._saved_token,
+             self._lineno)
+
     def _parse_header(self):
         # Parses /dts-v1/ (expected) and /plugin/ (unsupported) at the start of
         # files. There may be multiple /dts-v1/ at the start of a file.
@@ -1623,6 +1639,115 @@ class DT:
         return self._saved_token
 
     def _next_token(self):
+        # Returns the next token. Whitespace and comments before it are
+        # skipped by the same regex match, see _init_fast_lexer(). This
+        # gives the same tokens as _next_token_legacy(), which is used
+        # instead if the DT was created with fast_lexer=False.
+
+        if not self._fast_lexer:
+            return self._next_token_legacy()
+
+        if self._saved_token:
+            tmp = self._saved_token
+            self._saved_token = None
+            return tmp
+
+        while True:
+            contents = self._file_contents
+            pos = self._tok_end_i
+            regex, group_info = _lexers[self._lexer_state]
+            match = regex.match(contents, pos)
+
+            if match is None:
+                # Nothing but whitespace and comments matched. See
+                # _next_token_legacy() for why this is a token.
+                self._tok_i = self._tok_end_i = _skip_re.match(contents,
+                                                                pos).end()
+                self._lineno += contents.count("\n", pos, self._tok_i)
+                return _Token(_T.BAD, "<unknown token>")
+
+            skip_end = match.end(1)
+            if skip_end != pos:
+                self._lineno += contents.count("\n", pos, skip_end)
+
+            group = match.lastindex
+            tok_id, action, next_state = group_info[group]
+
+            if action == _LEX_MISC:
+                tok = _misc_tokens[match.group(group)]
+                self._tok_i = skip_end
+                self._tok_end_i = match.end()
+                next_state = _value2lexer_state.get(tok.val)
+                if next_state is not None:
+                    self._lexer_state = next_state
+                return tok
+
+            if action == _LEX_TOKEN:
+                tok_val = match.group(group)
+
+            elif action == _LEX_NUM:
+                num_s = match.group(group + 1)
+                tok_val = int(num_s,
+                              16 if num_s.startswith(("0x", "0X")) else
+                              8 if num_s[0] == "0" else
+                              10)
+
+            elif action == _LEX_PROPNODENAME:
+                tok_val = match.group(group + 1)
+
+            elif action == _LEX_BYTE:
+                tok_val = int(match.group(group), 16)
+
+            elif action == _LEX_CHAR_LITERAL:
+                val = self._unescape(match.group(group).encode("utf-8"))
+                if len(val) != 1:
+                    if skip_end != pos:
+                        # Report the column of the last skipped token, like
+                        # _next_token_legacy()
+                        self._tok_i = _last_skip_start(contents, pos, skip_end)
+                    self._parse_error("character literals must be length 1")
+                tok_val = ord(val)
+
+            else:
+                self._tok_i = skip_end
+                self._tok_end_i = match.end()
+                tok_val = match.group(group)
+
+                if action == _LEX_INCLUDE:
+                    # Can have newlines between /include/ and the filename
+                    self._lineno += tok_val.count("\n")
+                    self._enter_file(tok_val[tok_val.find('"') + 1:-1])
+                    continue
+
+                if action == _LEX_LINE:
+                    # #line directive
+                    self._lineno = int(tok_val.split()[0]) - 1
+                    self.filename = tok_val[tok_val.find('"') + 1:-1]
+                    continue
+
+                # _LEX_EOF
+                if self._filestack:
+                    self._leave_file()
+                    continue
+                return _Token(_T.EOF, "<EOF>")
+
+            self._tok_i = skip_end
+            self._tok_end_i = match.end()
+
+            # State handling, see _next_token_legacy(). Strings can have the
+            # values that change the state, too.
+            if next_state is None:
+                next_state = _value2lexer_state.get(tok_val)
+            if next_state is not None:
+                self._lexer_state = next_state
+
+            return _Token(tok_id, tok_val)
+
+    def _next_token_legacy(self):
+        # Original lexer, which tries _token_re and then the regexes for the
+        # current lexer state one at a time, returning whitespace and
+        # comments as separate tokens. Selected with DT(fast_lexer=False).
+
         if self._saved_token:
             tmp = self._saved_token
             self._saved_token = None
@@ -2206,11 +2331,11 @@ _nodename_chars = set(string.ascii_letters + string.digits + ',._+-@')
 
 # Misc. tokens that are tried after a property/node name. This is important, as
 # there's overlap with the allowed characters in names.
-_misc_re = re.compile(
-    "|".join(re.escape(pat) for pat in (
-        "==", "!=", "!", "=", ",", ";", "+", "-", "*", "/", "%", "~", "?", ":",
-        "^", "(", ")", "{", "}", "[", "]", "<<", "<=", "<", ">>", ">=", ">",
-        "||", "|", "&&", "&")))
+_misc_vals = (
+    "==", "!=", "!", "=", ",", ";", "+", "-", "*", "/", "%", "~", "?", ":",
+    "^", "(", ")", "{", "}", "[", "]", "<<", "<=", "<", ">>", ">=", ">",
+    "||", "|", "&&", "&")
+_misc_re = re.compile("|".join(re.escape(pat) for pat in _misc_vals))
 
 _byte_re = re.compile(r"[0-9a-fA-F]{2}")
 
@@ -2218,15 +2343,13 @@ _byte_re = re.compile(r"[0-9a-fA-F]{2}")
 # '\c', where c might be a single character or an octal/hex escape.
 _unescape_re = re.compile(br'\\([0-7]{1,3}|x[0-9A-Fa-f]{1,2}|.)')
 
-def _init_tokens():
-    # Builds a (<token 1>)|(<token 2>)|... regex and returns it. The
-    # way this is constructed makes the token's value as an int appear
-    # in match.lastindex after a match.
+def _token_spec():
+    # Returns a dict that maps token IDs to their regex patterns.
 
     # Each pattern must have exactly one capturing group, which can capture any
     # part of the pattern. This makes match.lastindex match the token type.
     # _Token.val is based on the captured string.
-    token_spec = {
+    return {
         _T.INCLUDE: r'(/include/\s*"(?:[^\\"]|\\.)*")',
         # #line directive or GCC linemarker
         _T.LINE:
@@ -2252,6 +2375,13 @@ def _init_tokens():
         _T.EOF: r"(\Z)",
     }
 
+def _init_tokens():
+    # Builds a (<token 1>)|(<token 2>)|... regex and returns it. The
+    # way this is constructed makes the token's value as an int appear
+    # in match.lastindex after a match.
+
+    token_spec = _token_spec()
+
     # MULTILINE is needed for C++ comments and #line directives
     return re.compile("|".join(token_spec[tok_id] for tok_id in
                                range(1, _T.EOF + 1)),
@@ -2259,6 +2389,121 @@ def _init_tokens():
 
 _token_re = _init_tokens()
 
+# How DT._next_token() handles the tokens matched by the groups of the
+# _lexers regexes
+_LEX_TOKEN = 0           # Token value is the captured string
+_LEX_MISC = 1            # Token from _misc_tokens
+_LEX_NUM = 2
+_LEX_PROPNODENAME = 3
+_LEX_BYTE = 4
+_LEX_CHAR_LITERAL = 5
+_LEX_INCLUDE = 6
+_LEX_LINE = 7
+_LEX_EOF = 8
+
+# Lexer state after a token with one of these values. This also applies to
+# strings.
+_value2lexer_state = {
+    "{": _EXPECT_PROPNODENAME,
+    ";": _EXPECT_PROPNODENAME,
+    "[": _EXPECT_BYTE,
+    "]": _DEFAULT,
+}
+
+def _init_fast_lexer():
+    # Builds the regexes used by DT._next_token(). Returns a list with a
+    # (<regex>, <group info>) tuple per lexer state, where <group info> maps
+    # match.lastindex to a (<token ID>, <_LEX_* action>, <next lexer state>)
+    # tuple. The next lexer state is None if it depends on the token value.
+    #
+    # Each regex is
+    #
+    #   (?=(<skip>*))\1(?:(<token 1>)|...|(<state token>)|(<misc>))
+    #
+    # which gives the same result as trying _token_re, then the regex for
+    # the lexer state and then _misc_re, after skipping whitespace and
+    # comments one token at a time. The tokens before _T.SKIP in _token_re
+    # can't match where a _T.SKIP matches, and _T.SKIP comes before the
+    # other tokens.
+    #
+    # The lookahead makes the skipping atomic. Without it, a failed match
+    # could be retried with a comment ending at a later '*/'.
+
+    token_spec = _token_spec()
+    skip = token_spec.pop(_T.SKIP)[1:-1]
+    tok_ids = [tok_id for tok_id in range(1, _T.EOF + 1)
+               if tok_id in token_spec]
+    patterns = [token_spec[tok_id] for tok_id in tok_ids]
+
+    tok_id2action = {
+        _T.CHAR_LITERAL: _LEX_CHAR_LITERAL,
+        _T.INCLUDE: _LEX_INCLUDE,
+        _T.LINE: _LEX_LINE,
+        _T.EOF: _LEX_EOF,
+    }
+    tok_id2state = {
+        _T.DEL_PROP: _EXPECT_PROPNODENAME,
+        _T.DEL_NODE: _EXPECT_PROPNODENAME,
+        _T.OMIT_IF_NO_REF: _EXPECT_PROPNODENAME,
+        _T.MEMRESERVE: _DEFAULT,
+        _T.BITS: _DEFAULT,
+    }
+    token_info = [None, None]
+    for tok_id in tok_ids:
+        token_info.append((int(tok_id),
+                           tok_id2action.get(tok_id, _LEX_TOKEN),
+                           tok_id2state.get(tok_id)))
+
+    # _T.NUM and _T.PROPNODENAME have a capturing group for the value,
+    # within the group for the token. Only the outer group can be
+    # match.lastindex.
+    state_tokens = {
+        _DEFAULT: (_T.NUM, _LEX_NUM, None, _num_re),
+        _EXPECT_PROPNODENAME: (_T.PROPNODENAME, _LEX_PROPNODENAME, _DEFAULT,
+                               _propnodename_re),
+        _EXPECT_BYTE: (_T.BYTE, _LEX_BYTE, None, _byte_re),
+    }
+
+    lexers = []
+    for state in (_DEFAULT, _EXPECT_PROPNODENAME, _EXPECT_BYTE):
+        tok_id, action, next_state, state_re = state_tokens[state]
+        regex = re.compile(
+            f"(?=((?:{skip})*))\\1(?:" +
+            "|".join(patterns + [f"({state_re.pattern})",
+                                 f"({_misc_re.pattern})"]) + ")",
+            re.MULTILINE | re.ASCII)
+
+        group_info = token_info + [(tok_id, action, next_state)]
+        group_info += [None] * state_re.groups
+        group_info.append((_T.MISC, _LEX_MISC, None))
+        assert len(group_info) == regex.groups + 1
+
+        lexers.append((regex, tuple(group_info)))
+
+    return lexers
+
+_lexers = _init_fast_lexer()
+
+# The _T.MISC tokens, which are immutable and shared
+_misc_tokens = {val: _Token(_T.MISC, val) for val in _misc_vals}
+
+# Matches a whitespace or comment token, like _T.SKIP in _token_re
+_skip_token_re = re.compile(_token_spec()[_T.SKIP], re.MULTILINE | re.ASCII)
+
+# Matches the whitespace and comments before a bad token
+_skip_re = re.compile(f"(?:{_skip_token_re.pattern})*",
+                      re.MULTILINE | re.ASCII)
+
+def _last_skip_start(contents: str, start: int, end: int) -> int:
+    # Returns the start of the last whitespace or comment token between
+    # 'start' and 'end' in 'contents'. Only needed for error messages.
+
+    last = start
+    while start < end:
+        last = start
+        start = _skip_token_re.match(contents, start).end()  # type: ignore
+    return last
+
 _TYPE_TO_N_BYTES = {
     _MarkerType.UINT8: 1,
     _MarkerType.UINT16: 2,
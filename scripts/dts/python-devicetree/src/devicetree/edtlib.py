@@ -71,6 +71,7 @@ import base64
 import hashlib
 import logging
 import os
+import pickle
 import re
 from collections import defaultdict
 from collections.abc import Callable, Iterable
@@ -1999,7 +2000,8 @@ class EDT:
                  support_fixed_partitions_on_any_bus: bool = True,
                  infer_binding_for_paths: Optional[Iterable[str]] = None,
                  vendor_prefixes: Optional[dict[str, str]] = None,
-                 werror: bool = False):
+                 werror: bool = False,
+                 binding_index: Optional[str] = None):
         """EDT constructor.
 
         dts:
@@ -2043,6 +2045,13 @@ class EDT:
           If True, some edtlib specific warnings become errors. This currently
           errors out if 'dts' has any deprecated properties set, or an unknown
           vendor prefix is used.
+
+        binding_index (default: None):
+          Path to a BindingIndex file. If given, the compatibles, include
+          chains and merged contents of the bindings are taken from the index
+          where it is still up to date, and the index is updated with what had
+          to be read from the binding files. The file is created if it does
+          not exist.
         """
         # All instance attributes should be initialized here.
         # This makes it easy to keep track of them, which makes
@@ -2069,6 +2078,7 @@ class EDT:
         self._infer_binding_for_paths: set[str] = set(infer_binding_for_paths or [])
         self._vendor_prefixes: dict[str, str] = vendor_prefixes or {}
         self._werror: bool = bool(werror)
+        self._binding_index: Optional[str] = binding_index
 
         # Other internal state
         self._compat2binding: dict[tuple[str, Optional[str]], Binding] = {}
@@ -2144,6 +2154,17 @@ class EDT:
         return (f"<EDT for '{self.dts_path}', binding directories "
                 f"'{self.bindings_dirs}'>")
 
+    def __getstate__(self) -> dict[str, Any]:
+        # The set of paths is pickled as a sorted list, so that pickled EDTs
+        # don't depend on the string hash seed
+        state = self.__dict__.copy()
+        state['_infer_binding_for_paths'] = sorted(self._infer_binding_for_paths)
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._infer_binding_for_paths = set(self._infer_binding_for_paths)
+
     def __deepcopy__(self, memo) -> 'EDT':
         """
         Implements support for the standard library copy.deepcopy()
@@ -2158,7 +2179,8 @@ class EDT:
             support_fixed_partitions_on_any_bus=self._fixed_partitions_no_bus,
             infer_binding_for_paths=set(self._infer_binding_for_paths),
             vendor_prefixes=dict(self._vendor_prefixes),
-            werror=self._werror
+            werror=self._werror,
+            binding_index=self._binding_index
         )
         ret.dts_path = self.dts_path
         ret._dt = deepcopy(self._dt, memo)
@@ -2265,38 +2287,75 @@ class EDT:
             "|".join(re.escape(compat) for compat in dt_compats)
         ).search
 
+        index = None
+        if self._binding_index is not None:
+            index = BindingIndex(self._binding_index)
+            index.load()
+
         for binding_path in self._binding_paths:
-            with open(binding_path, encoding="utf-8") as f:
-                contents = f.read()
+            if index is not None:
+                candidate, info = index._info(binding_path, dt_compats,
+                                              dt_compats_search)
+                if not candidate:
+                    # Doesn't contain any of the .dts 'compatible' strings,
+                    # as checked by _binding_from_file()
+                    continue
+                if info is not None:
+                    # The index knows the 'compatible:' of this file
+                    if info[0] not in dt_compats:
+                        continue
+                    binding = index._binding(binding_path,
+                                             self._binding_fname2path)
+                    self._register_bindings(binding)
+                    continue
 
-            # As an optimization, skip parsing files that don't contain any of
-            # the .dts 'compatible' strings, which should be reasonably safe
-            if not dt_compats_search(contents):
-                continue
+            self._register_bindings(
+                self._binding_from_file(binding_path, dt_compats,
+                                        dt_compats_search))
 
-            # Load the binding and check that it actually matches one of the
-            # compatibles. Might get false positives above due to comments and
-            # stuff.
+        if index is not None:
+            index.save()
 
-            try:
-                # Parsed PyYAML output (Python lists/dictionaries/strings/etc.,
-                # representing the file)
-                raw = yaml.load(contents, Loader=_BindingLoader)
-            except yaml.YAMLError as e:
-                _err(
-                        f"'{binding_path}' appears in binding directories "
-                        f"but isn't valid YAML: {e}")
+    def _binding_from_file(self,
+                           binding_path: str,
+                           dt_compats: set[str],
+                           dt_compats_search: Callable) -> Optional[Binding]:
+        # _init_compat2binding() helper. Reads the binding in 'binding_path'
+        # and returns it, or None if it isn't a binding for a compatible
+        # in dt_compats.
+
+        with open(binding_path, encoding="utf-8") as f:
+            contents = f.read()
+
+        # As an optimization, skip parsing files that don't contain any of
+        # the .dts 'compatible' strings, which should be reasonably safe
+        if not dt_compats_search(contents):
+            return None
 
-            # Convert the raw data to a Binding object, erroring out
-            # if necessary.
-            binding = self._binding(raw, binding_path, dt_compats)
+        # Load the binding and check that it actually matches one of the
+        # compatibles. Might get false positives above due to comments and
+        # stuff.
 
-            # Register the binding in self._compat2binding, along with
-            # any child bindings that have their own compatibles.
-            while binding is not None:
-                if binding.compatible:
-                    self._register_binding(binding)
-                binding = binding.child_binding
+        try:
+            # Parsed PyYAML output (Python lists/dictionaries/strings/etc.,
+            # representing the file)
+            raw = yaml.load(contents, Loader=_BindingLoader)
+        except yaml.YAMLError as e:
+            _err(
+                    f"'{binding_path}' appears in binding directories "
+                    f"but isn't valid YAML: {e}")
+
+        # Convert the raw data to a Binding object, erroring out
+        # if necessary.
+        return self._binding(raw, binding_path, dt_compats)
+
+    def _register_bindings(self, binding: Optional[Binding]) -> None:
+        # Register the binding in self._compat2binding, along with
+        # any child bindings that have their own compatibles.
+        while binding is not None:
+            if binding.compatible:
+                self._register_binding(binding)
+            binding = binding.child_binding
 
     def _binding(self,
                  raw: Optional[dict],
@@ -2469,6 +2528,241 @@ class EDT:
                 assert isinstance(compat, str)
 
 
+class BindingIndex:
+    """
+    On-disk index of binding files, which speeds up EDT construction.
+
+    Without an index, every EDT reads all the files in its binding
+    directories to find the bindings for the compatibles of the devicetree,
+    and merges the 'include:' files of each of those bindings again. The
+    index records the 'compatible:' and the included file names of every
+    binding file, and the contents of every binding used so far with all
+    its includes merged and checked.
+
+    A file whose modification time and size are unchanged is not read
+    again. Otherwise its contents are hashed, so touched but unmodified
+    files are still found in the index. Like without an index, files that
+    don't contain any of the 'compatible' strings of the devicetree are not
+    parsed, so that building the index costs about as much as not using
+    one. The index records the 'compatible' strings such a file doesn't
+    contain, and parses it once an EDT needs it. A merged binding is reused only
+    when the binding and every file of its include chain still have the
+    recorded contents and paths. The whole index is dropped when edtlib
+    changes.
+
+    The index is usually given to EDT by path, see its 'binding_index'
+    argument. Several processes may share an index file: it is replaced
+    atomically, and the last writer wins.
+
+    These attributes are available on BindingIndex objects:
+
+    path:
+      The absolute path of the index file
+
+    hits:
+      The number of binding files and merged bindings found in the index
+
+    misses:
+      The number of binding files read and bindings merged
+    """
+
+    _VERSION = 1
+
+    def __init__(self, path: str):
+        """
+        BindingIndex constructor. This does not read the index, see load().
+
+        path:
+          Path to the index file. It does not have to exist.
+        """
+        self.path: str = os.path.abspath(path)
+        self.hits: int = 0
+        self.misses: int = 0
+
+        # Binding file path -> ((mtime_ns, size), contents digest, info),
+        # where info is a ('compatible:' value, included file names) tuple,
+        # None for files that can't be indexed, or, for files that weren't
+        # parsed yet, a frozenset of 'compatible' strings they don't contain
+        self._files: dict[str, tuple] = {}
+        # Binding file path -> (((path, digest), ...), pickled merged raw
+        # binding). The first dependency is the binding file itself,
+        # followed by all the files of its include chain.
+        self._merged: dict[str, tuple] = {}
+        self._key: str = self._compute_key()
+        self._dirty: bool = False
+        # The frozensets of the unparsed files, so that files checked
+        # against the same 'compatible' strings share them in the index file
+        self._compat_sets: dict[frozenset, frozenset] = {}
+
+    def __repr__(self) -> str:
+        return (f"<BindingIndex {self.path}, {len(self._files)} files, "
+                f"{len(self._merged)} merged bindings>")
+
+    def load(self) -> None:
+        """
+        Reads the index file. A missing, unreadable or outdated index file
+        leaves the index empty.
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                data = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError,
+                ValueError) as e:
+            _LOG.warning(f"ignoring unreadable binding index {self.path}: {e}")
+            self._dirty = True
+            return
+
+        if not isinstance(data, dict) or data.get('key') != self._key:
+            self._dirty = True
+            return
+
+        self._files = data['files']
+        self._merged = data['merged']
+        for _, _, info in self._files.values():
+            if isinstance(info, frozenset):
+                self._compat_sets.setdefault(info, info)
+
+    def save(self) -> None:
+        """
+        Writes the index file, if anything changed since load().
+        """
+        if not self._dirty:
+            return
+
+        data = {'key': self._key, 'files': self._files,
+                'merged': self._merged}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    @classmethod
+    def _compute_key(cls) -> str:
+        # The merged bindings depend on the edtlib implementation
+        hasher = hashlib.sha256(f"{cls._VERSION}".encode())
+        with open(__file__, 'rb') as f:
+            hasher.update(f.read())
+        return hasher.hexdigest()
+
+    def _entry(self, path: str,
+               compats: Optional[set[str]] = None,
+               search: Optional[Callable] = None) -> tuple:
+        # Returns the up to date index entry of the binding file 'path',
+        # reading it if needed.
+        #
+        # If 'compats' is given, a file that wasn't parsed yet is only parsed
+        # if 'search' finds one of these 'compatible' strings in it.
+        # Otherwise, its info is the frozenset of 'compatible' strings it
+        # doesn't contain.
+
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        entry = self._files.get(path)
+        if entry is not None and entry[0] == stamp:
+            if not isinstance(entry[2], frozenset):
+                self.hits += 1
+                return entry
+            if compats is not None and compats <= entry[2]:
+                return entry
+
+        with open(path, 'rb') as f:
+            contents = f.read()
+        digest = hashlib.sha256(contents).hexdigest()
+
+        if entry is not None and entry[1] == digest and \
+           not isinstance(entry[2], frozenset):
+            self.hits += 1
+            info = entry[2]
+        elif compats is not None and search is not None and \
+             not search(contents.decode('utf-8')):
+            missing = frozenset(compats)
+            if entry is not None and entry[1] == digest:
+                # The unchanged file is still known to miss those too
+                missing |= entry[2]
+            info = self._compat_sets.setdefault(missing, missing)
+        else:
+            self.misses += 1
+            try:
+                raw = yaml.load(contents.decode('utf-8'),
+                                Loader=_BindingLoader)
+            except yaml.YAMLError:
+                # Reported by EDT when the file is actually needed
+                info = None
+            else:
+                info = _binding_index_info(raw)
+
+        if entry == (stamp, digest, info):
+            return entry
+
+        entry = (stamp, digest, info)
+        self._files[path] = entry
+        self._dirty = True
+        return entry
+
+    def _info(self, path: str,
+              compats: Optional[set[str]] = None,
+              search: Optional[Callable] = None) -> tuple[bool, Optional[tuple]]:
+        # Returns a (<candidate>, <info>) tuple for the binding file 'path'.
+        # <candidate> is False if the file contains none of 'compats', see
+        # _entry(). Otherwise, <info> is the ('compatible:' value, included
+        # file names) tuple of the file, or None if it can't be indexed.
+
+        info = self._entry(path, compats, search)[2]
+        if isinstance(info, frozenset):
+            return False, None
+        return True, info
+
+    def _dependencies(self, path: str,
+                      fname2path: dict[str, str]) -> Optional[tuple]:
+        # Returns the ((path, digest), ...) tuple of the binding file 'path'
+        # and all the files of its include chain, or None if some of them
+        # can't be indexed or found.
+
+        deps = []
+        seen = {path}
+        todo = [path]
+        while todo:
+            dep_path = todo.pop(0)
+            _, digest, info = self._entry(dep_path)
+            if info is None:
+                return None
+            deps.append((dep_path, digest))
+            for fname in info[1]:
+                inc_path = fname2path.get(fname)
+                if not inc_path:
+                    return None
+                if inc_path not in seen:
+                    seen.add(inc_path)
+                    todo.append(inc_path)
+
+        return tuple(deps)
+
+    def _binding(self, path: str, fname2path: dict[str, str]) -> Binding:
+        # Returns the Binding for the binding file 'path', from its merged
+        # contents if they are still up to date.
+
+        deps = self._dependencies(path, fname2path)
+        merged = self._merged.get(path)
+        if deps is not None and merged is not None and merged[0] == deps:
+            self.hits += 1
+            return Binding(path, fname2path, raw=pickle.loads(merged[1]))
+
+        self.misses += 1
+        binding = Binding(path, fname2path)
+        if deps is not None:
+            # Binding() merges the includes into the raw contents, including
+            # those of child bindings, so 'raw' doesn't need them any more.
+            self._merged[path] = (
+                deps,
+                pickle.dumps(binding.raw, protocol=pickle.HIGHEST_PROTOCOL))
+            self._dirty = True
+        return binding
+
+
 def bindings_from_paths(yaml_paths: list[str],
                         ignore_errors: bool = False) -> list[Binding]:
     """
@@ -2546,6 +2840,43 @@ def _binding_paths(bindings_dirs: list[str]) -> list[str]:
             if filename.endswith((".yaml", ".yml"))]
 
 
+def _binding_index_info(raw: Any) -> Optional[tuple]:
+    # BindingIndex helper. Returns the ('compatible:' value, included file
+    # names) tuple of the parsed binding file 'raw', or None if the file
+    # doesn't look like a binding or binding fragment, and needs to be
+    # handled as if there was no index.
+
+    if raw is None:
+        return (None, ())
+
+    if not isinstance(raw, dict):
+        return None
+
+    compatible = raw.get("compatible")
+    if compatible is not None and not isinstance(compatible, str):
+        return None
+
+    # The 'include:' of the binding and of its nested child bindings
+    fnames: list[str] = []
+    node: Any = raw
+    while isinstance(node, dict):
+        include = node.get("include")
+        if isinstance(include, str):
+            fnames.append(include)
+        elif isinstance(include, list):
+            for elem in include:
+                if isinstance(elem, dict):
+                    elem = elem.get("name")
+                if not isinstance(elem, str):
+                    return None
+                fnames.append(elem)
+        elif include is not None:
+            return None
+        node = node.get("child-binding")
+
+    return (compatible, tuple(fnames))
+
+
 def _binding_inc_error(msg):
     # Helper for reporting errors in the !include implementation
 
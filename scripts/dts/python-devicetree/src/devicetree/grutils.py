@@ -26,6 +26,33 @@ class Graph:
         self.__reverse_map = collections.defaultdict(set)
         self.__nodes = set()
 
+    def __getstate__(self):
+        # Sets of nodes are pickled as lists sorted with node_key(), so that
+        # pickled graphs do not depend on the memory addresses of the nodes.
+        # The state of Tarjan's algorithm is only used while it runs.
+        state = self.__dict__.copy()
+        for name in ('_Graph__stack', '_Graph__index',
+                     '_Graph__tarjan_index', '_Graph__tarjan_low_link'):
+            state.pop(name, None)
+        state['_Graph__nodes'] = sorted(self.__nodes, key=node_key)
+        if self.__roots is not None:
+            state['_Graph__roots'] = sorted(self.__roots, key=node_key)
+        for name in ('_Graph__edge_map', '_Graph__reverse_map'):
+            state[name] = {node: sorted(nodes, key=node_key)
+                           for node, nodes in state[name].items()}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__nodes = set(self.__nodes)
+        if self.__roots is not None:
+            self.__roots = set(self.__roots)
+        for name in ('_Graph__edge_map', '_Graph__reverse_map'):
+            nodes_map = collections.defaultdict(set)
+            nodes_map.update((node, set(nodes))
+                             for node, nodes in state[name].items())
+            setattr(self, name, nodes_map)
+
     def add_node(self, node):
         """
         Add a node without any target to the graph.
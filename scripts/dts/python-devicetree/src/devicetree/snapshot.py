@@ -0,0 +1,709 @@
+# Copyright The Zephyr Project Contributors
+# SPDX-License-Identifier: BSD-3-Clause
+
+# Tip: You can view just the documentation with 'pydoc3 devicetree.snapshot'
+
+"""
+Compact, read-only snapshots of edtlib.EDT objects.
+
+Loading a pickled EDT rebuilds the whole object graph: the dtlib tree, the
+bindings and the dependency graph. Tools that only ask a few questions about
+the devicetree (Kconfig preprocessor functions, twister filters) pay for all
+of it. A snapshot holds the same information as plain data, one record per
+node, and loads a node only when it is used.
+
+write_snapshot() writes a snapshot of an EDT, and Snapshot reads one. The
+Snapshot API is a read-only subset of the EDT API. See the Snapshot and
+SnapshotNode docstrings for what is available.
+
+Reading a snapshot doesn't import edtlib, whose import takes longer than
+loading a snapshot. Errors are still reported with edtlib.EDTError, which is
+imported when first needed. It is also available as snapshot.EDTError.
+"""
+
+# NOTE: tests/test_snapshot.py is the test suite for this module.
+
+# File format
+# -----------
+#
+# All integers are little-endian.
+#
+#   header:  magic, version, node count, offset table offset, index offset
+#            (struct _HEADER)
+#   records: one pickled tuple per node, in EDT.nodes order (see _record())
+#   offsets: node count + 1 uint64 offsets of the records. Record i spans
+#            offsets[i]..offsets[i + 1].
+#   index:   pickled dict with the node paths and the lookup tables, which
+#            map to node indices (see _index())
+#
+# Only the header and the index are read when a snapshot is opened. The file
+# is mapped in memory, and node records are unpickled on first use.
+
+import mmap
+import os
+import pickle
+import struct
+from collections.abc import Iterator, Mapping, Sequence
+from typing import TYPE_CHECKING, Any, NamedTuple, NoReturn, Optional
+
+if TYPE_CHECKING:
+    from devicetree.edtlib import EDT, Node
+
+SNAPSHOT_VERSION = 1
+
+_MAGIC = b"EDTSNAP\0"
+_HEADER = struct.Struct("<8sIIQQ")
+_OFFSETS = struct.Struct("<2Q")
+
+# Property types whose values refer to nodes
+_NODE_TYPES = ("phandle", "path")
+
+
+def write_snapshot(edt: "EDT", out_file: str) -> None:
+    """
+    Writes a snapshot of 'edt' to the file 'out_file'. The file is replaced
+    atomically.
+    """
+    node2i = {node: i for i, node in enumerate(edt.nodes)}
+
+    records = [pickle.dumps(_record(node, node2i), protocol=4) for node in edt.nodes]
+
+    offsets = []
+    offset = _HEADER.size
+    for record in records:
+        offsets.append(offset)
+        offset += len(record)
+    offsets.append(offset)
+    table = struct.pack(f"<{len(offsets)}Q", *offsets)
+
+    tmp_file = f"{out_file}.{os.getpid()}.tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, SNAPSHOT_VERSION, len(records), offset, offset + len(table)))
+        f.writelines(records)
+        f.write(table)
+        pickle.dump(_index(edt, node2i), f, protocol=4)
+    os.replace(tmp_file, out_file)
+
+
+class Snapshot:
+    """
+    Read-only view of an EDT written by write_snapshot(). Nodes are
+    SnapshotNode instances, created and loaded from the snapshot when first
+    accessed.
+
+    These attributes are available on Snapshot objects, with the same meaning
+    as on EDT objects:
+
+    nodes:
+      A sequence of the SnapshotNodes, in the same order as EDT.nodes
+
+    compat2nodes, compat2okay, compat2notokay:
+      Read-only mappings from 'compatible' strings to lists of SnapshotNodes
+
+    compat2vendor, compat2model:
+      Dicts from 'compatible' strings to vendor and model names
+
+    label2node:
+      A read-only mapping from node labels to SnapshotNodes
+
+    chosen_nodes:
+      A dict that maps the properties of the /chosen node to SnapshotNodes
+
+    dts_path:
+      The .dts path the EDT was created from
+
+    bindings_dirs:
+      The bindings directories the EDT was created with
+
+    A Snapshot keeps its file mapped in memory until close() is called. It
+    can be used as a context manager.
+    """
+
+    def __init__(self, path: str):
+        """
+        Snapshot constructor. Raises EDTError if 'path' is not a snapshot
+        file of a supported version.
+
+        path:
+          Path to a file written by write_snapshot()
+        """
+        with open(path, "rb") as f:
+            try:
+                buf: bytes | mmap.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty file, which can't be mapped
+                buf = b""
+        self._init(buf, path)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Snapshot":
+        """
+        Returns a Snapshot for the contents of a snapshot file, e.g. as kept
+        in a cache. Raises EDTError like the constructor.
+        """
+        ret = cls.__new__(cls)
+        ret._init(data, "<bytes>")
+        return ret
+
+    def _init(self, buf: bytes | mmap.mmap, name: str) -> None:
+        self._buf = buf
+
+        try:
+            magic, version, count, table_offset, index_offset = _HEADER.unpack_from(buf)
+        except struct.error:
+            magic = version = None
+        if magic != _MAGIC:
+            self.close()
+            _err(f"{name} is not an EDT snapshot")
+        if version != SNAPSHOT_VERSION:
+            self.close()
+            _err(
+                f"{name} is an EDT snapshot of version {version}, "
+                f"expected version {SNAPSHOT_VERSION}"
+            )
+
+        index = pickle.loads(buf[index_offset:])
+
+        self._count: int = count
+        self._table_offset: int = table_offset
+        self._paths: list[str] = index["paths"]
+        self._path2i: dict[str, int] = {path: i for i, path in enumerate(self._paths)}
+        self._alias2i: dict[str, int] = index["aliases"]
+        self._chosen2i: dict[str, int] = index["chosen"]
+        self._cache: dict[int, SnapshotNode] = {}
+
+        self.dts_path: str = index["dts_path"]
+        self.bindings_dirs: list[str] = index["bindings_dirs"]
+        self.compat2vendor: dict[str, str] = index["compat2vendor"]
+        self.compat2model: dict[str, str] = index["compat2model"]
+        self.nodes: Sequence[SnapshotNode] = _NodeList(self)
+        self.compat2nodes: Mapping[str, list[SnapshotNode]] = _NodeMap(self, index["compat2nodes"])
+        self.compat2okay: Mapping[str, list[SnapshotNode]] = _NodeMap(self, index["compat2okay"])
+        self.compat2notokay: Mapping[str, list[SnapshotNode]] = _NodeMap(
+            self, index["compat2notokay"]
+        )
+        self.label2node: Mapping[str, SnapshotNode] = _NodeMap(self, index["labels"])
+
+    def close(self) -> None:
+        """
+        Unmaps the snapshot file. Nodes that were not loaded yet can't be
+        used afterwards.
+        """
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def get_node(self, path: str) -> "SnapshotNode":
+        """
+        Returns the SnapshotNode at the DT path or alias 'path'. Raises
+        EDTError if the path or alias doesn't exist.
+        """
+        fullpath = path
+        if path.startswith("/"):
+            cur = "/"
+        else:
+            # First component must be an alias
+            alias, _, path = path.partition("/")
+            if alias not in self._alias2i:
+                _err(
+                    f"no alias '{alias}' found -- did you forget the leading '/' in the node path?"
+                )
+            cur = self._paths[self._alias2i[alias]]
+
+        # Same lookup as dtlib, which collapses multiple / and allows a / at
+        # the end
+        for component in path.split("/"):
+            if not component:
+                continue
+            cur = f"{cur.rstrip('/')}/{component}"
+            if cur not in self._path2i:
+                _err(f"component '{component}' in path '{fullpath}' does not exist")
+
+        return self._node(self._path2i[cur])
+
+    @property
+    def chosen_nodes(self) -> dict[str, "SnapshotNode"]:
+        "See the class docstring"
+        return {name: self._node(i) for name, i in self._chosen2i.items()}
+
+    def chosen_node(self, name: str) -> Optional["SnapshotNode"]:
+        """
+        Returns the SnapshotNode pointed at by the property named 'name' in
+        /chosen, or None if the property is missing
+        """
+        i = self._chosen2i.get(name)
+        return self._node(i) if i is not None else None
+
+    def __repr__(self) -> str:
+        return f"<Snapshot of EDT for '{self.dts_path}', {self._count} nodes>"
+
+    def _node(self, i: int) -> "SnapshotNode":
+        # Returns the SnapshotNode with index 'i', without loading its record
+
+        node = self._cache.get(i)
+        if node is None:
+            node = self._cache[i] = SnapshotNode(self, i, self._paths[i])
+        return node
+
+    def _nodes(self, indices: list[int]) -> list["SnapshotNode"]:
+        return [self._node(i) for i in indices]
+
+    def _record(self, i: int) -> tuple:
+        # Unpickles the record of the node with index 'i'
+
+        start, end = _OFFSETS.unpack_from(self._buf, self._table_offset + 8 * i)
+        return pickle.loads(self._buf[start:end])
+
+
+class SnapshotNode:
+    """
+    Represents a node of a Snapshot. The node's record is loaded from the
+    snapshot when an attribute other than 'path' or 'name' is first accessed.
+
+    These attributes are available on SnapshotNode objects, with the same
+    meaning as on edtlib.Node objects:
+
+    snapshot:
+      The Snapshot instance this node is from
+
+    name, path, unit_addr, label, labels, status, read_only, compats,
+    matching_compat, binding_path, aliases, buses, on_buses, dep_ordinal,
+    filename, lineno:
+      As for edtlib.Node
+
+    parent, bus_node:
+      The SnapshotNode for the parent and for the bus controller, or None
+
+    children:
+      A dict with the SnapshotNodes for the children of the node, indexed by
+      name
+
+    depends_on, required_by:
+      Lists of SnapshotNodes, as for edtlib.Node
+
+    regs:
+      A list of SnapshotRegister objects
+
+    props:
+      A dict that maps property names to SnapshotProperty objects
+
+    interrupts, gpio_hogs:
+      Lists of SnapshotControllerAndData objects
+    """
+
+    def __init__(self, snapshot: Snapshot, i: int, path: str):
+        '''
+        For internal use only; not meant to be used outside this module.
+        '''
+        self.snapshot: Snapshot = snapshot
+        self.path: str = path
+        self._i: int = i
+        self._rec: dict[str, Any] | None = None
+        self._props: dict[str, SnapshotProperty] | None = None
+
+    @property
+    def name(self) -> str:
+        "See the class docstring"
+        return "/" if self.path == "/" else self.path.rsplit("/", 1)[1]
+
+    @property
+    def unit_addr(self) -> int | None:
+        "See the class docstring"
+        return self._get("unit_addr")
+
+    @property
+    def label(self) -> str | None:
+        "See the class docstring"
+        return self._get("label")
+
+    @property
+    def labels(self) -> list[str]:
+        "See the class docstring"
+        return self._get("labels")
+
+    @property
+    def status(self) -> str:
+        "See the class docstring"
+        return self._get("status")
+
+    @property
+    def read_only(self) -> bool:
+        "See the class docstring"
+        return self._get("read_only")
+
+    @property
+    def compats(self) -> list[str]:
+        "See the class docstring"
+        return self._get("compats")
+
+    @property
+    def matching_compat(self) -> str | None:
+        "See the class docstring"
+        return self._get("matching_compat")
+
+    @property
+    def binding_path(self) -> str | None:
+        "See the class docstring"
+        return self._get("binding_path")
+
+    @property
+    def aliases(self) -> list[str]:
+        "See the class docstring"
+        return self._get("aliases")
+
+    @property
+    def buses(self) -> list[str]:
+        "See the class docstring"
+        return self._get("buses")
+
+    @property
+    def on_buses(self) -> list[str]:
+        "See the class docstring"
+        return self._get("on_buses")
+
+    @property
+    def dep_ordinal(self) -> int:
+        "See the class docstring"
+        return self._get("dep_ordinal")
+
+    @property
+    def filename(self) -> str:
+        "See the class docstring"
+        return self._get("filename")
+
+    @property
+    def lineno(self) -> int:
+        "See the class docstring"
+        return self._get("lineno")
+
+    @property
+    def parent(self) -> Optional["SnapshotNode"]:
+        "See the class docstring"
+        i = self._get("parent")
+        return self.snapshot._node(i) if i is not None else None
+
+    @property
+    def bus_node(self) -> Optional["SnapshotNode"]:
+        "See the class docstring"
+        i = self._get("bus_node")
+        return self.snapshot._node(i) if i is not None else None
+
+    @property
+    def children(self) -> dict[str, "SnapshotNode"]:
+        "See the class docstring"
+        return {name: self.snapshot._node(i) for name, i in self._get("children").items()}
+
+    @property
+    def depends_on(self) -> list["SnapshotNode"]:
+        "See the class docstring"
+        return self.snapshot._nodes(self._get("depends_on"))
+
+    @property
+    def required_by(self) -> list["SnapshotNode"]:
+        "See the class docstring"
+        return self.snapshot._nodes(self._get("required_by"))
+
+    @property
+    def regs(self) -> list["SnapshotRegister"]:
+        "See the class docstring"
+        return [SnapshotRegister(self, name, addr, size) for name, addr, size in self._get("regs")]
+
+    @property
+    def props(self) -> dict[str, "SnapshotProperty"]:
+        "See the class docstring"
+        if self._props is None:
+            self._props = {
+                name: SnapshotProperty(name, type, self._val(type, val), self)
+                for name, (type, val) in self._get("props").items()
+            }
+        return self._props
+
+    @property
+    def interrupts(self) -> list["SnapshotControllerAndData"]:
+        "See the class docstring"
+        return self._val("phandle-array", self._get("interrupts"))
+
+    @property
+    def gpio_hogs(self) -> list["SnapshotControllerAndData"]:
+        "See the class docstring"
+        return self._val("phandle-array", self._get("gpio_hogs"))
+
+    def __repr__(self) -> str:
+        return f"<SnapshotNode {self.path}>"
+
+    def _get(self, key: str) -> Any:
+        # Returns the value of 'key' in the node's record, loading it if
+        # needed. Errors raised by edtlib when the snapshot was written are
+        # raised again here.
+
+        if self._rec is None:
+            self._rec = dict(zip(_FIELDS, self.snapshot._record(self._i), strict=True))
+        val = self._rec[key]
+        if isinstance(val, _Error):
+            _err(val)
+        return val
+
+    def _val(self, type: str, val: Any) -> Any:
+        # Decodes a property value encoded by _encode_val()
+
+        node = self.snapshot._node
+        if type in _NODE_TYPES:
+            return node(val)
+        if type == "phandles":
+            return [node(i) for i in val]
+        if type == "phandle-array":
+            return [
+                SnapshotControllerAndData(self, node(entry[0]), *entry[1:])
+                if entry is not None
+                else None
+                for entry in val
+            ]
+        return val
+
+
+class SnapshotProperty:
+    """
+    Represents a property of a SnapshotNode.
+
+    These attributes are available on SnapshotProperty objects, with the same
+    meaning as on edtlib.Property objects:
+
+    name:
+      The name of the property
+
+    type:
+      The 'type:' of the property in the binding
+
+    val:
+      The value of the property. Nodes are SnapshotNodes.
+
+    node:
+      The SnapshotNode the property is on
+    """
+
+    __slots__ = ("name", "type", "val", "node")
+
+    def __init__(self, name: str, type: str, val: Any, node: SnapshotNode):
+        self.name = name
+        self.type = type
+        self.val = val
+        self.node = node
+
+    def __repr__(self) -> str:
+        return f"<SnapshotProperty {self.name}={self.val!r} on {self.node.path}>"
+
+
+class SnapshotRegister(NamedTuple):
+    """
+    Represents a register of a SnapshotNode, with the same attributes as
+    edtlib.Register.
+    """
+
+    node: SnapshotNode
+    name: str | None
+    addr: int | None
+    size: int | None
+
+
+class SnapshotControllerAndData(NamedTuple):
+    """
+    Represents an entry of a 'type: phandle-array' property value or of the
+    interrupts of a SnapshotNode, with the same attributes as
+    edtlib.ControllerAndData. 'node' and 'controller' are SnapshotNodes.
+    """
+
+    node: SnapshotNode
+    controller: SnapshotNode
+    data: dict
+    name: str | None
+    basename: str | None
+
+
+def __getattr__(name: str) -> Any:
+    # Makes edtlib.EDTError available as EDTError, without importing edtlib
+    # along with this module
+
+    if name == "EDTError":
+        from devicetree.edtlib import EDTError
+
+        return EDTError
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+#
+# Private global functions and classes
+#
+
+
+class _Error(str):
+    # Message of an error raised by edtlib for a node attribute when the
+    # snapshot was written, stored as the attribute value
+    pass
+
+
+def _err(msg: str) -> NoReturn:
+    from devicetree.edtlib import EDTError
+
+    raise EDTError(msg)
+
+
+class _NodeList(Sequence):
+    # The Snapshot.nodes sequence, which creates SnapshotNodes on access
+
+    def __init__(self, snapshot: Snapshot):
+        self._snapshot = snapshot
+
+    def __len__(self) -> int:
+        return self._snapshot._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._snapshot._node(j) for j in range(len(self))[i]]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("node index out of range")
+        return self._snapshot._node(i)
+
+    def __iter__(self) -> Iterator[SnapshotNode]:
+        return map(self._snapshot._node, range(len(self)))
+
+
+class _NodeMap(Mapping):
+    # Read-only mapping to SnapshotNodes (for int values) or lists of
+    # SnapshotNodes (for list values), given as node indices
+
+    def __init__(self, snapshot: Snapshot, key2i: dict):
+        self._snapshot = snapshot
+        self._key2i = key2i
+
+    def __getitem__(self, key):
+        i = self._key2i[key]
+        if isinstance(i, list):
+            return self._snapshot._nodes(i)
+        return self._snapshot._node(i)
+
+    def __contains__(self, key) -> bool:
+        return key in self._key2i
+
+    def __iter__(self) -> Iterator:
+        return iter(self._key2i)
+
+    def __len__(self) -> int:
+        return len(self._key2i)
+
+
+# Node record fields, in record order
+_FIELDS = (
+    "unit_addr",
+    "label",
+    "labels",
+    "status",
+    "read_only",
+    "compats",
+    "matching_compat",
+    "binding_path",
+    "aliases",
+    "buses",
+    "on_buses",
+    "dep_ordinal",
+    "filename",
+    "lineno",
+    "parent",
+    "bus_node",
+    "children",
+    "depends_on",
+    "required_by",
+    "regs",
+    "props",
+    "interrupts",
+    "gpio_hogs",
+)
+
+# The first fields of records are plain edtlib.Node attribute values
+_N_PLAIN_FIELDS = _FIELDS.index("parent")
+
+
+def _record(node: "Node", node2i: dict["Node", int]) -> tuple:
+    # Returns the record of 'node' for the snapshot, as a tuple of plain
+    # data with the fields in _FIELDS. Nodes are replaced by their index in
+    # EDT.nodes.
+
+    from devicetree.dtlib import DTError
+    from devicetree.edtlib import EDTError
+
+    def index(node: Optional["Node"]) -> int | None:
+        return node2i[node] if node is not None else None
+
+    def get(field: str) -> Any:
+        # Returns the value of a Node attribute, or the error it raised,
+        # which is then raised again when the attribute is read from the
+        # snapshot
+        try:
+            return getattr(node, field)
+        except (EDTError, DTError) as e:
+            return _Error(e)
+
+    gpio_hogs = get("gpio_hogs")
+    if not isinstance(gpio_hogs, _Error):
+        gpio_hogs = _encode_val("phandle-array", gpio_hogs, node2i)
+
+    return (
+        *[get(field) for field in _FIELDS[:_N_PLAIN_FIELDS]],
+        index(node.parent),
+        index(node.bus_node),
+        {name: node2i[child] for name, child in node.children.items()},
+        [node2i[dep] for dep in node.depends_on],
+        [node2i[dep] for dep in node.required_by],
+        [(reg.name, reg.addr, reg.size) for reg in node.regs],
+        {
+            name: (prop.type, _encode_val(prop.type, prop.val, node2i))
+            for name, prop in node.props.items()
+        },
+        _encode_val("phandle-array", node.interrupts, node2i),
+        gpio_hogs,
+    )
+
+
+def _encode_val(type: str, val: Any, node2i: dict["Node", int]) -> Any:
+    # Returns the value of a property of type 'type' with nodes replaced by
+    # their index in EDT.nodes
+
+    if type in _NODE_TYPES:
+        return node2i[val]
+    if type == "phandles":
+        return [node2i[node] for node in val]
+    if type == "phandle-array":
+        return [
+            (node2i[entry.controller], entry.data, entry.name, entry.basename)
+            if entry is not None
+            else None
+            for entry in val
+        ]
+    return val
+
+
+def _index(edt: "EDT", node2i: dict["Node", int]) -> dict[str, Any]:
+    # Returns the index of the snapshot of 'edt'
+
+    def indices(compat2nodes: dict[str, list["Node"]]) -> dict[str, list[int]]:
+        return {compat: [node2i[node] for node in nodes] for compat, nodes in compat2nodes.items()}
+
+    return {
+        "dts_path": edt.dts_path,
+        "bindings_dirs": edt.bindings_dirs,
+        "paths": [node.path for node in edt.nodes],
+        "labels": {label: node2i[node] for label, node in edt.label2node.items()},
+        "aliases": {alias: node2i[node] for node in edt.nodes for alias in node.aliases},
+        "chosen": {name: node2i[node] for name, node in edt.chosen_nodes.items()},
+        "compat2nodes": indices(edt.compat2nodes),
+        "compat2okay": indices(edt.compat2okay),
+        "compat2notokay": indices(edt.compat2notokay),
+        "compat2vendor": dict(edt.compat2vendor),
+        "compat2model": dict(edt.compat2model),
+    }
@@ -0,0 +1,284 @@
+# Copyright The Zephyr Project Contributors
+# SPDX-License-Identifier: BSD-3-Clause
+
+import copy
+import glob
+import os
+import shutil
+import subprocess
+from typing import Any
+
+import pytest
+from devicetree import dtlib
+
+# Parity tests for the fast dtlib lexer, DT(fast_lexer=True), against the
+# original one, DT(fast_lexer=False). Both must give the same trees,
+# including file names and line numbers, and the same error messages.
+#
+# test_boards() preprocesses the .dts files of all boards found in
+# $ZEPHYR_BASE/boards, like the build system does. Boards that need headers
+# from modules that aren't available are skipped.
+
+HERE = os.path.dirname(__file__)
+ZEPHYR_BASE = os.environ.get(
+    "ZEPHYR_BASE", os.path.abspath(os.path.join(HERE, "..", "..", "..", ".."))
+)
+CPP = os.environ.get("CPP", "cpp")
+
+
+def summary(dt: dtlib.DT) -> list[Any]:
+    # Returns what the lexer can affect in 'dt'
+
+    ret: list[Any] = [
+        str(dt),
+        dt.memreserves,
+        sorted(dt.label2node),
+        sorted(dt.phandle2node),
+        sorted(dt.alias2node),
+    ]
+    for node in dt.node_iter():
+        ret.append((node.path, node.filename, node.lineno, node.labels))
+        for prop in node.props.values():
+            ret.append(
+                (
+                    prop.name,
+                    prop.value,
+                    prop.filename,
+                    prop.lineno,
+                    prop.labels,
+                    prop.offset_labels,
+                    prop._markers,
+                )
+            )
+    return ret
+
+
+def parse_both(path: str, **kwargs) -> tuple[Any, Any]:
+    # Parses 'path' with both lexers, returning the summary of the tree or
+    # the error message for each
+
+    ret = []
+    for fast_lexer in (True, False):
+        try:
+            ret.append(summary(dtlib.DT(path, fast_lexer=fast_lexer, **kwargs)))
+        except dtlib.DTError as e:
+            ret.append(str(e))
+    return ret[0], ret[1]
+
+
+SNIPPETS = {
+    "basic": """
+/dts-v1/;
+/memreserve/ 0x1000 0x100;
+lbl: /memreserve/ 10 20;
+
+/ {
+	#address-cells = <1>;
+	a = <1 0x2 03 (4 + 5) ('x') 10U 0x10ULL>, "str", [00 11 AaBb];
+	b = /bits/ 16 <1 2>, /bits/ 64 <3>;
+	label: node@1 {
+		reg = <1>;
+		c = &label, &{/node@1};
+		d = lbl2: <1 lbl3: 2>;
+		e;
+	};
+	// line comment
+	/* block
+		comment */ f = "a\\"b", 'c';
+};
+/delete-node/ &label;
+/ { /omit-if-no-ref/ other {}; };
+""",
+    "strings with state characters": """
+/dts-v1/;
+/ {
+	a = "{", ";", "[", "]";
+	node { b = "}"; };
+};
+""",
+    "multi-line string": """
+/dts-v1/;
+/ {
+	a = "line 1
+line 2";
+	node {};
+};
+""",
+    "line markers": """
+# 1 "board.dts"
+/dts-v1/;
+# 10 "soc.dtsi" 1
+/ {
+# 1 "include/dt-bindings/foo.h" 1 3
+	a = <1>;
+#line 20 "soc.dtsi"
+	node {
+		b = <2>;
+	};
+};
+""",
+    "expressions": """
+/dts-v1/;
+/ {
+	a = <(1 << 3) (16 >> 2) (1 < 2) (2 <= 2) (3 > 2) (3 >= 3) (1 == 1)>;
+	b = <(1 != 2) (1 && 0) (1 || 0) (5 & 3) (5 | 3) (5 ^ 3) (~0) (!0)>;
+	c = <(1 ? 2 : 3) (7 % 3) (7 / 2) (-1) (0x10 * 2)>;
+};
+""",
+    "comments everywhere": """
+/dts-v1/;/**/
+/ /* a */ { // b
+	/* c */ a /* d */ = /* e */ < /* f */ 1 /* g */ > /* h */ ; /* i */
+	b = [ /* j */ 01 /* k */ 02 ];
+} /* l */ ; /* m
+*/
+""",
+    "bad character": """
+/dts-v1/;
+/ {
+	/* comment */ $ = <1>;
+};
+""",
+    "bad character after comments": """
+/dts-v1/;
+/ {
+	a = <1>; /* x */ $ */ b = <2>;
+};
+""",
+    "char literal error": """
+/dts-v1/;
+/ {
+	a = /* x */ <'ab'>;
+};
+""",
+    "unterminated comment": """
+/dts-v1/;
+/ {
+	a = <1>;
+}; /* never closed
+""",
+    "bad byte": """
+/dts-v1/;
+/ {
+	a = [0];
+};
+""",
+    "missing semicolon": """
+/dts-v1/;
+/ {
+	a = <1>
+	b = <2>;
+};
+""",
+    # The lexer regexes are ASCII-only, so non-ASCII whitespace and digits
+    # are bad tokens for both lexers
+    "unicode whitespace": """
+/dts-v1/;
+/ {
+	a = <1>;
+};
+""",
+    "unicode line separator": """
+/dts-v1/;
+/ {
+	a = <1>; b = <2>;
+};
+""",
+    "unicode digits": """
+/dts-v1/;
+/ {
+	a = <٣>;
+};
+""",
+    "unicode in strings and comments": """
+/dts-v1/;
+/* é ٣ */
+/ {
+	a = "é ٣"; //
+};
+""",
+}
+
+
+@pytest.mark.parametrize("dts", SNIPPETS.values(), ids=SNIPPETS.keys())
+def test_snippets(tmp_path, dts):
+    '''Test that both lexers agree on hand-written inputs and errors.'''
+
+    path = tmp_path / "test.dts"
+    path.write_text(dts[1:])
+
+    fast, legacy = parse_both(str(path))
+    assert fast == legacy
+
+
+def test_include(tmp_path):
+    '''Test that both lexers agree on /include/d files.'''
+
+    (tmp_path / "inc.dtsi").write_text("/ {\n\tinc = <1>;\n};\n/include/ \"inc2.dtsi\"\n")
+    (tmp_path / "inc2.dtsi").write_text("/ { inc2 = <2>; };\n")
+    path = tmp_path / "test.dts"
+    path.write_text('/dts-v1/;\n/include/\n"inc.dtsi"\n/ {\n\ta = <3>;\n};\n')
+
+    fast, legacy = parse_both(str(path))
+    assert fast == legacy
+    assert not isinstance(fast, str)
+
+
+def test_lexer_state_not_kept(tmp_path):
+    '''Test that only the lexer selection stays in the DT instance.'''
+
+    path = tmp_path / "test.dts"
+    path.write_text("/dts-v1/;\n/ { a = <1>; };\n")
+
+    dt = dtlib.DT(str(path), fast_lexer=False)
+    assert "_file_contents" not in vars(dt)
+    assert "_lexer_state" not in vars(dt)
+    assert copy.deepcopy(dt)._fast_lexer is False
+
+
+def board_dts_files() -> list[str]:
+    return sorted(glob.glob(os.path.join(ZEPHYR_BASE, "boards", "**", "*.dts"), recursive=True))
+
+
+def include_dirs() -> list[str]:
+    # The devicetree include directories used by the build system for
+    # ZEPHYR_BASE, see pre_dt.cmake
+
+    dirs = ["include", "include/zephyr", "dts/common", "dts/vendor"]
+    dirs += sorted(
+        os.path.relpath(path, ZEPHYR_BASE)
+        for path in glob.glob(os.path.join(ZEPHYR_BASE, "dts", "*"))
+        if os.path.isdir(path) and os.path.basename(path) not in ("bindings", "common", "vendor")
+    )
+    dirs.append("dts")
+    return [os.path.join(ZEPHYR_BASE, d) for d in dirs]
+
+
+@pytest.mark.parametrize(
+    "dts",
+    board_dts_files(),
+    ids=lambda dts: os.path.relpath(dts, os.path.join(ZEPHYR_BASE, "boards")),
+)
+def test_boards(tmp_path, dts):
+    '''Test that both lexers agree on the preprocessed board devicetrees.'''
+
+    if shutil.which(CPP) is None:
+        pytest.skip(f"no C preprocessor '{CPP}'")
+
+    command = [CPP, "-x", "assembler-with-cpp", "-nostdinc", "-undef", "-D__DTS__"]
+    for include_dir in include_dirs() + [os.path.dirname(dts)]:
+        command += ["-isystem", include_dir]
+    pre_dts = str(tmp_path / "zephyr.dts.pre")
+    command += [
+        "-include",
+        dts,
+        "-E",
+        "-o",
+        pre_dts,
+        os.path.join(ZEPHYR_BASE, "misc", "empty_file.c"),
+    ]
+    if subprocess.run(command, capture_output=True).returncode:
+        pytest.skip("needs headers from modules")
+
+    fast, legacy = parse_both(pre_dts)
+    assert fast == legacy
@@ -7,6 +7,9 @@ import io
 from logging import WARNING
 import os
 from pathlib import Path
+import pickle
+import shutil
+from unittest import mock
 
 import pytest
 
@@ -274,6 +277,113 @@ def test_include():
                  ['int', 'int', 'int', 'int'],
                  [0, 1, 2, 3])
 
+def test_binding_index(tmp_path):
+    '''Test that EDTs built with a BindingIndex match those built without,
+    and that the index notices changes in the include chain of a binding.'''
+
+    bindings_dir = tmp_path / "test-bindings"
+    shutil.copytree(os.path.join(HERE, "test-bindings"), bindings_dir)
+    index_path = tmp_path / "index" / "bindings.pickle"
+    dts = os.path.join(HERE, "test.dts")
+
+    def summary(edt):
+        return [(node.path, node.matching_compat, node.binding_path,
+                 repr(node.props)) for node in edt.nodes]
+
+    with from_here():
+        expected = summary(edtlib.EDT(dts, [bindings_dir]))
+        cold = edtlib.EDT(dts, [bindings_dir], binding_index=index_path)
+        assert summary(cold) == expected
+        assert index_path.exists()
+
+        # Nothing is parsed when the index is up to date
+        with mock.patch.object(edtlib.yaml, "load",
+                               side_effect=AssertionError("parsed")):
+            warm = edtlib.EDT(dts, [bindings_dir], binding_index=index_path)
+        assert summary(warm) == expected
+        assert summary(deepcopy(warm)) == expected
+
+        # Touched but unchanged files are found by their contents
+        os.utime(bindings_dir / "parent.yaml")
+        with mock.patch.object(edtlib.yaml, "load",
+                               side_effect=AssertionError("parsed")):
+            edtlib.EDT(dts, [bindings_dir], binding_index=index_path)
+
+        # parent.yaml includes child.yaml, which includes grandchild-3.yaml
+        grandchild = bindings_dir / "grandchild-3.yaml"
+        grandchild.write_text(grandchild.read_text().replace("type: int",
+                                                             "type: array"))
+        edt = edtlib.EDT(dts, [bindings_dir], binding_index=index_path)
+
+    for path in ["/binding-include", "/binding-include/child"]:
+        verify_props(edt.get_node(path), ['baz', 'qaz'], ['int', 'array'],
+                     [2, [3]])
+
+    index = edtlib.BindingIndex(index_path)
+    index.load()
+    assert index._info(str(bindings_dir / "parent.yaml")) == \
+        (True, ("binding-include-test", ("child.yaml", "child.yaml")))
+    assert index.hits == 1 and index.misses == 0
+
+def test_binding_index_prefilter(tmp_path):
+    '''Test that a cold index only parses the binding files containing a
+    compatible of the devicetree, and parses the others once needed.'''
+
+    bindings_dir = tmp_path / "test-bindings"
+    shutil.copytree(os.path.join(HERE, "test-bindings"), bindings_dir)
+    index_path = tmp_path / "bindings.pickle"
+    parent = str(bindings_dir / "parent.yaml")
+
+    def summary(edt):
+        return [(node.path, node.matching_compat, node.binding_path,
+                 repr(node.props)) for node in edt.nodes]
+
+    with from_here():
+        edtlib.EDT("test-multidir.dts", [bindings_dir],
+                   binding_index=index_path)
+
+        index = edtlib.BindingIndex(index_path)
+        index.load()
+        assert index._files[str(bindings_dir / "multidir.yaml")][2] == \
+            ("in-dir-1", ())
+        assert index._files[parent][2] == {"in-dir-1", "in-dir-2"}
+
+        # The same compatibles are not searched for again
+        with mock.patch("builtins.open", side_effect=AssertionError("read")):
+            assert index._info(parent, {"in-dir-1"}) == (False, None)
+
+        expected = summary(edtlib.EDT("test.dts", [bindings_dir]))
+        edt = edtlib.EDT("test.dts", [bindings_dir], binding_index=index_path)
+        assert summary(edt) == expected
+
+    index = edtlib.BindingIndex(index_path)
+    index.load()
+    assert index._files[parent][2] == \
+        ("binding-include-test", ("child.yaml", "child.yaml"))
+
+def test_binding_index_invalid(tmp_path):
+    '''Test that an unreadable or outdated index file is ignored.'''
+
+    index_path = tmp_path / "bindings.pickle"
+    index_path.write_bytes(b"not a pickle")
+
+    with from_here():
+        edt = edtlib.EDT("test-multidir.dts",
+                         ["test-bindings", "test-bindings-2"],
+                         binding_index=index_path)
+    assert edt.get_node("/in-dir-1").binding_path == \
+        hpath("test-bindings/multidir.yaml")
+
+    index = edtlib.BindingIndex(index_path)
+    index.load()
+    assert index._files and index._merged
+
+    with mock.patch.object(edtlib.BindingIndex, "_compute_key",
+                           return_value="other edtlib"):
+        outdated = edtlib.BindingIndex(index_path)
+        outdated.load()
+    assert not outdated._files and not outdated._merged
+
 def test_include_filters():
     '''Test property-allowlist and property-blocklist in an include.'''
 
@@ -780,6 +890,24 @@ def test_child_dependencies():
     assert edt.get_node("/child-binding/child-1/grandchild") in dep_node.required_by
     assert edt.get_node("/child-binding/child-2") in dep_node.required_by
 
+def test_pickle():
+    '''Test that pickled EDTs keep their dependencies, and only differ when
+    the devicetree does'''
+    with from_here():
+        edt = edtlib.EDT("test.dts", ["test-bindings"])
+        edt2 = edtlib.EDT("test.dts", ["test-bindings"])
+
+    data = pickle.dumps(edt, protocol=4)
+    assert data == pickle.dumps(edt2, protocol=4)
+
+    edt_copy = pickle.loads(data)
+    for node, node_copy in zip(edt.nodes, edt_copy.nodes):
+        assert [n.path for n in node_copy.depends_on] == \
+            [n.path for n in node.depends_on]
+        assert [n.path for n in node_copy.required_by] == \
+            [n.path for n in node.required_by]
+        assert node_copy.dep_ordinal == node.dep_ordinal
+
 def test_slice_errs(tmp_path):
     '''Test error messages from the internal _slice() helper'''
 
@@ -0,0 +1,224 @@
+# Copyright The Zephyr Project Contributors
+# SPDX-License-Identifier: BSD-3-Clause
+
+import os
+import subprocess
+import sys
+from typing import Any
+
+import pytest
+from devicetree import edtlib, snapshot
+
+# Test suite for snapshot.py. The snapshot of test.dts must answer the same
+# as the EDT it was written from, for every attribute it provides.
+
+HERE = os.path.dirname(__file__)
+
+NODE_ATTRS = [
+    "name",
+    "path",
+    "unit_addr",
+    "label",
+    "labels",
+    "status",
+    "read_only",
+    "compats",
+    "matching_compat",
+    "binding_path",
+    "aliases",
+    "buses",
+    "on_buses",
+    "dep_ordinal",
+    "filename",
+    "lineno",
+    "parent",
+    "bus_node",
+    "children",
+    "depends_on",
+    "required_by",
+    "regs",
+    "props",
+    "interrupts",
+    "gpio_hogs",
+]
+
+
+@pytest.fixture(scope="module")
+def edt():
+    cwd = os.getcwd()
+    try:
+        os.chdir(HERE)
+        yield edtlib.EDT("test.dts", ["test-bindings"])
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture
+def snap(edt, tmp_path):
+    path = tmp_path / "edt.snapshot"
+    snapshot.write_snapshot(edt, str(path))
+    with snapshot.Snapshot(str(path)) as ret:
+        yield ret
+
+
+def plain(val: Any) -> Any:
+    # Returns 'val' with nodes replaced by their paths, so that values from
+    # the EDT and from the snapshot can be compared
+
+    if isinstance(val, (edtlib.Node, snapshot.SnapshotNode)):
+        return val.path
+    if isinstance(val, (edtlib.Property, snapshot.SnapshotProperty)):
+        return ("property", val.name, val.type, plain(val.val))
+    if isinstance(val, (edtlib.Register, snapshot.SnapshotRegister)):
+        return ("register", plain(val.node), val.name, val.addr, val.size)
+    if isinstance(val, (edtlib.ControllerAndData, snapshot.SnapshotControllerAndData)):
+        return ("entry", plain(val.node), plain(val.controller), val.data, val.name, val.basename)
+    if isinstance(val, (list, tuple)):
+        return [plain(v) for v in val]
+    if isinstance(val, dict):
+        return {k: plain(v) for k, v in val.items()}
+    return val
+
+
+def attr(node: Any, name: str) -> Any:
+    try:
+        return plain(getattr(node, name))
+    except edtlib.EDTError as e:
+        return ("error", str(e))
+
+
+def call(fn, *args):
+    try:
+        return fn(*args)
+    except edtlib.EDTError as e:
+        return ("error", str(e))
+
+
+def test_nodes(edt, snap):
+    '''Test that every node of the snapshot matches the EDT node.'''
+
+    assert len(snap.nodes) == len(edt.nodes)
+    for node, snap_node in zip(edt.nodes, snap.nodes, strict=True):
+        for name in NODE_ATTRS:
+            assert attr(snap_node, name) == attr(node, name), (node.path, name)
+
+
+def test_lookups(edt, snap):
+    '''Test the snapshot's lookup tables.'''
+
+    for name in [
+        "compat2nodes",
+        "compat2okay",
+        "compat2notokay",
+        "label2node",
+        "chosen_nodes",
+        "compat2vendor",
+        "compat2model",
+    ]:
+        assert plain(dict(getattr(snap, name))) == plain(dict(getattr(edt, name))), name
+
+    assert snap.dts_path == edt.dts_path
+    assert snap.bindings_dirs == edt.bindings_dirs
+    # Nodes are only created once
+    assert snap.get_node("/") is snap.nodes[0]
+
+
+def test_get_node(tmp_path):
+    '''Test path and alias lookups, and chosen nodes.'''
+
+    dts = tmp_path / "test.dts"
+    dts.write_text("""
+/dts-v1/;
+
+/ {
+	aliases {
+		foo-alias = &foo;
+	};
+
+	chosen {
+		zephyr,foo = &foo;
+		zephyr,bar = "/foo/bar";
+		zephyr,none = "/none";
+	};
+
+	foo: foo {
+		bar {
+		};
+	};
+};
+""")
+    edt = edtlib.EDT(str(dts), [])
+    snapshot.write_snapshot(edt, str(tmp_path / "edt.snapshot"))
+    snap = snapshot.Snapshot(str(tmp_path / "edt.snapshot"))
+
+    for path in [
+        "/",
+        "/foo",
+        "//foo//bar/",
+        "foo-alias",
+        "foo-alias/bar",
+        "/none",
+        "/foo/none",
+        "none-alias",
+        "foo-alias/none",
+    ]:
+        assert plain(call(snap.get_node, path)) == plain(call(edt.get_node, path)), path
+
+    assert plain(snap.chosen_nodes) == plain(edt.chosen_nodes)
+    assert plain(dict(snap.label2node)) == {"foo": "/foo"}
+    assert snap.chosen_node("zephyr,foo").path == "/foo"
+    assert snap.chosen_node("zephyr,none") is None
+    assert snap.get_node("/foo").aliases == ["foo-alias"]
+
+
+def test_lazy(edt, snap):
+    '''Test that node records are only loaded when needed.'''
+
+    node = edt.get_node("/interrupt-parent-test/node")
+    compat = next(iter(edt.compat2okay))
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(snapshot.Snapshot, "_record", lambda *_: pytest.fail("record loaded"))
+        snap_node = snap.get_node(node.path)
+        assert (snap_node.path, snap_node.name) == (node.path, node.name)
+        assert compat in snap.compat2okay
+        assert len(snap.nodes) == len(edt.nodes)
+
+
+def test_no_edtlib_import(edt, tmp_path):
+    '''Test that reading a snapshot doesn't import edtlib.'''
+
+    path = tmp_path / "edt.snapshot"
+    snapshot.write_snapshot(edt, str(path))
+    code = f"""
+import sys
+from devicetree.snapshot import Snapshot
+snap = Snapshot({str(path)!r})
+for node in snap.nodes:
+    node.regs, node.props, node.interrupts
+assert "devicetree.edtlib" not in sys.modules
+"""
+    src = os.path.dirname(os.path.dirname(snapshot.__file__))
+    subprocess.run([sys.executable, "-c", code], check=True, env=dict(os.environ, PYTHONPATH=src))
+
+
+def test_from_bytes(edt, tmp_path):
+    '''Test snapshots read from memory.'''
+
+    path = tmp_path / "edt.snapshot"
+    snapshot.write_snapshot(edt, str(path))
+    snap = snapshot.Snapshot.from_bytes(path.read_bytes())
+    assert [n.status for n in snap.nodes] == [n.status for n in edt.nodes]
+
+
+@pytest.mark.parametrize(
+    "contents",
+    [b"", b"not a snapshot" + bytes(32), b"EDTSNAP\0\2\0\0\0" + bytes(32)],
+    ids=["empty", "wrong magic", "wrong version"],
+)
+def test_invalid(tmp_path, contents):
+    '''Test that files which are not snapshots of this version are rejected.'''
+
+    path = tmp_path / "edt.snapshot"
+    path.write_bytes(contents)
+    with pytest.raises(edtlib.EDTError):
+        snapshot.Snapshot(str(path))
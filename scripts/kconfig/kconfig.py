@@ -44,7 +44,8 @@ def main():
 
     print("Parsing " + args.kconfig_file)
     kconf = Kconfig(args.kconfig_file, warn_to_stderr=False,
-                    suppress_traceback=True)
+                    suppress_traceback=True, cache_dir=args.cache_dir,
+                    cache_build_dirs=args.cache_build_dir)
 
     if args.handwritten_input_configs:
         # Warn for assignments to undefined symbols, but only for handwritten
@@ -305,6 +306,14 @@ def parse_args():
                              " adjustments.")
     parser.add_argument("--zephyr-base",
                         help="Path to current Zephyr installation")
+    parser.add_argument("--cache-dir",
+                        help="Directory for caching parsed Kconfig trees, "
+                             "which may be shared between builds")
+    parser.add_argument("--cache-build-dir",
+                        action="append", default=[],
+                        help="Directory specific to the build, like the build "
+                             "directory, whose paths are cached relative to "
+                             "it. Can be given multiple times.")
     parser.add_argument("kconfig_file",
                         help="Top-level Kconfig file")
     parser.add_argument("config_out",
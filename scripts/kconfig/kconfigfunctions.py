@@ -3,6 +3,8 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 
+import atexit
+import collections
 import functools
 import inspect
 import operator
@@ -10,6 +12,7 @@ import os
 import pickle
 import re
 import sys
+import time
 from pathlib import Path
 
 ZEPHYR_BASE = str(Path(__file__).resolve().parents[2])
@@ -22,10 +25,18 @@ sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts", "dts",
 doc_mode = os.environ.get('KCONFIG_DOC_MODE') == "1"
 
 if not doc_mode:
+    EDT_SNAPSHOT = os.environ.get("EDT_SNAPSHOT")
     EDT_PICKLE = os.environ.get("EDT_PICKLE")
 
-    # The "if" handles a missing dts.
-    if EDT_PICKLE is not None and os.path.isfile(EDT_PICKLE):
+    # The "if" handles a missing dts. The snapshot is preferred, as it only
+    # loads the nodes that are queried. It provides the parts of the
+    # edtlib.EDT API used here, and edtlib.EDTError.
+    if EDT_SNAPSHOT and os.path.isfile(EDT_SNAPSHOT):
+        from devicetree import snapshot
+
+        edt = snapshot.Snapshot(EDT_SNAPSHOT)
+        edtlib = snapshot
+    elif EDT_PICKLE is not None and os.path.isfile(EDT_PICKLE):
         with open(EDT_PICKLE, 'rb') as f:
             edt = pickle.load(f)
             edtlib = inspect.getmodule(edt)
@@ -34,6 +45,122 @@ if not doc_mode:
         edtlib = None
 
 
+class _EDTQueries:
+    """
+    Memoized devicetree queries for the functions below. The Kconfig tree
+    repeats many dt_*() calls, and e.g. each dt_compat_on_bus() call would
+    otherwise go through all enabled nodes with the compatible again.
+
+    Each kind of query has an index, which is filled in as queries are made,
+    so that nodes in a snapshot are only loaded if some query needs them.
+    'hits' and 'misses' count the index lookups per kind of query, see
+    _print_stats().
+    """
+
+    def __init__(self, edt):
+        self._edt = edt
+        self._path2node = None
+        self._alias2node = None
+        self._indexes = collections.defaultdict(dict)
+        self.hits = collections.Counter()
+        self.misses = collections.Counter()
+
+    def _lookup(self, kind, key, compute):
+        # Returns the entry for 'key' in the index for 'kind', adding the
+        # result of compute() first if needed
+
+        index = self._indexes[kind]
+        if key in index:
+            self.hits[kind] += 1
+            return index[key]
+
+        self.misses[kind] += 1
+        ret = index[key] = compute()
+        return ret
+
+    def node(self, path):
+        """
+        Returns the node at the path or alias 'path', or None if there is no
+        such node. Unlike EDT.get_node(), missing nodes don't raise EDTError,
+        as the import of edtlib for it takes longer than all other queries
+        with a snapshot.
+        """
+        return self._lookup("path", path, lambda: self._find_node(path))
+
+    def _find_node(self, path):
+        if not path:
+            # E.g. from an unset $(DT_CHOSEN_*) variable
+            return None
+
+        if path.startswith("/"):
+            if "//" not in path and (path == "/" or not path.endswith("/")):
+                if self._path2node is None:
+                    self._path2node = {node.path: node
+                                       for node in self._edt.nodes}
+                return self._path2node.get(path)
+        else:
+            # The path starts with an alias
+            if self._alias2node is None:
+                self._alias2node = {alias: node for node in self._edt.nodes
+                                    for alias in node.aliases}
+            alias, _, rest = path.partition("/")
+            if alias not in self._alias2node:
+                return None
+            if not rest:
+                return self._alias2node[alias]
+
+        # Paths with extra slashes, and paths below aliases
+        try:
+            return self._edt.get_node(path)
+        except edtlib.EDTError:
+            return None
+
+    def compat_buses(self, compat):
+        """
+        Returns the set of buses that enabled nodes with compatible 'compat'
+        are on.
+        """
+        return self._lookup("compat_buses", compat, lambda: {
+            bus for node in self._edt.compat2okay.get(compat, ())
+            for bus in node.on_buses or ()})
+
+    def compat_prop(self, compat, prop):
+        """
+        Returns a (values, all_have) tuple for the property 'prop' on the
+        enabled nodes with compatible 'compat'. 'values' is the set of str()
+        of the property values, and 'all_have' is True if all of the nodes
+        have the property.
+        """
+        def compute():
+            nodes = self._edt.compat2okay.get(compat, ())
+            values = {str(node.props[prop].val) for node in nodes
+                      if prop in node.props}
+            return values, all(prop in node.props for node in nodes)
+
+        return self._lookup("compat_prop", (compat, prop), compute)
+
+    def compat_labels(self, compat):
+        """
+        Returns the set of node labels of the enabled nodes with compatible
+        'compat'.
+        """
+        return self._lookup("compat_labels", compat, lambda: {
+            label for node in self._edt.compat2okay.get(compat, ())
+            for label in node.labels})
+
+    def gpio_hogs_enabled(self):
+        """
+        Returns True if any enabled node has GPIO hogs.
+        """
+        return self._lookup("gpio_hogs", None, lambda: any(
+            node.gpio_hogs and node.status == "okay"
+            for node in self._edt.nodes))
+
+
+if not doc_mode:
+    _queries = _EDTQueries(edt) if edt is not None else None
+
+
 def _warn(kconf, msg):
     print("{}:{}: WARNING: {}".format(kconf.filename, kconf.linenr, msg))
 
@@ -141,10 +268,7 @@ def dt_node_enabled(kconf, name, node):
         # Make sure this is being called appropriately.
         assert name == "dt_path_enabled"
 
-    try:
-        node = edt.get_node(node)
-    except edtlib.EDTError:
-        return "n"
+    node = _queries.node(node)
 
     return "y" if node and node.status == "okay" else "n"
 
@@ -412,10 +536,7 @@ def _dt_node_reg_addr(kconf, path, index=0, unit=None):
     if doc_mode or edt is None:
         return 0
 
-    try:
-        node = edt.get_node(path)
-    except edtlib.EDTError:
-        return 0
+    node = _queries.node(path)
 
     return _node_reg_addr(node, index, unit)
 
@@ -438,10 +559,7 @@ def _dt_node_reg_size(kconf, path, index=0, unit=None):
     if doc_mode or edt is None:
         return 0
 
-    try:
-        node = edt.get_node(path)
-    except edtlib.EDTError:
-        return 0
+    node = _queries.node(path)
 
     return _node_reg_size(node, index, unit)
 
@@ -518,7 +636,7 @@ def dt_node_bool_prop(kconf, _, path, prop):
     if doc_mode or edt is None:
         return "n"
 
-    return _dt_node_bool_prop_generic(edt.get_node, path, prop)
+    return _dt_node_bool_prop_generic(_queries.node, path, prop)
 
 def dt_nodelabel_bool_prop(kconf, _, label, prop):
     """
@@ -595,7 +713,7 @@ def dt_node_has_prop(kconf, _, path, prop):
     if doc_mode or edt is None:
         return "n"
 
-    return _dt_node_has_prop_generic(edt.get_node, path, prop)
+    return _dt_node_has_prop_generic(_queries.node, path, prop)
 
 def dt_nodelabel_has_prop(kconf, _, label, prop):
     """
@@ -629,9 +747,8 @@ def dt_node_int_prop(kconf, name, path, prop, unit=None):
     if doc_mode or edt is None:
         return "0"
 
-    try:
-        node = edt.get_node(path)
-    except edtlib.EDTError:
+    node = _queries.node(path)
+    if node is None:
         return "0"
 
     if name == "dt_node_int_prop_int":
@@ -657,9 +774,8 @@ def dt_node_array_prop(kconf, name, path, prop, index, unit=None):
     if doc_mode or edt is None:
         return "0"
 
-    try:
-        node = edt.get_node(path)
-    except edtlib.EDTError:
+    node = _queries.node(path)
+    if node is None:
         return "0"
     if name == "dt_node_array_prop_int":
         return str(_node_array_prop(node, prop, index, unit))
@@ -686,9 +802,8 @@ def dt_node_ph_array_prop(kconf, name, path, prop, index, cell, unit=None):
     if doc_mode or edt is None:
         return "0"
 
-    try:
-        node = edt.get_node(path)
-    except edtlib.EDTError:
+    node = _queries.node(path)
+    if node is None:
         return "0"
     if name == "dt_node_ph_array_prop_int":
         return str(_node_ph_array_prop(node, prop, index, cell, unit))
@@ -707,12 +822,9 @@ def dt_node_ph_prop_path(kconf, name, path, prop):
     if doc_mode or edt is None:
         return ""
 
-    try:
-        node = edt.get_node(path)
-    except edtlib.EDTError:
-        return ""
+    node = _queries.node(path)
 
-    if prop not in node.props:
+    if node is None or prop not in node.props:
         return ""
     if node.props[prop].type != "phandle":
         return ""
@@ -732,12 +844,9 @@ def dt_node_str_prop_equals(kconf, _, path, prop, val):
     if doc_mode or edt is None:
         return "n"
 
-    try:
-        node = edt.get_node(path)
-    except edtlib.EDTError:
-        return "n"
+    node = _queries.node(path)
 
-    if prop not in node.props:
+    if node is None or prop not in node.props:
         return "n"
 
     if node.props[prop].type != "string":
@@ -779,12 +888,7 @@ def dt_compat_on_bus(kconf, _, compat, bus):
     if doc_mode or edt is None:
         return "n"
 
-    if compat in edt.compat2okay:
-        for node in edt.compat2okay[compat]:
-            if node.on_buses is not None and bus in node.on_buses:
-                return "y"
-
-    return "n"
+    return "y" if bus in _queries.compat_buses(compat) else "n"
 
 def dt_compat_any_has_prop(kconf, _, compat, prop, value=None):
     """
@@ -798,14 +902,10 @@ def dt_compat_any_has_prop(kconf, _, compat, prop, value=None):
     if doc_mode or edt is None:
         return "n"
 
-    if compat in edt.compat2okay:
-        for node in edt.compat2okay[compat]:
-            if prop in node.props:
-                if value is None:
-                    return "y"
-                elif str(node.props[prop].val) == value:
-                    return "y"
-    return "n"
+    values, _ = _queries.compat_prop(compat, prop)
+    if value is None:
+        return "y" if values else "n"
+    return "y" if value in values else "n"
 
 def dt_compat_any_not_has_prop(kconf, _, compat, prop):
     """
@@ -817,12 +917,8 @@ def dt_compat_any_not_has_prop(kconf, _, compat, prop):
     if doc_mode or edt is None:
         return "n"
 
-    if compat in edt.compat2okay:
-        for node in edt.compat2okay[compat]:
-            if prop not in node.props:
-                return "y"
-
-    return "n"
+    _, all_have = _queries.compat_prop(compat, prop)
+    return "n" if all_have else "y"
 
 def dt_nodelabel_has_compat(kconf, _, label, compat):
     """
@@ -850,10 +946,7 @@ def dt_node_has_compat(kconf, _, path, compat):
     if doc_mode or edt is None:
         return "n"
 
-    try:
-        node = edt.get_node(path)
-    except edtlib.EDTError:
-        return "n"
+    node = _queries.node(path)
 
     if node and compat in node.compats:
         return "y"
@@ -869,12 +962,7 @@ def dt_nodelabel_enabled_with_compat(kconf, _, label, compat):
     if doc_mode or edt is None:
         return "n"
 
-    if compat in edt.compat2okay:
-        for node in edt.compat2okay[compat]:
-            if label in node.labels:
-                return "y"
-
-    return "n"
+    return "y" if label in _queries.compat_labels(compat) else "n"
 
 
 def dt_nodelabel_array_prop_has_val(kconf, _, label, prop, val):
@@ -919,10 +1007,7 @@ def dt_node_parent(kconf, _, path):
     if doc_mode or edt is None:
         return ""
 
-    try:
-        node = edt.get_node(path)
-    except edtlib.EDTError:
-        return ""
+    node = _queries.node(path)
 
     if node is None:
         return ""
@@ -936,11 +1021,7 @@ def dt_gpio_hogs_enabled(kconf, _):
     if doc_mode or edt is None:
         return "n"
 
-    for node in edt.nodes:
-        if node.gpio_hogs and node.status == "okay":
-            return "y"
-
-    return "n"
+    return "y" if _queries.gpio_hogs_enabled() else "n"
 
 
 def normalize_upper(kconf, _, string):
@@ -1142,3 +1223,48 @@ functions = {
         "dec": (inc_dec, 1, 255),
         "dec_hex": (inc_dec, 1, 255),
 }
+
+
+def _timed(fn):
+    # Wraps the preprocessor function 'fn' to count its calls and the time
+    # spent in them, see _print_stats()
+
+    @functools.wraps(fn)
+    def wrapper(kconf, name, *args):
+        start = time.perf_counter()
+        try:
+            return fn(kconf, name, *args)
+        finally:
+            stats = _call_stats[name]
+            stats[0] += 1
+            stats[1] += time.perf_counter() - start
+
+    return wrapper
+
+
+def _print_stats():
+    # Prints the number of calls to each preprocessor function, the time spent
+    # in them, and the hits and misses of the devicetree query indexes
+
+    total_calls = sum(calls for calls, _ in _call_stats.values())
+    total_time = sum(secs for _, secs in _call_stats.values())
+    print("Kconfig preprocessor functions: {} calls, {:.1f} ms"
+          .format(total_calls, 1000 * total_time))
+
+    for name, (calls, secs) in sorted(_call_stats.items(),
+                                      key=lambda item: -item[1][1]):
+        print("  {}: {} calls, {:.1f} ms".format(name, calls, 1000 * secs))
+
+    if not doc_mode and _queries is not None:
+        for kind in sorted(_queries.hits.keys() | _queries.misses.keys()):
+            print("  devicetree {} index: {} hits, {} misses"
+                  .format(kind, _queries.hits[kind], _queries.misses[kind]))
+
+
+# With KCONFIG_FUNCTIONS_STATS=1, statistics about the calls to the functions
+# are printed at exit, to see what they cost in a configuration
+if os.environ.get("KCONFIG_FUNCTIONS_STATS") == "1":
+    _call_stats = collections.defaultdict(lambda: [0, 0.0])
+    functions = {name: (_timed(fn), min_args, max_args)
+                 for name, (fn, min_args, max_args) in functions.items()}
+    atexit.register(_print_stats)
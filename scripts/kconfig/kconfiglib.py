@@ -544,8 +544,12 @@ Send bug reports, suggestions, and questions to ulfalizer a.t Google's email
 service, or open a ticket on the GitHub page.
 """
 import errno
+import gc
+import hashlib
 import importlib
+import io
 import os
+import pickle
 import re
 import sys
 
@@ -811,6 +815,8 @@ class Kconfig(object):
       See the module docstring.
     """
     __slots__ = (
+        "_cache_build_dirs",
+        "_cache_deps",
         "_encoding",
         "_functions",
         "_set_match",
@@ -865,7 +871,8 @@ class Kconfig(object):
     #
 
     def __init__(self, filename="Kconfig", warn=True, warn_to_stderr=True,
-                 encoding="utf-8", suppress_traceback=False):
+                 encoding="utf-8", suppress_traceback=False, cache_dir=None,
+                 cache_build_dirs=()):
         """
         Creates a new Kconfig object by parsing Kconfig files.
         Note that Kconfig files are not the same as .config files (which store
@@ -942,9 +949,40 @@ class Kconfig(object):
 
           Other exceptions besides EnvironmentError and KconfigError are still
           propagated when suppress_traceback is True.
+
+        cache_dir (default: None):
+          Directory for caching parsed Kconfig trees, or None to always parse
+          the Kconfig files. The directory is created if needed, and may be
+          shared between configurations and processes.
+
+          Parsing records everything the tree depends on: the contents of the
+          Kconfig files, the results of 'source' globs, the environment
+          variables that are referenced, and the results of the preprocessor
+          functions that are called, including those from $KCONFIG_FUNCTIONS.
+          A cached tree is only used if all of these are unchanged. The
+          preprocessor functions are called again to check that. Warnings
+          generated while parsing are generated again when a cached tree is
+          used.
+
+          Trees that call $(info) are not cached, as the output of $(info)
+          can't be repeated. The entries that were used the least recently
+          are removed when there are more than 64 of them.
+
+        cache_build_dirs (default: ()):
+          Directories that are specific to a build, like the build directory,
+          and that the Kconfig files refer to through environment variables.
+          Paths within them are cached relative to them, so that builds in
+          different directories share cached trees. Only the number of the
+          directories, their order, and whether they are within $srctree
+          must match.
+
+          If the paths of these directories end up elsewhere in the tree, e.g.
+          in symbol values, the tree is only shared between builds in the same
+          directories.
         """
         try:
-            self._init(filename, warn, warn_to_stderr, encoding)
+            self._init(filename, warn, warn_to_stderr, encoding, cache_dir,
+                       cache_build_dirs)
         except (EnvironmentError, KconfigError) as e:
             if suppress_traceback:
                 cmd = sys.argv[0]  # Empty string if missing
@@ -956,7 +994,8 @@ class Kconfig(object):
                 sys.exit(cmd + str(e).strip())
             raise
 
-    def _init(self, filename, warn, warn_to_stderr, encoding):
+    def _init(self, filename, warn, warn_to_stderr, encoding, cache_dir,
+              cache_build_dirs):
         # See __init__()
 
         self._encoding = encoding
@@ -967,6 +1006,18 @@ class Kconfig(object):
         # because it assumes symlink/../foo is the same as foo/.
         self._srctree_prefix = realpath(self.srctree) + os.sep
 
+        # (<path>, <path relative to $srctree or None>, <placeholder>,
+        # <relative placeholder>) tuples for the 'cache_build_dirs', longest
+        # first, so that nested directories are replaced first. See
+        # _cache_template().
+        self._cache_build_dirs = sorted(
+            ((path,
+              path[len(self._srctree_prefix):]
+                  if path.startswith(self._srctree_prefix) else None,
+              "\0{}\0".format(i), "\0{}r\0".format(i))
+             for i, path in enumerate(cache_build_dirs) if path),
+            key=lambda build_dir: len(build_dir[0]), reverse=True)
+
         self.warn = warn
         self.warn_to_stderr = warn_to_stderr
         self.warn_assign_undef = os.getenv("KCONFIG_WARN_UNDEF_ASSIGN") == "y"
@@ -1075,6 +1126,16 @@ class Kconfig(object):
         # unget operation.
         self._reuse_tokens = False
 
+        # Use a cached tree if possible. Otherwise, record what the tree
+        # depends on while parsing, so that it can be cached. See
+        # _load_cache().
+        self._cache_deps = None
+        if cache_dir is not None:
+            cache_key = self._cache_key(filename)
+            if self._load_cache(cache_dir, cache_key):
+                return
+            self._cache_deps = []
+
         # Open the top-level Kconfig file. Store the readline() method directly
         # as a small optimization.
         self._readline = self._open(join(self.srctree, filename), "r").readline
@@ -1125,6 +1186,9 @@ class Kconfig(object):
         # awkward during dependency loop detection
         self._add_choice_deps()
 
+        if self._cache_deps is not None:
+            self._save_cache(cache_dir, cache_key)
+
     @property
     def mainmenu_text(self):
         """
@@ -2105,6 +2169,373 @@ class Kconfig(object):
     #
 
 
+    #
+    # Caching of parsed trees
+    #
+
+    def _cache_key(self, filename):
+        # Returns a key for the cached trees of the top-level Kconfig file
+        # 'filename'. It covers the Kconfiglib and preprocessor function
+        # implementations and the settings that affect parsing. Everything
+        # else is checked by _cache_deps_ok().
+
+        hasher = hashlib.sha256()
+        for setting in (filename, self._srctree_prefix, self._encoding,
+                        self.warn, os.getenv("KCONFIG_WARN_UNDEF"),
+                        os.getenv("KCONFIG_STRICT"),
+                        # The paths of the 'cache_build_dirs' are replaced,
+                        # but not whether they are relative
+                        sorted((build_dir[2], build_dir[1] is None)
+                               for build_dir in self._cache_build_dirs)):
+            hasher.update("{!r}\0".format(setting).encode("utf-8"))
+
+        functions_module = sys.modules.get(
+            os.getenv("KCONFIG_FUNCTIONS", "kconfigfunctions"))
+        for path in __file__, getattr(functions_module, "__file__", None):
+            if path is not None:
+                hasher.update(_file_digest(path))
+
+        return hasher.hexdigest()
+
+    def _cache_entry_path(self, cache_dir, cache_key, env_names):
+        # Returns the path of the cached tree for 'cache_key' and the current
+        # values of the environment variables in 'env_names'. Those are the
+        # variables referenced by earlier trees for 'cache_key', so that e.g.
+        # different boards get different entries. Paths of the
+        # 'cache_build_dirs' in the values are replaced, so that builds in
+        # different directories get the same entry.
+
+        hasher = hashlib.sha256(cache_key.encode("utf-8"))
+        for name in env_names:
+            val = os.getenv(name)
+            if val is not None:
+                val = self._cache_template(val)
+            hasher.update("{!r}\0".format((name, val)).encode("utf-8"))
+
+        return join(cache_dir, hasher.hexdigest() + ".pickle")
+
+    def _cache_template(self, s):
+        # Returns 's' with the paths of the 'cache_build_dirs' replaced by
+        # placeholders, or 's' itself if it has none of them. Paths relative
+        # to $srctree, like in MenuNode.filename, are only replaced at the
+        # beginning of 's'. See _cache_expand().
+
+        for path, rel_path, placeholder, rel_placeholder in \
+            self._cache_build_dirs:
+
+            if path in s:
+                s = s.replace(path, placeholder)
+
+            if rel_path is not None and s.startswith(rel_path) and \
+               s[len(rel_path):len(rel_path) + 1] in ("", os.sep):
+                s = rel_placeholder + s[len(rel_path):]
+
+        return s
+
+    def _cache_expand(self, s):
+        # Returns 's' with the placeholders from _cache_template() replaced by
+        # the paths of the 'cache_build_dirs'
+
+        if "\0" in s:
+            for path, rel_path, placeholder, rel_placeholder in \
+                self._cache_build_dirs:
+
+                s = s.replace(placeholder, path)
+                if rel_path is not None:
+                    s = s.replace(rel_placeholder, rel_path)
+
+        return s
+
+    def _load_cache(self, cache_dir, cache_key):
+        # Loads the cached tree for 'cache_key' if it is up to date. Returns
+        # True if it was loaded.
+        #
+        # A cache entry holds three pickles. Pickling the tree directly would
+        # recurse along menu nodes and symbol dependencies, and exceed the
+        # recursion limit. Instead, the symbols, choices, menu nodes, and
+        # variables are created with their constructors first, and then get
+        # the remaining attributes, which then only refer to existing objects:
+        #
+        #   1. The dependencies, from _cache_deps, split into the ones without
+        #      and the ones with paths of the 'cache_build_dirs'. None for
+        #      entries without a tree, see _save_cache().
+        #   2. The list of symbols, choices, menu nodes, and variables
+        #   3. The tree attributes of the Kconfig object, the attributes
+        #      of the objects from 2., except 'kconfig' (see _CacheBuild), and
+        #      the menu nodes with paths of the 'cache_build_dirs' in their
+        #      location
+        #
+        # The paths of the 'cache_build_dirs' are stored as placeholders. See
+        # _pickle_cache_entry().
+
+        gc_was_enabled = gc.isenabled()
+        try:
+            with open(join(cache_dir, cache_key + ".env"), "rb") as f:
+                env_names = pickle.load(f)
+            path = self._cache_entry_path(cache_dir, cache_key, env_names)
+
+            with open(path, "rb") as f:
+                unpickler = pickle.Unpickler(f)
+                deps = unpickler.load()
+                # Errors from calling preprocessor functions again are
+                # generated again when parsing
+                if deps is None or not self._cache_deps_ok(deps[0]) or \
+                   not self._cache_deps_ok(
+                       [_map_strs(self._cache_expand, dep)
+                        for dep in deps[1]]):
+                    return False
+
+                # Creating many objects triggers many slow garbage
+                # collections
+                gc.disable()
+                objs = unpickler.load()
+                state, _, build_nodes = unpickler.load()
+
+        except _CACHE_LOAD_ERRORS:
+            return False
+
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+        for obj in objs:
+            obj.kconfig = self
+
+        expand = self._cache_expand
+        include_paths = {}
+        for node in build_nodes:
+            node.filename = expand(node.filename)
+            include_path = include_paths.get(node.include_path)
+            if include_path is None:
+                include_path = include_paths[node.include_path] = \
+                    _map_strs(expand, node.include_path)
+            node.include_path = include_path
+
+        state["filename"] = expand(state["filename"])
+        state["kconfig_filenames"] = [expand(filename) for filename
+                                      in state["kconfig_filenames"]]
+        warnings = state.pop("warnings")
+        for name, val in state.items():
+            setattr(self, name, val)
+
+        self._parsing_kconfigs = False
+
+        # Generate the warnings from parsing again
+        for msg in warnings:
+            msg = expand(msg)
+            self.warnings.append(msg)
+            if self.warn_to_stderr:
+                sys.stderr.write(msg + "\n")
+
+        # Mark the entry as recently used. See _prune_cache().
+        try:
+            os.utime(path, None)
+        except EnvironmentError:
+            pass
+
+        return True
+
+    def _cache_deps_ok(self, deps):
+        # Returns True if the dependencies 'deps' of a cached tree are
+        # unchanged. See _save_cache() for the format. Raises EnvironmentError
+        # for missing files.
+
+        filename, linenr = self.filename, self.linenr
+        try:
+            for dep in deps:
+                kind = dep[0]
+                if kind == "env":
+                    if os.getenv(dep[1]) != dep[2]:
+                        return False
+
+                elif kind == "expandvars":
+                    if expandvars(dep[1].replace("$UNAME_RELEASE",
+                                                 _UNAME_RELEASE)) != dep[2]:
+                        return False
+
+                elif kind == "glob":
+                    if tuple(sorted(iglob(dep[1]))) != dep[2]:
+                        return False
+
+                elif kind == "file":
+                    if _file_digest(dep[1]) != dep[2]:
+                        return False
+
+                else:  # kind == "fn"
+                    # Call the function again, from the same location
+                    _, fn, args, self.filename, self.linenr, res = dep
+                    if fn not in self._functions or \
+                       self._functions[fn][0](self, fn, *args) != res:
+                        return False
+
+            return True
+
+        finally:
+            self.filename, self.linenr = filename, linenr
+
+    def _save_cache(self, cache_dir, cache_key):
+        # Writes the tree to the cache, with the dependencies recorded in
+        # _cache_deps while parsing it. Errors are ignored, as the cache is
+        # just an optimization.
+        #
+        # Writing the tree takes about half as long as parsing it, and most
+        # trees are parsed just once, e.g. in fresh CI build directories.
+        # Trees are only written once their cache entry already exists.
+        # Otherwise, an entry without a tree is written, which just marks
+        # the tree as parsed before.
+        #
+        # The dependencies are tuples:
+        #
+        #   ("env", <name>, <value, or None if unset>)
+        #   ("expandvars", <string>, <expanded string>)
+        #   ("glob", <pattern>, <tuple of matching files>)
+        #   ("file", <path>, <contents digest>)
+        #   ("fn", <function>, <args>, <filename>, <linenr>, <result>)
+
+        deps = _ordered_unique(self._cache_deps)
+        self._cache_deps = None
+
+        try:
+            if not exists(cache_dir):
+                os.makedirs(cache_dir)
+
+            # Keep the names of all environment variables used by trees for
+            # 'cache_key'. Each combination of their values has its own cache
+            # entry.
+            env_names_path = join(cache_dir, cache_key + ".env")
+            try:
+                with open(env_names_path, "rb") as f:
+                    env_names = pickle.load(f)
+            except _CACHE_LOAD_ERRORS:
+                env_names = []
+
+            new_env_names = {dep[1] for dep in deps if dep[0] == "env"}
+            if not new_env_names.issubset(env_names):
+                env_names = sorted(new_env_names.union(env_names))
+                _write_cache_file(env_names_path,
+                                  lambda f: pickle.dump(env_names, f))
+
+            entry_path = self._cache_entry_path(cache_dir, cache_key,
+                                                env_names)
+            if not exists(entry_path):
+                _write_cache_file(entry_path, lambda f: pickle.dump(None, f))
+                _prune_cache(cache_dir)
+                return
+
+            deps += [("file", path, _file_digest(path)) for path in
+                     _ordered_unique(join(self.srctree, filename)
+                                     for filename in self.kconfig_filenames)]
+            # Check the dependencies that are the fastest to check first
+            deps.sort(key=lambda dep: _CACHE_DEP_ORDER[dep[0]])
+
+            # See _load_cache()
+            gc_was_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                entry = self._pickle_cache_entry(deps, True)
+                if entry is None:
+                    # Paths of the 'cache_build_dirs' are left in the tree.
+                    # Keep all paths, so that the tree is only used in the
+                    # same directories.
+                    entry = self._pickle_cache_entry(deps, False)
+            finally:
+                if gc_was_enabled:
+                    gc.enable()
+
+            _write_cache_file(entry_path, lambda f: f.write(entry))
+            _prune_cache(cache_dir)
+
+        except (EnvironmentError, TypeError, pickle.PicklingError,
+                RecursionError):
+            pass
+
+    def _pickle_cache_entry(self, deps, relocate):
+        # Returns the cache entry of the tree, with the dependencies 'deps', as
+        # bytes. See _load_cache().
+        #
+        # If 'relocate' is True, the paths of the 'cache_build_dirs' in the
+        # dependencies, in the locations of the menu nodes, and in
+        # 'filename', 'kconfig_filenames', and 'warnings' are replaced with
+        # placeholders, see _cache_template(). Returns None if the paths are
+        # left elsewhere.
+
+        objs = _ordered_unique(
+            list(self.syms.values()) + list(self.const_syms.values()) +
+            self.choices + list(self.named_choices.values()) +
+            [self.top_node] + list(self.node_iter()) +
+            list(self.variables.values()))
+        state = {name: getattr(self, name) for name in _CACHED_KCONFIG_ATTRS}
+
+        build_deps = []
+        build_nodes = []
+        # (<menu node>, <filename>, <include path>) tuples with the original
+        # locations of the nodes in 'build_nodes'
+        node_locs = []
+        if relocate and self._cache_build_dirs:
+            template = self._cache_template
+
+            plain_deps = []
+            for dep in deps:
+                build_dep = _map_strs(template, dep)
+                if build_dep is dep:
+                    plain_deps.append(dep)
+                else:
+                    build_deps.append(build_dep)
+            deps = plain_deps
+
+            # Include paths are shared between nodes
+            include_paths = {}
+            for node in objs:
+                if node.__class__ is not MenuNode:
+                    continue
+
+                filename = template(node.filename)
+                include_path = include_paths.get(node.include_path)
+                if include_path is None:
+                    include_path = include_paths[node.include_path] = \
+                        _map_strs(template, node.include_path)
+
+                if filename is not node.filename or \
+                   include_path != node.include_path:
+                    node_locs.append((node, node.filename, node.include_path))
+                    build_nodes.append(node)
+                    node.filename = filename
+                    node.include_path = include_path
+
+            state["filename"] = template(state["filename"])
+            state["kconfig_filenames"] = [template(filename) for filename
+                                          in state["kconfig_filenames"]]
+            state["warnings"] = [template(msg) for msg in state["warnings"]]
+
+        # The attribute values set by the constructors, which don't need to be
+        # stored
+        ctor_attrs = {cls: _ctor_attrs(cls) for cls in _CACHE_NEW_DISPATCH}
+
+        f = io.BytesIO()
+        try:
+            pickler = pickle.Pickler(f, pickle.HIGHEST_PROTOCOL)
+            pickler.dump((deps, build_deps))
+            pickler.dispatch_table = _CACHE_NEW_DISPATCH
+            pickler.dump(objs)
+            pickler.dispatch_table = {}
+            pickler.dump((state,
+                          [_CacheBuild(obj, ctor_attrs[obj.__class__])
+                           for obj in objs],
+                          build_nodes))
+        finally:
+            for node, filename, include_path in node_locs:
+                node.filename = filename
+                node.include_path = include_path
+
+        entry = f.getvalue()
+        if relocate:
+            for path, rel_path, _, _ in self._cache_build_dirs:
+                if path.encode("utf-8") in entry or \
+                   (rel_path is not None and rel_path.encode("utf-8") in entry):
+                    return None
+
+        return entry
+
     #
     # File reading
     #
@@ -2463,6 +2894,9 @@ class Kconfig(object):
                         val = expandvars(s[i + 1:end_i - 1]
                                          .replace("$UNAME_RELEASE",
                                                   _UNAME_RELEASE))
+                        if self._cache_deps is not None:
+                            self._cache_deps.append(
+                                ("expandvars", s[i + 1:end_i - 1], val))
 
                         i = end_i
 
@@ -2850,13 +3284,27 @@ class Kconfig(object):
                                    .format(self.filename, self.linenr, fn,
                                            expected_args, len(args) - 1))
 
-            return py_fn(self, *args)
+            res = py_fn(self, *args)
+            if self._cache_deps is not None and fn not in _CACHE_SKIPPED_FNS:
+                if fn == "info":
+                    # The output of $(info) can't be repeated for a cached
+                    # tree. Don't cache the tree.
+                    self._cache_deps = None
+                else:
+                    self._cache_deps.append(
+                        ("fn", fn, tuple(args[1:]), self.filename,
+                         self.linenr, res))
+            return res
 
         # Environment variables are tried last
         if fn in os.environ:
             self.env_vars.add(fn)
+            if self._cache_deps is not None:
+                self._cache_deps.append(("env", fn, os.environ[fn]))
             return os.environ[fn]
 
+        if self._cache_deps is not None:
+            self._cache_deps.append(("env", fn, None))
         return ""
 
     #
@@ -2983,7 +3431,11 @@ class Kconfig(object):
                 # - Sort the glob results to ensure a consistent ordering of
                 #   Kconfig symbols, which indirectly ensures a consistent
                 #   ordering in e.g. .config files
-                filenames = sorted(iglob(join(self._srctree_prefix, pattern)))
+                glob_pattern = join(self._srctree_prefix, pattern)
+                filenames = sorted(iglob(glob_pattern))
+                if self._cache_deps is not None:
+                    self._cache_deps.append(("glob", glob_pattern,
+                                             tuple(filenames)))
 
                 if not filenames and t0 in _OBL_SOURCE_TOKENS:
                     raise KconfigError(
@@ -3218,6 +3670,10 @@ class Kconfig(object):
                     env_var = self._expect_str_and_eol()
                     node.item.env_var = env_var
 
+                    if self._cache_deps is not None:
+                        self._cache_deps.append(
+                            ("env", env_var, os.environ.get(env_var)))
+
                     if env_var in os.environ:
                         node.defaults.append(
                             (self._lookup_const_sym(os.environ[env_var]),
@@ -6795,6 +7251,131 @@ def _warn_verbose_deprecated(fn_name):
         "configuration interfaces.\n".format(fn_name))
 
 
+# Caching of parsed trees
+
+
+def _file_digest(path):
+    # Returns a digest of the contents of the file 'path'
+
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+def _map_strs(fn, val):
+    # Returns 'val' with fn() applied to it if it's a string, or to the
+    # strings in it if it's a tuple, recursively. Returns 'val' itself if no
+    # string changes.
+
+    if val.__class__ is str:
+        return fn(val)
+
+    if val.__class__ is tuple:
+        res = tuple([_map_strs(fn, item) for item in val])
+        for item, res_item in zip(val, res, strict=True):
+            if item is not res_item:
+                return res
+
+    return val
+
+
+def _write_cache_file(path, write_fn):
+    # Calls write_fn() with a temporary file, which then replaces 'path'. This
+    # makes sure that other processes sharing the cache never see partially
+    # written files.
+
+    tmp_path = "{}.{}.tmp".format(path, os.getpid())
+    try:
+        with open(tmp_path, "wb") as f:
+            write_fn(f)
+        os.replace(tmp_path, path)
+    finally:
+        if exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _prune_cache(cache_dir):
+    # Removes the least recently used trees from 'cache_dir', so that at most
+    # _CACHE_MAX_ENTRIES remain
+
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(".pickle"):
+            path = join(cache_dir, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except EnvironmentError:
+                # Removed by another process
+                pass
+
+    for _, path in sorted(entries)[:-_CACHE_MAX_ENTRIES]:
+        try:
+            os.remove(path)
+        except EnvironmentError:
+            pass
+
+
+def _reduce_new(obj):
+    # Pickles 'obj' as a new object of the same class, with the attribute
+    # values of its constructor. See Kconfig._load_cache().
+
+    return (obj.__class__, ())
+
+
+def _ctor_attrs(cls):
+    # Returns two lists of (name, value) tuples with the attributes set by the
+    # constructor of 'cls', except 'kconfig': one for immutable values, and
+    # one for empty containers. Attributes the constructor doesn't set get
+    # the value _NO_ATTR, which counts as immutable.
+
+    obj = cls()
+    immutable_attrs = []
+    container_attrs = []
+    for name in cls.__slots__:
+        if name != "kconfig":
+            val = getattr(obj, name, _NO_ATTR)
+            if isinstance(val, (list, dict, set)):
+                container_attrs.append((name, val))
+            else:
+                immutable_attrs.append((name, val))
+
+    return immutable_attrs, container_attrs
+
+
+def _cached_obj(obj):
+    return obj
+
+
+class _CacheBuild(object):
+    # Pickled as a reference to the already pickled 'obj', with the attributes
+    # of 'obj' that differ from 'ctor_attrs' (from _ctor_attrs()), which are
+    # set when unpickling. See Kconfig._load_cache().
+
+    __slots__ = ("obj", "ctor_attrs")
+
+    def __init__(self, obj, ctor_attrs):
+        self.obj = obj
+        self.ctor_attrs = ctor_attrs
+
+    def __reduce__(self):
+        obj = self.obj
+        immutable_attrs, container_attrs = self.ctor_attrs
+
+        # Immutable values are compared by identity, which is much faster. An
+        # equal value is just stored needlessly.
+        state = {name: val for name, ctor_val in immutable_attrs
+                 for val in (getattr(obj, name, _NO_ATTR),)
+                 if val is not ctor_val}
+
+        for name, ctor_val in container_attrs:
+            val = getattr(obj, name, _NO_ATTR)
+            # Compare the classes as well, so that e.g. an empty set isn't
+            # replaced by an empty list
+            if val or val.__class__ is not ctor_val.__class__:
+                state[name] = val
+
+        return (_cached_obj, (obj,), (None, state))
+
+
 # Predefined preprocessor functions
 
 
@@ -6876,6 +7457,82 @@ STR_TO_TRI = {
 # Symbol will do. We test this with 'is'.
 _NO_CACHED_SELECTION = 0
 
+# The tree attributes of Kconfig objects, which are stored in cached trees
+_CACHED_KCONFIG_ATTRS = (
+    "choices",
+    "comments",
+    "const_syms",
+    "defconfig_list",
+    "defined_syms",
+    "env_vars",
+    "filename",
+    "kconfig_filenames",
+    "linenr",
+    "m",
+    "menus",
+    "modules",
+    "n",
+    "named_choices",
+    "syms",
+    "top_node",
+    "unique_choices",
+    "unique_defined_syms",
+    "variables",
+    "warnings",
+    "y",
+)
+
+# Pickles symbols, choices, menu nodes, and variables as new objects. See
+# Kconfig._load_cache().
+_CACHE_NEW_DISPATCH = {
+    Choice:   _reduce_new,
+    MenuNode: _reduce_new,
+    Symbol:   _reduce_new,
+    Variable: _reduce_new,
+}
+
+# Value of attributes a constructor doesn't set. See _ctor_attrs().
+_NO_ATTR = object()
+
+# Maximum number of cached trees in a cache directory
+_CACHE_MAX_ENTRIES = 64
+
+# Order in which the dependencies of cached trees are checked, from the
+# fastest to check to the slowest
+_CACHE_DEP_ORDER = {
+    "env":        0,
+    "expandvars": 1,
+    "glob":       2,
+    "file":       3,
+    "fn":         4,
+}
+
+# Predefined preprocessor functions whose results and side effects only depend
+# on their arguments and on the location of the call, which are covered by the
+# Kconfig files in the dependencies of cached trees. Calls to other functions
+# are recorded and repeated before a cached tree is used.
+_CACHE_SKIPPED_FNS = frozenset({
+    "error-if",
+    "filename",
+    "lineno",
+    "warning-if",
+})
+
+# Errors from reading a cached tree or its list of environment variables,
+# which might be missing, outdated, or corrupt. They make the Kconfig files be
+# parsed instead.
+_CACHE_LOAD_ERRORS = (
+    AttributeError,
+    EnvironmentError,
+    EOFError,
+    ImportError,
+    IndexError,
+    KeyError,
+    TypeError,
+    ValueError,
+    pickle.UnpicklingError,
+)
+
 # Are we running on Python 2?
 _IS_PY2 = sys.version_info[0] < 3
 
@@ -9,11 +9,12 @@ Class for Dictionary-based Logging Database
 """
 
 import base64
+import bisect
 import copy
 import json
 
 from .mipi_syst import gen_syst_xml_file
-from .utils import extract_one_string_in_section, find_string_in_mappings
+from .utils import extract_one_string_in_section
 
 ARCHS = {
     "arc" : {
@@ -71,6 +72,8 @@ class LogDatabase:
 
         self.database = new_db
 
+        self.__clear_string_index()
+
 
     def get_version(self):
         """Get Database Version"""
@@ -162,6 +165,7 @@ class LogDatabase:
     def set_string_mappings(self, database):
         """Add string mappings to database"""
         self.database['string_mappings'] = database
+        self.__clear_string_index()
 
 
     def has_string_mappings(self):
@@ -177,12 +181,62 @@ class LogDatabase:
         return len(self.database['sections']) != 0
 
 
+    def __clear_string_index(self):
+        """Drop the string lookup index and the strings found so far,
+        to be rebuilt on the next lookup"""
+        self.__string_cache = {}
+        self.__mapping_ptrs = None
+        self.__max_mapping_len = 0
+        self.__section_starts = None
+        self.__section_list = None
+
+
+    def __build_string_index(self):
+        """Sort the addresses of the string mappings and sections,
+        so that strings can be looked up by bisection"""
+        if self.has_string_mappings():
+            mappings = self.database['string_mappings']
+            self.__mapping_ptrs = sorted(mappings)
+            self.__max_mapping_len = max((len(one_str) for one_str in mappings.values()),
+                                         default=0)
+        else:
+            self.__mapping_ptrs = []
+
+        if self.has_string_sections():
+            self.__section_list = sorted(self.database['sections'].values(),
+                                         key=lambda sect: sect['start'])
+        else:
+            self.__section_list = []
+        self.__section_starts = [sect['start'] for sect in self.__section_list]
+
+
     def __find_string_in_mappings(self, string_ptr):
         """
         Find string pointed by string_ptr in the string mapping
         list. Return None if not found.
         """
-        return find_string_in_mappings(self.database['string_mappings'], string_ptr)
+        mappings = self.database['string_mappings']
+
+        if string_ptr in mappings:
+            return mappings[string_ptr]
+
+        # No direct match on pointer value.
+        # This may be a combined string, i.e. the tail of a string starting
+        # at a lower address. Look at the closest ones, up to the length of
+        # the longest string.
+        ptrs = self.__mapping_ptrs
+        idx = bisect.bisect_right(ptrs, string_ptr) - 1
+
+        while idx >= 0 and ptrs[idx] > string_ptr - self.__max_mapping_len:
+            ptr = ptrs[idx]
+            whole_str = mappings[ptr]
+
+            if string_ptr < ptr + len(whole_str):
+                return whole_str[string_ptr - ptr:]
+
+            idx -= 1
+
+        return None
 
 
     def __find_string_in_sections(self, string_ptr):
@@ -190,18 +244,22 @@ class LogDatabase:
         Find string pointed by string_ptr in the binary data
         sections. Return None if not found.
         """
-        for _, sect in self.database['sections'].items():
-            one_str = extract_one_string_in_section(sect, string_ptr)
-
-            if one_str is not None:
-                return one_str
+        idx = bisect.bisect_right(self.__section_starts, string_ptr) - 1
+        if idx < 0:
+            return None
 
-        return None
+        return extract_one_string_in_section(self.__section_list[idx], string_ptr)
 
 
     def find_string(self, string_ptr):
         """Find string pointed by string_ptr in the database.
         Return None if not found."""
+        if string_ptr in self.__string_cache:
+            return self.__string_cache[string_ptr]
+
+        if self.__mapping_ptrs is None:
+            self.__build_string_index()
+
         one_str = None
 
         if self.has_string_mappings():
@@ -210,6 +268,8 @@ class LogDatabase:
         if one_str is None and self.has_string_sections():
             one_str = self.__find_string_in_sections(string_ptr)
 
+        self.__string_cache[string_ptr] = one_str
+
         return one_str
 
 
@@ -260,6 +320,7 @@ class LogDatabase:
 
         database = LogDatabase()
         database.database = json_db
+        database.__clear_string_index()
 
         # JSON encodes the addresses in string mappings as literal strings.
         # So convert them back to integers, as this is needed for partial
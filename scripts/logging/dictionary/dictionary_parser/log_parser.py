@@ -9,11 +9,15 @@ Abstract Class for Dictionary-based Logging Parsers
 """
 
 import abc
+import logging
+from dataclasses import dataclass
 
 from colorama import Fore
 
 from .data_types import DataTypes
 
+HEX_BYTES_IN_LINE = 16
+
 LOG_LEVELS = [
     ('none', Fore.WHITE),
     ('err', Fore.RED),
@@ -22,6 +26,9 @@ LOG_LEVELS = [
     ('dbg', Fore.BLUE)
 ]
 
+logger = logging.getLogger("parser")
+
+
 def get_log_level_str_color(lvl):
     """Convert numeric log level to string"""
     if lvl < 0 or lvl >= len(LOG_LEVELS):
@@ -53,6 +60,27 @@ def formalize_fmt_string(fmt_str):
     return new_str
 
 
+class LogDataError(Exception):
+    """Invalid binary log data"""
+
+
+@dataclass
+class LogMessage:
+    """Decoded log message"""
+    level: int
+    timestamp: int
+    source: str
+    message: str
+    # Data for hexdump, if any
+    data: bytes = b""
+
+
+@dataclass
+class DroppedMessages:
+    """Number of log messages dropped on the target"""
+    count: int
+
+
 class LogParser(abc.ABC):
     """Abstract class of log parser"""
     def __init__(self, database):
@@ -62,6 +90,102 @@ class LogParser(abc.ABC):
 
 
     @abc.abstractmethod
-    def parse_log_data(self, logdata, debug=False):
-        """Parse log data"""
+    def get_msg_size(self, logdata, offset):
+        """Return the size of the message at offset in logdata, or None
+        if logdata does not contain enough of the message to tell.
+        Raise LogDataError for invalid messages."""
+        return None
+
+
+    @abc.abstractmethod
+    def decode_msg(self, logdata, offset):
+        """Decode the complete message at offset in logdata and return
+        a LogMessage or DroppedMessages. Raise LogDataError for invalid
+        messages."""
         return None
+
+
+    def decode_log_data(self, logdata, offset=0):
+        """Decode binary log data from offset, one message at a time.
+
+        This is a generator of (message, next_offset) tuples, where
+        next_offset is the offset following the message. It stops at
+        the first message which is not completely in logdata, so that
+        decoding can continue from the last next_offset once more data
+        has been received."""
+        while offset < len(logdata):
+            size = self.get_msg_size(logdata, offset)
+            if size is None or offset + size > len(logdata):
+                return
+
+            msg = self.decode_msg(logdata, offset)
+            offset += size
+
+            yield msg, offset
+
+
+    def parse_log_data(self, logdata, debug=False):
+        """Parse binary log data and print the encoded log messages"""
+        offset = 0
+
+        try:
+            for msg, next_offset in self.decode_log_data(logdata):
+                self.print_msg(msg)
+                offset = next_offset
+        except LogDataError as e:
+            logger.error("------ %s", e)
+            return False
+
+        if offset < len(logdata):
+            logger.error("------ Incomplete message at end of log data")
+            return False
+
+        return True
+
+
+    def print_msg(self, msg):
+        """Print a message returned by decode_msg()"""
+        if isinstance(msg, DroppedMessages):
+            print(f"--- {msg.count} messages dropped ---")
+            return
+
+        level_str, color = get_log_level_str_color(msg.level)
+
+        if msg.level == 0:
+            print(f"{msg.message}", end='')
+            log_prefix = ""
+        else:
+            log_prefix = f"[{msg.timestamp:>10}] <{level_str}> {msg.source}: "
+            print(f"{color}%s%s{Fore.RESET}" % (log_prefix, msg.message))
+
+        if msg.data:
+            self.print_hexdump(msg.data, len(log_prefix), color)
+
+
+    @staticmethod
+    def print_hexdump(hex_data, prefix_len, color):
+        """Print hex dump"""
+        hex_vals = ""
+        chr_vals = ""
+        chr_done = 0
+
+        for one_hex in hex_data:
+            hex_vals += f'{one_hex:02x} '
+            chr_vals += chr(one_hex)
+            chr_done += 1
+
+            if chr_done == HEX_BYTES_IN_LINE / 2:
+                hex_vals += " "
+                chr_vals += " "
+
+            elif chr_done == HEX_BYTES_IN_LINE:
+                print(f"{color}%s%s|%s{Fore.RESET}" % ((" " * prefix_len),
+                      hex_vals, chr_vals))
+                hex_vals = ""
+                chr_vals = ""
+                chr_done = 0
+
+        if len(chr_vals) > 0:
+            hex_padding = "   " * (HEX_BYTES_IN_LINE - chr_done)
+            print(f"{color}%s%s%s|%s{Fore.RESET}" % ((" " * prefix_len),
+                  hex_vals, hex_padding, chr_vals))
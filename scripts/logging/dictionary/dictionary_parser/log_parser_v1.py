@@ -11,7 +11,6 @@ This contains the implementation of the parser for
 version 1 databases.
 """
 
-import logging
 import math
 import struct
 
@@ -19,7 +18,13 @@ import colorama
 from colorama import Fore
 
 from .data_types import DataTypes
-from .log_parser import LogParser, formalize_fmt_string, get_log_level_str_color
+from .log_parser import (
+    DroppedMessages,
+    LogDataError,
+    LogMessage,
+    LogParser,
+    formalize_fmt_string,
+)
 
 HEX_BYTES_IN_LINE = 16
 
@@ -57,9 +62,6 @@ MSG_TYPE_DROPPED = 1
 FMT_DROPPED_CNT = "H"
 
 
-logger = logging.getLogger("parser")
-
-
 class LogParserV1(LogParser):
     """Log Parser V1"""
     def __init__(self, database):
@@ -256,8 +258,8 @@ class LogParserV1(LogParser):
                   hex_vals, hex_padding, chr_vals))
 
 
-    def parse_one_normal_msg(self, logdata, offset):
-        """Parse one normal log message and print the encoded message"""
+    def decode_one_normal_msg(self, logdata, offset):
+        """Decode one normal log message"""
         # Parse log message header
         log_desc, source_id = struct.unpack_from(self.fmt_msg_hdr, logdata, offset)
         offset += struct.calcsize(self.fmt_msg_hdr)
@@ -271,10 +273,9 @@ class LogParserV1(LogParser):
         pkg_len = (log_desc >> 6) & int(math.pow(2, 10) - 1)
         data_len = (log_desc >> 16) & int(math.pow(2, 12) - 1)
 
-        level_str, color = get_log_level_str_color(level)
         source_id_str = self.database.get_log_source_string(domain_id, source_id)
 
-        # Skip over data to point to next message (save as return value)
+        # End of the message, after the extra data
         next_msg_offset = offset + pkg_len + data_len
 
         # Offset from beginning of cbprintf_packaged data to end of va_list arguments
@@ -283,7 +284,7 @@ class LogParserV1(LogParser):
         offset_end_of_args += offset
 
         # Extra data after packaged log
-        extra_data = logdata[(offset + pkg_len):next_msg_offset]
+        extra_data = bytes(logdata[(offset + pkg_len):next_msg_offset])
 
         # Number of appended strings in package
         num_packed_strings = struct.unpack_from("B", logdata, offset+1)[0]
@@ -300,8 +301,7 @@ class LogParserV1(LogParser):
         string_tbl = self.extract_string_table(logdata[offset_end_of_args:(offset + pkg_len)])
 
         if len(string_tbl) != num_packed_strings:
-            logger.error("------ Error extracting string table")
-            return None
+            raise LogDataError("Error extracting string table")
 
         # Skip packaged string header
         offset += self.data_types.get_sizeof(DataTypes.PTR)
@@ -320,54 +320,56 @@ class LogParserV1(LogParser):
         offset += self.data_types.get_sizeof(DataTypes.PTR)
 
         if not fmt_str:
-            logger.error("------ Error getting format string at 0x%x", fmt_str_ptr)
-            return None
+            raise LogDataError(f"Error getting format string at 0x{fmt_str_ptr:x}")
 
         args = self.process_one_fmt_str(fmt_str, logdata[offset:offset_end_of_args], string_tbl)
 
         fmt_str = formalize_fmt_string(fmt_str)
         log_msg = fmt_str % args
 
-        if level == 0:
-            print(f"{log_msg}", end='')
-        else:
-            log_prefix = f"[{timestamp:>10}] <{level_str}> {source_id_str}: "
-            print(f"{color}%s%s{Fore.RESET}" % (log_prefix, log_msg))
+        return LogMessage(level, timestamp, source_id_str, log_msg, extra_data)
 
-        if data_len > 0:
-            # Has hexdump data
-            self.print_hexdump(extra_data, len(log_prefix), color)
 
-        # Point to next message
-        return next_msg_offset
+    def get_msg_size(self, logdata, offset):
+        """Return the size of the message at offset in logdata, or None
+        if logdata does not contain enough of the message to tell"""
+        type_size = struct.calcsize(self.fmt_msg_type)
+        if len(logdata) < offset + type_size:
+            return None
 
+        msg_type = struct.unpack_from(self.fmt_msg_type, logdata, offset)[0]
 
-    def parse_log_data(self, logdata, debug=False):
-        """Parse binary log data and print the encoded log messages"""
-        offset = 0
+        if msg_type == MSG_TYPE_DROPPED:
+            return type_size + struct.calcsize(self.fmt_dropped_cnt)
 
-        while offset < len(logdata):
-            # Get message type
-            msg_type = struct.unpack_from(self.fmt_msg_type, logdata, offset)[0]
-            offset += struct.calcsize(self.fmt_msg_type)
+        if msg_type == MSG_TYPE_NORMAL:
+            hdr_size = struct.calcsize(self.fmt_msg_hdr)
+            if len(logdata) < offset + type_size + hdr_size:
+                return None
 
-            if msg_type == MSG_TYPE_DROPPED:
-                num_dropped = struct.unpack_from(self.fmt_dropped_cnt, logdata, offset)
-                offset += struct.calcsize(self.fmt_dropped_cnt)
+            log_desc, _ = struct.unpack_from(self.fmt_msg_hdr, logdata, offset + type_size)
+            pkg_len = (log_desc >> 6) & int(math.pow(2, 10) - 1)
+            data_len = (log_desc >> 16) & int(math.pow(2, 12) - 1)
 
-                print(f"--- {num_dropped} messages dropped ---")
+            return (type_size + hdr_size + struct.calcsize(self.fmt_msg_timestamp)
+                    + pkg_len + data_len)
 
-            elif msg_type == MSG_TYPE_NORMAL:
-                ret = self.parse_one_normal_msg(logdata, offset)
-                if ret is None:
-                    return False
+        raise LogDataError(f"Unknown message type: {msg_type}")
 
-                offset = ret
 
-            else:
-                logger.error("------ Unknown message type: %s", msg_type)
-                return False
+    def decode_msg(self, logdata, offset):
+        """Decode the complete message at offset in logdata"""
+        # Get message type
+        msg_type = struct.unpack_from(self.fmt_msg_type, logdata, offset)[0]
+        offset += struct.calcsize(self.fmt_msg_type)
+
+        if msg_type == MSG_TYPE_DROPPED:
+            num_dropped = struct.unpack_from(self.fmt_dropped_cnt, logdata, offset)[0]
+            return DroppedMessages(num_dropped)
+
+        if msg_type == MSG_TYPE_NORMAL:
+            return self.decode_one_normal_msg(logdata, offset)
 
-        return True
+        raise LogDataError(f"Unknown message type: {msg_type}")
 
 colorama.init()
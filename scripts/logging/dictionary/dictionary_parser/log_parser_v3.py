@@ -15,16 +15,18 @@ This contains the implementation of the parser for
 version 3 databases.
 """
 
-import logging
 import struct
 
 import colorama
-from colorama import Fore
 
 from .data_types import DataTypes
-from .log_parser import LogParser, formalize_fmt_string, get_log_level_str_color
-
-HEX_BYTES_IN_LINE = 16
+from .log_parser import (
+    DroppedMessages,
+    LogDataError,
+    LogMessage,
+    LogParser,
+    formalize_fmt_string,
+)
 
 # Need to keep sync with struct log_dict_output_msg_hdr in
 # include/logging/log_output_dict.h.
@@ -60,9 +62,6 @@ MSG_TYPE_DROPPED = 1
 FMT_DROPPED_CNT = "H"
 
 
-logger = logging.getLogger("parser")
-
-
 class LogParserV3(LogParser):
     """Log Parser V1"""
     def __init__(self, database):
@@ -232,37 +231,8 @@ class LogParserV3(LogParser):
         return tbl
 
 
-    @staticmethod
-    def print_hexdump(hex_data, prefix_len, color):
-        """Print hex dump"""
-        hex_vals = ""
-        chr_vals = ""
-        chr_done = 0
-
-        for one_hex in hex_data:
-            hex_vals += f'{one_hex:02x} '
-            chr_vals += chr(one_hex)
-            chr_done += 1
-
-            if chr_done == HEX_BYTES_IN_LINE / 2:
-                hex_vals += " "
-                chr_vals += " "
-
-            elif chr_done == HEX_BYTES_IN_LINE:
-                print(f"{color}%s%s|%s{Fore.RESET}" % ((" " * prefix_len),
-                      hex_vals, chr_vals))
-                hex_vals = ""
-                chr_vals = ""
-                chr_done = 0
-
-        if len(chr_vals) > 0:
-            hex_padding = "   " * (HEX_BYTES_IN_LINE - chr_done)
-            print(f"{color}%s%s%s|%s{Fore.RESET}" % ((" " * prefix_len),
-                  hex_vals, hex_padding, chr_vals))
-
-
-    def parse_one_normal_msg(self, logdata, offset):
-        """Parse one normal log message and print the encoded message"""
+    def decode_one_normal_msg(self, logdata, offset):
+        """Decode one normal log message"""
         # Parse log message header
         domain_lvl, pkg_len, data_len, source_id = struct.unpack_from(self.fmt_msg_hdr,
                                                                       logdata, offset)
@@ -279,10 +249,9 @@ class LogParserV3(LogParser):
             domain_id = domain_lvl & 0x0F
             level = (domain_lvl >> 4) & 0x0F
 
-        level_str, color = get_log_level_str_color(level)
         source_id_str = self.database.get_log_source_string(domain_id, source_id)
 
-        # Skip over data to point to next message (save as return value)
+        # End of the message, after the extra data
         next_msg_offset = offset + pkg_len + data_len
 
         # Offset from beginning of cbprintf_packaged data to end of va_list arguments
@@ -291,7 +260,7 @@ class LogParserV3(LogParser):
         offset_end_of_args += offset
 
         # Extra data after packaged log
-        extra_data = logdata[(offset + pkg_len):next_msg_offset]
+        extra_data = bytes(logdata[(offset + pkg_len):next_msg_offset])
 
         # Number of appended strings in package
         num_packed_strings = struct.unpack_from("B", logdata, offset+1)[0]
@@ -308,8 +277,7 @@ class LogParserV3(LogParser):
         string_tbl = self.extract_string_table(logdata[offset_end_of_args:(offset + pkg_len)])
 
         if len(string_tbl) != num_packed_strings:
-            logger.error("------ Error extracting string table")
-            return None
+            raise LogDataError("Error extracting string table")
 
         # Skip packaged string header
         offset += self.data_types.get_sizeof(DataTypes.PTR)
@@ -328,55 +296,55 @@ class LogParserV3(LogParser):
         offset += self.data_types.get_sizeof(DataTypes.PTR)
 
         if not fmt_str:
-            logger.error("------ Error getting format string at 0x%x", fmt_str_ptr)
-            return None
+            raise LogDataError(f"Error getting format string at 0x{fmt_str_ptr:x}")
 
         args = self.process_one_fmt_str(fmt_str, logdata[offset:offset_end_of_args], string_tbl)
 
         fmt_str = formalize_fmt_string(fmt_str)
         log_msg = fmt_str % args
 
-        if level == 0:
-            print(f"{log_msg}", end='')
-            log_prefix = ""
-        else:
-            log_prefix = f"[{timestamp:>10}] <{level_str}> {source_id_str}: "
-            print(f"{color}%s%s{Fore.RESET}" % (log_prefix, log_msg))
+        return LogMessage(level, timestamp, source_id_str, log_msg, extra_data)
 
-        if data_len > 0:
-            # Has hexdump data
-            self.print_hexdump(extra_data, len(log_prefix), color)
 
-        # Point to next message
-        return next_msg_offset
+    def get_msg_size(self, logdata, offset):
+        """Return the size of the message at offset in logdata, or None
+        if logdata does not contain enough of the message to tell"""
+        type_size = struct.calcsize(self.fmt_msg_type)
+        if len(logdata) < offset + type_size:
+            return None
 
+        msg_type = struct.unpack_from(self.fmt_msg_type, logdata, offset)[0]
 
-    def parse_log_data(self, logdata, debug=False):
-        """Parse binary log data and print the encoded log messages"""
-        offset = 0
+        if msg_type == MSG_TYPE_DROPPED:
+            return type_size + struct.calcsize(self.fmt_dropped_cnt)
 
-        while offset < len(logdata):
-            # Get message type
-            msg_type = struct.unpack_from(self.fmt_msg_type, logdata, offset)[0]
-            offset += struct.calcsize(self.fmt_msg_type)
+        if msg_type == MSG_TYPE_NORMAL:
+            hdr_size = struct.calcsize(self.fmt_msg_hdr)
+            if len(logdata) < offset + type_size + hdr_size:
+                return None
 
-            if msg_type == MSG_TYPE_DROPPED:
-                num_dropped = struct.unpack_from(self.fmt_dropped_cnt, logdata, offset)
-                offset += struct.calcsize(self.fmt_dropped_cnt)
+            _, pkg_len, data_len, _ = struct.unpack_from(self.fmt_msg_hdr, logdata,
+                                                         offset + type_size)
 
-                print(f"--- {num_dropped} messages dropped ---")
+            return (type_size + hdr_size + struct.calcsize(self.fmt_msg_timestamp)
+                    + pkg_len + data_len)
 
-            elif msg_type == MSG_TYPE_NORMAL:
-                ret = self.parse_one_normal_msg(logdata, offset)
-                if ret is None:
-                    return False
+        raise LogDataError(f"Unknown message type: {msg_type}")
 
-                offset = ret
 
-            else:
-                logger.error("------ Unknown message type: %s", msg_type)
-                return False
+    def decode_msg(self, logdata, offset):
+        """Decode the complete message at offset in logdata"""
+        # Get message type
+        msg_type = struct.unpack_from(self.fmt_msg_type, logdata, offset)[0]
+        offset += struct.calcsize(self.fmt_msg_type)
+
+        if msg_type == MSG_TYPE_DROPPED:
+            num_dropped = struct.unpack_from(self.fmt_dropped_cnt, logdata, offset)[0]
+            return DroppedMessages(num_dropped)
+
+        if msg_type == MSG_TYPE_NORMAL:
+            return self.decode_one_normal_msg(logdata, offset)
 
-        return True
+        raise LogDataError(f"Unknown message type: {msg_type}")
 
 colorama.init()
@@ -13,16 +13,16 @@ import binascii
 
 def convert_hex_file_to_bin(hexfile):
     """This converts a file in hexadecimal to binary"""
-    bin_data = b''
+    bin_data = bytearray()
 
     with open(hexfile, encoding="iso-8859-1") as hfile:
-        for line in hfile.readlines():
+        for line in hfile:
             hex_str = line.strip()
 
             bin_str = binascii.unhexlify(hex_str)
             bin_data += bin_str
 
-    return bin_data
+    return bytes(bin_data)
 
 
 def extract_one_string_in_section(section, str_ptr):
@@ -34,13 +34,12 @@ def extract_one_string_in_section(section, str_ptr):
     if offset < 0 or offset >= max_offset:
         return None
 
-    ret_str = ""
+    end = data.find(b'\0', offset, max_offset)
+    if end < 0:
+        end = max_offset
 
-    while (offset < max_offset) and (data[offset] != 0):
-        ret_str += chr(data[offset])
-        offset += 1
-
-    return ret_str
+    # Each byte is one character, as with chr()
+    return str(memoryview(data)[offset:end], "iso-8859-1")
 
 
 def find_string_in_mappings(string_mappings, str_ptr):
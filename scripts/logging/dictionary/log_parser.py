@@ -14,10 +14,12 @@ log data and print the log messages.
 
 import argparse
 import binascii
+import functools
+import itertools
 import logging
+import re
 import sys
 
-import dictionary_parser
 import parserlib
 
 LOGGER_FORMAT = "%(message)s"
@@ -25,6 +27,11 @@ logger = logging.getLogger("parser")
 
 LOG_HEX_SEP = "##ZLOGV1##"
 
+HEX_DIGITS_RE = re.compile(r"[0-9a-fA-F]*")
+
+# Size of the chunks binary log data is read and decoded in
+READ_CHUNK_SIZE = 64 * 1024
+
 
 def parse_args():
     """Parse command line arguments"""
@@ -42,61 +49,99 @@ def parse_args():
     return argparser.parse_args()
 
 
-def read_log_file(args):
+def read_raw_hex_log(logfile):
     """
-    Read the log from file
+    Read a log file with only hexadecimal log data. This is a generator
+    of chunks of binary log data.
     """
-    logdata = None
-    hexdata = ''
+    logdata = bytearray()
 
-    # Open log data file for reading
-    if args.hex:
-        if args.rawhex:
-            # Simply log file with only hexadecimal data
-            logdata = dictionary_parser.utils.convert_hex_file_to_bin(args.logfile)
+    with open(logfile, encoding="iso-8859-1") as hexfile:
+        for line in hexfile:
+            logdata += binascii.unhexlify(line.strip())
+
+            if len(logdata) >= READ_CHUNK_SIZE:
+                yield bytes(logdata)
+                logdata.clear()
+
+    if logdata:
+        yield bytes(logdata)
+
+
+def read_hex_log(logfile):
+    """
+    Read the hexadecimal log data following LOG_HEX_SEP in a log file,
+    e.g. the output of QEMU. This is a generator of chunks of binary
+    log data.
+
+    Leading and trailing whitespace of each line is ignored, and the
+    lines are joined. The log data ends at the first character which is
+    not a hexadecimal digit, as there may be additional strings printed
+    by QEMU, west or ninja (for example, QEMU is terminated, or user
+    interrupted, etc).
+    """
+    with open(logfile, encoding="iso-8859-1") as hexfile:
+        lines = (line.strip() for line in hexfile)
+
+        # Find the start of log data, which may be split across lines
+        text = ""
+        for line in lines:
+            text += line
+
+            idx = text.find(LOG_HEX_SEP)
+            if idx >= 0:
+                text = text[idx + len(LOG_HEX_SEP):]
+                break
+
+            text = text[-(len(LOG_HEX_SEP) - 1):]
         else:
-            hexdata = ''
+            logger.error("ERROR: Cannot find start of log data, exiting...")
+            sys.exit(1)
 
-            with open(args.logfile, encoding="iso-8859-1") as hexfile:
-                for line in hexfile.readlines():
-                    hexdata += line.strip()
+        # Hexadecimal digits not converted yet. Bytes may be split
+        # across lines.
+        hexdata = ""
 
-            if LOG_HEX_SEP not in hexdata:
-                logger.error("ERROR: Cannot find start of log data, exiting...")
-                sys.exit(1)
+        for line in itertools.chain([text], lines):
+            valid_len = HEX_DIGITS_RE.match(line).end()
+            hexdata += line[:valid_len]
 
-            idx = hexdata.index(LOG_HEX_SEP) + len(LOG_HEX_SEP)
-            hexdata = hexdata[idx:]
+            end_of_data = valid_len < len(line)
 
-            if len(hexdata) % 2 != 0:
+            if end_of_data or len(hexdata) >= 2 * READ_CHUNK_SIZE:
                 # Make sure there are even number of characters
-                idx = int(len(hexdata) / 2) * 2
-                hexdata = hexdata[:idx]
-
-            idx = 0
-            while idx < len(hexdata):
-                # When running QEMU via west or ninja, there may be additional
-                # strings printed by QEMU, west or ninja (for example, QEMU
-                # is terminated, or user interrupted, etc). So we need to
-                # figure out where the end of log data stream by
-                # trying to convert from hex to bin.
-                idx += 2
-
-                try:
-                    binascii.unhexlify(hexdata[:idx])
-                except binascii.Error:
-                    idx -= 2
-                    break
-
-            logdata = binascii.unhexlify(hexdata[:idx])
-    else:
-        with open(args.logfile, "rb") as logfile:
-            if not logfile:
-                logger.error(f"ERROR: Cannot open binary log data file: {args.logfile}, exiting...")
-                sys.exit(1)
-            logdata = logfile.read()
+                idx = len(hexdata) // 2 * 2
+                if idx > 0:
+                    yield binascii.unhexlify(hexdata[:idx])
+                hexdata = hexdata[idx:]
+
+            if end_of_data:
+                return
+
+        idx = len(hexdata) // 2 * 2
+        if idx > 0:
+            yield binascii.unhexlify(hexdata[:idx])
 
-    return logdata
+
+def read_log_file(args):
+    """
+    Read the log from file. This is a generator of chunks of binary
+    log data, which are decoded as they are read.
+    """
+    # Open log data file for reading
+    if args.hex:
+        if args.rawhex:
+            # Simply log file with only hexadecimal data
+            yield from read_raw_hex_log(args.logfile)
+        else:
+            yield from read_hex_log(args.logfile)
+    else:
+        try:
+            with open(args.logfile, "rb") as logfile:
+                yield from iter(functools.partial(logfile.read, READ_CHUNK_SIZE), b"")
+        except OSError:
+            logger.error(f"ERROR: Cannot read binary log data file: {args.logfile}, exiting...")
+            sys.exit(1)
 
 def main():
     """Main function of log parser"""
@@ -109,12 +154,12 @@ def main():
     else:
         logger.setLevel(logging.INFO)
 
-    logdata = read_log_file(args)
-    if logdata is None:
-        logger.error("ERROR: cannot read log from file: %s, exiting...", args.logfile)
-        sys.exit(1)
+    decoder = parserlib.LogDecoder(args.dbfile, logger)
+
+    for logdata in read_log_file(args):
+        decoder.print_log(logdata)
 
-    parserlib.parser(logdata, args.dbfile, logger)
+    decoder.finish()
 
 if __name__ == "__main__":
     main()
@@ -15,7 +15,6 @@ the log messages.
 import argparse
 import logging
 import sys
-import time
 
 import parserlib
 import serial
@@ -50,15 +49,15 @@ def main():
     else:
         logger.setLevel(logging.INFO)
 
-    # Parse the log every second from serial port
+    decoder = parserlib.LogDecoder(args.dbfile, logger)
+
+    # Decode the log as it arrives on the serial port. Each read blocks
+    # until there is data, and then returns all data available.
     with serial.Serial(args.serialPort, args.baudrate) as ser:
-        ser.timeout = 2
         while True:
-            size = ser.inWaiting()
-            if size:
-                data = ser.read(size)
-                parserlib.parser(data, args.dbfile, logger)
-            time.sleep(1)
+            data = ser.read(max(ser.in_waiting, 1))
+            decoder.print_log(data)
+            sys.stdout.flush()
 
 if __name__ == "__main__":
     main()
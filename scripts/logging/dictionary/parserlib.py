@@ -17,26 +17,34 @@ import sys
 
 import dictionary_parser
 from dictionary_parser.log_database import LogDatabase
+from dictionary_parser.log_parser import LogDataError
 
 
-def parser(logdata, dbfile, logger):
-    """function of serial parser"""
-    # Read from database file
-    database = LogDatabase.read_json_database(dbfile)
+class LogDecoder:
+    """Incremental decoder of binary log data
 
-    if not isinstance(logger, logging.Logger):
-        raise ValueError("Invalid logger instance. Please configure the logger!")
+    The database is read once, when the decoder is created. Log data
+    can then be passed to feed() in chunks of any size, e.g. as read
+    from a serial port. Messages split across chunks are kept until
+    they are complete."""
 
-    if database is None:
-        logger.error("ERROR: Cannot open database file:  exiting...")
-        sys.exit(1)
+    def __init__(self, dbfile, logger):
+        if not isinstance(logger, logging.Logger):
+            raise ValueError("Invalid logger instance. Please configure the logger!")
 
-    if logdata is None:
-        logger.error("ERROR: cannot read log from file:  exiting...")
-        sys.exit(1)
+        self.logger = logger
+
+        # Read from database file
+        database = LogDatabase.read_json_database(dbfile)
+        if database is None:
+            logger.error("ERROR: Cannot open database file:  exiting...")
+            sys.exit(1)
+
+        self.log_parser = dictionary_parser.get_parser(database)
+        if self.log_parser is None:
+            logger.error("ERROR: Cannot find a suitable parser matching database version!")
+            sys.exit(1)
 
-    log_parser = dictionary_parser.get_parser(database)
-    if log_parser is not None:
         logger.debug("# Build ID: %s", database.get_build_id())
         logger.debug("# Target: %s, %d-bit", database.get_arch(), database.get_tgt_bits())
         if database.is_tgt_little_endian():
@@ -44,9 +52,55 @@ def parser(logdata, dbfile, logger):
         else:
             logger.debug("# Endianness: Big")
 
-        ret = log_parser.parse_log_data(logdata)
-        if not ret:
-            logger.error("ERROR: there were error(s) parsing log data")
+        # Log data not decoded yet, starting with an incomplete message
+        self.pending = bytearray()
+
+    def feed(self, logdata):
+        """Add log data and decode the messages completed by it.
+
+        The data is added right away. The returned generator decodes the
+        messages, see dictionary_parser.log_parser.LogParser.decode_msg(),
+        and raises LogDataError for invalid log data. Messages that are
+        not consumed from it are decoded again by the next feed()."""
+        self.pending += logdata
+        return self._decode_pending()
+
+    def _decode_pending(self):
+        offset = 0
+        try:
+            for msg, next_offset in self.log_parser.decode_log_data(self.pending):
+                offset = next_offset
+                yield msg
+        finally:
+            # Drop the messages that have been yielded
+            del self.pending[:offset]
+
+    def print_log(self, logdata):
+        """Add log data and print the messages completed by it.
+        Exits on invalid log data."""
+        try:
+            for msg in self.feed(logdata):
+                self.log_parser.print_msg(msg)
+        except LogDataError as e:
+            self.logger.error("------ %s", e)
+            self.logger.error("ERROR: there were error(s) parsing log data")
+            sys.exit(1)
+
+    def finish(self):
+        """Check that all log data has been decoded. Exits if there
+        is an incomplete message left."""
+        if self.pending:
+            self.logger.error("------ Incomplete message at end of log data")
+            self.logger.error("ERROR: there were error(s) parsing log data")
             sys.exit(1)
-    else:
-        logger.error("ERROR: Cannot find a suitable parser matching database version!")
+
+
+def parser(logdata, dbfile, logger):
+    """function of serial parser"""
+    if logdata is None:
+        logger.error("ERROR: cannot read log from file:  exiting...")
+        sys.exit(1)
+
+    decoder = LogDecoder(dbfile, logger)
+    decoder.print_log(logdata)
+    decoder.finish()
@@ -101,8 +101,10 @@ class TwisterConfigParser:
         self.scenarios: dict[str, Any] = {}
         self.common: dict[str, Any] = {}
 
-    def load(self) -> dict[str, Any]:
-        data = scl.yaml_load_verify(self.filename, self.schema)
+    def load(self, data: dict[str, Any] | None = None) -> dict[str, Any]:
+        """Load and validate the yaml file, or use already validated data"""
+        if data is None:
+            data = scl.yaml_load_verify(self.filename, self.schema)
         self.data = data
 
         if 'tests' in self.data:
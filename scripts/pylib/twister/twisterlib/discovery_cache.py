@@ -0,0 +1,152 @@
+# Copyright The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+
+import twisterlib.testsuite
+
+logger = logging.getLogger('twister')
+
+
+class DiscoveryCache:
+    """Persistent cache of test discovery results.
+
+    Stores the validated content of testsuite yaml files and the ztest scan
+    results of every C source file, so a warm discovery only parses files
+    that changed since the previous run.
+
+    Entries are keyed by the absolute file path. A file whose mtime and
+    size are unchanged is a hit. Otherwise its content hash is compared
+    with the recorded one, so touched but unmodified files are still hits.
+
+    The whole cache is dropped when the testsuite schema, the source scanner
+    or the cache format changes.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path, schema=None):
+        self.path = os.path.abspath(path)
+        self.key = self._compute_key(schema)
+        self.hits = 0
+        self.misses = 0
+        # path -> ((mtime_ns, size), content digest, pickled value)
+        self._yaml_entries: dict[str, tuple] = {}
+        self._scan_entries: dict[str, tuple] = {}
+        # entries written since the last take_updates()
+        self._updates: dict[str, dict[str, tuple]] = {'yaml': {}, 'scan': {}}
+        self._dirty = False
+
+    @classmethod
+    def _compute_key(cls, schema) -> str:
+        key = hashlib.sha256(f"{cls.VERSION}".encode())
+        key.update(json.dumps(schema, sort_keys=True, default=str).encode())
+        # Results of scan_file() depend on the scanner implementation.
+        with open(twisterlib.testsuite.__file__, 'rb') as fp:
+            key.update(fp.read())
+        return key.hexdigest()
+
+    @staticmethod
+    def _digest(path) -> str:
+        with open(path, 'rb') as fp:
+            return hashlib.sha256(fp.read()).hexdigest()
+
+    def load(self) -> None:
+        try:
+            with open(self.path, 'rb') as fp:
+                data = pickle.load(fp)
+        except FileNotFoundError:
+            logger.debug(f"No discovery cache at {self.path}")
+            return
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable discovery cache {self.path}: {e}")
+            return
+
+        if not isinstance(data, dict) or data.get('key') != self.key:
+            logger.info(f"Discovery cache {self.path} is outdated, rebuilding it")
+            self._dirty = True
+            return
+
+        self._yaml_entries = data['yaml']
+        self._scan_entries = data['scan']
+        logger.debug(
+            f"Loaded discovery cache {self.path} with {len(self._yaml_entries)} yaml"
+            f" and {len(self._scan_entries)} source file entries"
+        )
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        data = {'key': self.key, 'yaml': self._yaml_entries, 'scan': self._scan_entries}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as fp:
+            pickle.dump(data, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def _entries(self, kind):
+        return self._yaml_entries if kind == 'yaml' else self._scan_entries
+
+    def _store(self, kind, path, entry):
+        self._entries(kind)[path] = entry
+        self._updates[kind][path] = entry
+        self._dirty = True
+
+    def _cached(self, kind, path, compute):
+        entries = self._entries(kind)
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        entry = entries.get(path)
+        if entry is not None and entry[0] == stamp:
+            self.hits += 1
+            return pickle.loads(entry[2])
+
+        digest = self._digest(path)
+        if entry is not None and entry[1] == digest:
+            self.hits += 1
+            self._store(kind, path, (stamp, digest, entry[2]))
+            return pickle.loads(entry[2])
+
+        self.misses += 1
+        value = compute(path)
+        # Values are kept pickled, callers always get a private copy.
+        self._store(
+            kind, path, (stamp, digest, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        )
+        return value
+
+    def load_config(self, parser):
+        """Load a TwisterConfigParser, reusing the cached yaml content."""
+        data = self._cached('yaml', parser.filename, lambda _: parser.load())
+        return parser.load(data=data)
+
+    def scan_file(self, filename) -> twisterlib.testsuite.ScanPathResult:
+        return self._cached('scan', filename, twisterlib.testsuite.scan_file)
+
+    def take_updates(self) -> dict:
+        """Return and forget the entries written and the hits and misses
+        counted since the previous call, to be merged into the cache of the
+        main process by a discovery worker."""
+        updates = dict(self._updates, hits=self.hits, misses=self.misses)
+        self._updates = {'yaml': {}, 'scan': {}}
+        self.hits = self.misses = 0
+        return updates
+
+    def merge_updates(self, updates) -> None:
+        for kind in ('yaml', 'scan'):
+            for path, entry in updates[kind].items():
+                self._store(kind, path, entry)
+        self.hits += updates['hits']
+        self.misses += updates['misses']
+
+    def stats(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses"
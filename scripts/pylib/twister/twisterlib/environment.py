@@ -337,6 +337,20 @@ structure in the main Zephyr tree: boards/<vendor>/<board_name>/""")
              "This option is useful when running a large number of tests on "
              "different hosts to speed up execution time.")
 
+    parser.add_argument(
+        "--subset-mode", choices=['count', 'duration'], default='count',
+        help="How --subset splits the test configurations. 'count' gives every "
+             "subset the same number of configurations. 'duration' balances "
+             "the build and run time predicted from --subset-history, so that "
+             "all subsets finish at about the same time. Default: count.")
+
+    parser.add_argument(
+        "--subset-history", action="append", metavar="FILENAME", default=[],
+        help="twister.json report of an earlier run providing build and run "
+             "times for --subset-mode duration. May be given multiple times, "
+             "times of a configuration found in several reports are averaged. "
+             "All subsets must be given the same reports.")
+
     parser.add_argument(
         "--shuffle-tests", action="store_true", default=None,
         help="""Shuffle test execution order to get randomly distributed tests across subsets.
@@ -418,6 +432,26 @@ structure in the main Zephyr tree: boards/<vendor>/<board_name>/""")
         "--device-serial-baud", action="store", default=None,
         help="Serial device baud rate (default 115200)")
 
+    parser.add_argument(
+        "--discovery-cache", metavar="FILENAME",
+        help="Cache the parsed testsuite yaml files and the test cases found "
+             "in the test sources in FILENAME, and reuse them in later runs. "
+             "Only files modified since the previous run are parsed again. "
+             "The cache is rebuilt when the testsuite schema changes.")
+
+    parser.add_argument(
+        "--discovery-jobs", type=int, metavar="N",
+        help="Number of worker processes parsing testsuite yaml files and "
+             "scanning test sources, defaults to number of CPU threads. "
+             "Use 1 to discover test suites in the twister process.")
+
+    parser.add_argument(
+        "--disable-board-filter-cache", action="store_true",
+        help="Always run CMake for each test suite to evaluate its devicetree and "
+             "Kconfig based filter. By default the devicetree and Kconfig data of "
+             "a board are reused for test suites without their own overlays, "
+             "Kconfig files or extra arguments.")
+
     parser.add_argument(
         "--disable-suite-name-check", action="store_true", default=False,
         help="Disable extended test suite name verification at the beginning "
@@ -535,6 +569,15 @@ structure in the main Zephyr tree: boards/<vendor>/<board_name>/""")
         help="Ignore all other command line options and just produce a report to "
              "stdout with ROM/RAM section sizes on the specified binary images.")
 
+    parser.add_argument(
+        "--handler-io", choices=['thread', 'selector'], default='thread',
+        help="How the QEMU and native simulator handlers follow the output of "
+             "a test. 'thread' reads the output from helper threads, one byte "
+             "or one line at a time. 'selector' waits for the output FIFO or "
+             "pipe and the test process with a selector in the handler thread "
+             "and reads the output in chunks. 'selector' is only available on "
+             "POSIX hosts. Default: thread.")
+
     parser.add_argument(
         "-i", "--inline-logs", action="store_true",
         help="Upon test failure, print relevant log data to stdout "
@@ -661,6 +704,15 @@ structure in the main Zephyr tree: boards/<vendor>/<board_name>/""")
                         that support this feature (currently only Linux).
                         """)
 
+    parser.add_argument(
+        "--pipeline-transport", choices=['manager', 'pipe'], default='manager',
+        help="How pipeline workers exchange tasks and results. 'manager' uses "
+             "queues proxied by a multiprocessing manager process and one "
+             "synchronized value per counter. 'pipe' keeps the queues in the "
+             "main process and batches each worker's queue operations into "
+             "one message per task, with all counters in a single shared "
+             "memory array. Default: manager.")
+
     parser.add_argument(
             "--vendor", action="append", default=[],
             help="Vendor filter for testing")
@@ -739,6 +791,19 @@ structure in the main Zephyr tree: boards/<vendor>/<board_name>/""")
         "--retry-build-errors", action="store_true",
         help="Retry build errors as well.")
 
+    parser.add_argument(
+        "--scheduler", choices=['lifo', 'cost'], default='lifo',
+        help="Order in which the pipeline workers pick up their tasks. 'lifo' "
+             "processes tasks in reverse insertion order. 'cost' starts the "
+             "configurations with the longest estimated build and run time "
+             "first, using --scheduler-history when available. Default: lifo.")
+
+    parser.add_argument(
+        "--scheduler-history", action="append", metavar="FILENAME", default=[],
+        help="twister.json report of an earlier run providing build and run "
+             "times for --scheduler cost. May be given multiple times, times "
+             "of a configuration found in several reports are averaged.")
+
     parser.add_argument(
         "-S", "--enable-slow", action="store_true",
         default="--enable-slow-only" in sys.argv,
@@ -972,6 +1037,18 @@ def parse_arguments(
         logger.error("--device-flash-with-test does not apply when --flash-before is used")
         sys.exit(1)
 
+    if options.scheduler_history and options.scheduler != 'cost':
+        logger.error("--scheduler-history requires --scheduler cost")
+        sys.exit(1)
+
+    if options.subset_mode == 'duration' and options.subset is None:
+        logger.error("--subset-mode duration requires --subset")
+        sys.exit(1)
+
+    if options.subset_history and options.subset_mode != 'duration':
+        logger.error("--subset-history requires --subset-mode duration")
+        sys.exit(1)
+
     if options.shuffle_tests and options.subset is None:
         logger.error("--shuffle-tests requires --subset")
         sys.exit(1)
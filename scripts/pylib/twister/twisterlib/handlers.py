@@ -14,6 +14,7 @@ import math
 import os
 import re
 import select
+import selectors
 import shlex
 import signal
 import subprocess
@@ -68,6 +69,48 @@ def terminate_process(proc):
     proc.kill()
 
 
+class OutputReader:
+    """Follows the output of a test from a pipe or FIFO with a selector.
+
+    Output is read in chunks as soon as it is available and split into lines,
+    so a handler can wait for it in its own thread, without a reader thread
+    and without a system call per byte.
+    """
+
+    CHUNK_SIZE = 65536
+
+    def __init__(self, fd):
+        self.fd = fd
+        # incomplete last line, without end of line
+        self.partial = b""
+        self.eof = False
+        os.set_blocking(fd, False)
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(fd, selectors.EVENT_READ)
+
+    def read_lines(self, timeout):
+        """Wait up to timeout seconds for output and return the complete
+        lines read, with their end of line. None is returned if nothing was
+        received in time. At end of file, eof is set and the incomplete last
+        line is left in partial.
+        """
+        if timeout < 0 or not self.selector.select(timeout):
+            return None
+        try:
+            data = os.read(self.fd, self.CHUNK_SIZE)
+        except BlockingIOError:
+            return []
+        if not data:
+            self.eof = True
+            return []
+        lines = (self.partial + data).split(b"\n")
+        self.partial = lines.pop()
+        return [line + b"\n" for line in lines]
+
+    def close(self):
+        self.selector.close()
+
+
 class Handler:
     def __init__(self, instance, type_str: str, options: argparse.Namespace,
                  generator_cmd: str | None = None, suite_name_check: bool = True):
@@ -104,6 +147,9 @@ class Handler:
         terminate_process(proc)
         self.terminated = True
 
+    def use_selector(self):
+        return self.options.handler_io == 'selector' and os.name == 'posix'
+
     def _verify_ztest_suite_name(self, harness_status, detected_suite_names, handler_time):
         """
         If test suite names was found in test's C source code, then verify if
@@ -209,9 +255,18 @@ class BinaryHandler(Handler):
     def _output_reader(self, proc):
         self.line = proc.stdout.readline()
 
-    def _output_handler(self, proc, harness):
+    def _handle_output_line(self, line, log_out_fp, harness):
         suffix = '\\r\\n'
 
+        line_decoded = line.decode('utf-8', "replace")
+        stripped_line = line_decoded.rstrip()
+        if stripped_line.endswith(suffix):
+            stripped_line = stripped_line[:-len(suffix)].rstrip()
+        logger.debug(f"OUTPUT: {stripped_line}")
+        log_out_fp.write(strip_ansi_sequences(line_decoded))
+        harness.handle(stripped_line)
+
+    def _output_handler(self, proc, harness):
         with open(self.log, "w") as log_out_fp:
             timeout_extended = False
             timeout_time = time.time() + self.get_test_timeout()
@@ -223,14 +278,8 @@ class BinaryHandler(Handler):
                 reader_t.start()
                 reader_t.join(this_timeout)
                 if not reader_t.is_alive() and self.line != b"":
-                    line_decoded = self.line.decode('utf-8', "replace")
-                    stripped_line = line_decoded.rstrip()
-                    if stripped_line.endswith(suffix):
-                        stripped_line = stripped_line[:-len(suffix)].rstrip()
-                    logger.debug(f"OUTPUT: {stripped_line}")
-                    log_out_fp.write(strip_ansi_sequences(line_decoded))
+                    self._handle_output_line(self.line, log_out_fp, harness)
                     log_out_fp.flush()
-                    harness.handle(stripped_line)
                     if (
                         harness.status != TwisterStatus.NONE
                         and not timeout_extended
@@ -251,6 +300,40 @@ class BinaryHandler(Handler):
             except subprocess.TimeoutExpired:
                 self.terminate(proc)
 
+    def _serve_output(self, proc, harness):
+        """Same as _output_handler, waiting for the output with an OutputReader
+        instead of a reader thread per line."""
+        reader = OutputReader(proc.stdout.fileno())
+        with open(self.log, "w") as log_out_fp:
+            timeout_extended = False
+            timeout_time = time.time() + self.get_test_timeout()
+            while not reader.eof:
+                lines = reader.read_lines(timeout_time - time.time())
+                if lines is None:
+                    break
+                if reader.eof and reader.partial:
+                    lines.append(reader.partial)
+                for line in lines:
+                    self._handle_output_line(line, log_out_fp, harness)
+                    if (
+                        harness.status != TwisterStatus.NONE
+                        and not timeout_extended
+                        or harness.capture_coverage
+                    ):
+                        timeout_extended = True
+                        if harness.capture_coverage:
+                            timeout_time = time.time() + 30
+                        else:
+                            timeout_time = time.time() + 2
+                log_out_fp.flush()
+            reader.close()
+            try:
+                # POSIX arch based ztests end on their own,
+                # so let's give it up to 100ms to do so
+                proc.wait(0.1)
+            except subprocess.TimeoutExpired:
+                self.terminate(proc)
+
     def _create_command(self, robot_test):
 
         if robot_test:
@@ -359,13 +442,18 @@ class BinaryHandler(Handler):
         with open(stderr_log, "w+") as stderr_log_fp, subprocess.Popen(
             command, stdout=subprocess.PIPE, stderr=stderr_log_fp, cwd=self.build_dir, env=env
         ) as proc:
-            logger.debug(f"Spawning BinaryHandler Thread for {self.name}")
-            t = threading.Thread(target=self._output_handler, args=(proc, harness,), daemon=True)
-            t.start()
-            t.join()
-            if t.is_alive():
-                self.terminate(proc)
+            if self.use_selector():
+                self._serve_output(proc, harness)
+            else:
+                logger.debug(f"Spawning BinaryHandler Thread for {self.name}")
+                t = threading.Thread(
+                    target=self._output_handler, args=(proc, harness,), daemon=True
+                )
+                t.start()
                 t.join()
+                if t.is_alive():
+                    self.terminate(proc)
+                    t.join()
             proc.wait()
             self.returncode = proc.returncode
             if proc.returncode != 0:
@@ -855,8 +943,14 @@ class QEMUHandler(Handler):
     We need to do this as once qemu starts, it runs forever until killed.
     Test cases emit special messages to the console as they run, we check
     for these to collect whether the test passed or failed.
+
+    With --handler-io selector, the pipes are monitored from the handler
+    thread instead.
     """
 
+    # how often 'make run' is checked for exit while QEMU is silent
+    PROC_POLL_INTERVAL = 0.5
+
     def __init__(
         self,
         instance,
@@ -1044,6 +1138,194 @@ class QEMUHandler(Handler):
         os.unlink(fifo_in)
         os.unlink(fifo_out)
 
+    def _read_pid(self):
+        if os.path.exists(self.pid_fn):
+            with open(self.pid_fn) as pid_file, contextlib.suppress(ValueError):
+                # the file may not be written completely yet
+                return int(pid_file.read())
+        return 0
+
+    def _serve_output(self, proc, reader, log_out_fp, harness, deadline):
+        """Same as _thread, waiting for the output with an OutputReader and
+        for 'make run' to end, in the handler thread.
+
+        QEMU's end of output is the end of 'make run', as both FIFOs are
+        opened read-write. Monitoring stops at the deadline of 'make run'
+        whatever the CPU time used by QEMU.
+
+        Return the status, the reason and the pid of QEMU.
+        """
+        timeout = self.get_test_timeout()
+        timeout_time = time.time() + timeout
+        _status = TwisterStatus.NONE
+        _reason = None
+        timeout_extended = False
+        pid = 0
+
+        while True:
+            if pid == 0:
+                pid = self._read_pid()
+
+            now = time.time()
+            if now >= deadline:
+                if _status == TwisterStatus.NONE:
+                    _status = TwisterStatus.FAIL
+                    _reason = "timeout"
+                break
+            this_timeout = timeout_time - now
+            if timeout_extended:
+                # Quit early after timeout extension if no more data is being received
+                this_timeout = min(this_timeout, 1)
+            wait = min(this_timeout, deadline - now, self.PROC_POLL_INTERVAL)
+            lines = reader.read_lines(wait)
+            if lines is None:
+                if proc.poll() is not None:
+                    # QEMU has exited and all of its output was read, this
+                    # shouldn't happen unless QEMU crashes
+                    if not self.ignore_unexpected_eof:
+                        _status = TwisterStatus.FAIL
+                        _reason = "unexpected eof"
+                    break
+                if wait < this_timeout:
+                    continue
+                try:
+                    if pid and this_timeout > 0:
+                        # there's possibility we polled nothing because
+                        # of not enough CPU time scheduled by host for
+                        # QEMU process during the wait
+                        cpu_time = QEMUHandler._get_cpu_time(pid)
+                        if cpu_time < timeout and _status == TwisterStatus.NONE:
+                            timeout_time = time.time() + (timeout - cpu_time)
+                            continue
+                except psutil.NoSuchProcess:
+                    pass
+                except ProcessLookupError:
+                    _status = TwisterStatus.FAIL
+                    _reason = "Execution error"
+                    break
+
+                if _status == TwisterStatus.NONE:
+                    _status = TwisterStatus.FAIL
+                    _reason = "timeout"
+                break
+
+            for line in lines:
+                if not line.isascii():
+                    break
+                line = line.decode()
+                log_out_fp.write(strip_ansi_sequences(line))
+                line = line.rstrip()
+                logger.debug(f"QEMU ({pid}): {line}")
+
+                harness.handle(line)
+                if harness.status != TwisterStatus.NONE:
+                    # if we have registered a fail make sure the status is not
+                    # overridden by a false success message coming from the
+                    # testsuite
+                    if _status != TwisterStatus.FAIL:
+                        _status = harness.status
+                        _reason = harness.reason
+
+                    # see _thread about the timeout extension
+                    if not timeout_extended or harness.capture_coverage:
+                        timeout_extended = True
+                        if harness.capture_coverage:
+                            timeout_time = time.time() + 30
+                        else:
+                            timeout_time = time.time() + 2
+            else:
+                log_out_fp.flush()
+                if reader.partial.isascii():
+                    continue
+
+            # Test is writing something weird, fail
+            log_out_fp.flush()
+            _status = TwisterStatus.FAIL
+            _reason = "unexpected byte"
+            break
+
+        return _status, _reason, pid
+
+    def _run_with_selector(self, harness, command):
+        """Run 'make run' and follow the QEMU output without a monitor thread,
+        see _serve_output. Return whether 'make run' timed out."""
+        fifo_in, fifo_out = QEMUHandler._thread_get_fifo_names(self.fifo_fn)
+
+        # These in/out nodes are named from QEMU's perspective, not ours
+        for fifo in (fifo_in, fifo_out):
+            if os.path.exists(fifo):
+                os.unlink(fifo)
+            os.mkfifo(fifo)
+
+        if sys.stdout.isatty():
+            subprocess.call(["stty", "sane"], stdin=sys.stdout)
+
+        logger.debug(f"Running {self.name} ({self.type_str})")
+
+        is_timeout = False
+
+        # Opening a FIFO read-write doesn't wait for the other end, QEMU
+        # opening its ends doesn't block either.
+        in_fd = os.open(fifo_in, os.O_RDWR)
+        out_fd = os.open(fifo_out, os.O_RDWR)
+        reader = OutputReader(out_fd)
+        try:
+            with open(self.stdout_fn, "w") as stdout_fp, \
+                open(self.stderr_fn, "w") as stderr_fp, \
+                open(self.log_fn, "w") as log_out_fp, subprocess.Popen(
+                command,
+                stdout=stdout_fp,
+                stderr=stderr_fp,
+                cwd=self.build_dir
+            ) as proc:
+                start_time = time.time()
+                deadline = start_time + self.get_test_timeout()
+                _status, _reason, pid = self._serve_output(
+                    proc, reader, log_out_fp, harness, deadline
+                )
+                handler_time = time.time() - start_time
+                logger.debug(
+                    f"QEMU ({pid}) complete with {_status} ({_reason}) after {handler_time} seconds"
+                )
+                QEMUHandler._thread_update_instance_info(self, handler_time, _status, _reason)
+
+                try:
+                    if time.time() >= deadline:
+                        raise subprocess.TimeoutExpired(command, self.get_test_timeout())
+                    # the pid file may have been written after the last output
+                    pid = pid or self._read_pid()
+                    if pid:
+                        with contextlib.suppress(ProcessLookupError, psutil.NoSuchProcess):
+                            os.kill(pid, signal.SIGTERM)
+                    proc.wait(max(deadline - time.time(), 0))
+                except subprocess.TimeoutExpired:
+                    # sometimes QEMU can't handle SIGTERM signal correctly
+                    # in that case kill -9 QEMU process directly and leave
+                    # twister to judge testing result by console output
+                    is_timeout = True
+                    self.terminate(proc)
+                    if harness.status == TwisterStatus.PASS:
+                        self.returncode = 0
+                    else:
+                        self.returncode = proc.returncode
+                else:
+                    logger.debug(f"No timeout, return code from QEMU ({pid}): {proc.returncode}")
+                    self.returncode = proc.returncode
+        finally:
+            reader.close()
+            os.close(in_fd)
+            os.close(out_fd)
+            os.unlink(fifo_in)
+            os.unlink(fifo_out)
+
+        qemu_pid = self._read_pid()
+        if os.path.exists(self.pid_fn):
+            os.unlink(self.pid_fn)
+
+        logger.debug(f"return code from QEMU ({qemu_pid or None}): {self.returncode}")
+
+        return is_timeout
+
     def _set_qemu_filenames(self, sysbuild_build_dir):
         # We pass this to QEMU which looks for fifos with .in and .out suffixes.
         # QEMU fifo will use main build dir
@@ -1082,6 +1364,12 @@ class QEMUHandler(Handler):
 
         self._set_qemu_filenames(domain_build_dir)
 
+        if self.use_selector():
+            is_timeout = self._run_with_selector(harness, command)
+            self._update_instance_info(harness, is_timeout)
+            self._final_handle_actions(harness, 0)
+            return
+
         self.thread = threading.Thread(name=self.name, target=QEMUHandler._thread,
                                        args=(self, self.get_test_timeout(), self.build_dir,
                                              self.log_fn, self.fifo_fn,
@@ -39,6 +39,7 @@ class Harness:
     RUN_PASSED = "PROJECT EXECUTION SUCCESSFUL"
     RUN_FAILED = "PROJECT EXECUTION FAILED"
     run_id_pattern = r"RunID: (?P<run_id>[0-9A-Fa-f]+)"
+    run_id_re = re.compile(run_id_pattern)
 
     def __init__(self):
         self._status = TwisterStatus.NONE
@@ -65,7 +66,8 @@ class Harness:
         self.matched_run_id = False
         self.run_id_exists = False
         self.instance: TestInstance | None = None
-        self.testcase_output = ""
+        # Output lines of the current test case, joined only when needed.
+        self._testcase_output: list[str] = []
         self._match = False
 
 
@@ -73,6 +75,17 @@ class Harness:
     def trace(self) -> bool:
         return self.instance.handler.options.verbose > 2
 
+    @property
+    def testcase_output(self) -> str:
+        return ''.join(self._testcase_output)
+
+    @testcase_output.setter
+    def testcase_output(self, value: str) -> None:
+        self._testcase_output = [value] if value else []
+
+    def add_testcase_output(self, line: str) -> None:
+        self._testcase_output.append(line + "\n")
+
     @property
     def status(self) -> TwisterStatus:
         return self._status
@@ -154,7 +167,7 @@ class Harness:
 
         self.parse_record(line)
 
-        runid_match = re.search(self.run_id_pattern, line)
+        runid_match = "RunID: " in line and self.run_id_re.search(line)
         if runid_match:
             run_id = runid_match.group("run_id")
             self.run_id_exists = True
@@ -720,7 +733,7 @@ class Gtest(Harness):
             tc = self.instance.get_case_or_create(name)
             self.tc = tc
             self.tc.status = TwisterStatus.STARTED
-            self.testcase_output += line + "\n"
+            self.add_testcase_output(line)
             self._match = True
 
         # Check if the test run finished
@@ -901,16 +914,32 @@ class Test(Harness):
             logger.warning(f"{phase}: END case '{tc_name}' without START detected")
 
     def handle(self, line):
-        testcase_match = None
         if self._match:
-            self.testcase_output += line + "\n"
-        if test_suite_start_match := re.search(self.test_suite_start_pattern, line):
+            self.add_testcase_output(line)
+        # Every Ztest log pattern contains one of these markers, most of the
+        # output lines are not matched against the patterns at all.
+        if "TESTSUITE" in line or " - " in line:
+            self.handle_ztest_line(line)
+
+        self.process_test(line)
+
+        if not self.ztest and self.status != TwisterStatus.NONE:
+            logger.debug(f"{self.id} is not a Ztest, status:{self.status}")
+            tc = self.instance.get_case_or_create(self.id)
+            if self.status == TwisterStatus.PASS:
+                tc.status = TwisterStatus.PASS
+            else:
+                tc.status = TwisterStatus.FAIL
+                tc.reason = "Test failure"
+
+    def handle_ztest_line(self, line):
+        if test_suite_start_match := self.test_suite_start_pattern.search(line):
             self.start_suite(test_suite_start_match.group("suite_name"))
-        elif test_suite_end_match := re.search(self.test_suite_end_pattern, line):
+        elif test_suite_end_match := self.test_suite_end_pattern.search(line):
             suite_name=test_suite_end_match.group("suite_name")
             self.end_suite(suite_name)
             self.ztest = True
-        elif testcase_match := re.search(self.test_case_start_pattern, line):
+        elif testcase_match := self.test_case_start_pattern.search(line):
             tc_name = testcase_match.group(2)
             tc = self.get_testcase(tc_name, 'TC_START')
             self.start_case(tc.name)
@@ -919,7 +948,7 @@ class Test(Harness):
             # be marked as failed and not blocked (not run).
             tc.status = TwisterStatus.STARTED
             if not self._match:
-                self.testcase_output += line + "\n"
+                self.add_testcase_output(line)
                 self._match = True
         # some testcases are skipped based on predicates and do not show up
         # during test execution, however they are listed in the summary. Parse
@@ -965,17 +994,6 @@ class Test(Harness):
             self._match = False
             self.ztest = True
 
-        self.process_test(line)
-
-        if not self.ztest and self.status != TwisterStatus.NONE:
-            logger.debug(f"{self.id} is not a Ztest, status:{self.status}")
-            tc = self.instance.get_case_or_create(self.id)
-            if self.status == TwisterStatus.PASS:
-                tc.status = TwisterStatus.PASS
-            else:
-                tc.status = TwisterStatus.FAIL
-                tc.reason = "Test failure"
-
 
 class Ztest(Test):
     pass
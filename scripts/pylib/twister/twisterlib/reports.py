@@ -8,6 +8,7 @@ import json
 import logging
 import os
 import string
+import tempfile
 import xml.etree.ElementTree as ET
 from datetime import datetime
 from enum import Enum
@@ -35,6 +36,213 @@ class ReportingJSONEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
+class JSONReportWriter:
+    """Writes a JSON report one test suite at a time.
+
+    The output is the same as json.dump(report, indent=4, separators=(',',':'))
+    of a report made of the header items followed by the "testsuites" list,
+    without holding all the test suites in memory.
+    """
+
+    INDENT = ' ' * 4
+
+    def __init__(self, fp, header):
+        self.fp = fp
+        self.encoder = ReportingJSONEncoder(indent=4, separators=(',', ':'))
+        self.count = 0
+        fp.write('{')
+        for key, value in header.items():
+            fp.write(f'\n{self.INDENT}{self._encode(key, 1)}:{self._encode(value, 1)},')
+        fp.write(f'\n{self.INDENT}"testsuites":[')
+
+    def _encode(self, obj, level):
+        # JSON strings never contain a raw new line, only the layout does.
+        return self.encoder.encode(obj).replace('\n', '\n' + self.INDENT * level)
+
+    def add_suite(self, suite):
+        separator = ',' if self.count else ''
+        self.fp.write(f'{separator}\n{self.INDENT * 2}{self._encode(suite, 2)}')
+        self.count += 1
+
+    def close(self):
+        self.fp.write(f'\n{self.INDENT}]\n}}' if self.count else ']\n}')
+
+
+class JSONReportReader:
+    """Reads a JSON report one test suite at a time.
+
+    Use as a context manager. On entry, the top level items written before
+    the "testsuites" list, like the environment, are in header. The test
+    suites are then given by testsuites(), after which header also holds
+    the items following the list.
+    """
+
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.header = {}
+        self._decoder = json.JSONDecoder()
+        self._fp = None
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+        self._in_suites = False
+
+    def __enter__(self):
+        self._fp = open(self.filename)
+        if self._next_char() != '{':
+            self._error('Expecting object')
+        self._pos += 1
+        self._read_items()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._fp.close()
+
+    def _error(self, msg):
+        raise json.JSONDecodeError(msg, self._buf, self._pos)
+
+    def _fill(self):
+        # read at least as much as already buffered to keep decoding linear
+        # when a single value is larger than a chunk
+        data = self._fp.read(max(self.CHUNK_SIZE, len(self._buf) - self._pos))
+        self._buf = self._buf[self._pos:] + data
+        self._pos = 0
+        self._eof = not data
+
+    def _next_char(self):
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos].isspace():
+                self._pos += 1
+            if self._pos < len(self._buf) or self._eof:
+                return self._buf[self._pos:self._pos + 1]
+            self._fill()
+
+    def _value(self):
+        self._next_char()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            else:
+                # a number may continue in the next chunk
+                if end < len(self._buf) or self._eof:
+                    self._pos = end
+                    return value
+            self._fill()
+
+    def _read_items(self):
+        """Read top level items until the test suites or the end of the report."""
+        if self._next_char() == '}':
+            return
+        while True:
+            key = self._value()
+            if self._next_char() != ':':
+                self._error("Expecting ':' delimiter")
+            self._pos += 1
+            if key == 'testsuites':
+                if self._next_char() != '[':
+                    self._error('Expecting array')
+                self._pos += 1
+                self._in_suites = True
+                return
+            self.header[key] = self._value()
+            c = self._next_char()
+            self._pos += 1
+            if c == '}':
+                return
+            if c != ',':
+                self._error("Expecting ',' delimiter")
+
+    def testsuites(self):
+        if not self._in_suites:
+            return
+        self._in_suites = False
+        if self._next_char() == ']':
+            self._pos += 1
+        else:
+            while True:
+                yield self._value()
+                c = self._next_char()
+                self._pos += 1
+                if c == ']':
+                    break
+                if c != ',':
+                    self._error("Expecting ',' delimiter")
+        c = self._next_char()
+        self._pos += 1
+        if c == ',':
+            self._read_items()
+        elif c != '}':
+            self._error("Expecting ',' delimiter")
+
+
+class XunitReportWriter:
+    """Writes the <testsuites> element of an xunit report one <testsuite>
+    at a time, with the same layout as ET.indent(space="\t") and
+    ET.tostring() of the whole tree.
+    """
+
+    # <testsuite> elements serialized together, to save on ET.tostring() calls
+    BATCH_SIZE = 100
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.started = False
+        self._pending = ET.Element('testsuites')
+
+    def _write(self, data):
+        if not self.started:
+            self.fp.write(b'<testsuites>')
+            self.started = True
+        self.fp.write(data)
+
+    def _flush(self):
+        if not len(self._pending):
+            return
+        ET.indent(self._pending, space="\t")
+        data = ET.tostring(self._pending)
+        self._write(data[len(b'<testsuites>'):data.rindex(b'\n</testsuites>')])
+        self._pending = ET.Element('testsuites')
+
+    def add(self, element, testcases=()):
+        """Write a <testsuite> element followed by serialized <testcase>
+        elements, see testcases()."""
+        if not testcases:
+            self._pending.append(element)
+            if len(self._pending) >= self.BATCH_SIZE:
+                self._flush()
+            return
+
+        self._flush()
+        element.tail = None
+        ET.indent(element, space="\t", level=1)
+        data = ET.tostring(element)
+        # element has <properties>, so its end tag is on its own line
+        end = data.rindex(b'\n\t</')
+        self._write(b'\n\t' + data[:end])
+        for chunk in testcases:
+            self._write(chunk)
+        self._write(data[end:])
+
+    @staticmethod
+    def testcases(element):
+        """Serialize the <testcase> children of element, to be written with
+        add() as children of another <testsuite>."""
+        if not len(element):
+            return b''
+        ET.indent(element, space="\t", level=1)
+        data = ET.tostring(element)
+        return data[data.index(b'>') + 1:data.rindex(b'\n\t</')]
+
+    def close(self):
+        self._flush()
+        self.fp.write(b'\n</testsuites>' if self.started else b'<testsuites />')
+
+
 class Reporting:
 
     json_filters = {
@@ -139,69 +347,62 @@ class Reporting:
     # Generate a report with all testsuites instead of doing this per platform
     def xunit_report_suites(self, json_file, filename):
 
-        json_data = {}
-        with open(json_file) as json_results:
-            json_data = json.load(json_results)
-
+        with JSONReportReader(json_file) as reader, open(filename, 'wb') as report:
+            env = reader.header.get('environment', {})
+            version = env.get('zephyr_version', None)
 
-        env = json_data.get('environment', {})
-        version = env.get('zephyr_version', None)
+            writer = XunitReportWriter(report)
+            for suite in reader.testsuites():
+                # do not create entry if everything is filtered out
+                if (
+                    not self.env.options.detailed_skipped_report
+                    and TwisterStatus(suite.get('status')) == TwisterStatus.FILTER
+                ):
+                    continue
 
-        eleTestsuites = ET.Element('testsuites')
-        all_suites = json_data.get("testsuites", [])
+                duration = 0
+                eleTestsuite = ET.Element('testsuite',
+                                          name=suite.get("name"), time="0",
+                                          timestamp = self.timestamp,
+                                          tests="0",
+                                          failures="0",
+                                          errors="0", skipped="0")
+                eleTSPropetries = ET.SubElement(eleTestsuite, 'properties')
+                # Multiple 'property' can be added to 'properties'
+                # differing by name and value
+                ET.SubElement(eleTSPropetries, 'property', name="version", value=version)
+                ET.SubElement(eleTSPropetries, 'property', name="platform",
+                              value=suite.get("platform"))
+                ET.SubElement(eleTSPropetries, 'property', name="architecture",
+                              value=suite.get("arch"))
+
+                total = 0
+                fails = passes = errors = skips = 0
+                handler_time = suite.get('execution_time', 0)
+                runnable = suite.get('runnable', 0)
+                duration += float(handler_time)
+                ts_status = TwisterStatus(suite.get('status'))
+                classname = Path(suite.get("name","")).name
+                for tc in suite.get("testcases", []):
+                    status = TwisterStatus(tc.get('status'))
+                    reason = tc.get('reason', suite.get('reason', 'Unknown'))
+                    log = tc.get("log", suite.get("log"))
+
+                    tc_duration = tc.get('execution_time', handler_time)
+                    name = tc.get("identifier")
+                    fails, passes, errors, skips = self.xunit_testcase(eleTestsuite,
+                        name, classname, status, ts_status, reason, tc_duration, runnable,
+                        (fails, passes, errors, skips), log, True)
 
-        suites_to_report = all_suites
-            # do not create entry if everything is filtered out
-        if not self.env.options.detailed_skipped_report:
-            suites_to_report = list(
-                filter(lambda d: TwisterStatus(d.get('status')) != TwisterStatus.FILTER, all_suites)
-            )
+                total = errors + passes + fails + skips
 
-        for suite in suites_to_report:
-            duration = 0
-            eleTestsuite = ET.SubElement(eleTestsuites, 'testsuite',
-                                            name=suite.get("name"), time="0",
-                                            timestamp = self.timestamp,
-                                            tests="0",
-                                            failures="0",
-                                            errors="0", skipped="0")
-            eleTSPropetries = ET.SubElement(eleTestsuite, 'properties')
-            # Multiple 'property' can be added to 'properties'
-            # differing by name and value
-            ET.SubElement(eleTSPropetries, 'property', name="version", value=version)
-            ET.SubElement(eleTSPropetries, 'property', name="platform", value=suite.get("platform"))
-            ET.SubElement(eleTSPropetries, 'property', name="architecture", value=suite.get("arch"))
-
-            total = 0
-            fails = passes = errors = skips = 0
-            handler_time = suite.get('execution_time', 0)
-            runnable = suite.get('runnable', 0)
-            duration += float(handler_time)
-            ts_status = TwisterStatus(suite.get('status'))
-            classname = Path(suite.get("name","")).name
-            for tc in suite.get("testcases", []):
-                status = TwisterStatus(tc.get('status'))
-                reason = tc.get('reason', suite.get('reason', 'Unknown'))
-                log = tc.get("log", suite.get("log"))
-
-                tc_duration = tc.get('execution_time', handler_time)
-                name = tc.get("identifier")
-                fails, passes, errors, skips = self.xunit_testcase(eleTestsuite,
-                    name, classname, status, ts_status, reason, tc_duration, runnable,
-                    (fails, passes, errors, skips), log, True)
-
-            total = errors + passes + fails + skips
-
-            eleTestsuite.attrib['time'] = f"{duration}"
-            eleTestsuite.attrib['failures'] = f"{fails}"
-            eleTestsuite.attrib['errors'] = f"{errors}"
-            eleTestsuite.attrib['skipped'] = f"{skips}"
-            eleTestsuite.attrib['tests'] = f"{total}"
-
-        ET.indent(eleTestsuites, space="\t", level=0)
-        result = ET.tostring(eleTestsuites)
-        with open(filename, 'wb') as report:
-            report.write(result)
+                eleTestsuite.attrib['time'] = f"{duration}"
+                eleTestsuite.attrib['failures'] = f"{fails}"
+                eleTestsuite.attrib['errors'] = f"{errors}"
+                eleTestsuite.attrib['skipped'] = f"{skips}"
+                eleTestsuite.attrib['tests'] = f"{total}"
+                writer.add(eleTestsuite)
+            writer.close()
 
     def xunit_report(self, json_file, filename, selected_platform=None, full_report=False):
         if selected_platform:
@@ -211,54 +412,37 @@ class Reporting:
             logger.info(f"Writing xunit report {filename}...")
             selected = self.selected_platforms
 
-        json_data = {}
-        with open(json_file) as json_results:
-            json_data = json.load(json_results)
-
-
-        env = json_data.get('environment', {})
-        version = env.get('zephyr_version', None)
+        # Test suites are read once, in the order of the report. The testcase
+        # elements of each platform are spooled to a temporary file, to be
+        # written grouped by platform.
+        platforms = {
+            platform: {
+                'duration': 0, 'stats': (0, 0, 0, 0), 'non_filtered': False,
+                'pending': ET.Element('testsuite'), 'testcases': []
+            } for platform in selected
+        }
 
-        eleTestsuites = ET.Element('testsuites')
-        all_suites = json_data.get("testsuites", [])
+        with JSONReportReader(json_file) as reader, tempfile.TemporaryFile() as spool:
+            env = reader.header.get('environment', {})
+            version = env.get('zephyr_version', None)
 
-        for platform in selected:
-            suites = list(filter(lambda d: d['platform'] == platform, all_suites))
-            # do not create entry if everything is filtered out
-            if not self.env.options.detailed_skipped_report:
-                non_filtered = list(
-                    filter(lambda d: TwisterStatus(d.get('status')) != TwisterStatus.FILTER, suites)
-                )
-                if not non_filtered:
+            for ts in reader.testsuites():
+                data = platforms.get(ts['platform'])
+                if data is None:
                     continue
-
-            duration = 0
-            eleTestsuite = ET.SubElement(eleTestsuites, 'testsuite',
-                                            name=platform,
-                                            timestamp = self.timestamp,
-                                            time="0",
-                                            tests="0",
-                                            failures="0",
-                                            errors="0", skipped="0")
-            eleTSPropetries = ET.SubElement(eleTestsuite, 'properties')
-            # Multiple 'property' can be added to 'properties'
-            # differing by name and value
-            ET.SubElement(eleTSPropetries, 'property', name="version", value=version)
-
-            total = 0
-            fails = passes = errors = skips = 0
-            for ts in suites:
                 handler_time = ts.get('execution_time', 0)
                 runnable = ts.get('runnable', 0)
-                duration += float(handler_time)
+                data['duration'] += float(handler_time)
 
                 ts_status = TwisterStatus(ts.get('status'))
                 # Do not report filtered testcases
-                if (
-                    ts_status == TwisterStatus.FILTER
-                    and not self.env.options.detailed_skipped_report
-                ):
-                    continue
+                if ts_status == TwisterStatus.FILTER:
+                    if not self.env.options.detailed_skipped_report:
+                        continue
+                else:
+                    data['non_filtered'] = True
+                eleTestcases = data['pending']
+                stats = data['stats']
                 if full_report:
                     classname = Path(ts.get("name","")).name
                     for tc in ts.get("testcases", []):
@@ -268,30 +452,59 @@ class Reporting:
 
                         tc_duration = tc.get('execution_time', handler_time)
                         name = tc.get("identifier")
-                        fails, passes, errors, skips = self.xunit_testcase(eleTestsuite,
+                        stats = self.xunit_testcase(eleTestcases,
                             name, classname, status, ts_status, reason, tc_duration, runnable,
-                            (fails, passes, errors, skips), log, True)
+                            stats, log, True)
                 else:
                     reason = ts.get('reason', 'Unknown')
                     name = ts.get("name")
-                    classname = f"{platform}:{name}"
+                    classname = f"{ts['platform']}:{name}"
                     log = ts.get("log")
-                    fails, passes, errors, skips = self.xunit_testcase(eleTestsuite,
+                    stats = self.xunit_testcase(eleTestcases,
                         name, classname, ts_status, ts_status, reason, handler_time, runnable,
-                        (fails, passes, errors, skips), log, False)
-
-            total = errors + passes + fails + skips
+                        stats, log, False)
+                data['stats'] = stats
+                if len(eleTestcases) >= XunitReportWriter.BATCH_SIZE:
+                    self._spool_testcases(spool, data)
+            for data in platforms.values():
+                self._spool_testcases(spool, data)
+
+            with open(filename, 'wb') as report:
+                writer = XunitReportWriter(report)
+                for platform, data in platforms.items():
+                    # do not create entry if everything is filtered out
+                    if not self.env.options.detailed_skipped_report and not data['non_filtered']:
+                        continue
+
+                    fails, passes, errors, skips = data['stats']
+                    total = errors + passes + fails + skips
+                    eleTestsuite = ET.Element('testsuite',
+                                              name=platform,
+                                              timestamp = self.timestamp,
+                                              time=f"{data['duration']}",
+                                              tests=f"{total}",
+                                              failures=f"{fails}",
+                                              errors=f"{errors}", skipped=f"{skips}")
+                    eleTSPropetries = ET.SubElement(eleTestsuite, 'properties')
+                    # Multiple 'property' can be added to 'properties'
+                    # differing by name and value
+                    ET.SubElement(eleTSPropetries, 'property', name="version", value=version)
+                    writer.add(eleTestsuite, self._read_spooled(spool, data['testcases']))
+                writer.close()
 
-            eleTestsuite.attrib['time'] = f"{duration}"
-            eleTestsuite.attrib['failures'] = f"{fails}"
-            eleTestsuite.attrib['errors'] = f"{errors}"
-            eleTestsuite.attrib['skipped'] = f"{skips}"
-            eleTestsuite.attrib['tests'] = f"{total}"
+    @staticmethod
+    def _spool_testcases(spool, data):
+        testcases = XunitReportWriter.testcases(data['pending'])
+        if testcases:
+            data['testcases'].append((spool.tell(), len(testcases)))
+            spool.write(testcases)
+        data['pending'] = ET.Element('testsuite')
 
-        ET.indent(eleTestsuites, space="\t", level=0)
-        result = ET.tostring(eleTestsuites)
-        with open(filename, 'wb') as report:
-            report.write(result)
+    @staticmethod
+    def _read_spooled(spool, chunks):
+        for offset, size in chunks:
+            spool.seek(offset)
+            yield spool.read(size)
 
     def json_report(self, filename, version="NA", platform=None, filters=None):
         logger.info(f"Writing JSON report {filename}")
@@ -309,8 +522,16 @@ class Reporting:
                                  "run_date": self.env.run_date,
                                  "options": report_options
                                  }
-        suites = []
 
+        # Suites are written as they are made, logs and footprints of all
+        # instances are never held in memory together.
+        with open(filename, 'w') as json_file:
+            writer = JSONReportWriter(json_file, report)
+            for suite in self._json_report_suites(filename, platform, filters):
+                writer.add_suite(suite)
+            writer.close()
+
+    def _json_report_suites(self, filename, platform, filters):
         for instance in self.instances.values():
             if platform and platform != instance.platform.name:
                 continue
@@ -486,11 +707,7 @@ class Reporting:
                 #
             #
 
-            suites.append(suite)
-
-        report["testsuites"] = suites
-        with open(filename, 'w') as json_file:
-            json.dump(report, json_file, indent=4, separators=(',',':'), cls=ReportingJSONEncoder)
+            yield suite
 
 
     def compare_metrics(self, filename):
@@ -504,9 +721,8 @@ class Reporting:
 
         results = []
         saved_metrics = {}
-        with open(filename) as fp:
-            jt = json.load(fp)
-            for ts in jt.get("testsuites", []):
+        with JSONReportReader(filename) as reader:
+            for ts in reader.testsuites():
                 d = {}
                 for m, _, _ in interesting_metrics:
                     d[m] = ts.get(m, 0)
@@ -4,8 +4,12 @@
 # Copyright 2022 NXP
 # SPDX-License-Identifier: Apache-2.0
 
+import hashlib
+import heapq
+import itertools
 import logging
 import multiprocessing
+import multiprocessing.connection
 import os
 import pathlib
 import pickle
@@ -17,7 +21,7 @@ import sys
 import time
 import traceback
 from math import log10
-from multiprocessing import Lock, Process, Value
+from multiprocessing import Array, Lock, Pipe, Process, Value
 from multiprocessing.managers import BaseManager
 
 import elftools
@@ -31,6 +35,7 @@ from twisterlib.environment import canonical_zephyr_base
 from twisterlib.error import BuildError, ConfigurationError, StatusAttributeError
 from twisterlib.log_helper import setup_logging
 from twisterlib.statuses import TwisterStatus
+from twisterlib.timing import TaskCostEstimator, TimingDatabase
 
 if version.parse(elftools.__version__) < version.parse('0.24'):
     sys.exit("pyelftools is out of date, need version 0.24 or later")
@@ -43,6 +48,10 @@ from twisterlib.environment import ZEPHYR_BASE
 
 sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/build_helpers"))
 from domains import Domains
+
+# This is needed to load edt.snapshot files
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/dts/python-devicetree/src"))
+from devicetree.snapshot import Snapshot
 from twisterlib.coverage import run_coverage_instance
 from twisterlib.environment import TwisterEnv
 from twisterlib.harness import Ctest, HarnessImporter, Pytest
@@ -63,8 +72,55 @@ from anytree import Node, RenderTree
 logger = logging.getLogger('twister')
 
 
+def load_edt(zephyr_dir):
+    """Load the devicetree of a build for filter expressions.
+
+    The EDT snapshot is preferred over the pickled edtlib.EDT object, as it
+    only loads the nodes a filter asks about. Returns None if the build has
+    no devicetree.
+    """
+    snapshot = os.path.join(zephyr_dir, "edt.snapshot")
+    if os.path.exists(snapshot):
+        return Snapshot(snapshot)
+
+    edt_pickle = os.path.join(zephyr_dir, "edt.pickle")
+    if os.path.exists(edt_pickle):
+        with open(edt_pickle, 'rb') as f:
+            return pickle.load(f)
+    return None
+
+
+class SharedCounter:
+    """Value-like view of one slot of a shared memory counter array.
+
+    All counters of an array share the array lock, so a single semaphore
+    serves every counter of an ExecutionCounter.
+    """
+
+    __slots__ = ('_array', '_index')
+
+    def __init__(self, array, index, value=0):
+        self._array = array
+        self._index = index
+        self.value = value
+
+    def get_lock(self):
+        return self._array.get_lock()
+
+    @property
+    def value(self):
+        return self._array.get_obj()[self._index]
+
+    @value.setter
+    def value(self, value):
+        self._array.get_obj()[self._index] = value
+
+
 class ExecutionCounter:
-    def __init__(self, total=0):
+    # Number of slots of the shared counter array, enough for every counter.
+    SHARED_COUNTER_SLOTS = 32
+
+    def __init__(self, total=0, shared_array=False):
         '''
         Most of the stats are at test instance level
         Except that case statistics are for cases of ALL test instances
@@ -77,67 +133,82 @@ class ExecutionCounter:
 
         pass rate = passed / (total - filtered_configs)
         case pass rate = passed_cases / (cases - filtered_cases - skipped_cases)
+
+        With shared_array all counters are slots of a single shared memory
+        array protected by one lock, instead of separate synchronized Values.
         '''
+        self._shared_array = Array('i', self.SHARED_COUNTER_SLOTS) if shared_array else None
+        self._shared_slots = 0
+
         # instances that go through the pipeline
         # updated by report_out()
-        self._done = Value('i', 0)
+        self._done = self._new_counter()
 
         # iteration
-        self._iteration = Value('i', 0)
+        self._iteration = self._new_counter()
 
         # instances that actually executed and passed
         # updated by report_out()
-        self._passed = Value('i', 0)
+        self._passed = self._new_counter()
 
         # instances that are built but not runnable
         # updated by report_out()
-        self._notrun = Value('i', 0)
+        self._notrun = self._new_counter()
 
         # static filter + runtime filter + build skipped
         # updated by update_counting_before_pipeline() and report_out()
-        self._filtered_configs = Value('i', 0)
+        self._filtered_configs = self._new_counter()
 
         # cmake filter + build skipped
         # updated by report_out()
-        self._filtered_runtime = Value('i', 0)
+        self._filtered_runtime = self._new_counter()
 
         # static filtered at yaml parsing time
         # updated by update_counting_before_pipeline()
-        self._filtered_static = Value('i', 0)
+        self._filtered_static = self._new_counter()
 
         # updated by report_out() in pipeline
-        self._error = Value('i', 0)
-        self._failed = Value('i', 0)
-        self._skipped = Value('i', 0)
+        self._error = self._new_counter()
+        self._failed = self._new_counter()
+        self._skipped = self._new_counter()
 
         # initialized to number of test instances
-        self._total = Value('i', total)
+        self._total = self._new_counter(total)
 
         #######################################
         # TestCase counters for all instances #
         #######################################
         # updated in report_out
-        self._cases = Value('i', 0)
+        self._cases = self._new_counter()
 
         # updated by update_counting_before_pipeline() and report_out()
-        self._skipped_cases = Value('i', 0)
-        self._filtered_cases = Value('i', 0)
+        self._skipped_cases = self._new_counter()
+        self._filtered_cases = self._new_counter()
 
         # updated by report_out() in pipeline
-        self._passed_cases = Value('i', 0)
-        self._notrun_cases = Value('i', 0)
-        self._failed_cases = Value('i', 0)
-        self._error_cases = Value('i', 0)
-        self._blocked_cases = Value('i', 0)
+        self._passed_cases = self._new_counter()
+        self._notrun_cases = self._new_counter()
+        self._failed_cases = self._new_counter()
+        self._error_cases = self._new_counter()
+        self._blocked_cases = self._new_counter()
 
         # Incorrect statuses
-        self._none_cases = Value('i', 0)
-        self._started_cases = Value('i', 0)
+        self._none_cases = self._new_counter()
+        self._started_cases = self._new_counter()
 
-        self._warnings = Value('i', 0)
+        self._warnings = self._new_counter()
 
         self.lock = Lock()
 
+    def _new_counter(self, value=0):
+        if self._shared_array is None:
+            return Value('i', value)
+        if self._shared_slots >= self.SHARED_COUNTER_SLOTS:
+            raise ValueError("Shared counter array is full")
+        counter = SharedCounter(self._shared_array, self._shared_slots, value)
+        self._shared_slots += 1
+        return counter
+
     @staticmethod
     def _find_number_length(n):
         if n > 0:
@@ -504,6 +575,144 @@ class ExecutionCounter:
         with self._total.get_lock():
             self._total.value += value
 
+class CostAwareQueue(queue.Queue):
+    """Pipeline queue handing out the most expensive work first.
+
+    Drop-in replacement of the LifoQueue shared by the pipeline workers, with
+    the same locking and blocking behavior, as it only changes the storage of
+    the tasks like queue.PriorityQueue does. Tasks are ordered by the
+    estimated remaining time of their instance, so long builds and long
+    running emulated tests start early instead of ending up at the tail of
+    the run. Report and cleanup tasks are cheap and release the finished
+    instances, so they always go first. Tasks of equal cost keep the LIFO
+    order of the original queue.
+    """
+
+    # Operations after which only a negligible amount of work remains.
+    FINISHING_OPS = ('coverage', 'report', 'cleanup')
+    # Operations after which the instance still needs to be built and run.
+    BUILD_OPS = ('filter', 'cmake', 'build')
+
+    def __init__(self, costs: dict[str, tuple[float, float]] = None, maxsize=0):
+        self.costs = costs or {}
+        super().__init__(maxsize)
+
+    def remaining_cost(self, task) -> float:
+        op = task.get('op')
+        build_time, handler_time = self.costs.get(task['test'].name, (0.0, 0.0))
+        if op in self.BUILD_OPS:
+            return build_time + handler_time
+        if op in self.FINISHING_OPS:
+            return 0.0
+        return handler_time
+
+    def priority(self, task) -> tuple:
+        if task.get('op') in self.FINISHING_OPS:
+            return (0, 0.0)
+        return (1, -self.remaining_cost(task))
+
+    # The queue.Queue storage methods, called with the queue lock held
+
+    def _init(self, maxsize):
+        self.queue = []
+        self._counter = itertools.count()
+
+    def _qsize(self):
+        return len(self.queue)
+
+    def _put(self, task):
+        heapq.heappush(self.queue, (*self.priority(task), -next(self._counter), task))
+
+    def _get(self):
+        return heapq.heappop(self.queue)[-1]
+
+
+class PipelineChannel:
+    """Worker side of the pipe based pipeline transport.
+
+    Mimics the put()/get_nowait() interface of the pipeline queue. Tasks
+    queued by the worker and instances reported as done are buffered and
+    sent to the PipelineDispatcher in the main process together with the
+    request for the next task, so processing a task costs one round trip
+    instead of one Manager call per queue operation.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.done = _PipelineDoneSink(self)
+        self._tasks = []
+        self._done = []
+
+    def put(self, task, block=True, timeout=None):
+        self._tasks.append(task)
+
+    def get_nowait(self):
+        self.conn.send((self._tasks, self._done))
+        self._tasks = []
+        self._done = []
+        task = self.conn.recv()
+        if task is None:
+            raise queue.Empty
+        return task
+
+    def close(self):
+        self.conn.close()
+
+
+class _PipelineDoneSink:
+    def __init__(self, channel):
+        self.channel = channel
+
+    def put(self, instance, block=True, timeout=None):
+        self.channel._done.append(instance)
+
+
+class PipelineDispatcher:
+    """Main process side of the pipe based pipeline transport.
+
+    Owns the pipeline and done queues and serves the requests of all
+    PipelineChannel workers from a single loop.
+    """
+
+    def __init__(self, pipeline, done):
+        self.pipeline = pipeline
+        self.done = done
+        self.connections = []
+
+    def connect(self):
+        """Create the channel to hand over to a new worker."""
+        conn, worker_conn = Pipe()
+        self.connections.append(conn)
+        return PipelineChannel(worker_conn)
+
+    def serve(self, on_disconnect=None):
+        """Answer task requests until every worker has disconnected."""
+        while self.connections:
+            for conn in multiprocessing.connection.wait(self.connections):
+                try:
+                    tasks, done = conn.recv()
+                except EOFError:
+                    self.connections.remove(conn)
+                    conn.close()
+                    if on_disconnect:
+                        on_disconnect(conn)
+                    continue
+                for task in tasks:
+                    self.pipeline.put(task)
+                for instance in done:
+                    self.done.put(instance)
+                try:
+                    task = self.pipeline.get_nowait()
+                except queue.Empty:
+                    task = None
+                try:
+                    conn.send(task)
+                except OSError:
+                    # The worker is gone, its disconnection is handled on EOF.
+                    if task is not None:
+                        self.pipeline.put(task)
+
+
 class CMake:
     config_re = re.compile('(CONFIG_[A-Za-z0-9_]+)[=]\"?([^\"]*)\"?$')
     dt_re = re.compile('([A-Za-z0-9_]+)[=]\"?([^\"]*)\"?$')
@@ -783,7 +992,7 @@ class FilterBuilder(CMake):
             domain_build = domains.get_default_domain().build_dir
             cmake_cache_path = os.path.join(domain_build, "CMakeCache.txt")
             defconfig_path = os.path.join(domain_build, "zephyr", ".config")
-            edt_pickle = os.path.join(domain_build, "zephyr", "edt.pickle")
+            edt_dir = os.path.join(domain_build, "zephyr")
         else:
             cmake_cache_path = os.path.join(self.build_dir, "CMakeCache.txt")
             # .config is only available after kconfig stage in cmake.
@@ -791,8 +1000,8 @@ class FilterBuilder(CMake):
             if not filter_stages or "kconfig" in filter_stages:
                 defconfig_path = os.path.join(self.build_dir, "zephyr", ".config")
             # dt is compiled before kconfig,
-            # so edt_pickle is available regardless of choice of filter stages
-            edt_pickle = os.path.join(self.build_dir, "zephyr", "edt.pickle")
+            # so the edt is available regardless of choice of filter stages
+            edt_dir = os.path.join(self.build_dir, "zephyr")
 
 
         if not filter_stages or "kconfig" in filter_stages:
@@ -819,14 +1028,7 @@ class FilterBuilder(CMake):
 
         self.cmake_cache = cmake_conf
 
-        filter_data = {
-            "ARCH": self.platform.arch,
-            "PLATFORM": self.platform.name
-        }
-        filter_data.update(os.environ)
-        if not filter_stages or "kconfig" in filter_stages:
-            filter_data.update(self.defconfig)
-        filter_data.update(self.cmake_cache)
+        filter_data = self.get_filter_data(filter_stages)
 
         # Verify that twister's arguments support sysbuild.
         # Twister sysbuild flashing currently only works with west,
@@ -846,41 +1048,56 @@ class FilterBuilder(CMake):
             }
 
         if self.testsuite and self.testsuite.filter:
+            edt = load_edt(edt_dir)
             try:
-                if os.path.exists(edt_pickle):
-                    with open(edt_pickle, 'rb') as f:
-                        edt = pickle.load(f)
-                else:
-                    edt = None
-                ret = expr_parser.parse(self.testsuite.filter, filter_data, edt)
-
-            except (ValueError, SyntaxError) as se:
-                sys.stderr.write(f"Failed processing {self.testsuite.yamlfile}\n")
-                raise se
-
-            if not ret:
-                return {
-                    os.path.join(
-                        self.platform.name,
-                        self.instance.toolchain,
-                        self.testsuite.name
-                    ): True
-                }
-            else:
-                return {
-                    os.path.join(
-                        self.platform.name,
-                        self.instance.toolchain,
-                        self.testsuite.name
-                    ): False
-                }
+                return self.evaluate_filter(filter_data, edt)
+            finally:
+                # Don't keep the snapshot file mapped until it is collected
+                if isinstance(edt, Snapshot):
+                    edt.close()
         else:
             self.platform.filter_data = filter_data
             return filter_data
 
+    def get_filter_data(self, filter_stages):
+        filter_data = {
+            "ARCH": self.platform.arch,
+            "PLATFORM": self.platform.name
+        }
+        filter_data.update(os.environ)
+        if not filter_stages or "kconfig" in filter_stages:
+            filter_data.update(self.defconfig)
+        filter_data.update(self.cmake_cache)
+        return filter_data
+
+    def evaluate_filter(self, filter_data, edt):
+        """Evaluate the test suite filter, the result maps the instance name
+        to True when the instance is filtered out."""
+        try:
+            ret = expr_parser.parse(self.testsuite.filter, filter_data, edt)
+        except (ValueError, SyntaxError) as se:
+            sys.stderr.write(f"Failed processing {self.testsuite.yamlfile}\n")
+            raise se
+
+        return {
+            os.path.join(
+                self.platform.name,
+                self.instance.toolchain,
+                self.testsuite.name
+            ): not ret
+        }
+
 
 class ProjectBuilder(FilterBuilder):
 
+    # Test suite source directory entries which feed the devicetree or
+    # Kconfig of an application, see cmake/modules/configuration_files.cmake.
+    APP_CONFIG_DIRS = ['boards', 'socs', 'dts', 'zephyr']
+    APP_CONFIG_FILES = ['Kconfig']
+
+    # Board level filter data loaded by this worker process, by key.
+    _board_filter_data: dict = {}
+
     def __init__(self, instance: TestInstance, env: TwisterEnv, jobserver, **kwargs):
         super().__init__(
             instance.testsuite,
@@ -985,7 +1202,7 @@ class ProjectBuilder(FilterBuilder):
 
         if op == "filter":
             try:
-                ret = self.cmake(filter_stages=self.instance.filter_stages)
+                ret = self.cmake_filter(self.instance.filter_stages)
                 if self.instance.status in [TwisterStatus.FAIL, TwisterStatus.ERROR]:
                     next_op = 'report'
                 else:
@@ -1707,6 +1924,123 @@ class ProjectBuilder(FilterBuilder):
 
         return args_expanded
 
+    @staticmethod
+    def board_filter_dir(outdir):
+        return os.path.join(outdir, 'twister', 'board_filter')
+
+    def board_filter_key(self, filter_stages):
+        """
+        Return a key of the inputs the dt/kconfig filter stages depend on when
+        only the board, the toolchain and the prj.conf file of the test suite
+        feed them, or None when the test suite brings its own devicetree
+        overlays, Kconfig files or extra arguments.
+        """
+        if self.options.disable_board_filter_cache:
+            return None
+        if self.instance.sysbuild or self.platform.name == "unit_testing":
+            return None
+        if (
+            self.testsuite.extra_args
+            or self.testsuite.extra_conf_files
+            or self.testsuite.extra_overlay_confs
+            or self.testsuite.extra_dtc_overlay_files
+            or self.testsuite.required_snippets
+            or self.options.extra_args
+            or os.path.exists(os.path.join(self.build_dir, "twister", "testsuite_extra.conf"))
+        ):
+            return None
+
+        try:
+            entries = list(os.scandir(self.source_dir))
+        except OSError:
+            return None
+        for entry in entries:
+            if (
+                entry.name in self.APP_CONFIG_FILES
+                or entry.name.endswith('.overlay')
+                or (entry.name in self.APP_CONFIG_DIRS and entry.is_dir())
+            ):
+                return None
+
+        key = hashlib.sha256()
+        key.update(repr((self.platform.name, self.instance.toolchain, filter_stages)).encode())
+        if self.instance.handler.ready:
+            # The QEMU fifo is specific to the build directory and has no effect
+            # on the configuration.
+            key.update(repr([
+                arg for arg in self.instance.handler.args if not arg.startswith('QEMU_PIPE=')
+            ]).encode())
+        if "kconfig" in filter_stages:
+            prj_conf = os.path.join(self.source_dir, "prj.conf")
+            try:
+                with open(prj_conf, 'rb') as fp:
+                    key.update(fp.read())
+            except OSError:
+                return None
+        return key.hexdigest()
+
+    def load_board_filter_data(self, key):
+        if key not in self._board_filter_data:
+            path = os.path.join(self.board_filter_dir(self.options.outdir), f"{key}.pickle")
+            try:
+                with open(path, 'rb') as fp:
+                    data = pickle.load(fp)
+            except FileNotFoundError:
+                return None
+            if data['edt'] is None:
+                edt = None
+            elif data.get('edt_snapshot'):
+                edt = Snapshot.from_bytes(data['edt'])
+            else:
+                edt = pickle.loads(data['edt'])
+            self._board_filter_data[key] = (data['defconfig'], data['cmake_cache'], edt)
+        return self._board_filter_data[key]
+
+    def save_board_filter_data(self, key):
+        edt = None
+        for name in ('edt.snapshot', 'edt.pickle'):
+            try:
+                with open(os.path.join(self.build_dir, "zephyr", name), 'rb') as fp:
+                    edt = fp.read()
+                break
+            except FileNotFoundError:
+                pass
+        data = {
+            'defconfig': self.defconfig,
+            'cmake_cache': self.cmake_cache,
+            'edt': edt,
+            'edt_snapshot': name == 'edt.snapshot',
+        }
+
+        # Other workers may store the same data concurrently, the last one wins.
+        path = os.path.join(self.board_filter_dir(self.options.outdir), f"{key}.pickle")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as fp:
+            pickle.dump(data, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def cmake_filter(self, filter_stages):
+        """
+        Run the dt/kconfig filter stages of the test suite. The devicetree
+        and Kconfig results of a package helper CMake run are kept per board,
+        and reused for test suites which cannot change them, so their filter
+        is evaluated without running CMake.
+        """
+        key = self.board_filter_key(filter_stages)
+        if key:
+            data = self.load_board_filter_data(key)
+            if data is not None:
+                logger.debug(f"Using board level filter data for {self.instance.name}")
+                self.defconfig, self.cmake_cache, edt = data
+                filter_data = self.get_filter_data(filter_stages)
+                return {'returncode': 0, 'filter': self.evaluate_filter(filter_data, edt)}
+
+        ret = self.cmake(filter_stages=filter_stages)
+        if key and ret.get('returncode') == 0:
+            self.save_board_filter_data(key)
+        return ret
+
     def cmake(self, filter_stages=None):
         if filter_stages is None:
             filter_stages = []
@@ -1841,14 +2175,32 @@ class TwisterRunner:
 
         retries = self.options.retry_failed + 1
 
-        BaseManager.register('LifoQueue', queue.LifoQueue)
-        manager = BaseManager()
-        manager.start()
+        if not self.options.disable_board_filter_cache:
+            # Board level filter data is only valid within a twister run.
+            shutil.rmtree(ProjectBuilder.board_filter_dir(self.options.outdir), ignore_errors=True)
 
-        self.results = ExecutionCounter(total=len(self.instances))
+        if self.options.pipeline_transport == 'pipe':
+            # Queues live in this process, workers reach them through
+            # PipelineChannel connections served by execute().
+            self.results = ExecutionCounter(total=len(self.instances), shared_array=True)
+            if self.options.scheduler == 'cost':
+                pipeline = CostAwareQueue(self.estimate_costs())
+            else:
+                pipeline = queue.LifoQueue()
+            done_queue = queue.LifoQueue()
+        else:
+            BaseManager.register('LifoQueue', queue.LifoQueue)
+            BaseManager.register('CostAwareQueue', CostAwareQueue)
+            manager = BaseManager()
+            manager.start()
+
+            self.results = ExecutionCounter(total=len(self.instances))
+            if self.options.scheduler == 'cost':
+                pipeline = manager.CostAwareQueue(self.estimate_costs())
+            else:
+                pipeline = manager.LifoQueue()
+            done_queue = manager.LifoQueue()
         self.iteration = 0
-        pipeline = manager.LifoQueue()
-        done_queue = manager.LifoQueue()
 
         # Set number of jobs
         if self.options.jobs:
@@ -1911,6 +2263,13 @@ class TwisterRunner:
 
         self.show_brief()
 
+    def estimate_costs(self):
+        timing_db = TimingDatabase.from_reports(self.options.scheduler_history)
+        logger.info(
+            f"Scheduling by estimated cost, timing history of {len(timing_db)} configurations"
+        )
+        return TaskCostEstimator(timing_db).costs(self.instances.values())
+
     def update_counting_before_pipeline(self):
         '''
         Updating counting before pipeline is necessary because statically filterd
@@ -2045,21 +2404,40 @@ class TwisterRunner:
         logger.info("Added initial list of jobs to queue")
 
         processes = []
+        dispatcher = None
+        if self.options.pipeline_transport == 'pipe':
+            dispatcher = PipelineDispatcher(pipeline, done)
 
         for _ in range(self.jobs):
-            p = Process(target=self.pipeline_mgr, args=(pipeline, done, lock, self.results, ))
+            if dispatcher:
+                channel = dispatcher.connect()
+                p = Process(
+                    target=self.pipeline_mgr,
+                    args=(channel, channel.done, lock, self.results, )
+                )
+            else:
+                p = Process(target=self.pipeline_mgr, args=(pipeline, done, lock, self.results, ))
             processes.append(p)
             p.start()
+            if dispatcher:
+                # Only the worker keeps its end, so the dispatcher sees EOF on exit.
+                channel.close()
         logger.debug(f"Launched {self.jobs} jobs")
 
+        def check_process(p):
+            p.join()
+            if p.exitcode != 0:
+                logger.error(f"Process {p.pid} failed, aborting execution")
+                for proc in processes:
+                    proc.terminate()
+                sys.exit(1)
+
         try:
+            if dispatcher:
+                workers = dict(zip(dispatcher.connections, processes, strict=True))
+                dispatcher.serve(on_disconnect=lambda conn: check_process(workers[conn]))
             for p in processes:
-                p.join()
-                if p.exitcode != 0:
-                    logger.error(f"Process {p.pid} failed, aborting execution")
-                    for proc in processes:
-                        proc.terminate()
-                    sys.exit(1)
+                check_process(p)
         except KeyboardInterrupt:
             logger.info("Execution interrupted")
             for p in processes:
@@ -7,9 +7,11 @@
 import logging
 import os
 import re
-import subprocess
+import struct
 import sys
 
+from elftools.elf.constants import SH_FLAGS
+from elftools.elf.elffile import ELFFile
 from twisterlib.error import TwisterRuntimeError
 
 logger = logging.getLogger('twister')
@@ -104,7 +106,7 @@ class SizeCalculator:
         """Constructor
 
         @param elf_filename (str) Path to the output binary
-            parsed by objdump to determine section sizes.
+            parsed to determine section sizes.
         @param extra_sections (list[str]) List of extra,
             unexpected sections, which Twister should not
             report as error and not include in the
@@ -190,53 +192,107 @@ class SizeCalculator:
             print(str(e))
             sys.exit(2)
 
-    def _check_is_xip(self) -> None:
-        # Search for CONFIG_XIP in the ELF's list of symbols using NM and AWK.
-        # GREP can not be used as it returns an error if the symbol is not
-        # found.
-        is_xip_command = "nm " + self.elf_filename + \
-                         " | awk '/CONFIG_XIP/ { print $3 }'"
-        is_xip_output = subprocess.check_output(
-            is_xip_command, shell=True, stderr=subprocess.STDOUT).decode(
-            "utf-8").strip()
+    def _check_is_xip(self, elf: ELFFile) -> None:
+        # Search for CONFIG_XIP in the names of the ELF's symbols. Names are
+        # looked up in the raw string table first, and only offsets of the
+        # matching strings are compared with the symbol name offsets.
+        symtab = next(elf.iter_sections('SHT_SYMTAB'), None)
         try:
-            if is_xip_output.endswith("no symbols"):
+            if symtab is None or symtab.num_symbols() <= 1:
                 raise TwisterRuntimeError(f"{self.elf_filename} has no symbol information")
         except Exception as e:
             print(str(e))
             sys.exit(2)
 
-        self.is_xip = len(is_xip_output) != 0
-
-    def _get_info_elf_sections(self) -> None:
-        """Calculate RAM and ROM usage and information about issues by section"""
-        objdump_command = "objdump -h " + self.elf_filename
-        objdump_output = subprocess.check_output(
-            objdump_command, shell=True).decode("utf-8").splitlines()
-
-        for line in objdump_output:
-            words = line.split()
-
-            if not words:  # Skip lines that are too short
+        strtab = elf.get_section(symtab['sh_link']).data()
+        name_offsets = []
+        pos = strtab.find(b'CONFIG_XIP')
+        while pos != -1:
+            # Any name starting between the previous NUL and the match contains it.
+            name_offsets.append((strtab.rfind(b'\0', 0, pos) + 1, pos))
+            pos = strtab.find(b'CONFIG_XIP', pos + 1)
+
+        self.is_xip = False
+        if not name_offsets:
+            return
+
+        entsize = symtab['sh_entsize']
+        sym_format = ('<' if elf.little_endian else '>') + f'I{entsize - 4}x'
+        # st_name is the first field of both Elf32_Sym and Elf64_Sym.
+        data = symtab.data()[entsize:]
+        for (st_name,) in struct.iter_unpack(sym_format, data):
+            if any(start <= st_name <= end for start, end in name_offsets):
+                self.is_xip = True
+                return
+
+    @staticmethod
+    def _get_section_lma(section, segments) -> int:
+        """Get the load address of a section the way binutils derives it from
+        the program headers, see _bfd_elf_make_section_from_shdr()."""
+        header = section.header
+        if not header['sh_flags'] & SH_FLAGS.SHF_ALLOC or not segments:
+            return header['sh_addr']
+
+        is_tls = bool(header['sh_flags'] & SH_FLAGS.SHF_TLS)
+        is_nobits = header['sh_type'] == 'SHT_NOBITS'
+        lma = header['sh_addr']
+        for segment in segments:
+            if segment['p_type'] != ('PT_TLS' if is_tls else 'PT_LOAD'):
+                continue
+            size = header['sh_size']
+            if not is_nobits and not (
+                header['sh_offset'] >= segment['p_offset']
+                and header['sh_offset'] - segment['p_offset'] + size <= segment['p_filesz']
+            ):
+                continue
+            if not (
+                header['sh_addr'] >= segment['p_vaddr']
+                and header['sh_addr'] - segment['p_vaddr'] + size <= segment['p_memsz']
+            ):
                 continue
 
-            index = words[0]
-            if not index[0].isdigit():  # Skip lines that do not start
-                continue  # with a digit
-
-            name = words[1]  # Skip lines with section names
-            if name[0] == '.':  # starting with '.'
+            if is_nobits:
+                lma = segment['p_paddr'] + header['sh_addr'] - segment['p_vaddr']
+            else:
+                lma = segment['p_paddr'] + header['sh_offset'] - segment['p_offset']
+            if (
+                header['sh_addr'] >= segment['p_vaddr']
+                and header['sh_addr'] + header['sh_size']
+                    <= segment['p_vaddr'] + segment['p_memsz']
+            ):
+                break
+        return lma
+
+    def _get_info_elf_sections(self, elf: ELFFile) -> None:
+        """Calculate RAM and ROM usage and information about issues by section"""
+        segments = [
+            segment.header for segment in elf.iter_segments()
+            if segment['p_type'] in ('PT_LOAD', 'PT_TLS')
+        ]
+        # Linkers leaving all p_paddr at zero: binutils keeps LMA equal to VMA.
+        if (
+            all(segment['p_paddr'] == 0 for segment in elf.iter_segments())
+            and sum(1 for s in segments if s['p_type'] == 'PT_LOAD' and s['p_memsz']) > 1
+        ):
+            segments = []
+
+        for section in elf.iter_sections():
+            name = section.name
+            # Skip the null section, symbol and relocation tables and
+            # sections with names starting with '.'
+            if not name or name[0] == '.' or section['sh_type'] in \
+                    ('SHT_NULL', 'SHT_SYMTAB', 'SHT_STRTAB', 'SHT_REL', 'SHT_RELA'):
                 continue
 
             # TODO this doesn't actually reflect the size in flash or RAM as
             # it doesn't include linker-imposed padding between sections.
             # It is close though.
-            size = int(words[2], 16)
+            size = section['sh_size']
             if size == 0:
                 continue
 
-            load_addr = int(words[4], 16)
-            virt_addr = int(words[3], 16)
+            load_addr = self._get_section_lma(section, segments)
+            virt_addr = section['sh_addr']
 
             # Add section to memory use totals (for both non-XIP and XIP scenarios)
             # Unrecognized section names are not included in the calculations.
@@ -272,8 +328,10 @@ class SizeCalculator:
 
     def _analyze_elf_file(self) -> None:
         self._check_elf_file()
-        self._check_is_xip()
-        self._get_info_elf_sections()
+        with open(self.elf_filename, "rb") as f:
+            elf = ELFFile(f)
+            self._check_is_xip(elf)
+            self._get_info_elf_sections(elf)
 
     def _get_buildlog_file_content(self) -> list[str]:
         """Get content of the build.log file.
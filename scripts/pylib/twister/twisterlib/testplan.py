@@ -10,6 +10,7 @@ import copy
 import itertools
 import json
 import logging
+import multiprocessing
 import os
 import random
 import re
@@ -29,12 +30,14 @@ except ImportError:
 
 import scl
 from twisterlib.config_parser import TwisterConfigParser
+from twisterlib.discovery_cache import DiscoveryCache
 from twisterlib.error import TwisterRuntimeError
 from twisterlib.platform import Platform, generate_platforms
 from twisterlib.quarantine import Quarantine
 from twisterlib.statuses import TwisterStatus
 from twisterlib.testinstance import TestInstance
 from twisterlib.testsuite import TestSuite, scan_testsuite_path
+from twisterlib.timing import TaskCostEstimator, TimingDatabase, balance_shards
 from zephyr_module import parse_modules
 
 logger = logging.getLogger('twister')
@@ -71,6 +74,64 @@ class Filters:
     ENVIRONMENT = 'Environment filter'
 
 
+def load_testsuite_config(suite_yaml_path, suite_path, schema, cache=None):
+    """
+    Load a testsuite yaml file and scan the test suite sources when one of
+    its scenarios uses a ztest harness.
+
+    This is the part of the discovery done by worker processes, so errors are
+    returned instead of raised: the result is a (data, scan) tuple where data
+    is the validated yaml content or the exception raised when loading it, and
+    scan is the (subcases, ztest_suite_names) result of scan_testsuite_path(),
+    the exception it raised, or None when no scenario needs it.
+    """
+    parsed_data = TwisterConfigParser(suite_yaml_path, schema)
+    try:
+        if cache:
+            data = cache.load_config(parsed_data)
+        else:
+            data = parsed_data.load()
+    except Exception as e:
+        return e, None
+
+    try:
+        needs_scan = any(
+            parsed_data.get_scenario(name).get('harness') in ['ztest', 'test']
+            for name in parsed_data.scenarios
+        )
+    except Exception:
+        # Reported when the scenarios are loaded by the main process.
+        needs_scan = False
+
+    scan = None
+    if needs_scan:
+        try:
+            scan = scan_testsuite_path(suite_path, cache=cache)
+        except Exception as e:
+            scan = e
+    return data, scan
+
+
+_discovery_worker = {}
+
+
+def _init_discovery_worker(schema, cache):
+    if cache:
+        # Only report what this worker adds to the cache of the main process.
+        cache.take_updates()
+    _discovery_worker['schema'] = schema
+    _discovery_worker['cache'] = cache
+
+
+def _discovery_worker_load(args):
+    suite_yaml_path, suite_path = args
+    cache = _discovery_worker['cache']
+    result = load_testsuite_config(
+        suite_yaml_path, suite_path, _discovery_worker['schema'], cache
+    )
+    return result, cache.take_updates() if cache else None
+
+
 class TestLevel:
     name = None
     levels = []
@@ -100,6 +161,9 @@ class TestPlan:
     SAMPLE_FILENAME = 'sample.yaml'
     TESTSUITE_FILENAME = 'testcase.yaml'
 
+    # Below this number of testsuite files a worker pool costs more than it saves.
+    PARALLEL_DISCOVERY_MIN_SUITES = 32
+
     def __init__(self, env: Namespace):
 
         self.options = env.options
@@ -125,6 +189,7 @@ class TestPlan:
         self.modules = []
 
         self.run_individual_testsuite = []
+        self.discovery_cache = None
         self.levels = []
         self.test_config =  {}
 
@@ -189,7 +254,15 @@ class TestPlan:
             self.run_individual_testsuite = self.options.test
 
         self.add_configurations()
+        if self.options.discovery_cache:
+            self.discovery_cache = DiscoveryCache(
+                self.options.discovery_cache, schema=self.suite_schema
+            )
+            self.discovery_cache.load()
         num = self.add_testsuites(testsuite_filter=self.run_individual_testsuite)
+        if self.discovery_cache:
+            logger.info(f"Discovery cache: {self.discovery_cache.stats()}")
+            self.discovery_cache.save()
         if num == 0:
             raise TwisterRuntimeError("No testsuites found at the specified location...")
         if self.load_errors:
@@ -308,6 +381,22 @@ class TestPlan:
         # This fixes an issue where some sets would get majority of skips and
         # basically run nothing beside filtering.
         to_run = {k : v for k,v in self.instances.items() if v.status == TwisterStatus.NONE}
+        if self.options.subset_mode == 'duration':
+            sliced_instances = self.balanced_subset(to_run, subset, sets)
+        else:
+            sliced_instances = self.sliced_subset(to_run, subset, sets)
+
+        skipped = {k : v for k,v in self.instances.items() if v.status == TwisterStatus.SKIP}
+        errors = {k : v for k,v in self.instances.items() if v.status == TwisterStatus.ERROR}
+        self.instances = OrderedDict(sliced_instances)
+        if subset == 1:
+            # add all pre-filtered tests that are skipped or got error status
+            # to the first set to allow for better distribution among all sets.
+            self.instances.update(skipped)
+            self.instances.update(errors)
+
+    @staticmethod
+    def sliced_subset(to_run, subset, sets):
         total = len(to_run)
         per_set = int(total / sets)
         num_extra_sets = total - (per_set * sets)
@@ -323,15 +412,28 @@ class TestPlan:
             start = ((subset - num_extra_sets - 1) * per_set) + base
             end = start + per_set
 
-        sliced_instances = islice(to_run.items(), start, end)
-        skipped = {k : v for k,v in self.instances.items() if v.status == TwisterStatus.SKIP}
-        errors = {k : v for k,v in self.instances.items() if v.status == TwisterStatus.ERROR}
-        self.instances = OrderedDict(sliced_instances)
-        if subset == 1:
-            # add all pre-filtered tests that are skipped or got error status
-            # to the first set to allow for better distribution among all sets.
-            self.instances.update(skipped)
-            self.instances.update(errors)
+        return islice(to_run.items(), start, end)
+
+    def balanced_subset(self, to_run, subset, sets):
+        # Every subset computes the whole partition from the same history and
+        # the same instance order, then keeps its own shard.
+        timing_db = TimingDatabase.from_reports(self.options.subset_history)
+        estimator = TaskCostEstimator(timing_db)
+        costs = {k: sum(estimator.estimate(v)) for k, v in to_run.items()}
+        shards = balance_shards(costs, sets)
+
+        totals = [total for total, _ in shards]
+        longest = max(totals, default=0.0)
+        shortest = min(totals, default=0.0)
+        logger.info(
+            f"Subsets balanced by duration, timing history of {len(timing_db)} configurations"
+        )
+        logger.info(
+            f"Predicted subset duration: {totals[subset - 1]:.0f} s, "
+            f"shortest {shortest:.0f} s, longest {longest:.0f} s, "
+            f"spread {longest - shortest:.0f} s"
+        )
+        return ((k, to_run[k]) for k in shards[subset - 1][1])
 
 
     def handle_modules(self):
@@ -487,15 +589,19 @@ class TestPlan:
                             testcases.remove(case.detailed_name)
         return testcases
 
-    def add_testsuites(self, testsuite_filter=None):
-        if testsuite_filter is None:
-            testsuite_filter = []
+    def find_testsuite_configs(self):
+        """
+        Walk the test roots and return a (root, suite_path, suite_yaml_path)
+        tuple for every testsuite found, in a deterministic order.
+        """
+        configs = []
         for root in self.env.test_roots:
             root = os.path.abspath(root)
 
             logger.debug(f"Reading testsuite configuration files under {root}...")
 
-            for dirpath, _, filenames in os.walk(root, topdown=True):
+            for dirpath, dirnames, filenames in os.walk(root, topdown=True):
+                dirnames.sort()
                 if self.SAMPLE_FILENAME in filenames:
                     filename = self.SAMPLE_FILENAME
                 elif self.TESTSUITE_FILENAME in filenames:
@@ -519,65 +625,105 @@ class TestPlan:
                         suite_yaml_path = alt_config
                         break
 
-                try:
-                    parsed_data = TwisterConfigParser(suite_yaml_path, self.suite_schema)
-                    parsed_data.load()
-                    subcases = None
-                    ztest_suite_names = None
-
-                    for name in parsed_data.scenarios:
-                        suite_dict = parsed_data.get_scenario(name)
-                        suite = TestSuite(
-                            root,
-                            suite_path,
-                            name,
-                            data=suite_dict,
-                            detailed_test_id=self.options.detailed_test_id
-                        )
+                configs.append((root, suite_path, suite_yaml_path))
+        return configs
+
+    def load_testsuite_configs(self, configs):
+        """
+        Yield the load_testsuite_config() result of every testsuite in
+        "configs", in the same order. Large sets are spread over a pool of
+        --discovery-jobs worker processes.
+        """
+        jobs = None
+        if len(configs) >= self.PARALLEL_DISCOVERY_MIN_SUITES:
+            jobs = self.options.discovery_jobs or os.cpu_count() or 1
+
+        if not jobs or jobs <= 1:
+            for _, suite_path, suite_yaml_path in configs:
+                yield load_testsuite_config(
+                    suite_yaml_path, suite_path, self.suite_schema, self.discovery_cache
+                )
+            return
 
-                        # convert to fully qualified names
-                        suite.integration_platforms = self.verify_platforms_existence(
-                                suite.integration_platforms,
-                                f"integration_platforms in {suite.name}")
-                        suite.platform_exclude = self.verify_platforms_existence(
-                                suite.platform_exclude,
-                                f"platform_exclude in {suite.name}")
-                        suite.platform_allow =  self.verify_platforms_existence(
-                                suite.platform_allow,
-                                f"platform_allow in {suite.name}")
-
-                        if suite.harness in ['ztest', 'test']:
-                            if subcases is None:
-                                # scan it only once per testsuite
-                                subcases, ztest_suite_names = scan_testsuite_path(suite_path)
-                            suite.add_subcases(suite_dict, subcases, ztest_suite_names)
+        logger.debug(f"Loading {len(configs)} testsuites with {jobs} workers")
+        args = [(suite_yaml_path, suite_path) for _, suite_path, suite_yaml_path in configs]
+        chunksize = max(1, len(args) // (jobs * 8))
+        with multiprocessing.Pool(
+            jobs,
+            initializer=_init_discovery_worker,
+            initargs=(self.suite_schema, self.discovery_cache),
+        ) as pool:
+            for result, updates in pool.imap(_discovery_worker_load, args, chunksize):
+                if updates:
+                    self.discovery_cache.merge_updates(updates)
+                yield result
+
+    def add_testsuites(self, testsuite_filter=None):
+        if testsuite_filter is None:
+            testsuite_filter = []
+        configs = self.find_testsuite_configs()
+        results = self.load_testsuite_configs(configs)
+        for (root, suite_path, suite_yaml_path), (data, scan) in zip(configs, results, strict=True):
+            try:
+                if isinstance(data, Exception):
+                    raise data
+                parsed_data = TwisterConfigParser(suite_yaml_path, self.suite_schema)
+                parsed_data.load(data=data)
+
+                for name in parsed_data.scenarios:
+                    suite_dict = parsed_data.get_scenario(name)
+                    suite = TestSuite(
+                        root,
+                        suite_path,
+                        name,
+                        data=suite_dict,
+                        detailed_test_id=self.options.detailed_test_id
+                    )
+
+                    # convert to fully qualified names
+                    suite.integration_platforms = self.verify_platforms_existence(
+                            suite.integration_platforms,
+                            f"integration_platforms in {suite.name}")
+                    suite.platform_exclude = self.verify_platforms_existence(
+                            suite.platform_exclude,
+                            f"platform_exclude in {suite.name}")
+                    suite.platform_allow =  self.verify_platforms_existence(
+                            suite.platform_allow,
+                            f"platform_allow in {suite.name}")
+
+                    if suite.harness in ['ztest', 'test']:
+                        # sources are scanned only once per testsuite
+                        if isinstance(scan, Exception):
+                            raise scan
+                        subcases, ztest_suite_names = scan
+                        suite.add_subcases(suite_dict, subcases, ztest_suite_names)
+                    else:
+                        suite.add_subcases(suite_dict)
+
+                    if testsuite_filter:
+                        scenario = os.path.basename(suite.name)
+                        if (
+                            suite.name
+                            and (suite.name in testsuite_filter or scenario in testsuite_filter)
+                        ):
+                            self.testsuites[suite.name] = suite
+                    elif suite.name in self.testsuites:
+                        msg = (
+                            f"test suite '{suite.name}' in '{suite.yamlfile}' is already added"
+                        )
+                        if suite.yamlfile == self.testsuites[suite.name].yamlfile:
+                            logger.debug(f"Skip - {msg}")
                         else:
-                            suite.add_subcases(suite_dict)
-
-                        if testsuite_filter:
-                            scenario = os.path.basename(suite.name)
-                            if (
-                                suite.name
-                                and (suite.name in testsuite_filter or scenario in testsuite_filter)
-                            ):
-                                self.testsuites[suite.name] = suite
-                        elif suite.name in self.testsuites:
                             msg = (
-                                f"test suite '{suite.name}' in '{suite.yamlfile}' is already added"
+                                f"Duplicate {msg} from '{self.testsuites[suite.name].yamlfile}'"
                             )
-                            if suite.yamlfile == self.testsuites[suite.name].yamlfile:
-                                logger.debug(f"Skip - {msg}")
-                            else:
-                                msg = (
-                                    f"Duplicate {msg} from '{self.testsuites[suite.name].yamlfile}'"
-                                )
-                                raise TwisterRuntimeError(msg)
-                        else:
-                            self.testsuites[suite.name] = suite
+                            raise TwisterRuntimeError(msg)
+                    else:
+                        self.testsuites[suite.name] = suite
 
-                except Exception as e:
-                    logger.error(f"{suite_path}: can't load (skipping): {e!r}")
-                    self.load_errors += 1
+            except Exception as e:
+                logger.error(f"{suite_path}: can't load (skipping): {e!r}")
+                self.load_errors += 1
         return len(self.testsuites)
 
     def __str__(self):
@@ -286,23 +286,22 @@ def find_c_files_in(path: str, extensions: list = None) -> list:
     if not os.path.isdir(path):
         return []
 
-    # back up previous CWD
-    oldpwd = os.getcwd()
-    os.chdir(path)
-
     filenames = []
     for ext in extensions:
         # glob.glob('**/*.c') does not pick up the base directory
-        filenames += [os.path.join(path, x) for x in glob.glob(f'*.{ext}')]
+        filenames += [os.path.join(path, x) for x in glob.glob(f'*.{ext}', root_dir=path)]
         # glob matches in subdirectories too
-        filenames += [os.path.join(path, x) for x in glob.glob(f'**/*.{ext}')]
-
-    # restore previous CWD
-    os.chdir(oldpwd)
+        filenames += [os.path.join(path, x) for x in glob.glob(f'**/*.{ext}', root_dir=path)]
 
     return filenames
 
-def scan_testsuite_path(testsuite_path):
+def scan_testsuite_path(testsuite_path, cache=None):
+    """
+    Scan the sources of a test suite for ztest suites and test cases. Scan
+    results of single files are taken from the DiscoveryCache "cache" when
+    given.
+    """
+    scan = cache.scan_file if cache else scan_file
     subcases = []
     has_registered_test_suites = False
     has_run_registered_test_suites = False
@@ -314,7 +313,7 @@ def scan_testsuite_path(testsuite_path):
         if os.stat(filename).st_size == 0:
             continue
         try:
-            result: ScanPathResult = scan_file(filename)
+            result: ScanPathResult = scan(filename)
             if result.warnings:
                 logger.error(f"{filename}: {result.warnings}")
                 raise TwisterRuntimeError(f"{filename}: {result.warnings}")
@@ -340,7 +339,7 @@ def scan_testsuite_path(testsuite_path):
             continue
 
         try:
-            result: ScanPathResult = scan_file(filename)
+            result: ScanPathResult = scan(filename)
             if result.warnings:
                 logger.error(f"{filename}: {result.warnings}")
             if result.matches:
@@ -0,0 +1,199 @@
+# Copyright The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import statistics
+from dataclasses import dataclass
+
+from twisterlib.statuses import TwisterStatus
+
+logger = logging.getLogger('twister')
+
+
+@dataclass
+class TimingRecord:
+    """Durations and footprint of a configuration averaged over earlier runs.
+
+    Only the runs which measured a duration count as samples of it, so that
+    build-only runs do not pull the average handler time towards zero.
+    """
+
+    build_time: float = 0.0
+    handler_time: float = 0.0
+    used_rom: int = 0
+    build_samples: int = 0
+    handler_samples: int = 0
+
+    def add(self, build_time: float, handler_time: float, used_rom: int) -> None:
+        if build_time > 0:
+            n = self.build_samples
+            self.build_time = (self.build_time * n + build_time) / (n + 1)
+            self.build_samples = n + 1
+        if handler_time > 0:
+            n = self.handler_samples
+            self.handler_time = (self.handler_time * n + handler_time) / (n + 1)
+            self.handler_samples = n + 1
+        if used_rom:
+            self.used_rom = used_rom
+
+
+class TimingDatabase:
+    """Historical build and run times of test configurations.
+
+    The database is filled from twister.json reports of earlier runs. Every
+    configuration is identified by its platform, toolchain and test scenario
+    name, so the records can be matched against TestInstance objects of the
+    current test plan.
+    """
+
+    def __init__(self) -> None:
+        self.records: dict[tuple[str, str, str], TimingRecord] = {}
+        self._by_scenario: dict[tuple[str, str], TimingRecord] = {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @classmethod
+    def from_reports(cls, filenames) -> TimingDatabase:
+        db = cls()
+        for filename in filenames or []:
+            db.load_report(filename)
+        return db
+
+    def load_report(self, filename) -> None:
+        try:
+            with open(filename) as fp:
+                report = json.load(fp)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cannot load timing data from {filename}: {e}")
+            return
+
+        for suite in report.get('testsuites', []):
+            name = suite.get('name')
+            platform = suite.get('platform')
+            if not name or not platform:
+                continue
+            # Filtered and skipped suites were neither built nor run
+            if suite.get('status') in (TwisterStatus.FILTER, TwisterStatus.SKIP):
+                continue
+            build_time = float(suite.get('build_time', 0) or 0)
+            handler_time = float(suite.get('execution_time', 0) or 0)
+            if build_time <= 0 and handler_time <= 0:
+                continue
+            self.add(
+                platform,
+                suite.get('toolchain', ''),
+                name,
+                build_time=build_time,
+                handler_time=handler_time,
+                used_rom=int(suite.get('used_rom', 0) or 0),
+            )
+        logger.debug(f"Loaded timing data from {filename}, {len(self.records)} configurations")
+
+    def add(self, platform, toolchain, name, build_time=0.0, handler_time=0.0, used_rom=0):
+        key = (platform, toolchain or '', name)
+        record = self.records.setdefault(key, TimingRecord())
+        record.add(build_time, handler_time, used_rom)
+        self._by_scenario[(platform, name)] = record
+
+    def lookup(self, platform, name, toolchain=None) -> TimingRecord | None:
+        """Return the record of a configuration.
+
+        Records of the same scenario built with another toolchain are used when
+        there is no exact match.
+        """
+        record = self.records.get((platform, toolchain or '', name))
+        if record is None:
+            record = self._by_scenario.get((platform, name))
+        return record
+
+    def lookup_instance(self, instance) -> TimingRecord | None:
+        return self.lookup(instance.platform.name, instance.testsuite.name, instance.toolchain)
+
+    def median_build_time(self) -> float:
+        times = [r.build_time for r in self.records.values() if r.build_time]
+        return statistics.median(times) if times else 0.0
+
+    def median_handler_time(self) -> float:
+        times = [r.handler_time for r in self.records.values() if r.handler_time]
+        return statistics.median(times) if times else 0.0
+
+    def build_time_per_rom_byte(self) -> float:
+        """Ratio of build time to image size over all records having both."""
+        pairs = [
+            (r.build_time, r.used_rom) for r in self.records.values() if r.build_time and r.used_rom
+        ]
+        if not pairs:
+            return 0.0
+        return sum(t for t, _ in pairs) / sum(rom for _, rom in pairs)
+
+
+class TaskCostEstimator:
+    """Estimate how long the remaining pipeline stages of an instance take.
+
+    Estimates come from the TimingDatabase of earlier runs. Configurations
+    without history fall back to their recorded image size scaled by the
+    average build time per ROM byte, then to the median times of all known
+    configurations, and finally to fixed defaults.
+    """
+
+    DEFAULT_BUILD_TIME = 60.0
+    DEFAULT_HANDLER_TIME = 10.0
+
+    def __init__(self, timing_db: TimingDatabase = None):
+        self.timing_db = timing_db if timing_db is not None else TimingDatabase()
+        self.default_build_time = self.timing_db.median_build_time() or self.DEFAULT_BUILD_TIME
+        self.default_handler_time = (
+            self.timing_db.median_handler_time() or self.DEFAULT_HANDLER_TIME
+        )
+        self.rom_ratio = self.timing_db.build_time_per_rom_byte()
+
+    def estimate(self, instance) -> tuple[float, float]:
+        """Return the (build, run) time estimate of an instance in seconds."""
+        record = self.timing_db.lookup_instance(instance)
+        build_time = self.default_build_time
+        handler_time = self.default_handler_time
+        if record:
+            if record.build_time:
+                build_time = record.build_time
+            elif record.used_rom and self.rom_ratio:
+                build_time = record.used_rom * self.rom_ratio
+            if record.handler_time:
+                handler_time = record.handler_time
+        if not instance.run:
+            handler_time = 0.0
+        return build_time, handler_time
+
+    def costs(self, instances) -> dict[str, tuple[float, float]]:
+        return {instance.name: self.estimate(instance) for instance in instances}
+
+
+def balance_shards(costs: dict[str, float], shards: int) -> list[tuple[float, list[str]]]:
+    """Split items into shards of about the same total cost.
+
+    Greedy longest processing time first: items are taken by decreasing cost
+    and each one goes to the shard with the lowest total so far. Ties are
+    broken by the order of ``costs`` and by the shard index, so the same input
+    always gives the same partition.
+
+    Returns a (total cost, item names) tuple per shard, names in the order of
+    ``costs``.
+    """
+    order = {name: index for index, name in enumerate(costs)}
+    ranked = sorted(costs, key=lambda name: (-costs[name], order[name]))
+    heap = [(0.0, shard) for shard in range(shards)]
+    assigned: list[list[str]] = [[] for _ in range(shards)]
+    totals = [0.0] * shards
+    for name in ranked:
+        total, shard = heapq.heappop(heap)
+        assigned[shard].append(name)
+        totals[shard] = total + costs[name]
+        heapq.heappush(heap, (totals[shard], shard))
+    return [
+        (totals[shard], sorted(assigned[shard], key=order.__getitem__)) for shard in range(shards)
+    ]
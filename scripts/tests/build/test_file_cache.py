@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# Copyright The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for the cache of file processing results of file_cache.py
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE", str(Path(__file__).parents[3]))
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts", "build"))
+
+import file_cache  # noqa: E402
+
+HEADER = ("test", 1)
+
+
+@pytest.fixture
+def src(tmp_path):
+    # A file last modified well before any run started
+    path = tmp_path / "src.h"
+    path.write_text("int a;\n")
+    past_ns = time.time_ns() - 60 * 1000 * 1000 * 1000
+    os.utime(path, ns=(past_ns, past_ns))
+    return path
+
+
+def result_of(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size, "result")
+
+
+def test_cache_hit(tmp_path, src):
+    """Test that the results of unchanged files are loaded from the cache"""
+    cache = tmp_path / "cache" / "results.pickle"
+    start_ns = time.time_ns()
+    file_cache.save_cache(str(cache), HEADER, start_ns, {str(src): result_of(src)})
+
+    cached_start_ns, results = file_cache.load_cache(str(cache), HEADER)
+    assert cached_start_ns == start_ns
+    assert results == {str(src): result_of(src)}
+    assert file_cache.is_unchanged(str(src), results[str(src)], cached_start_ns)
+
+
+def test_changed_file(tmp_path, src):
+    """Test that a file changed since its result was cached is processed again"""
+    cache = tmp_path / "results.pickle"
+    file_cache.save_cache(str(cache), HEADER, time.time_ns(), {str(src): result_of(src)})
+    src.write_text("int a, b;\n")
+
+    start_ns, results = file_cache.load_cache(str(cache), HEADER)
+    assert not file_cache.is_unchanged(str(src), results[str(src)], start_ns)
+
+    # Also when the file was written shortly before the run started, as its
+    # modification time may not have changed since
+    result = result_of(src)
+    assert not file_cache.is_unchanged(str(src), result, time.time_ns())
+
+    src.unlink()
+    assert not file_cache.is_unchanged(str(src), result, start_ns)
+
+
+@pytest.mark.parametrize(
+    "content",
+    [b"", b"not a pickle", b"\x80\x05\x95\x10"],
+    ids=["empty", "garbage", "truncated"],
+)
+def test_corrupt_cache(tmp_path, content):
+    """Test that a corrupt cache is ignored, and replaced by the next run"""
+    cache = tmp_path / "results.pickle"
+    cache.write_bytes(content)
+    assert file_cache.load_cache(str(cache), HEADER) == (0, {})
+
+    file_cache.save_cache(str(cache), HEADER, 1, {"a": (1, 2)})
+    assert file_cache.load_cache(str(cache), HEADER) == (1, {"a": (1, 2)})
+
+
+def test_other_header(tmp_path):
+    """Test that the results cached with another header are ignored"""
+    cache = tmp_path / "results.pickle"
+    file_cache.save_cache(str(cache), HEADER, 1, {"a": (1, 2)})
+    assert file_cache.load_cache(str(cache), ("test", 2)) == (0, {})
+    assert file_cache.load_cache(str(tmp_path / "missing.pickle"), HEADER) == (0, {})
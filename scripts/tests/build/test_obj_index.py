@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# Copyright The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for the object file index of obj_index.py
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE", str(Path(__file__).parents[3]))
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts", "build"))
+
+import obj_index  # noqa: E402
+
+CC = os.environ.get("CC", "cc")
+
+SOURCES = {
+    "a.c": "int a_data = 1;\nint a_bss;\n__attribute__((section(\".app_a\"))) int a_app;\n",
+    "b.c": "int b_data = 2;\n",
+}
+
+
+def compile_source(tmp_path, name, source, mtime_ns):
+    src = tmp_path / name
+    src.write_text(source)
+    obj = tmp_path / "objs" / (name + ".obj")
+    obj.parent.mkdir(exist_ok=True)
+    subprocess.run([CC, "-c", "-fcommon", "-o", str(obj), str(src)], check=True)
+    # Written well before the runs, see file_cache.MTIME_MARGIN_NS
+    os.utime(obj, ns=(mtime_ns, mtime_ns))
+    return str(obj)
+
+
+@pytest.fixture
+def objs(tmp_path):
+    if shutil.which(CC) is None:
+        pytest.skip(f"no C compiler '{CC}'")
+
+    past_ns = time.time_ns() - 60 * 1000 * 1000 * 1000
+    return [compile_source(tmp_path, name, source, past_ns) for name, source in SOURCES.items()]
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    # The object files read from disk
+    paths = []
+    read_object_file = obj_index.read_object_file
+
+    def recording_read_object_file(path):
+        paths.append(path)
+        return read_object_file(path)
+
+    monkeypatch.setattr(obj_index, "read_object_file", recording_read_object_file)
+    return paths
+
+
+def section_names(obj):
+    return [name for name, _ in obj.sections]
+
+
+def test_read(objs, reads):
+    """Test that the sections and common symbols of object files are read once"""
+    index = obj_index.ObjectIndex()
+    a, b = index.read(objs)
+
+    assert ".app_a" in section_names(a) and ".app_a" not in section_names(b)
+    assert "a_bss" in [name for names in a.common_symbols.values() for name in names]
+    assert a.error is None
+
+    assert index.get(objs[0]) is a
+    assert reads == objs
+
+
+def test_cache_hit(tmp_path, objs, reads):
+    """Test that unchanged object files are loaded from the cache"""
+    cache_dir = str(tmp_path / "cache")
+    expected = obj_index.ObjectIndex(cache_dir).read(objs)
+    del reads[:]
+
+    assert obj_index.ObjectIndex(cache_dir).read(objs) == expected
+    assert reads == []
+
+
+def test_changed_file(tmp_path, objs, reads):
+    """Test that an object file modified since it was cached is read again"""
+    cache_dir = str(tmp_path / "cache")
+    obj_index.ObjectIndex(cache_dir).read(objs)
+    del reads[:]
+
+    past_ns = time.time_ns() - 30 * 1000 * 1000 * 1000
+    compile_source(tmp_path, "a.c", "int a_data = 1;\n", past_ns)
+    a, _ = obj_index.ObjectIndex(cache_dir).read(objs)
+
+    assert reads == [objs[0]]
+    assert ".app_a" not in section_names(a)
+
+    # The cache now has the new content
+    del reads[:]
+    assert obj_index.ObjectIndex(cache_dir).get(objs[0]) == a
+    assert reads == []
+
+
+def test_corrupt_cache(tmp_path, objs, reads):
+    """Test that a corrupt cache is ignored, and replaced"""
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    (cache_dir / obj_index.OBJ_INDEX_CACHE_FILE).write_bytes(b"\x80\x05garbage")
+
+    expected = obj_index.ObjectIndex().read(objs)
+    assert obj_index.ObjectIndex(str(cache_dir)).read(objs) == expected
+    assert reads == objs + objs
+
+    del reads[:]
+    assert obj_index.ObjectIndex(str(cache_dir)).read(objs) == expected
+    assert reads == []
+
+
+def test_not_elf(tmp_path, reads):
+    """Test that files which are not ELF files are indexed with an error"""
+    (tmp_path / "empty.obj").write_bytes(b"")
+    (tmp_path / "text.obj").write_text("not an object file\n")
+
+    paths = obj_index.find_object_files(str(tmp_path))
+    empty, text = obj_index.ObjectIndex().read(paths)
+
+    assert empty.error == "empty file"
+    assert text.error and text.sections == []
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# Copyright The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for the cached scan of parse_syscalls.py
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE", str(Path(__file__).parents[3]))
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts", "build"))
+
+import parse_syscalls  # noqa: E402
+
+FILES = {
+    "include/zephyr/drivers/foo.h": (
+        "__syscall int foo_read(const struct device *dev, uint8_t *buf);\n"
+        "__subsystem struct foo_driver_api {\n\tint (*read)(void);\n};\n"
+    ),
+    "include/zephyr/drivers/bar.h": "__syscall_always_inline void bar_reset(int id);\n",
+    "include/zephyr/toolchain/common.h": "#define __syscall\n",
+    "include/zephyr/types.h": "typedef int foo_t;\n",
+    "subsys/net/sock.c": "__net_socket struct sock_obj {\n\tint fd;\n};\n",
+    "subsys/net/sock.h": "__syscall int zsock_close(int sock);\n",
+}
+
+
+@pytest.fixture
+def tree(tmp_path):
+    # Sources last modified well before any run started
+    past_ns = time.time_ns() - 60 * 1000 * 1000 * 1000
+    for name, content in FILES.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        os.utime(path, ns=(past_ns, past_ns))
+    return tmp_path
+
+
+@pytest.fixture
+def scans(monkeypatch):
+    # The files scanned, and whether they had a cached entry
+    paths = []
+    scan_file = parse_syscalls.scan_file
+
+    def recording_scan_file(path, cached=None):
+        paths.append((os.path.basename(path), cached is not None))
+        return scan_file(path, cached)
+
+    monkeypatch.setattr(parse_syscalls, "scan_file", recording_scan_file)
+    return paths
+
+
+def run(tree, monkeypatch, out, cache=True, jobs=1):
+    """Run parse_syscalls.py on the tree, and return its JSON files"""
+    out = tree / out
+    out.mkdir(exist_ok=True)
+    argv = [
+        "parse_syscalls.py",
+        "-i", str(tree / "include"),
+        "--scan", str(tree / "subsys"),
+        "-j", str(out / "syscalls.json"),
+        "-t", str(out / "struct_tags.json"),
+        "--jobs", str(jobs),
+    ]  # fmt: skip
+    if cache:
+        argv += ["--cache-dir", str(tree / "cache")]
+    monkeypatch.setattr(sys, "argv", argv)
+    parse_syscalls.main()
+    return out / "syscalls.json", out / "struct_tags.json"
+
+
+def contents(paths):
+    return [path.read_text() for path in paths]
+
+
+def test_cold_warm_touched(tree, monkeypatch, scans):
+    """Test that cold, warm and incremental runs give the same JSON files"""
+    expected = contents(run(tree, monkeypatch, "uncached", cache=False))
+    assert "foo_read" in expected[0] and "zsock_close" in expected[0]
+    assert "foo_driver_api" in expected[1] and "sock_obj" in expected[1]
+
+    # Cold: all the files are scanned
+    del scans[:]
+    outputs = run(tree, monkeypatch, "out")
+    assert contents(outputs) == expected
+    assert len(scans) == len(FILES) - 1
+    assert not any(cached for _, cached in scans)
+
+    # Written well before the next runs, so that rewriting them is noticed
+    past_ns = time.time_ns() - 30 * 1000 * 1000 * 1000
+    for path in outputs:
+        os.utime(path, ns=(past_ns, past_ns))
+
+    # Warm: no file is scanned and the JSON files are not rewritten
+    del scans[:]
+    assert contents(run(tree, monkeypatch, "out")) == expected
+    assert scans == []
+    assert all(path.stat().st_mtime_ns == past_ns for path in outputs)
+
+    # Touched: the file is read again, and its cached results reused
+    os.utime(tree / "subsys" / "net" / "sock.h")
+    del scans[:]
+    assert contents(run(tree, monkeypatch, "out")) == expected
+    assert scans == [("sock.h", True)]
+    assert all(path.stat().st_mtime_ns == past_ns for path in outputs)
+
+
+def test_edited_file(tree, monkeypatch, scans):
+    """Test that an edited file is scanned again, and the JSON files updated"""
+    run(tree, monkeypatch, "out")
+    (tree / "include" / "zephyr" / "drivers" / "bar.h").write_text(
+        "__syscall void bar_reset(int id);\n__syscall int bar_status(int id);\n"
+    )
+
+    del scans[:]
+    outputs = run(tree, monkeypatch, "out")
+    assert scans == [("bar.h", True)]
+    assert "bar_status" in outputs[0].read_text()
+    assert contents(outputs) == contents(run(tree, monkeypatch, "uncached", cache=False))
+
+
+def test_jobs(tree, monkeypatch):
+    """Test that scanning files in several processes gives the same JSON files"""
+    expected = contents(run(tree, monkeypatch, "uncached", cache=False))
+
+    monkeypatch.setattr(parse_syscalls, "MIN_FILES_PER_POOL", 1)
+    outputs = run(tree, monkeypatch, "out", jobs=2)
+    assert contents(outputs) == expected
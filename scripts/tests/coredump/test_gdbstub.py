@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# Copyright The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for the memory reads of the coredump GDB stub of gdbstub.py
+"""
+
+import os
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE", str(Path(__file__).parents[3]))
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts", "coredump"))
+
+from gdbstubs.gdbstub import GdbStub  # noqa: E402
+
+
+class _GdbStub(GdbStub):
+    def handle_register_group_read_packet(self):
+        pass
+
+
+def log_region(start, data):
+    """Return a region of memory dumped by the target, with an exclusive end"""
+    return {"start": start, "end": start + len(data), "data": data}
+
+
+def elf_region(start, data):
+    """Return a region of an ELF section, with an inclusive end"""
+    return {"start": start, "end": start + len(data) - 1, "data": data}
+
+
+def make_stub(log_regions=(), elf_regions=()):
+    logfile = mock.Mock(get_memory_regions=mock.Mock(return_value=list(log_regions)))
+    elffile = mock.Mock(get_memory_regions=mock.Mock(return_value=list(elf_regions)))
+    return _GdbStub(logfile, elffile)
+
+
+def test_adjacent_regions():
+    """Test that a read can span adjacent regions"""
+    stub = make_stub(
+        log_regions=[log_region(0x1000, b"\x01\x02\x03\x04"), log_region(0x1004, b"\x05\x06")],
+        elf_regions=[elf_region(0x1006, b"\x07\x08")],
+    )
+
+    assert stub.get_memory(0x1000, 8) == bytes(range(1, 9))
+    assert stub.get_memory(0x1002, 5) == b"\x03\x04\x05\x06\x07"
+    assert stub.get_memory(0x1004, 2) == b"\x05\x06"
+
+
+@pytest.mark.parametrize(
+    "start, length",
+    [(0x0FFF, 2), (0x1002, 4), (0x1004, 1), (0x1007, 2), (0x100A, 1), (0x2000, 1)],
+    ids=["before", "into gap", "in gap", "from gap", "after", "far after"],
+)
+def test_gap(start, length):
+    """Test that a read of memory not in the core dump fails"""
+    stub = make_stub(
+        log_regions=[log_region(0x1000, b"\x01\x02\x03\x04"), log_region(0x1008, b"\x09\x0a")]
+    )
+
+    assert stub.get_memory(start, length) is None
+
+
+def test_elf_section_end():
+    """Test that the last byte of an ELF section can be read"""
+    stub = make_stub(elf_regions=[elf_region(0x2000, b"\xaa\xbb\xcc\xdd")])
+
+    assert stub.get_memory(0x2003, 1) == b"\xdd"
+    assert stub.get_memory(0x2000, 4) == b"\xaa\xbb\xcc\xdd"
+    assert stub.get_memory(0x2003, 2) is None
+
+
+def test_overlapping_regions():
+    """Test that memory dumped by the target is read over the ELF sections"""
+    stub = make_stub(
+        log_regions=[log_region(0x3002, b"\x11\x12"), log_region(0x3003, b"\x21\x22\x23")],
+        elf_regions=[elf_region(0x3000, b"\xe0\xe1\xe2\xe3\xe4\xe5\xe6\xe7")],
+    )
+
+    assert stub.get_memory(0x3000, 8) == b"\xe0\xe1\x11\x12\x22\x23\xe6\xe7"
+    assert stub.get_memory(0x3003, 1) == b"\x12"
+
+
+def test_memory_read_packet():
+    """Test the replies to 'm' packets"""
+    stub = make_stub(log_regions=[log_region(0x1000, b"\x01\x02")])
+    stub.socket = mock.Mock()
+
+    stub.handle_memory_read_packet(b"m1000,2")
+    stub.handle_memory_read_packet(b"m1001,2")
+
+    sent = [c.args[0] for c in stub.socket.send.call_args_list]
+    assert sent == [b"$0102#C3", b"$E01#A6"]
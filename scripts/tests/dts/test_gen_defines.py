@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# Copyright The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for gen_defines.py
+"""
+
+import os
+import pickle
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE", str(Path(__file__).parents[3]))
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts", "dts"))
+
+import gen_defines  # noqa: E402
+from devicetree import edtlib  # noqa: E402
+
+FIXTURES = Path(__file__).parent / "gen_defines"
+
+
+@pytest.fixture
+def edt_pickle(tmp_path, monkeypatch):
+    # Relative paths keep the top comment of the header independent of
+    # where the tree is checked out
+    monkeypatch.chdir(FIXTURES)
+    edt = edtlib.EDT(
+        "test.dts",
+        ["bindings"],
+        default_prop_types=True,
+        infer_binding_for_paths=["/zephyr,user", "/cpus"],
+    )
+    path = tmp_path / "edt.pickle"
+    with open(path, "wb") as f:
+        pickle.dump(edt, f, protocol=4)
+    return path
+
+
+def test_header(edt_pickle, tmp_path, monkeypatch):
+    """Test that the generated header matches the expected one exactly."""
+    header = tmp_path / "devicetree_generated.h"
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["gen_defines.py", "--edt-pickle", str(edt_pickle), "--header-out", str(header)],
+    )
+
+    gen_defines.main()
+
+    # Compared as text, as the header is written with the platform's line
+    # endings
+    expected = (FIXTURES / "devicetree_generated.h.expected").read_text(encoding="utf-8")
+    assert header.read_text(encoding="utf-8") == expected
+
+
+@pytest.mark.parametrize(
+    "s",
+    ["vnd,device", "spi@40002000", "Some-Mixed.Case+Name/x", "zephyr,user", "plain_name", "ÄÖ-1"],
+)
+def test_str2ident(s):
+    """Test that str2ident() converts the characters of the original regex."""
+    assert gen_defines.str2ident(s) == re.sub("[-,.@/+]", "_", s.lower())
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# Copyright The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for the incremental mode of gen_edt.py and gen_defines.py
+"""
+
+import os
+import shutil
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE", str(Path(__file__).parents[3]))
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts", "dts"))
+
+import gen_defines  # noqa: E402
+import gen_edt  # noqa: E402
+import incremental  # noqa: E402
+from devicetree import edtlib  # noqa: E402
+
+FIXTURES = Path(__file__).parent / "gen_defines"
+
+
+@pytest.fixture
+def build(tmp_path, monkeypatch):
+    # A copy of the gen_defines.py test devicetree and bindings, with the
+    # outputs of gen_edt.py and gen_defines.py next to them
+    shutil.copytree(FIXTURES, tmp_path, dirs_exist_ok=True)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def run_gen_edt(monkeypatch, dts="test.dts"):
+    argv = [
+        "gen_edt.py",
+        "--dts", dts,
+        "--dtc-flags", "",
+        "--bindings-dirs", "bindings",
+        "--dts-out", "zephyr.dts",
+        "--edt-pickle-out", "edt.pickle",
+        "--edt-snapshot-out", "edt.snapshot",
+        "--inputs-stamp", "gen_edt.stamp",
+    ]  # fmt: skip
+    monkeypatch.setattr(sys, "argv", argv)
+    gen_edt.main()
+
+
+def run_gen_defines(monkeypatch):
+    argv = [
+        "gen_defines.py",
+        "--edt-pickle", "edt.pickle",
+        "--header-out", "devicetree_generated.h",
+        "--inputs-stamp", "gen_defines.stamp",
+    ]  # fmt: skip
+    monkeypatch.setattr(sys, "argv", argv)
+    gen_defines.main()
+
+
+def mtimes(build):
+    return {
+        name: (build / name).stat().st_mtime_ns
+        for name in ["zephyr.dts", "edt.pickle", "edt.snapshot", "devicetree_generated.h"]
+    }
+
+
+def age(build):
+    # Moves the modification time of all outputs to the past, so that
+    # replaced outputs can be told apart on file systems with coarse
+    # timestamps
+    for name in mtimes(build):
+        os.utime(build / name, ns=(0, 0))
+
+
+def test_unchanged(build, monkeypatch):
+    """Test that nothing is done again when the inputs did not change."""
+    run_gen_edt(monkeypatch)
+    run_gen_defines(monkeypatch)
+    header = (build / "devicetree_generated.h").read_bytes()
+    assert header == (FIXTURES / "devicetree_generated.h.expected").read_bytes()
+    age(build)
+
+    with (
+        mock.patch.object(edtlib, "EDT", side_effect=AssertionError("EDT built")),
+        mock.patch.object(gen_defines, "write_header", side_effect=AssertionError("written")),
+    ):
+        run_gen_edt(monkeypatch)
+        run_gen_defines(monkeypatch)
+
+    assert set(mtimes(build).values()) == {0}
+
+
+def test_change_without_effect(build, monkeypatch):
+    """Test that outputs which would not change are not replaced."""
+    run_gen_edt(monkeypatch)
+    run_gen_defines(monkeypatch)
+    age(build)
+
+    # A new comment changes the DTS file, but nothing in the EDT
+    dts = build / "test.dts"
+    dts.write_text(dts.read_text() + "/* comment */\n")
+    run_gen_edt(monkeypatch)
+    run_gen_defines(monkeypatch)
+
+    assert set(mtimes(build).values()) == {0}
+
+
+def test_change(build, monkeypatch):
+    """Test that a devicetree change replaces the outputs it affects."""
+    run_gen_edt(monkeypatch)
+    run_gen_defines(monkeypatch)
+    age(build)
+
+    # As if an overlay changed a property
+    dts = build / "test.dts"
+    dts.write_text(dts.read_text().replace("int = <42>;", "int = <43>;"))
+    run_gen_edt(monkeypatch)
+    run_gen_defines(monkeypatch)
+
+    assert 0 not in mtimes(build).values()
+    header = (build / "devicetree_generated.h").read_text()
+    assert "#define DT_N_S_soc_S_spi_40002000_S_device_0_P_int 43\n" in header
+
+
+def test_binding_change(build, monkeypatch):
+    """Test that the EDT is built again when a binding changes."""
+    run_gen_edt(monkeypatch)
+
+    binding = build / "bindings" / "vnd,device.yaml"
+    binding.write_text(binding.read_text() + "  new-prop:\n    type: int\n")
+    with (
+        mock.patch.object(edtlib, "EDT", side_effect=SystemExit("EDT built")),
+        pytest.raises(SystemExit, match="EDT built"),
+    ):
+        run_gen_edt(monkeypatch)
+
+    # The stamp is removed before the outputs are written
+    assert not (build / "gen_edt.stamp").exists()
+
+
+def test_missing_output(build, monkeypatch):
+    """Test that missing outputs are written again."""
+    run_gen_edt(monkeypatch)
+    run_gen_defines(monkeypatch)
+
+    (build / "edt.snapshot").unlink()
+    (build / "devicetree_generated.h").unlink()
+    run_gen_edt(monkeypatch)
+    run_gen_defines(monkeypatch)
+
+    assert (build / "edt.snapshot").exists()
+    assert (build / "devicetree_generated.h").exists()
+
+
+def test_include(build, monkeypatch):
+    """Test that outputs are not reused for DTS files with /include/."""
+    (build / "main.dts").write_text('/include/ "test.dts"\n')
+    run_gen_edt(monkeypatch, dts="main.dts")
+
+    with (
+        mock.patch.object(edtlib, "EDT", side_effect=SystemExit("EDT built")),
+        pytest.raises(SystemExit, match="EDT built"),
+    ):
+        run_gen_edt(monkeypatch, dts="main.dts")
+
+
+def test_update_file(tmp_path):
+    """Test that files are only replaced when their contents change."""
+    path = tmp_path / "out"
+
+    assert incremental.update_file(str(path), lambda tmp: Path(tmp).write_text("a"))
+    assert not incremental.update_file(str(path), lambda tmp: Path(tmp).write_text("a"))
+    assert incremental.update_file(str(path), lambda tmp: Path(tmp).write_text("b"))
+    assert path.read_text() == "b"
+
+    def fail(tmp):
+        Path(tmp).write_text("partial")
+        raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        incremental.update_file(str(path), fail)
+    assert path.read_text() == "b"
+    assert os.listdir(tmp_path) == ["out"]
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# Copyright The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for the cache of parsed trees of kconfiglib.py
+"""
+
+import importlib
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE", str(Path(__file__).parents[3]))
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts", "kconfig"))
+
+import kconfiglib  # noqa: E402
+
+FUNCTIONS_MODULE = "kconfiglib_cache_test_functions"
+
+KCONFIG = """\
+config ENV_STR
+	string "env"
+	default "$(TEST_ENV)"
+
+config FN_STR
+	string "fn"
+	default "$(test-fn)"
+
+osource "modules/*/Kconfig"
+osource "$(BUILD_DIR)/Kconfig.gen"
+"""
+
+FUNCTIONS = """\
+RESULT = "first"
+
+
+def _test_fn(kconf, name):
+    return RESULT
+
+
+functions = {"test-fn": (_test_fn, 0, 0)}
+"""
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    # A Kconfig tree in src/, sourcing the Kconfig files of src/modules/ and
+    # the generated Kconfig file of the build directory in b1/ or b2/
+    src = tmp_path / "src"
+    (src / "modules" / "a").mkdir(parents=True)
+    (src / "Kconfig").write_text(KCONFIG)
+    (src / "modules" / "a" / "Kconfig").write_text('config A\n\tbool "a"\n')
+    for build_dir in "b1", "b2":
+        (tmp_path / build_dir).mkdir()
+        (tmp_path / build_dir / "Kconfig.gen").write_text('config GEN\n\tbool "gen"\n')
+
+    (tmp_path / "fns").mkdir()
+    (tmp_path / "fns" / (FUNCTIONS_MODULE + ".py")).write_text(FUNCTIONS)
+    monkeypatch.syspath_prepend(str(tmp_path / "fns"))
+    monkeypatch.setitem(sys.modules, FUNCTIONS_MODULE, importlib.import_module(FUNCTIONS_MODULE))
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("srctree", str(src))
+    monkeypatch.setenv("KCONFIG_FUNCTIONS", FUNCTIONS_MODULE)
+    monkeypatch.setenv("TEST_ENV", "first")
+    monkeypatch.setenv("BUILD_DIR", str(tmp_path / "b1"))
+    return tmp_path
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    # Whether each parse loaded a cached tree
+    results = []
+    load_cache = kconfiglib.Kconfig._load_cache
+
+    def recording_load_cache(self, *args):
+        results.append(load_cache(self, *args))
+        return results[-1]
+
+    monkeypatch.setattr(kconfiglib.Kconfig, "_load_cache", recording_load_cache)
+    return results
+
+
+def parse(tree, loads, filename="Kconfig", build_dir=None):
+    """Parse the tree with the cache, and return it and whether it was cached"""
+    kconf = kconfiglib.Kconfig(
+        filename,
+        warn_to_stderr=False,
+        cache_dir=str(tree / "cache"),
+        cache_build_dirs=[str(build_dir)] if build_dir else (),
+    )
+    return kconf, loads[-1]
+
+
+def cache(tree, loads, **kwargs):
+    """Parse the tree twice, so that it is cached"""
+    # The tree is only written by the second parse, see _save_cache()
+    for _ in range(2):
+        _, cached = parse(tree, loads, **kwargs)
+        assert not cached
+
+
+def test_cache_hit(tree, loads):
+    """Test that an unchanged tree is loaded from the cache"""
+    cache(tree, loads)
+    kconf, cached = parse(tree, loads)
+    assert cached
+
+    uncached = kconfiglib.Kconfig("Kconfig", warn_to_stderr=False)
+    assert list(kconf.syms) == list(uncached.syms)
+    assert kconf.syms["ENV_STR"].str_value == "first"
+    assert kconf.syms["FN_STR"].str_value == "first"
+    assert kconf.kconfig_filenames == uncached.kconfig_filenames
+    assert kconf.env_vars == uncached.env_vars
+
+
+def test_file_edit(tree, loads):
+    """Test that editing a Kconfig file invalidates the cached tree"""
+    cache(tree, loads)
+    (tree / "src" / "modules" / "a" / "Kconfig").write_text('config A2\n\tbool "a2"\n')
+
+    kconf, cached = parse(tree, loads)
+    assert not cached
+    assert "A2" in kconf.syms and "A" not in kconf.syms
+
+
+def test_glob(tree, loads):
+    """Test that a new file matching a 'source' glob invalidates the cached tree"""
+    cache(tree, loads)
+    (tree / "src" / "modules" / "b").mkdir()
+    (tree / "src" / "modules" / "b" / "Kconfig").write_text('config B\n\tbool "b"\n')
+
+    kconf, cached = parse(tree, loads)
+    assert not cached
+    assert "B" in kconf.syms
+
+
+def test_env(tree, loads, monkeypatch):
+    """Test that each value of an environment variable has its cached tree"""
+    cache(tree, loads)
+    monkeypatch.setenv("TEST_ENV", "second")
+
+    kconf, cached = parse(tree, loads)
+    assert not cached
+    assert kconf.syms["ENV_STR"].str_value == "second"
+
+    # The tree with the first value is still cached
+    monkeypatch.setenv("TEST_ENV", "first")
+    kconf, cached = parse(tree, loads)
+    assert cached
+    assert kconf.syms["ENV_STR"].str_value == "first"
+
+
+def test_function(tree, loads, monkeypatch):
+    """Test that a different preprocessor function result invalidates the cached tree"""
+    cache(tree, loads)
+    monkeypatch.setattr(sys.modules[FUNCTIONS_MODULE], "RESULT", "second")
+
+    kconf, cached = parse(tree, loads)
+    assert not cached
+    assert kconf.syms["FN_STR"].str_value == "second"
+
+
+def test_info(tree, loads):
+    """Test that trees calling $(info) are not cached"""
+    (tree / "src" / "Kconfig.info").write_text('$(info,parsing)\nsource "Kconfig"\n')
+    for _ in range(3):
+        _, cached = parse(tree, loads, filename="Kconfig.info")
+        assert not cached
+
+
+def test_build_dirs(tree, loads, monkeypatch):
+    """Test that builds in different directories share the cached tree"""
+    cache(tree, loads, build_dir=tree / "b1")
+    monkeypatch.setenv("BUILD_DIR", str(tree / "b2"))
+
+    kconf, cached = parse(tree, loads, build_dir=tree / "b2")
+    assert cached
+    gen_path = str(tree / "b2" / "Kconfig.gen")
+    assert kconf.syms["GEN"].nodes[0].filename == gen_path
+    assert gen_path in kconf.kconfig_filenames
+
+    # The generated Kconfig file of the build directory is still checked
+    (tree / "b2" / "Kconfig.gen").write_text('config GEN2\n\tbool "gen2"\n')
+    kconf, cached = parse(tree, loads, build_dir=tree / "b2")
+    assert not cached
+    assert "GEN2" in kconf.syms
+
+
+def test_build_dir_in_value(tree, loads, monkeypatch):
+    """Test that trees with build directory paths in values are not shared"""
+    for build_dir in "b1", "b2":
+        (tree / build_dir / "Kconfig.gen").write_text(
+            'config GEN_DIR\n\tstring "dir"\n\tdefault "$(BUILD_DIR)"\n'
+        )
+    cache(tree, loads, build_dir=tree / "b1")
+
+    kconf, cached = parse(tree, loads, build_dir=tree / "b1")
+    assert cached
+    assert kconf.syms["GEN_DIR"].str_value == str(tree / "b1")
+
+    monkeypatch.setenv("BUILD_DIR", str(tree / "b2"))
+    kconf, cached = parse(tree, loads, build_dir=tree / "b2")
+    assert not cached
+    assert kconf.syms["GEN_DIR"].str_value == str(tree / "b2")
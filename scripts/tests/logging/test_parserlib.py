@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# Copyright The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for the incremental log decoder of parserlib.py
+"""
+
+import json
+import logging
+import os
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE", str(Path(__file__).parents[3]))
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts", "logging", "dictionary"))
+
+import parserlib  # noqa: E402
+from dictionary_parser.log_parser import LogMessage  # noqa: E402
+
+FMT_ADDR = 0x1000
+SOURCE_ID = 7
+
+
+@pytest.fixture
+def decoder(tmp_path):
+    # A decoder for a version 3 database of a 32-bit little-endian target
+    database = {
+        "version": 3,
+        "target": {"bits": 32, "little_endianness": True},
+        "log_subsys": {
+            "log_instances": {
+                str(SOURCE_ID): {"source_id": SOURCE_ID, "name": "main", "level": 3, "addr": 7}
+            }
+        },
+        "build_id": "test",
+        "arch": "x86",
+        "kconfigs": {},
+        "string_mappings": {str(FMT_ADDR): "answer %d"},
+    }
+    dbfile = tmp_path / "database.json"
+    dbfile.write_text(json.dumps(database))
+    return parserlib.LogDecoder(str(dbfile), logging.getLogger("parser"))
+
+
+def encode_msg(value, timestamp=1000):
+    """Return a normal message logging 'answer <value>'"""
+    # cbprintf package: header (length in words, no strings), format string
+    # address, one int argument
+    package = bytes([3, 0, 0, 0]) + struct.pack("<Ii", FMT_ADDR, value)
+    # type, domain and level, package length, data length, source, timestamp
+    return struct.pack("<BBHHII", 0, 3 << 4, len(package), 0, SOURCE_ID, timestamp) + package
+
+
+def test_whole_message(decoder):
+    """Test that a message fed at once is decoded"""
+    msgs = list(decoder.feed(encode_msg(42)))
+
+    assert len(msgs) == 1
+    assert isinstance(msgs[0], LogMessage)
+    assert msgs[0].message == "answer 42"
+    assert not decoder.pending
+
+
+def test_split_message(decoder):
+    """Test that a message split across feed() calls is decoded once"""
+    data = encode_msg(42) + encode_msg(43)
+    split = len(data) // 4
+
+    assert list(decoder.feed(data[:split])) == []
+    assert decoder.pending == data[:split]
+
+    msgs = list(decoder.feed(data[split : len(data) - 1]))
+    assert [msg.message for msg in msgs] == ["answer 42"]
+
+    msgs = list(decoder.feed(data[len(data) - 1 :]))
+    assert [msg.message for msg in msgs] == ["answer 43"]
+    assert not decoder.pending
+
+
+def test_feed_without_consuming(decoder):
+    """Test that data is kept even if the messages are not consumed"""
+    data = encode_msg(42)
+    decoder.feed(data)
+    assert decoder.pending == data
+
+    msgs = list(decoder.feed(encode_msg(43)))
+    assert [msg.message for msg in msgs] == ["answer 42", "answer 43"]
+
+
+def test_finish(decoder):
+    """Test that finish() only fails with an incomplete message left"""
+    data = encode_msg(42)
+    list(decoder.feed(data))
+    decoder.finish()
+
+    list(decoder.feed(data[:-1]))
+    with pytest.raises(SystemExit) as e:
+        decoder.finish()
+    assert e.value.code == 1
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# Copyright The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for discovery_cache.py classes' methods
+"""
+
+import os
+from unittest import mock
+
+import scl
+from twisterlib.config_parser import TwisterConfigParser
+from twisterlib.discovery_cache import DiscoveryCache
+from twisterlib.testsuite import scan_file, scan_testsuite_path
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
+SUITE_SCHEMA = scl.yaml_load(
+    os.path.join(ZEPHYR_BASE, 'scripts', 'schemas', 'twister', 'testsuite-schema.yaml')
+)
+
+TESTCASE_YAML = """\
+tests:
+  dummy.cached:
+    tags: cache
+"""
+
+ZTEST_SOURCE = """\
+#include <zephyr/ztest.h>
+
+ZTEST_SUITE(cached_suite, NULL, NULL, NULL, NULL, NULL);
+
+ZTEST(cached_suite, test_one)
+{
+}
+"""
+
+
+def make_suite(tmp_path):
+    suite_dir = tmp_path / 'suite'
+    (suite_dir / 'src').mkdir(parents=True)
+    (suite_dir / 'testcase.yaml').write_text(TESTCASE_YAML)
+    (suite_dir / 'src' / 'main.c').write_text(ZTEST_SOURCE)
+    return suite_dir
+
+
+def test_discoverycache_load_config(tmp_path):
+    suite_dir = make_suite(tmp_path)
+    yaml_path = str(suite_dir / 'testcase.yaml')
+    cache_path = tmp_path / 'cache' / 'discovery.pickle'
+
+    cold = DiscoveryCache(cache_path, schema=SUITE_SCHEMA)
+    cold.load()
+    parser = TwisterConfigParser(yaml_path, SUITE_SCHEMA)
+    cold.load_config(parser)
+    cold.save()
+
+    assert cold.stats() == '0 hits, 1 misses'
+    assert os.path.exists(cache_path)
+
+    warm = DiscoveryCache(cache_path, schema=SUITE_SCHEMA)
+    warm.load()
+    warm_parser = TwisterConfigParser(yaml_path, SUITE_SCHEMA)
+    with mock.patch('scl.yaml_load_verify') as load_mock:
+        warm.load_config(warm_parser)
+
+    load_mock.assert_not_called()
+    assert warm.stats() == '1 hits, 0 misses'
+    assert warm_parser.scenarios == parser.scenarios
+    assert warm_parser.get_scenario('dummy.cached') == parser.get_scenario('dummy.cached')
+
+    # Modifying the cached copy does not leak into later lookups.
+    warm_parser.scenarios['dummy.cached']['tags'] = 'changed'
+    assert (
+        warm.load_config(TwisterConfigParser(yaml_path, SUITE_SCHEMA))['tests']
+        == parser.data['tests']
+    )
+
+
+def test_discoverycache_invalidation(tmp_path):
+    suite_dir = make_suite(tmp_path)
+    source = suite_dir / 'src' / 'main.c'
+    cache_path = tmp_path / 'discovery.pickle'
+
+    cache = DiscoveryCache(cache_path, schema=SUITE_SCHEMA)
+    cache.scan_file(str(source))
+    cache.save()
+
+    # Touched but unchanged files are matched by their content hash.
+    st = os.stat(source)
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 1000))
+    cache = DiscoveryCache(cache_path, schema=SUITE_SCHEMA)
+    cache.load()
+    assert cache.scan_file(str(source)) == scan_file(str(source))
+    assert cache.stats() == '1 hits, 0 misses'
+
+    source.write_text(ZTEST_SOURCE.replace('test_one', 'test_two'))
+    result = cache.scan_file(str(source))
+    assert result.matches == ['cached_suite.two']
+    assert cache.stats() == '1 hits, 1 misses'
+    cache.save()
+
+    # A different schema drops all entries.
+    other = DiscoveryCache(cache_path, schema={'type': 'map'})
+    other.load()
+    other.scan_file(str(source))
+    assert other.stats() == '0 hits, 1 misses'
+
+
+def test_discoverycache_unreadable(tmp_path, caplog):
+    cache_path = tmp_path / 'discovery.pickle'
+    cache_path.write_bytes(b'not a pickle')
+
+    cache = DiscoveryCache(cache_path, schema=SUITE_SCHEMA)
+    cache.load()
+
+    assert 'Ignoring unreadable discovery cache' in caplog.text
+
+
+def test_scan_testsuite_path_cached(tmp_path):
+    suite_dir = make_suite(tmp_path)
+    cache = DiscoveryCache(tmp_path / 'discovery.pickle', schema=SUITE_SCHEMA)
+
+    expected = scan_testsuite_path(str(suite_dir))
+    cold = scan_testsuite_path(str(suite_dir), cache=cache)
+    with mock.patch('twisterlib.testsuite.scan_file') as scan_mock:
+        warm = scan_testsuite_path(str(suite_dir), cache=cache)
+
+    scan_mock.assert_not_called()
+    assert expected == cold == warm == (['cached_suite.one'], ['cached_suite'])
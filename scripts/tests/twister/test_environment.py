@@ -256,6 +256,10 @@ def test_parse_arguments(zephyr_base, additional_args):
 
     assert options.extra_test_args == ['dummy_extra_1', 'dummy_extra_2']
 
+    assert options.pipeline_transport == 'manager'
+
+    assert options.handler_io == 'thread'
+
 
 TESTDATA_3 = [
     (
@@ -415,6 +415,48 @@ def test_binaryhandler_output_handler(
         handler.terminate.assert_called_once_with(proc)
 
 
+TESTDATA_3_1 = [
+    ('print("line one"); print("line two", end="")', 60,
+     'line one\nline two', TwisterStatus.NONE, False),
+    ('print("PASS", flush=True); print("late")', 60,
+     'PASS\nlate\n', TwisterStatus.PASS, False),
+    ('print("started", flush=True); import time; time.sleep(30)', 1,
+     'started\n', TwisterStatus.NONE, True),
+]
+
+@pytest.mark.parametrize(
+    'script, timeout, expected_log, expected_status, expected_terminate',
+    TESTDATA_3_1,
+    ids=['last line without eol', 'status', 'timeout']
+)
+def test_binaryhandler_serve_output(
+    mocked_instance,
+    script,
+    timeout,
+    expected_log,
+    expected_status,
+    expected_terminate
+):
+    def mock_handle(line):
+        if line == 'PASS':
+            harness.status = TwisterStatus.PASS
+
+    type(mocked_instance.testsuite).timeout = mock.PropertyMock(return_value=timeout)
+    type(mocked_instance.platform).timeout_multiplier = mock.PropertyMock(return_value=1)
+    handler = BinaryHandler(mocked_instance, 'build', mock.Mock(timeout_multiplier=1))
+    handler.terminate = mock.Mock(side_effect=lambda proc: proc.kill())
+    harness = mock.Mock(status=TwisterStatus.NONE, capture_coverage=False)
+    harness.handle = mock.Mock(side_effect=mock_handle)
+
+    with subprocess.Popen([sys.executable, '-c', script], stdout=subprocess.PIPE) as proc:
+        handler._serve_output(proc, harness)
+
+    harness.handle.assert_has_calls([mock.call(line) for line in expected_log.splitlines()])
+    assert harness.status == expected_status
+    with open(handler.log) as log:
+        assert log.read() == expected_log
+    assert handler.terminate.called == expected_terminate
+
 TESTDATA_4 = [
     (True, False, True, None, None,
      ['valgrind', '--error-exitcode=2', '--leak-check=full',
@@ -2044,6 +2086,78 @@ def test_qemuhandler_handle(
     assert all([expected_log in caplog.text for expected_log in expected_logs])
 
 
+FAKE_QEMU = """\
+import os, sys, time
+
+fifo_fn, pid_fn, output, exit_code = sys.argv[1:]
+with open(pid_fn, 'w') as pid_file:
+    pid_file.write(str(os.getpid()))
+with open(fifo_fn + '.out', 'wb') as fifo:
+    fifo.write(output.encode().decode('unicode_escape').encode('latin-1'))
+    fifo.flush()
+    if exit_code == 'forever':
+        time.sleep(60)
+sys.exit(int(exit_code))
+"""
+
+TESTDATA_26_1 = [
+    ('boot\\nPASS\\nlate\\n', 'forever', 60, TwisterStatus.PASS, 'PASS',
+     False, 'boot\nPASS\nlate\n'),
+    ('boot\\ncrash', '3', 60, TwisterStatus.FAIL, 'unexpected eof',
+     False, 'boot\n'),
+    ('boot\\n\\xff\\n', 'forever', 60, TwisterStatus.FAIL, 'unexpected byte',
+     False, 'boot\n'),
+    ('boot\\n', 'forever', 1, TwisterStatus.FAIL, 'timeout',
+     True, 'boot\n'),
+]
+
+@pytest.mark.parametrize(
+    'output, exit_code, timeout, expected_status, expected_reason,'
+    ' expected_timeout, expected_log',
+    TESTDATA_26_1,
+    ids=['pass', 'crash', 'unexpected byte', 'timeout']
+)
+def test_qemuhandler_run_with_selector(
+    mocked_instance,
+    tmp_path,
+    output,
+    exit_code,
+    timeout,
+    expected_status,
+    expected_reason,
+    expected_timeout,
+    expected_log
+):
+    def mock_handle(line):
+        if line == 'PASS':
+            harness.status = TwisterStatus.PASS
+            harness.reason = 'PASS'
+
+    type(mocked_instance.testsuite).timeout = mock.PropertyMock(return_value=timeout)
+    type(mocked_instance.platform).timeout_multiplier = mock.PropertyMock(return_value=1)
+    mocked_instance.testsuite.ignore_qemu_crash = False
+    handler = QEMUHandler(mocked_instance, 'build', mock.Mock(timeout_multiplier=1))
+    handler.log_fn = handler.log
+    handler.terminate = mock.Mock(side_effect=lambda proc: proc.kill())
+    harness = mock.Mock(status=TwisterStatus.NONE, capture_coverage=False)
+    harness.handle = mock.Mock(side_effect=mock_handle)
+
+    fake_qemu = tmp_path / 'fake_qemu.py'
+    fake_qemu.write_text(FAKE_QEMU)
+    command = [sys.executable, str(fake_qemu), handler.fifo_fn, handler.pid_fn,
+               output, exit_code]
+
+    assert handler._run_with_selector(harness, command) == expected_timeout
+
+    assert mocked_instance.status == expected_status
+    assert mocked_instance.reason == expected_reason
+    with open(handler.log) as log:
+        assert log.read() == expected_log
+    assert not os.path.exists(handler.fifo_fn + '.in')
+    assert not os.path.exists(handler.fifo_fn + '.out')
+    assert not os.path.exists(handler.pid_fn)
+
+
 def test_qemuhandler_get_fifo(mocked_instance):
     handler = QEMUHandler(mocked_instance, 'build', mock.Mock(timeout_multiplier=1))
     handler.fifo_fn = 'fifo_fn'
@@ -821,6 +821,59 @@ def test_test_handle(
         assert test_obj.instance.testcases[1].status == exp_status
 
 
+def test_test_handle_log(tmp_path):
+    mock_platform = mock.Mock()
+    mock_platform.name = "mock_platform"
+    mock_platform.normalized_name = "mock_platform"
+
+    mock_testsuite = mock.Mock(id="dummy.test_id", testcases=[])
+    mock_testsuite.name = "dummy_suite/dummy.test_id"
+    mock_testsuite.harness_config = {}
+    mock_testsuite.ztest_suite_names = ["suite"]
+    mock_testsuite.detailed_test_id = False
+    mock_testsuite.source_dir_rel = "dummy_suite"
+
+    outdir = tmp_path / "ztest_out"
+    with mock.patch('twisterlib.testsuite.TestSuite.get_unique', return_value="dummy_suite"):
+        instance = TestInstance(
+            testsuite=mock_testsuite, platform=mock_platform, toolchain='zephyr', outdir=outdir
+        )
+    instance.handler = mock.Mock(options=mock.Mock(verbose=0), type_str="handler_type")
+    instance.compose_case_name = lambda name: name
+
+    test_obj = Test()
+    test_obj.configure(instance)
+
+    log = [
+        "*** Booting Zephyr OS build v4.1.0 ***",
+        "Running TESTSUITE suite",
+        "START - test_one",
+        "output of one - not a result",
+        " PASS - test_one in 0.010 seconds",
+        "START - test_two",
+        "assertion failed",
+        " FAIL - test_two in 0.020 seconds",
+        "TESTSUITE suite failed.",
+        "SUITE FAIL -  50.00% [suite]: pass = 1, fail = 1, skip = 0, total = 2"
+        " duration = 0.030 seconds",
+        " - PASS - [suite.test_one] duration = 0.010 seconds",
+        "PROJECT EXECUTION FAILED",
+    ]
+    for line in log:
+        test_obj.handle(line)
+
+    cases = {tc.name: tc for tc in instance.testcases}
+    assert cases["one"].status == TwisterStatus.PASS
+    assert cases["one"].duration == 0.01
+    assert cases["two"].status == TwisterStatus.FAIL
+    assert cases["two"].output == (
+        "START - test_two\nassertion failed\n FAIL - test_two in 0.020 seconds\n"
+    )
+    assert test_obj.testcase_output == ""
+    assert test_obj.status == TwisterStatus.FAIL
+    assert test_obj.started_suites == {"suite": {"count": 0, "repeat": 0}}
+
+
 @pytest.fixture
 def gtest(tmp_path):
     mock_platform = mock.Mock()
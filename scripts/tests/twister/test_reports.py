@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# Copyright The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for reports.py classes' methods
+"""
+
+import io
+import json
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from twisterlib.reports import (
+    JSONReportReader,
+    JSONReportWriter,
+    Reporting,
+    XunitReportWriter,
+)
+from twisterlib.statuses import TwisterStatus
+
+HEADER = {
+    'environment': {
+        'os': 'posix',
+        'zephyr_version': 'v4.1.0',
+        'options': {'testsuite_root': [Path('tests')], 'jobs': 8, 'ratio': 0.5},
+    }
+}
+
+SUITES = [
+    {
+        'name': 'a/suite.one',
+        'platform': 'p1',
+        'arch': 'arm',
+        'status': 'passed',
+        'execution_time': '1.25',
+        'testcases': [{'identifier': 'suite.one.case', 'status': 'passed'}],
+    },
+    {
+        'name': 'b/suite.two',
+        'platform': 'p2',
+        'arch': 'x86',
+        'status': 'failed',
+        'reason': 'Failed',
+        'log': 'line\n"quoted" ☃ [1, 2]\n',
+        'used_ram': 123456789012,
+        'testcases': [],
+    },
+    {
+        'name': 'a/suite.three',
+        'platform': 'p1',
+        'arch': 'arm',
+        'status': 'filtered',
+        'reason': 'filter',
+        'runnable': False,
+        'testcases': [{'identifier': 'suite.three.case', 'status': 'filtered'}],
+    },
+]
+
+
+@pytest.mark.parametrize('count', [0, 1, 3], ids=['empty', 'one suite', 'suites'])
+def test_jsonreportwriter(count):
+    fp = io.StringIO()
+    writer = JSONReportWriter(fp, HEADER)
+    for suite in SUITES[:count]:
+        writer.add_suite(suite)
+    writer.close()
+
+    expected = json.dumps(
+        dict(HEADER, testsuites=SUITES[:count]), indent=4, separators=(',', ':'), default=str
+    )
+    assert fp.getvalue() == expected
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 1 << 20], ids=['byte', 'small', 'default'])
+@pytest.mark.parametrize('count', [0, 3], ids=['empty', 'suites'])
+def test_jsonreportreader(tmp_path, chunk_size, count):
+    report = dict(HEADER, testsuites=SUITES[:count], trailer=[1.5, 42])
+    report_file = tmp_path / 'twister.json'
+    report_file.write_text(json.dumps(report, indent=4, default=str))
+
+    with (
+        mock.patch.object(JSONReportReader, 'CHUNK_SIZE', chunk_size),
+        JSONReportReader(report_file) as reader,
+    ):
+        assert reader.header == json.loads(json.dumps(HEADER, default=str))
+        assert list(reader.testsuites()) == SUITES[:count]
+        assert reader.header['trailer'] == [1.5, 42]
+
+
+@pytest.mark.parametrize(
+    'content',
+    ['[]', '{"environment": {}, "testsuites": [{}, {}', '{"testsuites": [{} {}]}'],
+    ids=['not an object', 'truncated', 'missing delimiter'],
+)
+def test_jsonreportreader_invalid(tmp_path, content):
+    report_file = tmp_path / 'twister.json'
+    report_file.write_text(content)
+
+    with pytest.raises(json.JSONDecodeError), JSONReportReader(report_file) as reader:
+        list(reader.testsuites())
+
+
+def make_xunit_suite(name, parent=None):
+    suite = (
+        ET.Element('testsuite', name=name)
+        if parent is None
+        else ET.SubElement(parent, 'testsuite', name=name)
+    )
+    ET.SubElement(ET.SubElement(suite, 'properties'), 'property', name='version')
+    for case in ['a', 'b']:
+        testcase = ET.SubElement(suite, 'testcase', name=case)
+        ET.SubElement(testcase, 'failure', message='<failed>').text = 'log'
+    return suite
+
+
+@pytest.mark.parametrize('batch_size', [1, 100], ids=['batch of one', 'batch'])
+def test_xunitreportwriter(batch_size):
+    names = ['first', 'second', 'third', 'fourth']
+    root = ET.Element('testsuites')
+    for name in names:
+        make_xunit_suite(name, root)
+    ET.indent(root, space='\t', level=0)
+
+    fp = io.BytesIO()
+    writer = XunitReportWriter(fp)
+    writer.BATCH_SIZE = batch_size
+    for name in names:
+        suite = make_xunit_suite(name)
+        if name != 'second':
+            writer.add(suite)
+            continue
+        # testcases serialized apart, as done for the platform reports
+        cases = ET.Element('testsuite')
+        for tc in suite.findall('testcase'):
+            suite.remove(tc)
+            cases.append(tc)
+        writer.add(suite, [XunitReportWriter.testcases(cases)])
+    writer.close()
+
+    assert fp.getvalue() == ET.tostring(root)
+
+
+def test_xunitreportwriter_empty():
+    fp = io.BytesIO()
+    writer = XunitReportWriter(fp)
+    writer.close()
+
+    assert fp.getvalue() == ET.tostring(ET.Element('testsuites'))
+
+
+@pytest.mark.parametrize('detailed_skipped_report', [False, True], ids=['default', 'detailed'])
+def test_reporting_xunit_report(tmp_path, detailed_skipped_report):
+    json_file = tmp_path / 'twister.json'
+    json_file.write_text(json.dumps(dict(HEADER, testsuites=SUITES), default=str))
+    plan = SimpleNamespace(
+        instances={}, platforms=[], selected_platforms=['p1', 'p2', 'p3'], instance_fail_count=0
+    )
+    env = SimpleNamespace(
+        options=SimpleNamespace(
+            outdir=str(tmp_path), detailed_skipped_report=detailed_skipped_report
+        )
+    )
+    reporting = Reporting(plan, env)
+
+    xml_file = tmp_path / 'twister_report.xml'
+    reporting.xunit_report(json_file, xml_file, full_report=True)
+
+    root = ET.parse(xml_file).getroot()
+    expected_platforms = ['p1', 'p2', 'p3'] if detailed_skipped_report else ['p1', 'p2']
+    assert [ts.get('name') for ts in root] == expected_platforms
+    p1, p2 = root[0], root[1]
+    expected_cases = ['suite.one.case']
+    if detailed_skipped_report:
+        expected_cases.append('suite.three.case')
+    assert [tc.get('name') for tc in p1.iter('testcase')] == expected_cases
+    assert p1.get('time') == '1.25'
+    assert p2.get('tests') == '0'
+    assert all(ts.find('properties/property').get('value') == 'v4.1.0' for ts in root)
+
+    suite_xml_file = tmp_path / 'twister_suite_report.xml'
+    reporting.xunit_report_suites(json_file, suite_xml_file)
+
+    root = ET.parse(suite_xml_file).getroot()
+    expected_suites = [s['name'] for s in SUITES]
+    if not detailed_skipped_report:
+        expected_suites.remove('a/suite.three')
+    assert [ts.get('name') for ts in root] == expected_suites
+
+
+def test_reporting_json_report_streaming(tmp_path):
+    instance = mock.Mock(
+        testsuite=mock.Mock(source_dir_rel='tests/dummy'),
+        platform=mock.Mock(arch='arm'),
+        run_id=None,
+        status=TwisterStatus.PASS,
+        run=True,
+        retries=0,
+        toolchain='zephyr',
+        dut=None,
+        build_dir=str(tmp_path),
+        build_time=1.5,
+        testcases=[],
+        recording=None,
+        metrics={'handler_time': 0.5, 'used_ram': 1000},
+    )
+    instance.testsuite.name = 'dummy.suite'
+    instance.platform.name = 'p1'
+    plan = SimpleNamespace(
+        instances={'p1/dummy.suite': instance},
+        platforms=[],
+        selected_platforms=['p1'],
+        instance_fail_count=0,
+    )
+    options = SimpleNamespace(
+        outdir=str(tmp_path),
+        report_all_options=False,
+        report_filtered=False,
+        create_rom_ram_report=False,
+        footprint_report=None,
+    )
+    env = SimpleNamespace(
+        options=options,
+        non_default_options=lambda: {'jobs': 1},
+        toolchain='zephyr',
+        commit_date='today',
+        run_date='today',
+    )
+    reporting = Reporting(plan, env)
+
+    json_file = tmp_path / 'twister.json'
+    reporting.json_report(json_file, version='v4.1.0')
+
+    with open(json_file) as fp:
+        report = json.load(fp)
+    assert report['environment']['zephyr_version'] == 'v4.1.0'
+    assert report['testsuites'] == [
+        {
+            'name': 'dummy.suite',
+            'arch': 'arm',
+            'platform': 'p1',
+            'path': 'tests/dummy',
+            'runnable': True,
+            'used_ram': 1000,
+            'retries': 0,
+            'toolchain': 'zephyr',
+            'status': 'passed',
+            'execution_time': '0.50',
+            'build_time': '1.50',
+            'testcases': [],
+        }
+    ]
@@ -15,6 +15,7 @@ import queue
 import re
 import subprocess
 import sys
+import threading
 import yaml
 
 from contextlib import nullcontext
@@ -30,11 +31,17 @@ from twisterlib.harness import Pytest
 
 from twisterlib.runner import (
     CMake,
+    CostAwareQueue,
     ExecutionCounter,
     FilterBuilder,
+    PipelineDispatcher,
     ProjectBuilder,
-    TwisterRunner
+    TaskCostEstimator,
+    Snapshot,
+    TwisterRunner,
+    load_edt
 )
+from twisterlib.timing import TimingDatabase
 
 @pytest.fixture
 def mocked_instance(tmp_path):
@@ -186,8 +193,9 @@ def test_if_zephyr_base_is_sanitized_properly(project_builder: ProjectBuilder):
     assert sanitized_path == sanitized_path_expected
 
 
-def test_executioncounter(capfd):
-    ec = ExecutionCounter(total=12)
+@pytest.mark.parametrize('shared_array', [False, True], ids=['values', 'shared array'])
+def test_executioncounter(capfd, shared_array):
+    ec = ExecutionCounter(total=12, shared_array=shared_array)
 
     ec.cases = 25
     ec.skipped_cases = 6
@@ -240,6 +248,12 @@ def test_executioncounter(capfd):
     assert ec.filtered_static == 2
     assert ec.failed == 1
 
+    ec.passed_increment(3)
+    ec.warnings_increment()
+    assert ec.passed == 9
+    assert ec.warnings == 1
+    assert ec.total == 12
+
 
 def test_cmake_parse_generated(mocked_jobserver):
     testsuite_mock = mock.Mock()
@@ -742,7 +756,8 @@ def test_filterbuilder_parse_generated(
          mock.patch('builtins.open', mock_open), \
          mock.patch('expr_parser.parse', mock_parser), \
          mock.patch('pickle.load', mock_pickle), \
-         mock.patch('os.path.exists', return_value=edt_exists), \
+         mock.patch('os.path.exists',
+                    lambda path: edt_exists and path == expected_edt_pickle_path), \
          mock.patch('os.environ', environ_mock), \
          pytest.raises(expected_return) if \
              isinstance(parse_results, type) and \
@@ -762,6 +777,46 @@ def test_filterbuilder_parse_generated(
     assert result == expected_return
 
 
+@pytest.mark.parametrize(
+    'files, expected',
+    [
+        (['edt.snapshot', 'edt.pickle'], 'snapshot'),
+        (['edt.pickle'], 'edt'),
+        ([], None),
+    ],
+    ids=['snapshot', 'pickle only', 'no devicetree']
+)
+def test_load_edt(tmp_path, files, expected):
+    for name in files:
+        (tmp_path / name).write_bytes(b'dummy')
+
+    with mock.patch('twisterlib.runner.Snapshot', return_value='snapshot'), \
+         mock.patch('pickle.load', return_value='edt'):
+        assert load_edt(str(tmp_path)) == expected
+
+
+@pytest.mark.parametrize('parse_error', [False, True], ids=['parsed', 'parse error'])
+def test_filterbuilder_parse_generated_closes_snapshot(tmp_path, mocked_jobserver, parse_error):
+    testsuite_mock = mock.Mock(filter='dt_compat_enabled("dummy")')
+    testsuite_mock.name = 'dummy.testsuite.name'
+    platform_mock = mock.Mock()
+    platform_mock.name = 'dummy_platform'
+    fb = FilterBuilder(testsuite_mock, platform_mock, 'source_dir', str(tmp_path),
+                       mocked_jobserver)
+    fb.instance = mock.Mock(sysbuild=None, toolchain='zephyr')
+
+    snapshot = mock.create_autospec(Snapshot, instance=True)
+
+    with mock.patch('twisterlib.runner.load_edt', return_value=snapshot), \
+         mock.patch('expr_parser.parse',
+                    side_effect=SyntaxError if parse_error else None,
+                    return_value=True), \
+         pytest.raises(SyntaxError) if parse_error else nullcontext():
+        fb.parse_generated(filter_stages=['dts'])
+
+    snapshot.close.assert_called_once_with()
+
+
 TESTDATA_4 = [
     (False, False, [f"see: {os.path.join('dummy', 'path', 'dummy_file.log')}"]),
     (True, False, [os.path.join('dummy', 'path', 'dummy_file.log'),
@@ -2234,6 +2289,79 @@ def test_projectbuilder_cmake():
     pb.run_cmake.assert_called_once_with(['dummy'], ['dummy filter'])
 
 
+TESTDATA_BOARD_FILTER = [
+    ({}, 'prj.conf', ['kconfig'], False),
+    ({}, 'app.overlay', ['dts', 'kconfig'], True),
+    ({}, 'Kconfig', ['kconfig'], True),
+    ({'extra_args': ['SHIELD=dummy']}, None, ['dts', 'kconfig'], True),
+    ({'required_snippets': ['cdc-acm-console']}, None, ['kconfig'], True),
+    ({'sysbuild': True}, None, ['kconfig'], True),
+]
+
+@pytest.mark.parametrize(
+    'suite_changes, extra_file, filter_stages, expect_cmake',
+    TESTDATA_BOARD_FILTER,
+    ids=['board only', 'app overlay', 'app Kconfig', 'extra args', 'snippets', 'sysbuild']
+)
+def test_projectbuilder_cmake_filter(
+    tmp_path,
+    mocked_jobserver,
+    suite_changes,
+    extra_file,
+    filter_stages,
+    expect_cmake
+):
+    def make_builder(name, source_files):
+        source_dir = tmp_path / name
+        source_dir.mkdir()
+        for filename in source_files:
+            (source_dir / filename).write_text('CONFIG_ZTEST=y\n')
+        instance_mock = mock.Mock(sysbuild=False, toolchain='zephyr')
+        instance_mock.name = f'dummy_board/zephyr/{name}'
+        instance_mock.handler.ready = False
+        instance_mock.build_dir = str(tmp_path / 'out' / name)
+        instance_mock.platform.name = 'dummy_board'
+        instance_mock.platform.arch = 'arm'
+        instance_mock.testsuite.name = name
+        instance_mock.testsuite.source_dir = str(source_dir)
+        instance_mock.testsuite.filter = 'CONFIG_DUMMY'
+        for attr in ['extra_args', 'extra_conf_files', 'extra_overlay_confs',
+                     'extra_dtc_overlay_files', 'required_snippets']:
+            setattr(instance_mock.testsuite, attr, [])
+        env_mock = mock.Mock()
+        env_mock.options.disable_board_filter_cache = False
+        env_mock.options.extra_args = []
+        env_mock.options.outdir = str(tmp_path / 'out')
+        return ProjectBuilder(instance_mock, env_mock, mocked_jobserver)
+
+    def run_cmake(pb):
+        def cmake(filter_stages):
+            pb.defconfig = {'CONFIG_DUMMY': 'y'}
+            pb.cmake_cache = {}
+            return {
+                'returncode': 0,
+                'filter': pb.evaluate_filter(pb.get_filter_data(filter_stages), None)
+            }
+        return mock.Mock(side_effect=cmake)
+
+    with mock.patch.object(ProjectBuilder, '_board_filter_data', {}):
+        reference = make_builder('reference', ['prj.conf'])
+        reference.cmake = run_cmake(reference)
+        reference.cmake_filter(filter_stages)
+        reference.cmake.assert_called_once_with(filter_stages=filter_stages)
+
+        pb = make_builder('suite', ['prj.conf'] + ([extra_file] if extra_file else []))
+        for attr, value in suite_changes.items():
+            target = pb.instance if attr == 'sysbuild' else pb.testsuite
+            setattr(target, attr, value)
+        pb.cmake = run_cmake(pb)
+
+        res = pb.cmake_filter(filter_stages)
+
+    assert res['filter'] == {'dummy_board/zephyr/suite': False}
+    assert pb.cmake.called == expect_cmake
+
+
 def test_projectbuilder_build(mocked_jobserver):
     instance_mock = mock.Mock()
     instance_mock.testsuite.harness = 'test'
@@ -2869,3 +2997,151 @@ def test_twisterrunner_get_cmake_filter_stages(filter, expected_result):
     result = TwisterRunner.get_cmake_filter_stages(filter, ['not', 'and'])
 
     assert sorted(result) == sorted(expected_result)
+
+
+def test_taskcostestimator_estimate():
+    timing_db = TimingDatabase()
+    timing_db.add('p1', 'zephyr', 'known', build_time=100, handler_time=50, used_rom=1000)
+    timing_db.add('p1', 'zephyr', 'rom_only', used_rom=3000)
+    timing_db.add('p1', 'zephyr', 'other', build_time=20, handler_time=10, used_rom=1000)
+
+    def make_instance(name, run=True):
+        instance = mock.Mock(run=run, toolchain='zephyr')
+        instance.name = name
+        instance.platform.name = 'p1'
+        instance.testsuite.name = name
+        return instance
+
+    estimator = TaskCostEstimator(timing_db)
+
+    assert estimator.estimate(make_instance('known')) == (100, 50)
+    assert estimator.estimate(make_instance('known', run=False)) == (100, 0.0)
+    # 120 seconds of build time spread over 2000 bytes of ROM
+    assert estimator.estimate(make_instance('rom_only')) == (180.0, 30.0)
+    assert estimator.estimate(make_instance('unknown')) == (60.0, 30.0)
+
+    empty_estimator = TaskCostEstimator()
+    assert empty_estimator.estimate(make_instance('unknown')) == (
+        TaskCostEstimator.DEFAULT_BUILD_TIME,
+        TaskCostEstimator.DEFAULT_HANDLER_TIME
+    )
+
+
+def test_costawarequeue_order():
+    def make_task(op, name):
+        instance = mock.Mock()
+        instance.name = name
+        return {'op': op, 'test': instance}
+
+    costs = {
+        'short': (10.0, 0.0),
+        'long_build': (200.0, 0.0),
+        'long_run': (50.0, 300.0),
+    }
+    pipeline = CostAwareQueue(costs)
+    tasks = [
+        make_task('cmake', 'short'),
+        make_task('cmake', 'long_build'),
+        make_task('report', 'short'),
+        make_task('run', 'long_build'),
+        make_task('cmake', 'long_run'),
+        make_task('cmake', 'unknown'),
+        make_task('cleanup', 'long_run'),
+    ]
+    for task in tasks:
+        pipeline.put(task)
+
+    assert pipeline.qsize() == len(tasks)
+
+    order = []
+    while not pipeline.empty():
+        task = pipeline.get_nowait()
+        order.append((task['op'], task['test'].name))
+
+    assert order == [
+        ('cleanup', 'long_run'),
+        ('report', 'short'),
+        ('cmake', 'long_run'),
+        ('cmake', 'long_build'),
+        ('cmake', 'short'),
+        ('cmake', 'unknown'),
+        ('run', 'long_build'),
+    ]
+
+    with pytest.raises(queue.Empty):
+        pipeline.get_nowait()
+
+
+def test_costawarequeue_blocking():
+    pipeline = CostAwareQueue()
+    task = {'op': 'cmake', 'test': mock.Mock()}
+
+    with pytest.raises(queue.Empty):
+        pipeline.get(timeout=0.01)
+
+    putter = threading.Timer(0.05, pipeline.put, args=(task,))
+    putter.start()
+    assert pipeline.get(timeout=5) is task
+    putter.join()
+
+
+def _pipe_transport_worker(pipeline, done, lock, results):
+    while True:
+        try:
+            task = pipeline.get_nowait()
+        except queue.Empty:
+            return
+        if task['op'] == 'build':
+            pipeline.put({'op': 'report', 'test': task['test']})
+        else:
+            with lock:
+                done.put(task['test'])
+                results.done_increment()
+
+
+def test_twisterrunner_execute_pipe_transport():
+    tr = TwisterRunner({}, [], env=mock.Mock())
+    tr.options.pipeline_transport = 'pipe'
+    tr.add_tasks_to_queue = mock.Mock()
+    tr.pipeline_mgr = _pipe_transport_worker
+    tr.results = ExecutionCounter(total=20, shared_array=True)
+    tr.jobs = 4
+
+    pipeline = queue.LifoQueue()
+    done = queue.LifoQueue()
+    for i in range(20):
+        pipeline.put({'op': 'build', 'test': f'instance {i}'})
+
+    tr.execute(pipeline, done)
+
+    assert pipeline.empty()
+    assert sorted(done.queue) == sorted(f'instance {i}' for i in range(20))
+    assert tr.results.done == 20
+
+
+def test_pipelinedispatcher_serve():
+    pipeline = queue.LifoQueue()
+    done = queue.LifoQueue()
+    pipeline.put({'op': 'cmake', 'test': 'a'})
+
+    dispatcher = PipelineDispatcher(pipeline, done)
+    channel = dispatcher.connect()
+    conn = dispatcher.connections[0]
+
+    # Requests carry the buffered tasks and done instances of the worker.
+    channel.put({'op': 'report', 'test': 'b'})
+    channel.done.put('c')
+    channel.conn.send((channel._tasks, channel._done))
+    channel.close()
+
+    on_disconnect = mock.Mock()
+    dispatcher.serve(on_disconnect=on_disconnect)
+
+    on_disconnect.assert_called_once_with(conn)
+    assert dispatcher.connections == []
+    assert list(done.queue) == ['c']
+    # The task picked for the worker that went away is put back.
+    assert list(pipeline.queue) == [
+        {'op': 'cmake', 'test': 'a'},
+        {'op': 'report', 'test': 'b'}
+    ]
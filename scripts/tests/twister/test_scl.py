@@ -84,6 +84,7 @@ def test_yaml_imports(fail_c):
 
     import yaml
     reload(yaml)
+    reload(scl)
 
 
 TESTDATA_2 = [
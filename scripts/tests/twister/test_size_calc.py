@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# Copyright The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for size_calc.py classes' methods
+"""
+
+import shutil
+import subprocess
+
+import pytest
+from twisterlib.size_calc import SizeCalculator
+
+ASM_SOURCE = """\
+.section text,"ax",@progbits
+.globl _start
+_start:
+.space 64
+.section rodata,"a",@progbits
+.space 100
+.section datas,"aw",@progbits
+.space 32
+.section bss,"aw",@nobits
+.space 256
+.section noinit,"aw",@nobits
+.space 16
+.section mystery,"a",@progbits
+.space 8
+.section .comment_like,"",@progbits
+.space 4
+"""
+
+LINKER_SCRIPT = """\
+SECTIONS {
+  . = 0x10000;
+  text : { *(text) }
+  rodata : { *(rodata) }
+  . = 0x20000000;
+  datas : AT(LOADADDR(rodata) + SIZEOF(rodata)) { *(datas) }
+  bss (NOLOAD) : { *(bss) }
+  noinit (NOLOAD) : { *(noinit) }
+  mystery : { *(mystery) }
+}
+"""
+
+
+def build_elf(tmp_path, xip):
+    source = tmp_path / 'image.s'
+    source.write_text(ASM_SOURCE + ('.globl CONFIG_XIP\n.set CONFIG_XIP, 1\n' if xip else ''))
+    script = tmp_path / 'image.ld'
+    script.write_text(LINKER_SCRIPT)
+    elf = tmp_path / 'image.elf'
+    subprocess.check_call(
+        ['gcc', '-nostdlib', '-static', '-no-pie', '-T', str(script), '-o', str(elf), str(source)]
+    )
+    return str(elf)
+
+
+def objdump_sections(elf_filename):
+    """Sections reported by 'objdump -h', as parsed by former SizeCalculator versions."""
+    output = subprocess.check_output(['objdump', '-h', elf_filename]).decode().splitlines()
+    sections = []
+    for line in output:
+        words = line.split()
+        if not words or not words[0][0].isdigit() or words[1][0] == '.':
+            continue
+        size = int(words[2], 16)
+        if size:
+            sections.append((words[1], int(words[3], 16), int(words[4], 16), size))
+    return sections
+
+
+@pytest.mark.skipif(
+    not all(shutil.which(tool) for tool in ['gcc', 'objdump', 'nm']),
+    reason='binutils and gcc are required',
+)
+@pytest.mark.parametrize('xip', [True, False], ids=['xip', 'not xip'])
+def test_sizecalculator_parity(tmp_path, xip):
+    elf_filename = build_elf(tmp_path, xip)
+    nm_output = subprocess.check_output(['nm', elf_filename]).decode()
+
+    calc = SizeCalculator(elf_filename, [])
+
+    assert calc.is_xip == ('CONFIG_XIP' in nm_output) == xip
+    assert [
+        (s['name'], s['virt_addr'], s['load_addr'], s['size']) for s in calc.sections
+    ] == objdump_sections(elf_filename)
+    assert [s['type'] for s in calc.sections] == ['ro', 'ro', 'rw', 'alloc', 'alloc', 'unknown']
+    assert calc.get_used_rom() == 64 + 100 + 32
+    assert calc.get_used_ram() == 32 + 256 + 16 + (0 if xip else 64 + 100)
+
+
+def test_sizecalculator_not_elf(tmp_path, capfd):
+    not_elf = tmp_path / 'zephyr.elf'
+    not_elf.write_bytes(b'not an elf file')
+
+    with pytest.raises(SystemExit) as exc:
+        SizeCalculator(str(not_elf), [])
+
+    assert exc.value.code == 2
+    assert 'is not an ELF binary' in capfd.readouterr().out
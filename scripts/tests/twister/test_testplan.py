@@ -6,6 +6,7 @@
 '''
 This test file contains testsuites for testsuite.py module of twister
 '''
+import json
 import sys
 import os
 import mock
@@ -17,6 +18,7 @@ ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
 sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/twister"))
 
 from twisterlib.statuses import TwisterStatus
+from twisterlib.discovery_cache import DiscoveryCache
 from twisterlib.testplan import TestPlan, change_skip_to_error_if_integration
 from twisterlib.testinstance import TestInstance
 from twisterlib.testsuite import TestSuite
@@ -566,6 +568,7 @@ def test_testplan_discover(
         test='ts1',
         quarantine_list=[tmp_path / qf for qf in ql],
         quarantine_verify=qv,
+        discovery_cache=None,
     )
     testplan.testsuites = {
         'ts1': mock.Mock(id=1),
@@ -849,6 +852,58 @@ def test_testplan_generate_subset(
            expected_subset
 
 
+@pytest.mark.parametrize(
+    'subset, expected_subset',
+    [
+        (1, ['plat1/testA', 'plat3/testA', 'plat3/testB', 'plat3/testC']),
+        (2, ['plat1/testB', 'plat1/testC', 'plat2/testA', 'plat2/testB']),
+    ],
+    ids=['subset 1', 'subset 2']
+)
+def test_testplan_generate_subset_duration(tmp_path, subset, expected_subset):
+    report = tmp_path / 'twister.json'
+    report.write_text(json.dumps({'testsuites': [
+        {'name': 'testA', 'platform': 'plat1', 'toolchain': 'zephyr',
+         'build_time': '100.00', 'execution_time': '200.00'},
+        {'name': 'testB', 'platform': 'plat1', 'toolchain': 'zephyr',
+         'build_time': '10.00', 'execution_time': '20.00'},
+        {'name': 'testC', 'platform': 'plat1', 'toolchain': 'zephyr',
+         'build_time': '10.00', 'execution_time': '10.00'},
+        {'name': 'testA', 'platform': 'plat2', 'toolchain': 'zephyr',
+         'build_time': '50.00', 'execution_time': '30.00'},
+        {'name': 'testB', 'platform': 'plat2', 'toolchain': 'zephyr',
+         'build_time': '50.00', 'execution_time': '50.00'},
+    ]}))
+
+    def make_instance(platform, name, status=TwisterStatus.NONE):
+        instance = mock.Mock(status=status, run=True, toolchain='zephyr')
+        instance.platform.name = platform
+        instance.testsuite.name = name
+        return instance
+
+    testplan = TestPlan(env=mock.Mock())
+    testplan.options = mock.Mock(
+        device_testing=False,
+        shuffle_tests=False,
+        subset_mode='duration',
+        subset_history=[report]
+    )
+    testplan.instances = {
+        'plat1/testA': make_instance('plat1', 'testA'),
+        'plat1/testB': make_instance('plat1', 'testB'),
+        'plat1/testC': make_instance('plat1', 'testC'),
+        'plat2/testA': make_instance('plat2', 'testA'),
+        'plat2/testB': make_instance('plat2', 'testB'),
+        'plat3/testA': make_instance('plat3', 'testA', TwisterStatus.SKIP),
+        'plat3/testB': make_instance('plat3', 'testB', TwisterStatus.SKIP),
+        'plat3/testC': make_instance('plat3', 'testC', TwisterStatus.ERROR),
+    }
+
+    testplan.generate_subset(subset, 2)
+
+    assert list(testplan.instances.keys()) == expected_subset
+
+
 def test_testplan_handle_modules():
     testplan = TestPlan(env=mock.Mock())
 
@@ -1317,6 +1372,51 @@ tests:
     assert testplan.load_errors == expected_errors
 
 
+def test_testplan_add_testsuites_parallel(tmp_path):
+    tmp_test_root_dir = tmp_path / 'tests'
+    for i in range(6):
+        suite_dir = tmp_test_root_dir / f'suite_{i}'
+        (suite_dir / 'src').mkdir(parents=True)
+        (suite_dir / 'testcase.yaml').write_text(
+            f'tests:\n  dummy.parallel.{i}:\n    harness: ztest\n'
+        )
+        (suite_dir / 'src' / 'main.c').write_text(
+            f'ZTEST_SUITE(suite_{i}, NULL, NULL, NULL, NULL, NULL);\n'
+            f'ZTEST(suite_{i}, test_case_{i}) {{}}\n'
+        )
+    (tmp_test_root_dir / 'broken').mkdir()
+    (tmp_test_root_dir / 'broken' / 'testcase.yaml').write_text('tests:\n wrong: {]}\n')
+
+    def discover(jobs, cache=None):
+        env = mock.Mock(
+            test_roots=[tmp_test_root_dir],
+            options=mock.Mock(detailed_test_id=True, discovery_jobs=jobs),
+            alt_config_root=[]
+        )
+        testplan = TestPlan(env=env)
+        testplan.discovery_cache = cache
+        testplan.PARALLEL_DISCOVERY_MIN_SUITES = 0
+        testplan.add_testsuites()
+        return testplan
+
+    serial = discover(1)
+    cache = DiscoveryCache(tmp_path / 'discovery.pickle', schema=TestPlan.suite_schema)
+    parallel = discover(2, cache)
+
+    assert parallel.load_errors == serial.load_errors == 1
+    assert list(parallel.testsuites) == list(serial.testsuites)
+    assert len(parallel.testsuites) == 6
+    for name, suite in serial.testsuites.items():
+        assert [tc.name for tc in parallel.testsuites[name].testcases] == \
+            [tc.name for tc in suite.testcases]
+
+    # Cache entries written by the workers end up in the cache of the plan,
+    # the broken yaml file is never cached.
+    assert cache.stats() == '0 hits, 13 misses'
+    discover(2, cache)
+    assert cache.stats() == '12 hits, 14 misses'
+
+
 def test_testplan_str():
     testplan = TestPlan(env=mock.Mock())
     testplan.name = 'my name'
@@ -488,10 +488,11 @@ def test_find_c_files_in(isdir, expected):
         raise ValueError('This test wasn\'t designed for those globs.'
                          ' Please fix the test before PR!')
 
-    def mock_glob(fmt, *args, **kwargs):
+    def mock_glob(fmt, *args, root_dir=None, **kwargs):
         from_where, extension = format_tester(fmt)
+        search_dir = root_dir or cur_dir
 
-        if cur_dir == old_dir:
+        if search_dir == old_dir:
             if from_where == 'subdirs':
                 return []
             elif from_where == 'base':
@@ -499,7 +500,7 @@ def test_find_c_files_in(isdir, expected):
                                    old_dir_base))
             else:
                 return []
-        if cur_dir == new_path:
+        if search_dir == new_path:
             if from_where == 'subdirs':
                 return list(filter(lambda fn: fn.endswith(extension),
                                    new_path_subs))
@@ -520,8 +521,8 @@ def test_find_c_files_in(isdir, expected):
 
     assert sorted(filenames) == sorted(expected)
 
-    assert chdir_mock.call_args is None or \
-           chdir_mock.call_args == mock.call(old_dir)
+    # Workers scan test suites concurrently, the CWD must stay untouched.
+    chdir_mock.assert_not_called()
 
 
 TESTDATA_8 = [
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# Copyright The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for timing.py classes' methods
+"""
+
+import json
+
+import pytest
+from twisterlib.timing import TimingDatabase, TimingRecord, balance_shards
+
+
+def write_report(path, suites):
+    with open(path, 'w') as fp:
+        json.dump({'environment': {}, 'testsuites': suites}, fp)
+    return path
+
+
+def test_timingrecord_add():
+    record = TimingRecord()
+    record.add(10.0, 4.0, 100)
+    record.add(20.0, 2.0, 0)
+    # Build-only run
+    record.add(30.0, 0.0, 0)
+
+    assert record.build_time == pytest.approx(20.0)
+    assert record.handler_time == pytest.approx(3.0)
+    assert record.used_rom == 100
+    assert record.build_samples == 3
+    assert record.handler_samples == 2
+
+
+def test_timingdatabase_from_reports(tmp_path):
+    report1 = write_report(
+        tmp_path / 'twister1.json',
+        [
+            {
+                'name': 'kernel.common',
+                'platform': 'qemu_x86',
+                'toolchain': 'zephyr',
+                'build_time': '30.00',
+                'execution_time': '12.50',
+                'used_rom': 4096,
+            },
+            {'name': 'no.platform'},
+            {
+                'name': 'sample.basic',
+                'platform': 'frdm_k64f',
+                'build_time': '10.00',
+                'used_rom': 2048,
+            },
+        ],
+    )
+    report2 = write_report(
+        tmp_path / 'twister2.json',
+        [
+            {
+                'name': 'kernel.common',
+                'platform': 'qemu_x86',
+                'toolchain': 'zephyr',
+                'build_time': '50.00',
+                'execution_time': '7.50',
+            },
+            {
+                'name': 'kernel.common',
+                'platform': 'qemu_x86',
+                'toolchain': 'zephyr',
+                'status': 'filtered',
+                'build_time': '0.00',
+            },
+            {
+                'name': 'kernel.common',
+                'platform': 'qemu_x86',
+                'toolchain': 'zephyr',
+                'status': 'passed',
+                'build_time': '40.00',
+            },
+            {
+                'name': 'only.filtered',
+                'platform': 'qemu_x86',
+                'status': 'filtered',
+            },
+            {
+                'name': 'only.skipped',
+                'platform': 'qemu_x86',
+                'status': 'skipped',
+                'build_time': '5.00',
+            },
+        ],
+    )
+
+    db = TimingDatabase.from_reports([report1, report2, tmp_path / 'missing.json'])
+
+    assert len(db) == 2
+    record = db.lookup('qemu_x86', 'kernel.common', 'zephyr')
+    assert record.build_time == pytest.approx(40.0)
+    assert record.handler_time == pytest.approx(10.0)
+    assert record.used_rom == 4096
+
+    # Fall back to another toolchain of the same configuration.
+    assert db.lookup('qemu_x86', 'kernel.common', 'llvm') is record
+    assert db.lookup('qemu_x86', 'sample.basic') is None
+    # Suites which were not built nor run have no record of their own.
+    assert db.lookup('qemu_x86', 'only.filtered') is None
+    assert db.lookup('qemu_x86', 'only.skipped') is None
+
+    assert db.median_build_time() == pytest.approx(25.0)
+    assert db.median_handler_time() == pytest.approx(10.0)
+    assert db.build_time_per_rom_byte() == pytest.approx(50.0 / 6144)
+
+
+def test_timingdatabase_empty():
+    db = TimingDatabase.from_reports(None)
+
+    assert len(db) == 0
+    assert db.median_build_time() == 0.0
+    assert db.median_handler_time() == 0.0
+    assert db.build_time_per_rom_byte() == 0.0
+
+
+@pytest.mark.parametrize(
+    'costs, shards, expected',
+    [
+        ({}, 2, [(0.0, []), (0.0, [])]),
+        ({'a': 5.0}, 3, [(5.0, ['a']), (0.0, []), (0.0, [])]),
+        # equal count slices would give 10+9 and 1+1
+        ({'a': 10.0, 'b': 9.0, 'c': 1.0, 'd': 1.0}, 2, [(11.0, ['a', 'd']), (10.0, ['b', 'c'])]),
+        # ties are broken by the input order
+        ({'x': 2.0, 'y': 2.0, 'z': 2.0, 'w': 2.0}, 2, [(4.0, ['x', 'z']), (4.0, ['y', 'w'])]),
+    ],
+    ids=['empty', 'fewer items than shards', 'balanced', 'ties'],
+)
+def test_balance_shards(costs, shards, expected):
+    assert balance_shards(costs, shards) == expected
+
+
+def test_balance_shards_covers_all_items():
+    costs = {f'item{i}': float((i * 37) % 11) for i in range(100)}
+
+    result = balance_shards(costs, 7)
+
+    names = [name for _, shard in result for name in shard]
+    assert sorted(names) == sorted(costs)
+    totals = [total for total, _ in result]
+    # LPT keeps every shard within the largest single item of the others
+    assert max(totals) - min(totals) <= max(costs.values())
+    assert balance_shards(dict(costs), 7) == result